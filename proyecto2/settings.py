@@ -98,6 +98,18 @@ DATABASES = {
     }
 }
 
+# La caché "resumen" (totales de Inicio y del listado de proyectos) está en la base de datos
+# para que su invalidación llegue a todos los procesos; la tabla la crea la migración 0045.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'resumen': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'proyectoapp_cache',
+    },
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
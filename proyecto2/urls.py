@@ -128,6 +128,11 @@ urlpatterns = [
 
     path('proyecto/<str:proyecto_id>/', detalle_proyecto, name='detalle_proyecto'),
     path('api/subcategorias/<str:categoria_id>/', obtener_subcategorias, name='obtener_subcategorias'),
+    path('api/subarbol/<str:categoria_id>/', views.obtener_subarbol_categoria, name='obtener_subarbol_categoria'),
+    path('api/importacion/validar/', views.validar_importacion, name='validar_importacion'),
+    path('api/importacion/trabajos/<int:trabajo_id>/', views.estado_trabajo_importacion, name='estado_trabajo_importacion'),
+    path('api/importacion/trabajos/<int:trabajo_id>/cancelar/', views.cancelar_trabajo_importacion, name='cancelar_trabajo_importacion'),
+    path('api/importacion/trabajos/<int:trabajo_id>/reanudar/', views.reanudar_trabajo_importacion, name='reanudar_trabajo_importacion'),
     
    path('subir_archivo/', subir_archivo, name='subir_archivo'),
 
@@ -181,11 +186,15 @@ urlpatterns = [
 
 
    path('api/obtener-comparacion-costos/<str:proyecto_id>/', views.obtener_comparacion_costos, name='obtener_comparacion_costos'),
+   path('api/portafolio/', views.portafolio_costos, name='portafolio_costos'),
 
    path('obtener_proyecto_relacionado/<str:proyecto_id>/', views.obtener_proyecto_relacionado, name='obtener_proyecto_relacionado'),
 
    
     path('api/duplicar-proyecto/<str:proyecto_id>/', views.duplicar_proyecto, name='duplicar_proyecto'),
+    path('api/archivo-proyecto/<str:proyecto_id>/', views.archivo_proyecto, name='archivo_proyecto'),
+    path('api/eliminar-masivo/<str:modelo_nombre>/', views.eliminar_masivo, name='eliminar_masivo'),
+    path('api/editar-masivo/<str:modelo_nombre>/', views.editar_masivo, name='editar_masivo'),
 
     path('api/obtener-niveles-proyecto/<str:proyecto_id>/', views.obtener_niveles_proyecto, name='obtener_niveles_proyecto'),
 
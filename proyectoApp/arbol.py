@@ -0,0 +1,143 @@
+"""Utilidades sobre la jerarquía de categorías (ruta materializada y subárboles)."""
+from django.db import connection
+
+from .models import CategoriaNuevo
+
+
+SEP = CategoriaNuevo.SEPARADOR_RUTA
+
+
+def calcular_rutas(categorias, rutas_externas=None):
+    """Calcula {id: ruta} en memoria para una lista de categorías (id, id_padre_id).
+
+    ``rutas_externas`` aporta la ruta de padres que no están en la lista. Las
+    categorías que forman un ciclo quedan como raíz para no perder el árbol.
+    Lanza ValueError si algún id contiene el separador o alguna ruta no entra en la columna.
+    """
+    rutas_externas = rutas_externas or {}
+    padres = {c.id: c.id_padre_id for c in categorias}
+    rutas = {}
+
+    for categoria_id in padres:
+        camino = []
+        actual = categoria_id
+        while actual in padres and actual not in rutas and actual not in camino:
+            camino.append(actual)
+            actual = padres[actual]
+
+        if actual in rutas:
+            base = rutas[actual]
+        elif actual in camino:
+            base = SEP  # ciclo: se corta en el nodo repetido
+        elif actual is not None and actual in rutas_externas:
+            base = rutas_externas[actual] or f"{SEP}{actual}{SEP}"
+        else:
+            base = SEP
+        for nodo in reversed(camino):
+            base = f"{base}{nodo}{SEP}"
+            CategoriaNuevo.validar_id_ruta(nodo)
+            CategoriaNuevo.validar_largo_ruta(nodo, len(base))
+            rutas[nodo] = base
+    return rutas
+
+
+def reconstruir_rutas(proyecto_ids=None, batch_size=500):
+    """Recalcula la ruta materializada de las categorías y guarda solo las que cambian.
+
+    Retorna la cantidad de categorías actualizadas.
+    """
+    categorias = CategoriaNuevo.objects.only('id', 'id_padre_id', 'ruta')
+    if proyecto_ids:
+        categorias = categorias.filter(proyecto_id__in=proyecto_ids)
+    categorias = list(categorias)
+
+    ids = {c.id for c in categorias}
+    padres_externos = {c.id_padre_id for c in categorias if c.id_padre_id and c.id_padre_id not in ids}
+    rutas_externas = dict(
+        CategoriaNuevo.objects.filter(id__in=padres_externos).values_list('id', 'ruta')
+    ) if padres_externos else {}
+
+    rutas = calcular_rutas(categorias, rutas_externas)
+    modificadas = []
+    for categoria in categorias:
+        if categoria.ruta != rutas[categoria.id]:
+            categoria.ruta = rutas[categoria.id]
+            modificadas.append(categoria)
+    CategoriaNuevo.objects.bulk_update(modificadas, ['ruta'], batch_size=batch_size)
+    return len(modificadas)
+
+
+# Campos que la API de subárbol puede devolver (parámetro ``fields``)
+CAMPOS_SUBARBOL = ('id', 'nombre', 'total_costo', 'nivel', 'final', 'id_padre', 'categoria_relacionada', 'proyecto')
+CAMPOS_SUBARBOL_DEFECTO = ('id', 'nombre', 'total_costo')
+# Tope de niveles de la consulta recursiva (protege contra ciclos en datos antiguos)
+PROFUNDIDAD_MAXIMA = 100
+
+
+def filas_subarbol(categoria_id, max_depth=None, campos=CAMPOS_SUBARBOL_DEFECTO):
+    """Lee el subárbol de una categoría (sin incluirla) con una sola consulta WITH RECURSIVE.
+
+    Las hijas directas tienen profundidad 1. Si se indica ``max_depth`` se lee un nivel
+    extra para poder informar qué nodos del borde tienen hijos. Retorna una lista de
+    diccionarios con los ``campos`` pedidos más ``id``, ``id_padre`` y ``profundidad``.
+    """
+    q = connection.ops.quote_name
+    meta = CategoriaNuevo._meta
+    tabla = q(meta.db_table)
+    col_id = q(meta.get_field('id').column)
+    col_padre = q(meta.get_field('id_padre').column)
+
+    limite = PROFUNDIDAD_MAXIMA if max_depth is None else min(max_depth + 1, PROFUNDIDAD_MAXIMA)
+    nombres = list(dict.fromkeys(('id', 'id_padre') + tuple(campos)))
+    campos_modelo = [meta.get_field(nombre) for nombre in nombres]
+    columnas = ", ".join(f"c.{q(campo.column)}" for campo in campos_modelo)
+
+    sql = (
+        f"WITH RECURSIVE subarbol (id, profundidad) AS ("
+        f" SELECT {col_id}, 1 FROM {tabla} WHERE {col_padre} = %s"
+        f" UNION ALL"
+        f" SELECT c.{col_id}, s.profundidad + 1 FROM {tabla} c"
+        f" INNER JOIN subarbol s ON c.{col_padre} = s.id"
+        f" WHERE s.profundidad < %s"
+        f") SELECT {columnas}, s.profundidad FROM subarbol s"
+        f" INNER JOIN {tabla} c ON c.{col_id} = s.id"
+        f" ORDER BY s.profundidad, c.{col_id}"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [categoria_id, limite])
+        filas = cursor.fetchall()
+
+    resultado = []
+    for fila in filas:
+        registro = {nombre: campo.to_python(valor) for nombre, campo, valor in zip(nombres, campos_modelo, fila)}
+        registro['profundidad'] = fila[-1]
+        resultado.append(registro)
+    return resultado
+
+
+def armar_subarbol(filas, raiz_id, campos=CAMPOS_SUBARBOL_DEFECTO, max_depth=None,
+                   clave_hijos='hijos', renombrar=None):
+    """Arma en O(n) la lista anidada de hijos de ``raiz_id`` a partir de ``filas_subarbol``.
+
+    Los nodos del borde (``profundidad == max_depth``) no incluyen hijos, pero indican
+    ``tiene_hijos`` para que la interfaz los cargue al desplegarlos.
+    """
+    renombrar = renombrar or {}
+    nodos = {}
+    hijos_de = {raiz_id: []}
+    # Las filas vienen ordenadas por profundidad: el padre siempre se procesa antes
+    for fila in filas:
+        if max_depth is not None and fila['profundidad'] > max_depth:
+            # Nivel extra: solo marca que el padre tiene hijos
+            if fila['id_padre'] in nodos:
+                nodos[fila['id_padre']]['tiene_hijos'] = True
+            continue
+        nodo = {renombrar.get(campo, campo): fila[campo] for campo in campos}
+        nodo[clave_hijos] = []
+        if max_depth is not None and fila['profundidad'] == max_depth:
+            nodo['tiene_hijos'] = False
+        nodos[fila['id']] = nodo
+        hijos_de[fila['id']] = nodo[clave_hijos]
+        if fila['id_padre'] in hijos_de:
+            hijos_de[fila['id_padre']].append(nodo)
+    return hijos_de[raiz_id]
@@ -0,0 +1,113 @@
+"""Archivo ZIP de un proyecto completo, generado mientras se envía.
+
+Cada tabla del proyecto (el proyecto, sus categorías y todas las tablas de costo) se lee
+por bloques (ver exportacion.py) y se escribe como un miembro .csv, .xlsx o .parquet de un
+ZIP que va directo a la respuesta: ``zipfile`` escribe sobre una salida sin ``seek`` y los
+bytes comprimidos se entregan apenas salen, así que la memoria no depende del tamaño del
+proyecto. Al final se agrega ``manifest.json`` con las filas y el SHA-256 de cada miembro.
+"""
+import hashlib
+import io
+import json
+import zipfile
+
+from django.utils import timezone
+
+from .clonacion import modelos_del_proyecto
+from .exportacion import EXPORTADORES, bloques_exportacion, columnas_exportacion, requiere_pyarrow
+from .models import CategoriaNuevo, ProyectoNuevo
+
+
+TAMANO_LECTURA = 64 * 1024
+
+
+class _Salida(io.RawIOBase):
+    """Destino del ZIP sin ``seek``: acumula lo escrito hasta que se lo entrega."""
+
+    def __init__(self):
+        super().__init__()
+        self.partes = []
+
+    def writable(self):
+        return True
+
+    def write(self, datos):
+        self.partes.append(bytes(datos))
+        return len(datos)
+
+    def vaciar(self):
+        datos = b''.join(self.partes)
+        self.partes.clear()
+        return datos
+
+
+def tablas_proyecto(proyecto_id):
+    """(modelo, queryset) de cada tabla con filas del proyecto."""
+    yield ProyectoNuevo, ProyectoNuevo.objects.filter(id=proyecto_id)
+    yield CategoriaNuevo, CategoriaNuevo.objects.del_proyecto(proyecto_id)
+    for modelo in modelos_del_proyecto():
+        yield modelo, modelo.objects.del_proyecto(proyecto_id)
+
+
+def _contenido(formato, queryset, columnas, bloques):
+    """Bytes del miembro en partes; el .xlsx y el .parquet pasan por un archivo temporal."""
+    if formato == 'csv':
+        for texto in EXPORTADORES['csv'](queryset, columnas, bloques):
+            yield texto.encode('utf-8')
+        return
+    with EXPORTADORES[formato](queryset, columnas, bloques) as archivo:
+        while parte := archivo.read(TAMANO_LECTURA):
+            yield parte
+
+
+def zip_proyecto(proyecto_id, formato='csv'):
+    """Genera el ZIP del proyecto por partes, para enviarlo con StreamingHttpResponse.
+
+    Lanza ValueError (antes de generar nada) si el formato no se puede escribir.
+    """
+    if formato not in EXPORTADORES:
+        raise ValueError(f"Formato no soportado: {formato}")
+    if formato == 'parquet':
+        requiere_pyarrow()
+    return _generar_zip(proyecto_id, formato)
+
+
+def _generar_zip(proyecto_id, formato):
+    salida = _Salida()
+    manifiesto = {
+        'proyecto': proyecto_id,
+        'formato': formato,
+        'generado': timezone.now().isoformat(),
+        'archivos': [],
+    }
+    with zipfile.ZipFile(salida, 'w', zipfile.ZIP_DEFLATED) as archivo_zip:
+        for modelo, queryset in tablas_proyecto(proyecto_id):
+            columnas = columnas_exportacion(modelo)
+            filas = 0
+
+            def contar(bloques):
+                nonlocal filas
+                for bloque in bloques:
+                    filas += len(bloque)
+                    yield bloque
+
+            nombre = f'{modelo.__name__}.{formato}'
+            resumen = hashlib.sha256()
+            tamano = 0
+            # Sin seek el tamaño va en el encabezado: zip64 por si el miembro pasa de 4 GB
+            with archivo_zip.open(nombre, 'w', force_zip64=True) as miembro:
+                for parte in _contenido(formato, queryset, columnas, contar(bloques_exportacion(queryset, columnas))):
+                    resumen.update(parte)
+                    tamano += len(parte)
+                    miembro.write(parte)
+                    if datos := salida.vaciar():
+                        yield datos
+            manifiesto['archivos'].append({
+                'nombre': nombre,
+                'modelo': modelo.__name__,
+                'filas': filas,
+                'bytes': tamano,
+                'sha256': resumen.hexdigest(),
+            })
+        archivo_zip.writestr('manifest.json', json.dumps(manifiesto, indent=2))
+    yield salida.vaciar()
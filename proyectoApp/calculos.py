@@ -0,0 +1,465 @@
+"""Fórmulas de los campos calculados de los modelos de costo.
+
+Cada fórmula es una función pura que recibe los valores por nombre y retorna
+{campo: valor}. Los valores pueden ser escalares (un registro, desde ``save()``) o
+``pd.Series`` de tipo object con Decimal (un lote, desde la importación o el comando
+``recalcular_campos_calculados``): la aritmética es la misma Decimal en ambos casos, así
+que los resultados coinciden al centavo.
+"""
+from collections import namedtuple
+from decimal import Decimal
+
+import pandas as pd
+from django.db import models, transaction
+from django.db.backends.utils import format_number
+
+from .models import (
+    CategoriaNuevo, Adquisiciones, Cantidades, MaterialesOtros, EquiposConstruccion, ManoObra, ApuEspecifico,
+    EspecificoCategoria, StaffEnami, DatosOtrosEP, CotizacionMateriales, ContratoSubcontrato,
+    IngenieriaDetallesContraparte, GestionPermisos, Dueno, MB, AdministracionSupervision,
+    PersonalIndirectoContratista, ServiciosApoyo, OtrosADM,
+)
+from .rollup import defer_rollups, solicitar_rollup
+
+
+CERO = Decimal('0.00')
+TAMANO_LOTE = 1000
+TAMANO_LOTE_IDS = 500
+
+
+# --- Operaciones que sirven para escalares y para lotes ----------------------------
+
+def _serie(valor, indice):
+    if isinstance(valor, pd.Series):
+        return valor.astype(object)
+    return pd.Series([valor] * len(indice), index=indice, dtype=object)
+
+
+def _si(condicion, si, no):
+    """``si if condicion else no`` elemento a elemento."""
+    if isinstance(condicion, pd.Series):
+        return _serie(si, condicion.index).where(condicion.astype(bool), _serie(no, condicion.index))
+    return si if condicion else no
+
+
+def _presente(valor):
+    if isinstance(valor, pd.Series):
+        return valor.notna()
+    return valor is not None
+
+
+def _o(valor, defecto):
+    """Reemplaza los valores vacíos por ``defecto``."""
+    return _si(_presente(valor), valor, defecto)
+
+
+def _decimal(valor):
+    if isinstance(valor, pd.Series):
+        return valor.map(Decimal, na_action='ignore')
+    return Decimal(valor)
+
+
+def _requerido(valor, mensaje):
+    faltantes = ~_presente(valor)
+    if faltantes.any() if isinstance(faltantes, pd.Series) else faltantes:
+        raise ValueError(mensaje)
+    return valor
+
+
+# --- Fórmulas -------------------------------------------------------------------------
+
+def calcular_cantidad(cantidad, fc):
+    return {'cantidad_final': cantidad + (cantidad * (fc / 100))}
+
+
+def calcular_adquisicion(costo_unitario, crecimiento, cantidad_final, flete_unitario):
+    costo_unitario, crecimiento = _decimal(costo_unitario), _decimal(crecimiento)
+    cantidad_final, flete_unitario = _decimal(cantidad_final), _decimal(flete_unitario)
+    total = _si(
+        crecimiento > Decimal('0.00'),
+        cantidad_final * costo_unitario * (Decimal('1.00') + crecimiento / Decimal('100.00')),
+        cantidad_final * costo_unitario,
+    )
+    flete = total * (flete_unitario / Decimal('100.00'))
+    return {'total': total, 'flete': flete, 'total_con_flete': total + flete}
+
+
+def calcular_material(costo_unidad, crecimiento, cantidad_final, flete_unitario):
+    crecimiento = _o(crecimiento, CERO)
+    total_usd = _si(
+        crecimiento > 0,
+        cantidad_final * costo_unidad * (1 + crecimiento / 100),
+        cantidad_final * costo_unidad,
+    )
+    fletes = total_usd * (flete_unitario / 100)
+    return {'total_usd': total_usd, 'fletes': fletes, 'total_sitio': total_usd + fletes}
+
+
+def calcular_equipo(horas_maquina_unidad, costo_maquina_hora, cantidad_final, final):
+    # 3 columnas si la categoría es final, 2 si no
+    return {
+        'total_horas_maquina': horas_maquina_unidad * cantidad_final,
+        'total_usd': _si(
+            final,
+            costo_maquina_hora * cantidad_final * horas_maquina_unidad,
+            costo_maquina_hora * cantidad_final,
+        ),
+    }
+
+
+def calcular_mano_obra(horas_hombre_unidad, fp, rendimiento, tarifas_usd_hh_mod, tarifa_usd_hh_equipos,
+                       costo_hombre_hora, cantidad_final):
+    horas_hombre_final = horas_hombre_unidad * fp
+    total_hh = cantidad_final * rendimiento * fp
+    total_usd_mod = total_hh * tarifas_usd_hh_mod
+    total_usd_equipos = total_hh * tarifa_usd_hh_equipos
+    return {
+        'horas_hombre_final': horas_hombre_final,
+        'total_hh': total_hh,
+        'cantidad_horas_hombre': horas_hombre_final * cantidad_final,
+        'total_usd_mod': total_usd_mod,
+        'total_usd_equipos': total_usd_equipos,
+        'total_usd': _si(
+            (total_usd_mod == 0) & (total_usd_equipos == 0),
+            cantidad_final * horas_hombre_final * costo_hombre_hora,
+            total_usd_equipos + total_usd_mod,
+        ),
+    }
+
+
+def calcular_apu_especifico(cantidad, precio_unitario):
+    return {'total_usd': cantidad * precio_unitario}
+
+
+def calcular_especifico_categoria(cantidad, duracion, dedicacion, costo):
+    return {'total': cantidad * duracion * dedicacion * costo}
+
+
+def calcular_staff_enami(valor, dotacion, duracion, factor_utilizacion):
+    total_horas_hombre = duracion * factor_utilizacion * Decimal(180)
+    return {'total_horas_hombre': total_horas_hombre, 'costo_total': valor * dotacion * total_horas_hombre}
+
+
+def calcular_datos_otros_ep(comprador, plazo, sueldo_pax):
+    return {'gestiones': comprador * plazo * sueldo_pax * Decimal(4) * Decimal(160)}
+
+
+def calcular_contrato_subcontrato(costo_laboral_indirecto_usd_hh, fc_subcontrato, cantidad_final, total_hh_mano_obra,
+                                  total_usd_mano_obra, total_sitio, tipo_suministro, moneda_aplicada):
+    total_usd_indirectos_contratista = total_hh_mano_obra * costo_laboral_indirecto_usd_hh
+    # Solo se calcula usd_por_unidad si el suministro es "SUB"
+    usd_por_unidad = _si(tipo_suministro == "SUB", moneda_aplicada * (1 + fc_subcontrato / 100), 0)
+    usd_total_subcontrato = cantidad_final * usd_por_unidad
+    costo_contrato_total = usd_total_subcontrato + total_usd_indirectos_contratista + total_sitio + total_usd_mano_obra
+    return {
+        'total_usd_indirectos_contratista': total_usd_indirectos_contratista,
+        'usd_por_unidad': usd_por_unidad,
+        'usd_total_subcontrato': usd_total_subcontrato,
+        'costo_contrato_total': costo_contrato_total,
+        'costo_contrato_unitario': costo_contrato_total / _si(cantidad_final > 0, cantidad_final, 1),
+    }
+
+
+def calcular_ingenieria_detalles(UF, mb):
+    return {'total_usd': UF * _requerido(mb, "Se requiere un MB para calcular el total")}
+
+
+def calcular_gestion_permisos(dedicacion, meses, cantidad, mb):
+    HH = (dedicacion / 100) * meses * cantidad * 180
+    return {'HH': HH, 'total_usd': HH * _requerido(mb, "Se requiere un MB para calcular el total")}
+
+
+def calcular_dueno(total_hh, costo_hh_us):
+    return {'costo_total': total_hh * costo_hh_us}
+
+
+def calcular_administracion_supervision(precio_unitario_clp, total_unitario, mb, fc):
+    costo_total_clp = precio_unitario_clp * total_unitario
+    tiene_mb = _presente(mb)
+    costo_total_us = _si(tiene_mb, costo_total_clp / _o(mb, 1), 0)
+    return {
+        'costo_total_clp': costo_total_clp,
+        'costo_total_us': costo_total_us,
+        'costo_total_mb': _si(tiene_mb, costo_total_us * _o(fc, 0), 0),
+    }
+
+
+def calcular_personal_indirecto(hh_mes, plazo_mes, precio_unitario_clp_hh, mb, fc):
+    tiene_mb = _presente(mb)
+    mb, fc = _o(mb, 1), _o(fc, 1)
+    costo_total_clp = precio_unitario_clp_hh * plazo_mes * hh_mes
+    costo_total_us = costo_total_clp / mb
+    return {
+        'total_hh': plazo_mes * hh_mes,
+        'tarifa_usd_hh': _si(tiene_mb, precio_unitario_clp_hh / (mb * fc), 0),
+        'costo_total_clp': _si(tiene_mb, costo_total_clp, 0),
+        'costo_total_us': _si(tiene_mb, costo_total_us, 0),
+        'costo_total_mb': _si(tiene_mb, costo_total_us * fc, 0),
+    }
+
+
+def calcular_servicios_apoyo(hh_totales, mb):
+    hh = _o(hh_totales, CERO)
+    return {'total_usd': _si(_presente(mb) & (hh != 0), hh * _o(mb, 0), Decimal('0'))}
+
+
+def calcular_otros_adm(dedicacion, meses, cantidad, mb):
+    HH = (dedicacion / 100) * meses * cantidad * 180
+    return {'HH': HH, 'total_usd': _si(_presente(mb), HH * _o(mb, 0), 0)}
+
+
+# --- Calculadoras por modelo ----------------------------------------------------------
+
+# Valor tomado del primer registro de ``modelo`` cuyo ``campo`` apunta a la FK del registro
+# (``campo='pk'``: el propio objeto relacionado). Equivale al ``.filter(...).first()`` de save().
+Fuente = namedtuple('Fuente', 'modelo campo columna defecto')
+
+CANTIDAD_FINAL = Fuente(Cantidades, 'id_categoria', 'cantidad_final', CERO)
+FLETE_UNITARIO = Fuente(CotizacionMateriales, 'id_categoria', 'flete_unitario', CERO)
+CATEGORIA_FINAL = Fuente(CategoriaNuevo, 'pk', 'final', False)
+MB_VALOR = Fuente(MB, 'pk', 'mb', None)
+MB_FC = Fuente(MB, 'pk', 'fc', None)
+
+
+def _valores_fuente(modelo, campo, columnas, claves):
+    """{clave: {columna: valor}} del primer registro (por pk) de cada clave, en lotes."""
+    claves = list({clave for clave in claves if clave is not None})
+    filtro = 'pk__in' if campo == 'pk' else f'{campo}__in'
+    valores = {}
+    for inicio in range(0, len(claves), TAMANO_LOTE_IDS):
+        lote = modelo.objects.filter(**{filtro: claves[inicio:inicio + TAMANO_LOTE_IDS]}).order_by('pk')
+        for clave, *fila in lote.values_list('pk' if campo == 'pk' else campo, *columnas):
+            valores.setdefault(clave, dict(zip(columnas, fila)))
+    return valores
+
+
+class Calculadora:
+    """Fórmula de un modelo y de dónde sale cada uno de sus argumentos.
+
+    ``campos`` son atributos del propio registro; ``relacionadas`` es {argumento: (fk, Fuente)}.
+    """
+
+    def __init__(self, modelo, funcion, campos, salidas, relacionadas=None):
+        self.modelo = modelo
+        self.funcion = funcion
+        self.campos = tuple(campos)
+        self.salidas = tuple(salidas)
+        self.relacionadas = dict(relacionadas or {})
+
+    @property
+    def campo_categoria(self):
+        for campo in self.modelo._meta.concrete_fields:
+            if campo.is_relation and campo.related_model is CategoriaNuevo:
+                return campo
+        return None
+
+    def _relacionadas(self, objetos):
+        """{argumento: [valor por objeto]} con una consulta por (modelo, campo) de origen."""
+        grupos = {}
+        for argumento, (fk, fuente) in self.relacionadas.items():
+            grupos.setdefault((fk, fuente.modelo, fuente.campo), []).append((argumento, fuente))
+
+        valores = {}
+        for (fk, modelo, campo), argumentos in grupos.items():
+            campo_fk = self.modelo._meta.get_field(fk)
+            claves = [getattr(objeto, campo_fk.attname) for objeto in objetos]
+            columnas = [fuente.columna for _, fuente in argumentos]
+            if campo == 'pk' and all(campo_fk.is_cached(objeto) for objeto in objetos):
+                # El objeto relacionado ya está cargado: no hace falta consultarlo
+                encontrados = {
+                    clave: {columna: getattr(relacionado, columna) for columna in columnas}
+                    for clave, relacionado in ((getattr(o, campo_fk.attname), getattr(o, fk)) for o in objetos)
+                    if relacionado is not None
+                }
+            else:
+                encontrados = _valores_fuente(modelo, campo, columnas, claves)
+            for argumento, fuente in argumentos:
+                valores[argumento] = [
+                    encontrados[clave][fuente.columna] if clave in encontrados else fuente.defecto
+                    for clave in claves
+                ]
+        return valores
+
+    def aplicar(self, objeto):
+        """Completa los campos calculados de un registro (lo usa ``save()``)."""
+        argumentos = {campo: getattr(objeto, campo) for campo in self.campos}
+        for argumento, valores in self._relacionadas([objeto]).items():
+            argumentos[argumento] = valores[0]
+        for nombre, valor in self.funcion(**argumentos).items():
+            setattr(objeto, nombre, valor)
+
+    def aplicar_lote(self, objetos):
+        """Completa los campos calculados de una lista de registros en una pasada vectorizada.
+
+        Retorna {posición: mensaje} de los registros que no se pudieron calcular; esos
+        quedan sin modificar.
+        """
+        if not objetos:
+            return {}
+        datos = {campo: [getattr(objeto, campo) for objeto in objetos] for campo in self.campos}
+        datos.update(self._relacionadas(objetos))
+        df = pd.DataFrame(datos, dtype=object)
+
+        errores = {}
+        try:
+            resultados = self.funcion(**{nombre: df[nombre] for nombre in df.columns})
+            columnas = {nombre: list(_serie(valor, df.index)) for nombre, valor in resultados.items()}
+        except (ArithmeticError, TypeError, ValueError):
+            # Un valor inválido invalida el lote: se repite fila a fila para identificarlo
+            columnas = {nombre: [None] * len(objetos) for nombre in self.salidas}
+            for posicion, fila in enumerate(df.to_dict('records')):
+                try:
+                    for nombre, valor in self.funcion(**fila).items():
+                        columnas[nombre][posicion] = valor
+                except (ArithmeticError, TypeError, ValueError) as e:
+                    errores[posicion] = str(e) or e.__class__.__name__
+
+        for posicion, objeto in enumerate(objetos):
+            if posicion in errores:
+                continue
+            for nombre in self.salidas:
+                setattr(objeto, nombre, columnas[nombre][posicion])
+        return errores
+
+
+def _calculadoras(*calculadoras):
+    return {calculadora.modelo: calculadora for calculadora in calculadoras}
+
+
+# En orden de dependencia: ContratoSubcontrato lee ManoObra y MaterialesOtros ya calculados
+CALCULADORAS = _calculadoras(
+    Calculadora(Cantidades, calcular_cantidad, ('cantidad', 'fc'), ('cantidad_final',)),
+    Calculadora(
+        Adquisiciones, calcular_adquisicion, ('costo_unitario', 'crecimiento'), ('total', 'flete', 'total_con_flete'),
+        {'cantidad_final': ('id_categoria', CANTIDAD_FINAL), 'flete_unitario': ('id_categoria', FLETE_UNITARIO)},
+    ),
+    Calculadora(
+        MaterialesOtros, calcular_material, ('costo_unidad', 'crecimiento'), ('total_usd', 'fletes', 'total_sitio'),
+        {'cantidad_final': ('id_categoria', CANTIDAD_FINAL), 'flete_unitario': ('id_categoria', FLETE_UNITARIO)},
+    ),
+    Calculadora(
+        EquiposConstruccion, calcular_equipo, ('horas_maquina_unidad', 'costo_maquina_hora'),
+        ('total_horas_maquina', 'total_usd'),
+        {'cantidad_final': ('id_categoria', CANTIDAD_FINAL), 'final': ('id_categoria', CATEGORIA_FINAL)},
+    ),
+    Calculadora(
+        ManoObra, calcular_mano_obra,
+        ('horas_hombre_unidad', 'fp', 'rendimiento', 'tarifas_usd_hh_mod', 'tarifa_usd_hh_equipos', 'costo_hombre_hora'),
+        ('horas_hombre_final', 'total_hh', 'cantidad_horas_hombre', 'total_usd_mod', 'total_usd_equipos', 'total_usd'),
+        {'cantidad_final': ('id_categoria', CANTIDAD_FINAL)},
+    ),
+    Calculadora(ApuEspecifico, calcular_apu_especifico, ('cantidad', 'precio_unitario'), ('total_usd',)),
+    Calculadora(EspecificoCategoria, calcular_especifico_categoria, ('cantidad', 'duracion', 'dedicacion', 'costo'), ('total',)),
+    Calculadora(
+        StaffEnami, calcular_staff_enami, ('valor', 'dotacion', 'duracion', 'factor_utilizacion'),
+        ('total_horas_hombre', 'costo_total'),
+    ),
+    Calculadora(DatosOtrosEP, calcular_datos_otros_ep, ('comprador', 'plazo', 'sueldo_pax'), ('gestiones',)),
+    Calculadora(
+        ContratoSubcontrato, calcular_contrato_subcontrato, ('costo_laboral_indirecto_usd_hh', 'fc_subcontrato'),
+        ('total_usd_indirectos_contratista', 'usd_por_unidad', 'usd_total_subcontrato', 'costo_contrato_total',
+         'costo_contrato_unitario'),
+        {
+            'cantidad_final': ('id_categoria', CANTIDAD_FINAL),
+            'total_hh_mano_obra': ('id_categoria', Fuente(ManoObra, 'id_categoria', 'total_hh', 0)),
+            'total_usd_mano_obra': ('id_categoria', Fuente(ManoObra, 'id_categoria', 'total_usd', 0)),
+            'total_sitio': ('id_categoria', Fuente(MaterialesOtros, 'id_categoria', 'total_sitio', 0)),
+            'tipo_suministro': ('id_categoria', Fuente(CotizacionMateriales, 'id_categoria', 'tipo_suministro', None)),
+            'moneda_aplicada': ('id_categoria', Fuente(CotizacionMateriales, 'id_categoria', 'moneda_aplicada', 0)),
+        },
+    ),
+    Calculadora(IngenieriaDetallesContraparte, calcular_ingenieria_detalles, ('UF',), ('total_usd',), {'mb': ('MB', MB_VALOR)}),
+    Calculadora(
+        GestionPermisos, calcular_gestion_permisos, ('dedicacion', 'meses', 'cantidad'), ('HH', 'total_usd'),
+        {'mb': ('MB', MB_VALOR)},
+    ),
+    Calculadora(Dueno, calcular_dueno, ('total_hh', 'costo_hh_us'), ('costo_total',)),
+    Calculadora(
+        AdministracionSupervision, calcular_administracion_supervision, ('precio_unitario_clp', 'total_unitario'),
+        ('costo_total_clp', 'costo_total_us', 'costo_total_mb'),
+        {'mb': ('mb_seleccionado', MB_VALOR), 'fc': ('mb_seleccionado', MB_FC)},
+    ),
+    Calculadora(
+        PersonalIndirectoContratista, calcular_personal_indirecto, ('hh_mes', 'plazo_mes', 'precio_unitario_clp_hh'),
+        ('total_hh', 'tarifa_usd_hh', 'costo_total_clp', 'costo_total_us', 'costo_total_mb'),
+        {'mb': ('mb_seleccionado', MB_VALOR), 'fc': ('mb_seleccionado', MB_FC)},
+    ),
+    Calculadora(ServiciosApoyo, calcular_servicios_apoyo, ('hh_totales',), ('total_usd',), {'mb': ('mb', MB_VALOR)}),
+    Calculadora(OtrosADM, calcular_otros_adm, ('dedicacion', 'meses', 'cantidad'), ('HH', 'total_usd'), {'mb': ('MB', MB_VALOR)}),
+)
+
+
+def calculadora_de(modelo):
+    return CALCULADORAS.get(modelo)
+
+
+def dependientes(modelo):
+    """Nombres de los modelos cuyos campos calculados leen ``modelo``, directa o indirectamente."""
+    nombres = []
+    leidos = {modelo}
+    for calculadora in CALCULADORAS.values():  # en orden de dependencia
+        if any(fuente.modelo in leidos for _, fuente in calculadora.relacionadas.values()):
+            nombres.append(calculadora.modelo.__name__)
+            leidos.add(calculadora.modelo)
+    return nombres
+
+
+def valor_guardado(campo, valor):
+    """Valor tal como quedará en la BD (los DecimalField se redondean a sus decimales)."""
+    if valor is not None and isinstance(campo, models.DecimalField):
+        return Decimal(format_number(Decimal(valor), campo.max_digits, campo.decimal_places))
+    return valor
+
+
+def recalcular_campos(modelos=None, proyecto_ids=None, batch_size=TAMANO_LOTE):
+    """Recalcula en lotes los campos calculados y guarda solo los registros que cambian.
+
+    Pide un rollup por proyecto afectado al terminar. Retorna {nombre del modelo: actualizados}.
+    """
+    actualizados = {}
+    proyectos = set()
+    with defer_rollups():
+        for modelo, calculadora in CALCULADORAS.items():
+            if modelos and modelo.__name__ not in modelos:
+                continue
+            campo_categoria = calculadora.campo_categoria
+            consulta = modelo.objects.all()
+            if campo_categoria is not None:
+                consulta = consulta.select_related(campo_categoria.name)
+                if proyecto_ids:
+                    consulta = consulta.de_proyectos(proyecto_ids)
+            campos = [modelo._meta.get_field(nombre) for nombre in calculadora.salidas]
+
+            total = 0
+            ultimo = None
+            with transaction.atomic():
+                while True:
+                    lote_consulta = consulta.order_by('pk')
+                    if ultimo is not None:
+                        lote_consulta = lote_consulta.filter(pk__gt=ultimo)
+                    lote = list(lote_consulta[:batch_size])
+                    if not lote:
+                        break
+                    ultimo = lote[-1].pk
+
+                    antes = [[getattr(objeto, campo.attname) for campo in campos] for objeto in lote]
+                    errores = calculadora.aplicar_lote(lote)
+                    cambiados = [
+                        objeto for posicion, objeto in enumerate(lote)
+                        if posicion not in errores and any(
+                            valor_guardado(campo, getattr(objeto, campo.attname)) != valor_guardado(campo, anterior)
+                            for campo, anterior in zip(campos, antes[posicion])
+                        )
+                    ]
+                    modelo.objects.bulk_update(cambiados, calculadora.salidas, batch_size=batch_size)
+                    total += len(cambiados)
+                    if campo_categoria is not None:
+                        for objeto in cambiados:
+                            categoria = getattr(objeto, campo_categoria.name)
+                            if categoria is not None:
+                                proyectos.add(categoria.proyecto_id)
+            actualizados[modelo.__name__] = total
+
+        for proyecto_id in proyectos:
+            solicitar_rollup(proyecto_id)
+    return actualizados
@@ -0,0 +1,176 @@
+"""Copia de un proyecto completo dentro de la base de datos.
+
+El árbol de categorías y todas las filas de costo del proyecto se leen con ``values()``,
+se les cambian los ids en memoria (``<prefijo><id>``, como hacía la copia por Excel) y se
+insertan con ``bulk_create`` por lotes, sin pasar por ``save()`` ni por los cargadores de
+``cargar_datos``. Al final se recalcula el proyecto nuevo con un solo rollup. Las tablas
+compartidas entre proyectos (MB, ApuGeneral) no se copian: las filas nuevas apuntan a las
+mismas.
+
+Antes de escribir se comprueba que todos los ids con prefijo (proyecto, categorías y
+tablas con PK de texto como DatosEP) entren en su columna y estén libres.
+"""
+from itertools import islice
+
+from django.apps import apps
+from django.db import transaction
+from django.db.models import Max
+from django.db.models.functions import Length
+
+from .arbol import calcular_rutas
+from .models import CategoriaNuevo, PorProyectoQuerySet, ProyectoNuevo
+from .rollup import recalcular_proyecto
+
+
+TAMANO_LOTE = 1000
+
+
+def modelos_del_proyecto():
+    """Modelos con PorProyectoQuerySet (salvo CategoriaNuevo), los referenciados primero."""
+    modelos = [
+        modelo for modelo in apps.get_app_config('proyectoApp').get_models()
+        if modelo is not CategoriaNuevo and issubclass(modelo._default_manager._queryset_class, PorProyectoQuerySet)
+    ]
+    referenciados = _referenciados(modelos)
+    return sorted(modelos, key=lambda modelo: modelo not in referenciados)
+
+
+def _referenciados(modelos):
+    """Modelos de la lista a los que apunta una FK de otro modelo de la lista (p. ej. ManoObra)."""
+    return {
+        campo.related_model for modelo in modelos for campo in modelo._meta.concrete_fields
+        if campo.is_relation and campo.related_model in modelos
+    }
+
+
+def _lotes(filas, tamano=TAMANO_LOTE):
+    while lote := list(islice(filas, tamano)):
+        yield lote
+
+
+def _validar_prefijo(prefijo):
+    if not isinstance(prefijo, str) or not prefijo:
+        raise ValueError("El prefijo debe ser un texto no vacío")
+    if CategoriaNuevo.SEPARADOR_RUTA in prefijo:
+        raise ValueError(f"El prefijo no puede contener '{CategoriaNuevo.SEPARADOR_RUTA}'")
+
+
+def _automatico(modelo):
+    return modelo._meta.pk.get_internal_type() in ('AutoField', 'BigAutoField')
+
+
+def _validar_ids_copiados(modelo, consulta, prefijo):
+    """Comprueba que los ids ``<prefijo><id>`` de las filas de ``consulta`` entren en la columna y estén libres."""
+    maximo = modelo._meta.pk.max_length
+    largo = consulta.aggregate(largo=Max(Length('pk')))['largo'] or 0
+    if maximo and largo + len(prefijo) > maximo:
+        raise ValueError(
+            f"Con el prefijo {prefijo} los ids de {modelo.__name__} tendrían {largo + len(prefijo)} caracteres (máximo {maximo})"
+        )
+    ids = [f"{prefijo}{i}" for i in consulta.values_list('pk', flat=True)]
+    for inicio in range(0, len(ids), TAMANO_LOTE):
+        ocupados = list(modelo.objects.filter(pk__in=ids[inicio:inicio + TAMANO_LOTE]).values_list('pk', flat=True)[:5])
+        if ocupados:
+            raise ValueError(f"Ya existen filas de {modelo.__name__} con el prefijo {prefijo}: {', '.join(ocupados)}")
+
+
+def _clonar_categorias(proyecto_id, nuevo_id, prefijo):
+    categorias = [
+        CategoriaNuevo(**{
+            **fila,
+            'id': f"{prefijo}{fila['id']}",
+            'proyecto_id': nuevo_id,
+            'id_padre_id': f"{prefijo}{fila['id_padre_id']}" if fila['id_padre_id'] else None,
+        })
+        for fila in CategoriaNuevo.objects.del_proyecto(proyecto_id).values()
+    ]
+    rutas = calcular_rutas(categorias)
+    for categoria in categorias:
+        categoria.ruta = rutas[categoria.id]
+    # Padres antes que hijos, para que la FK id_padre exista al insertar cada lote
+    categorias.sort(key=lambda categoria: categoria.ruta.count(CategoriaNuevo.SEPARADOR_RUTA))
+    CategoriaNuevo.objects.bulk_create(categorias, batch_size=TAMANO_LOTE)
+    return {categoria.id[len(prefijo):]: categoria.id for categoria in categorias}
+
+
+def _clonar_filas(modelo, proyecto_id, nuevo_id, prefijo, mapas, referenciado):
+    """Copia las filas de ``modelo`` del proyecto; retorna ({pk anterior: pk nuevo}, filas copiadas).
+
+    El mapa de pks solo se arma si ``referenciado`` (otro modelo copiado apunta a este).
+    """
+    pk = modelo._meta.pk
+    automatico = _automatico(modelo)
+    relaciones = {
+        campo.attname: mapas[campo.related_model]
+        for campo in modelo._meta.concrete_fields if campo.is_relation and campo.related_model in mapas
+    }
+
+    nuevos_pks = {}
+    anteriores = []  # pks originales de las filas con id autonumérico, en orden de inserción
+    filas = modelo.objects.del_proyecto(proyecto_id).order_by('pk').values().iterator(chunk_size=TAMANO_LOTE)
+    total = 0
+    for lote in _lotes(filas):
+        instancias = []
+        for fila in lote:
+            anterior = fila[pk.attname]
+            if automatico:
+                fila[pk.attname] = None
+                if referenciado:
+                    anteriores.append(anterior)
+            else:
+                fila[pk.attname] = f"{prefijo}{anterior}"
+                if referenciado:
+                    nuevos_pks[anterior] = fila[pk.attname]
+            for attname, mapa in relaciones.items():
+                if fila[attname] is not None:
+                    fila[attname] = mapa.get(fila[attname], fila[attname])
+            if 'proyecto_id' in fila:
+                fila['proyecto_id'] = nuevo_id
+            instancias.append(modelo(**fila))
+        modelo.objects.bulk_create(instancias)
+        total += len(instancias)
+
+    if anteriores:
+        # bulk_create no devuelve los ids autonuméricos en MySQL y asignarlos a mano (Max + 1)
+        # choca con inserciones concurrentes: se leen de vuelta. Las filas del proyecto nuevo
+        # solo las ve esta transacción y reciben ids crecientes en el orden de inserción.
+        nuevos = modelo.objects.del_proyecto(nuevo_id).order_by('pk').values_list('pk', flat=True)
+        nuevos_pks = dict(zip(anteriores, nuevos, strict=True))
+    return nuevos_pks, total
+
+
+def clonar_proyecto(proyecto_id, prefijo='c', nombre=None):
+    """Copia el proyecto como ``<prefijo><proyecto_id>`` con sus categorías y costos.
+
+    Retorna (proyecto nuevo, {modelo: filas copiadas}). Lanza ProyectoNuevo.DoesNotExist
+    si el proyecto no existe y ValueError si el prefijo no es válido o alguno de los ids
+    nuevos no entra en su columna o ya está ocupado.
+    """
+    proyecto = ProyectoNuevo.objects.get(id=proyecto_id)
+    _validar_prefijo(prefijo)
+    nuevo_id = f"{prefijo}{proyecto.id}"
+    _validar_ids_copiados(ProyectoNuevo, ProyectoNuevo.objects.filter(id=proyecto.id), prefijo)
+    _validar_ids_copiados(CategoriaNuevo, CategoriaNuevo.objects.del_proyecto(proyecto.id), prefijo)
+    for modelo in modelos_del_proyecto():
+        if not _automatico(modelo):
+            _validar_ids_copiados(modelo, modelo.objects.del_proyecto(proyecto.id), prefijo)
+
+    with transaction.atomic():
+        nuevo = ProyectoNuevo.objects.create(
+            id=nuevo_id,
+            nombre=nombre or f"Copia de {proyecto.nombre}",
+            proyecto_relacionado=proyecto.proyecto_relacionado,
+        )
+        mapas = {CategoriaNuevo: _clonar_categorias(proyecto.id, nuevo_id, prefijo)}
+        copiadas = {CategoriaNuevo.__name__: len(mapas[CategoriaNuevo])}
+        modelos = modelos_del_proyecto()
+        referenciados = _referenciados(modelos)
+        for modelo in modelos:
+            nuevos_pks, copiadas[modelo.__name__] = _clonar_filas(
+                modelo, proyecto.id, nuevo_id, prefijo, mapas, modelo in referenciados
+            )
+            if modelo in referenciados:
+                mapas[modelo] = nuevos_pks
+        recalcular_proyecto(nuevo_id)
+    nuevo.refresh_from_db()
+    return nuevo, copiadas
@@ -0,0 +1,106 @@
+"""Comparación de costos de un proyecto contra los proyectos relacionados.
+
+Las categorías del proyecto y las de todos sus relacionados se leen con una consulta cada
+una y se cruzan en memoria por ``categoria_relacionada`` (un diccionario por proyecto), en
+vez de buscar la categoría equivalente con una consulta por fila. El resultado se guarda
+en la caché ``resumen`` bajo una clave con la versión de cada proyecto involucrado (ver
+``resumen.versiones_proyectos``), así que cualquier rollup o edición lo invalida.
+"""
+import hashlib
+from decimal import Decimal
+
+from django.core.cache import caches
+
+from .models import CategoriaNuevo
+from .resumen import CACHE, DURACION, versiones_proyectos
+
+
+CERO = Decimal('0.00')
+
+
+def _diferencia(actual, comparado):
+    """(actual - comparado, % sobre el comparado); el % es None si el comparado es 0."""
+    diferencia = actual - comparado
+    porcentaje = float(diferencia / comparado * 100) if comparado else None
+    return float(diferencia), porcentaje
+
+
+def _costos(actual, costos, proyectos):
+    """{proyecto_id: {costo, diferencia, diferencia_pct}} para cada proyecto comparado."""
+    resultado = {}
+    for proyecto_id in proyectos:
+        costo = costos.get(proyecto_id)
+        diferencia, porcentaje = _diferencia(actual, costo or CERO)
+        resultado[proyecto_id] = {
+            'costo': float(costo) if costo is not None else None,
+            'diferencia': diferencia,
+            'diferencia_pct': porcentaje,
+        }
+    return resultado
+
+
+def calcular_comparacion(proyecto, relacionados, nivel=None):
+    """Compara las categorías de ``proyecto`` (o solo las del ``nivel``) con las de cada relacionado.
+
+    Cada categoría se cruza con la primera categoría (por id) de cada relacionado que tenga
+    su misma ``categoria_relacionada``; las categorías sin ``categoria_relacionada`` no se
+    cruzan con ninguna. Retorna {categorias: [...], niveles: [...]} con la diferencia y el
+    porcentaje por categoría y por nivel.
+    """
+    ids = [relacionado.id for relacionado in relacionados]
+    categorias = CategoriaNuevo.objects.del_proyecto(proyecto.id).order_by('id')
+    if nivel is not None:
+        categorias = categorias.filter(nivel=nivel)
+
+    # Lado de construcción del hash join: {proyecto: {categoria_relacionada: total}}
+    equivalentes = {proyecto_id: {} for proyecto_id in ids}
+    filas = (
+        CategoriaNuevo.objects.de_proyectos(ids).exclude(categoria_relacionada=None)
+        .order_by('proyecto_id', 'id').values_list('proyecto_id', 'categoria_relacionada', 'total_costo')
+    )
+    for proyecto_id, relacionada, total in filas:
+        equivalentes[proyecto_id].setdefault(relacionada, total or CERO)
+
+    filas_categorias = []
+    por_nivel = {}
+    for categoria in categorias.values('id', 'nombre', 'nivel', 'categoria_relacionada', 'total_costo'):
+        actual = categoria['total_costo'] or CERO
+        relacionada = categoria['categoria_relacionada']
+        costos = {
+            proyecto_id: equivalentes[proyecto_id].get(relacionada)
+            for proyecto_id in ids if relacionada is not None
+        }
+        filas_categorias.append({
+            'id': categoria['id'],
+            'nombre': categoria['nombre'],
+            'nivel': categoria['nivel'],
+            'categoria_relacionada': relacionada,
+            'costo': float(actual),
+            'comparados': _costos(actual, costos, ids),
+        })
+
+        acumulado = por_nivel.setdefault(categoria['nivel'], {'actual': CERO, 'costos': dict.fromkeys(ids, CERO)})
+        acumulado['actual'] += actual
+        for proyecto_id, costo in costos.items():
+            acumulado['costos'][proyecto_id] += costo or CERO
+
+    niveles = [
+        {'nivel': nivel, 'costo': float(datos['actual']), 'comparados': _costos(datos['actual'], datos['costos'], ids)}
+        for nivel, datos in sorted(por_nivel.items())
+    ]
+    return {'categorias': filas_categorias, 'niveles': niveles}
+
+
+def comparacion_proyecto(proyecto, relacionados, nivel=None):
+    """``calcular_comparacion`` tomada de la caché mientras ningún proyecto cambie de versión."""
+    ids = [proyecto.id] + [relacionado.id for relacionado in relacionados]
+    versiones = versiones_proyectos(ids)
+    firma = ':'.join(f'{proyecto_id}={versiones[proyecto_id]}' for proyecto_id in ids)
+    # Con muchos relacionados la firma no cabe en la clave de la caché en BD (255 caracteres)
+    clave = f'comparacion:{proyecto.id}:{nivel}:' + hashlib.sha1(firma.encode()).hexdigest()
+    cache = caches[CACHE]
+    comparacion = cache.get(clave)
+    if comparacion is None:
+        comparacion = calcular_comparacion(proyecto, relacionados, nivel)
+        cache.set(clave, comparacion, DURACION)
+    return comparacion
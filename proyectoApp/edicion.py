@@ -0,0 +1,152 @@
+"""Edición masiva de filas de costo con recálculo en lote y un solo rollup por proyecto.
+
+Los cambios se aplican por lotes de filas (recorridos por pk), los campos calculados de
+cada lote se recalculan con la calculadora del modelo en una pasada vectorizada
+(``Calculadora.aplicar_lote``) y se guardan con ``bulk_update`` solo las filas que cambian.
+Luego se recalculan los modelos que leen al editado (``calculos.dependientes``) y se hace
+un rollup por proyecto afectado, todo dentro de una transacción.
+"""
+from decimal import Decimal
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db import transaction
+
+from .calculos import calculadora_de, dependientes, recalcular_campos, valor_guardado
+from .eliminacion import modelo_eliminable
+from .exportacion import filtrar_exportacion
+from .models import CategoriaNuevo, ProyectoNuevo
+from .rollup import FUENTES_COSTO, defer_rollups, solicitar_rollup
+
+
+TAMANO_LOTE = 500
+CERO = Decimal('0.00')
+
+
+def _campos_editables(modelo, cambios):
+    """{campo: valor limpio} de ``cambios``; lanza ValueError si alguno no se puede editar."""
+    if not cambios or not isinstance(cambios, dict):
+        raise ValueError("No se indicaron cambios")
+    calculadora = calculadora_de(modelo)
+    calculados = set(calculadora.salidas) if calculadora else set()
+    limpios = {}
+    for nombre, valor in cambios.items():
+        try:
+            campo = modelo._meta.get_field(nombre)
+        except FieldDoesNotExist:
+            raise ValueError(f"{modelo.__name__} no tiene el campo {nombre}") from None
+        if campo.primary_key or not campo.editable or not campo.concrete or nombre in calculados:
+            raise ValueError(f"El campo {nombre} no se puede editar")
+        try:
+            limpios[campo] = campo.clean(valor, None)
+        except ValidationError as e:
+            raise ValueError(f"{nombre}: {' '.join(e.messages)}") from None
+    return limpios
+
+
+def _proyectos_destino(campos):
+    """Proyectos a los que pasan las filas si el cambio mueve su categoría o su proyecto."""
+    destinos = set()
+    for campo, valor in campos.items():
+        if valor is None:
+            continue
+        if campo.related_model is ProyectoNuevo:
+            destinos.add(valor)
+        elif campo.related_model is CategoriaNuevo:
+            destinos.update(CategoriaNuevo.objects.filter(pk=valor).proyectos())
+    return destinos
+
+
+def _columna_costo(modelo):
+    """Columna de ``modelo`` que suma al costo directo de la categoría (None si no suma)."""
+    return next((columna for fuente, _, columna in FUENTES_COSTO if fuente is modelo), None)
+
+
+def editar_filas(modelo, cambios, filtros):
+    """Aplica ``cambios`` ({campo: valor}) a las filas de ``modelo`` que cumplen ``filtros``.
+
+    ``filtros`` admite ``ids``, ``proyecto`` y ``categoria`` (con su subárbol); al menos uno
+    es obligatorio. Retorna {filas, modificadas, delta_monto, delta_total, proyectos}:
+    ``delta_monto`` es la variación del monto de costo de las filas editadas y
+    ``proyectos`` el costo total de cada proyecto antes y después (los de origen y, si se
+    cambia la categoría, los de destino).
+    Lanza ValueError si el modelo, los cambios o los filtros no son válidos.
+    """
+    if not modelo_eliminable(modelo):
+        raise ValueError(f"{modelo.__name__} no admite edición masiva")
+    campos = _campos_editables(modelo, cambios)
+    if not any(filtros.get(clave) for clave in ('ids', 'proyecto', 'categoria')):
+        raise ValueError("Indique ids, proyecto o categoria")
+
+    consulta = filtrar_exportacion(modelo.objects.all(), filtros)
+    if filtros.get('ids'):
+        consulta = consulta.filter(pk__in=list(filtros['ids']))
+
+    calculadora = calculadora_de(modelo)
+    salidas = [modelo._meta.get_field(nombre) for nombre in calculadora.salidas] if calculadora else []
+    guardados = list(campos) + salidas
+    # Posición en ``guardados`` del monto que suma al costo de la categoría (si se edita o se calcula)
+    columna = _columna_costo(modelo)
+    nombres = [campo.name for campo in guardados]
+    posicion_monto = nombres.index(columna) if columna in nombres else None
+    if calculadora and calculadora.campo_categoria is not None:
+        consulta = consulta.select_related(calculadora.campo_categoria.name)
+
+    filas = modificadas = 0
+    delta_monto = CERO
+    with transaction.atomic():
+        # Los proyectos de destino también cambian de total si las filas se mueven de proyecto
+        proyectos = sorted(set(consulta.proyectos()) | _proyectos_destino(campos))
+        antes = dict(ProyectoNuevo.objects.filter(id__in=proyectos).values_list('id', 'costo_total'))
+        with defer_rollups():
+            ultimo = None
+            while True:
+                lote_consulta = consulta.order_by('pk')
+                if ultimo is not None:
+                    lote_consulta = lote_consulta.filter(pk__gt=ultimo)
+                lote = list(lote_consulta[:TAMANO_LOTE])
+                if not lote:
+                    break
+                ultimo = lote[-1].pk
+                filas += len(lote)
+
+                previos = [[valor_guardado(c, getattr(o, c.attname)) for c in guardados] for o in lote]
+                for objeto in lote:
+                    for campo, valor in campos.items():
+                        setattr(objeto, campo.attname, valor)
+                errores = calculadora.aplicar_lote(lote) if calculadora else {}
+                if errores:
+                    posicion, mensaje = next(iter(errores.items()))
+                    raise ValueError(f"Fila {lote[posicion].pk}: {mensaje}")
+
+                cambiados = [
+                    objeto for objeto, previo in zip(lote, previos)
+                    if [valor_guardado(c, getattr(objeto, c.attname)) for c in guardados] != previo
+                ]
+                if posicion_monto is not None:
+                    campo_monto = guardados[posicion_monto]
+                    for objeto, previo in zip(lote, previos):
+                        nuevo = valor_guardado(campo_monto, getattr(objeto, campo_monto.attname))
+                        delta_monto += (nuevo or CERO) - (previo[posicion_monto] or CERO)
+                modelo.objects.bulk_update(cambiados, nombres, batch_size=TAMANO_LOTE)
+                modificadas += len(cambiados)
+
+            if modificadas and proyectos:
+                modelos = dependientes(modelo)
+                if modelos:
+                    recalcular_campos(modelos, proyecto_ids=proyectos)
+                for proyecto_id in proyectos:
+                    solicitar_rollup(proyecto_id)
+        despues = dict(ProyectoNuevo.objects.filter(id__in=proyectos).values_list('id', 'costo_total'))
+
+    detalle = [
+        {'id': proyecto_id, 'antes': float(antes[proyecto_id]), 'despues': float(despues[proyecto_id]),
+         'delta': float(despues[proyecto_id] - antes[proyecto_id])}
+        for proyecto_id in proyectos if proyecto_id in antes
+    ]
+    return {
+        'filas': filas,
+        'modificadas': modificadas,
+        'delta_monto': float(delta_monto),
+        'delta_total': sum(proyecto['delta'] for proyecto in detalle),
+        'proyectos': detalle,
+    }
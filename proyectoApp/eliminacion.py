@@ -0,0 +1,96 @@
+"""Eliminación masiva de filas de costo y de categorías con un solo recálculo por proyecto.
+
+``QuerySet.delete()`` borra todas las filas pedidas sin pasar por los ``delete()`` de los
+modelos, que recalculan el camino de la categoría fila por fila. En su lugar, después de
+borrar se recalculan en lote los campos calculados que leían las filas borradas (p. ej.
+las adquisiciones de una cantidad, ver ``calculos.dependientes``) y se hace un rollup por
+proyecto afectado, todo dentro de la misma transacción.
+
+Para las categorías se guardan antes del borrado los padres que quedan en pie y después
+se recalculan juntos, con sus ancestros, en un solo paso por proyecto
+(``rollup.propagar_eliminacion``).
+"""
+from django.db import transaction
+
+from .calculos import dependientes, recalcular_campos
+from .models import CategoriaNuevo, PorProyectoQuerySet
+from .rollup import defer_rollups, propagar_eliminacion, solicitar_rollup
+
+
+MAXIMO_IDS = 5000
+
+
+def _validar_ids(ids):
+    ids = list(dict.fromkeys(ids))
+    if not ids:
+        raise ValueError("No se indicaron ids")
+    if len(ids) > MAXIMO_IDS:
+        raise ValueError(f"Se pueden eliminar hasta {MAXIMO_IDS} filas por petición")
+    return ids
+
+
+def modelo_eliminable(modelo):
+    """Tablas de costo de un proyecto; las categorías tienen su propio borrado masivo."""
+    return modelo is not CategoriaNuevo and issubclass(modelo._default_manager._queryset_class, PorProyectoQuerySet)
+
+
+def eliminar_filas(modelo, ids):
+    """Elimina las filas ``ids`` de ``modelo`` y recalcula una vez cada proyecto afectado.
+
+    Retorna {eliminados, por_modelo, proyectos}; ``por_modelo`` incluye las filas
+    borradas en cascada. Lanza ValueError si el modelo o la lista de ids no son válidos.
+    """
+    if not modelo_eliminable(modelo):
+        raise ValueError(f"{modelo.__name__} no admite eliminación masiva")
+    ids = _validar_ids(ids)
+
+    with transaction.atomic(), defer_rollups():
+        consulta = modelo.objects.filter(pk__in=ids)
+        proyectos = sorted(consulta.proyectos())
+        eliminados, por_modelo = consulta.delete()
+        if eliminados and proyectos:
+            modelos = dependientes(modelo)
+            if modelos:
+                recalcular_campos(modelos, proyecto_ids=proyectos)
+            for proyecto_id in proyectos:
+                solicitar_rollup(proyecto_id)
+    return _resultado(eliminados, por_modelo, proyectos)
+
+
+def _resultado(eliminados, por_modelo, proyectos):
+    return {
+        'eliminados': eliminados,
+        'por_modelo': {etiqueta.split('.')[-1]: cantidad for etiqueta, cantidad in por_modelo.items()},
+        'proyectos': proyectos,
+    }
+
+
+def eliminar_categorias(ids):
+    """Elimina las categorías ``ids`` con todo su subárbol y recalcula los padres que quedan.
+
+    Retorna lo mismo que ``eliminar_filas``. Lanza ValueError si la lista de ids no es válida.
+    """
+    ids = set(_validar_ids(ids))
+    separador = CategoriaNuevo.SEPARADOR_RUTA
+
+    with transaction.atomic():
+        padres = {}  # {proyecto_id: padres que no se eliminan}
+        for categoria_id, proyecto_id, padre_id, ruta in (
+            CategoriaNuevo.objects.filter(id__in=ids).values_list('id', 'proyecto_id', 'id_padre_id', 'ruta')
+        ):
+            padres.setdefault(proyecto_id, set())
+            # Un padre que cae con el subárbol de otra categoría de la lista no se recalcula
+            ancestros = set(ruta.split(separador)[1:-2]) if ruta else {padre_id}
+            if padre_id is not None and ids.isdisjoint(ancestros):
+                padres[proyecto_id].add(padre_id)
+
+        # Con el subárbol completo en la consulta, la cascada de id_padre no baja nivel por nivel
+        subarbol = set(ids)
+        for categoria_id, ruta in CategoriaNuevo.objects.de_proyectos(list(padres)).values_list('id', 'ruta'):
+            if not ids.isdisjoint(ruta.split(separador)):
+                subarbol.add(categoria_id)
+
+        eliminados, por_modelo = CategoriaNuevo.objects.filter(id__in=subarbol).delete()
+        for proyecto_id, padre_ids in padres.items():
+            propagar_eliminacion(proyecto_id, padre_ids)
+    return _resultado(eliminados, por_modelo, sorted(p for p in padres if p is not None))
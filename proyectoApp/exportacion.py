@@ -0,0 +1,170 @@
+"""Exportación por bloques de una tabla a .xlsx, .csv o .parquet.
+
+Las filas se leen con ``iterator(chunk_size=...)``, así que la memoria no crece con el
+tamaño de la tabla. El CSV se genera fila a fila mientras se envía; el .xlsx (openpyxl en
+modo *write-only*) y el .parquet (un row group por bloque) se escriben en un archivo
+temporal que queda en memoria mientras es chico y pasa a disco si crece, y después se
+envía por partes.
+"""
+import csv
+import tempfile
+from datetime import datetime
+from itertools import islice
+
+from django.utils import timezone
+from openpyxl import Workbook
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+
+from .models import CategoriaNuevo
+
+
+TAMANO_BLOQUE = 2000
+MEMORIA_MAXIMA = 10 * 1024 * 1024  # hasta acá el archivo temporal vive en memoria
+
+FORMATOS = {
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'csv': 'text/csv; charset=utf-8',
+    'parquet': 'application/vnd.apache.parquet',
+}
+
+
+def columnas_exportacion(modelo):
+    """Columnas de la tabla, con el mismo nombre que da ``values()`` (``<fk>_id``)."""
+    return [campo.attname for campo in modelo._meta.concrete_fields]
+
+
+def filtrar_exportacion(queryset, parametros):
+    """Aplica ``proyecto`` y ``categoria`` (la categoría y todo su subárbol) a ``queryset``.
+
+    Lanza ValueError si la tabla no se puede filtrar así o la categoría no existe o no tiene ruta.
+    """
+    modelo = queryset.model
+    if parametros.get('proyecto'):
+        if not hasattr(queryset, 'del_proyecto'):
+            raise ValueError(f"{modelo.__name__} no se puede filtrar por proyecto")
+        queryset = queryset.del_proyecto(parametros['proyecto'])
+
+    if parametros.get('categoria'):
+        ruta = CategoriaNuevo.objects.filter(id=parametros['categoria']).values_list('ruta', flat=True).first()
+        if ruta is None:
+            raise ValueError(f"Categoría no encontrada: {parametros['categoria']}")
+        if not ruta:
+            # Con la ruta vacía, ruta__startswith='' tomaría las filas de todos los proyectos
+            raise ValueError(
+                f"La categoría {parametros['categoria']} no tiene ruta; ejecute reconstruir_rutas_categorias"
+            )
+        if modelo is CategoriaNuevo:
+            campo = 'ruta'
+        else:
+            fk = next((c.name for c in modelo._meta.concrete_fields
+                       if c.is_relation and c.related_model is CategoriaNuevo), None)
+            if fk is None:
+                raise ValueError(f"{modelo.__name__} no se puede filtrar por categoría")
+            campo = f'{fk}__ruta'
+        queryset = queryset.filter(**{f'{campo}__startswith': ruta})
+    return queryset
+
+
+def bloques_exportacion(queryset, columnas, tamano=TAMANO_BLOQUE):
+    """Tuplas de ``columnas`` en listas de hasta ``tamano`` filas, leídas con un cursor por bloques."""
+    filas = queryset.order_by('pk').values_list(*columnas).iterator(chunk_size=tamano)
+    while bloque := list(islice(filas, tamano)):
+        yield bloque
+
+
+def _sin_zona(valor):
+    if isinstance(valor, datetime) and timezone.is_aware(valor):
+        return timezone.make_naive(valor)
+    return valor
+
+
+def _celda_excel(valor):
+    # Excel no admite fechas con zona horaria ni caracteres de control
+    valor = _sin_zona(valor)
+    if isinstance(valor, str):
+        return ILLEGAL_CHARACTERS_RE.sub('', valor)
+    return valor
+
+
+def _bloques(queryset, columnas, bloques):
+    return bloques_exportacion(queryset, columnas) if bloques is None else bloques
+
+
+def _archivo_temporal():
+    return tempfile.SpooledTemporaryFile(max_size=MEMORIA_MAXIMA)
+
+
+def exportar_xlsx(queryset, columnas, bloques=None):
+    libro = Workbook(write_only=True)
+    hoja = libro.create_sheet('Datos')
+    hoja.append(columnas)
+    for bloque in _bloques(queryset, columnas, bloques):
+        for fila in bloque:
+            hoja.append([_celda_excel(valor) for valor in fila])
+    archivo = _archivo_temporal()
+    libro.save(archivo)
+    archivo.seek(0)
+    return archivo
+
+
+class _Eco:
+    """Destino de csv.writer que devuelve la línea escrita en vez de guardarla."""
+
+    def write(self, valor):
+        return valor
+
+
+def exportar_csv(queryset, columnas, bloques=None):
+    escritor = csv.writer(_Eco())
+    yield '\ufeff' + escritor.writerow(columnas)  # BOM: Excel abre el CSV como UTF-8
+    for bloque in _bloques(queryset, columnas, bloques):
+        yield ''.join(escritor.writerow(fila) for fila in bloque)
+
+
+def _esquema_parquet(pa, modelo, columnas):
+    """Tipos de Arrow según los campos del modelo, para que todos los bloques coincidan."""
+    tipos = {
+        'CharField': pa.string(), 'TextField': pa.string(),
+        'IntegerField': pa.int64(), 'BigIntegerField': pa.int64(), 'SmallIntegerField': pa.int64(),
+        'PositiveIntegerField': pa.int64(), 'AutoField': pa.int64(), 'BigAutoField': pa.int64(),
+        'FloatField': pa.float64(), 'BooleanField': pa.bool_(),
+        'DateField': pa.date32(), 'DateTimeField': pa.timestamp('us'),
+    }
+    campos = {campo.attname: campo for campo in modelo._meta.concrete_fields}
+    esquema = []
+    for columna in columnas:
+        campo = campos[columna]
+        if campo.is_relation:
+            campo = campo.target_field
+        if campo.get_internal_type() == 'DecimalField':
+            tipo = pa.decimal128(campo.max_digits, campo.decimal_places)
+        else:
+            tipo = tipos.get(campo.get_internal_type(), pa.string())
+        esquema.append(pa.field(columna, tipo))
+    return pa.schema(esquema)
+
+
+def requiere_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise ValueError("Exportar a .parquet requiere instalar pyarrow") from None
+
+
+def exportar_parquet(queryset, columnas, bloques=None):
+    requiere_pyarrow()
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    esquema = _esquema_parquet(pa, queryset.model, columnas)
+    archivo = _archivo_temporal()
+    with pq.ParquetWriter(archivo, esquema) as escritor:
+        for bloque in _bloques(queryset, columnas, bloques):
+            filas = [dict(zip(columnas, map(_sin_zona, fila))) for fila in bloque]
+            escritor.write_batch(pa.RecordBatch.from_pylist(filas, schema=esquema))
+    archivo.seek(0)
+    return archivo
+
+
+# Cada exportador recibe (queryset, columnas) y opcionalmente los ``bloques`` ya leídos
+EXPORTADORES = {'xlsx': exportar_xlsx, 'csv': exportar_csv, 'parquet': exportar_parquet}
@@ -0,0 +1,965 @@
+"""Motor de importación masiva de planillas Excel.
+
+Cada cargador de ``cargar_datos.py`` declara una ``EspecificacionCarga`` (columna -> campo).
+El motor convierte las columnas de una vez sobre el DataFrame, resuelve las FKs con un
+``in_bulk`` por modelo, completa los campos calculados con las fórmulas vectorizadas de
+``calculos.py`` (``bulk_create`` no llama a ``save()``), inserta con ``bulk_create`` dentro de
+una transacción y pide un solo rollup por proyecto afectado.
+
+Con ``simular=True`` hace la misma pasada sin escribir y reporta, fila por fila, qué se
+crearía, actualizaría u omitiría, junto con la variación proyectada del total de cada
+categoría raíz.
+
+Las planillas se leen por bloques (``leer_por_bloques``): ``.xlsx`` con openpyxl en modo
+``read_only``, ``.csv`` y ``.parquet``, con memoria acotada por el tamaño del bloque sin
+importar el tamaño del archivo.
+
+Los archivos de ``uploads/<Modelo>/`` se importan de forma incremental
+(``ImportacionIncremental``): un archivo cuyo hash no cambió se salta, y uno modificado
+aplica solo la diferencia por clave natural con la versión importada antes.
+"""
+import hashlib
+import logging
+import os
+import queue
+import threading
+from collections import defaultdict
+from copy import copy
+from datetime import datetime, time
+from decimal import Decimal
+
+import numpy as np
+import openpyxl
+import pandas as pd
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from django.utils import timezone
+
+from .calculos import calculadora_de, valor_guardado
+from .models import Adquisiciones, ArchivoSubido, CategoriaNuevo
+from .resumen import invalidar_resumen
+from .rollup import FUENTES_COSTO, defer_rollups, simular_proyecto, solicitar_rollup
+
+
+logger = logging.getLogger(__name__)
+
+
+TAMANO_LOTE = 1000
+TAMANO_LOTE_IDS = 500
+TAMANO_BLOQUE = 5000  # filas por bloque al leer planillas
+EXTENSIONES = ('.xlsx', '.csv', '.parquet')
+# Estados de fila del reporte de importación
+NUEVO, ACTUALIZADO, OMITIDO, ERROR = 'nuevo', 'actualizado', 'omitido', 'error'
+# Textos que se consideran celda vacía al leer la planilla como texto
+VALORES_NULOS = ('', 'nan', 'none', 'nat', 'null')
+VERDADEROS = ('true', '1', '1.0', 'si', 'sí', 'verdadero', 'x')
+
+CAMPOS_DECIMALES = (models.DecimalField, models.FloatField)
+CAMPOS_ENTEROS = (models.IntegerField,)  # incluye Positive*, Big*, Small* y AutoField
+CAMPOS_FECHA = (models.DateField,)  # incluye DateTimeField
+
+
+class EspecificacionCarga:
+    """Describe cómo importar una planilla a un modelo.
+
+    - ``columnas``: {columna del Excel: campo del modelo}. El tipo se deduce del campo.
+    - ``clave``: campos que identifican un registro ya existente (en BD o repetido en el archivo).
+    - ``actualizar``: False omite los existentes (como ``get_or_create``); True los actualiza
+      solo si cambian (como ``update_or_create``).
+    - ``opcionales``: columnas que pueden faltar en el archivo.
+    - ``fk_opcionales``: FKs que quedan en None si el id no existe, en vez de rechazar la fila.
+    - ``por_defecto``: valor (o función) para celdas vacías y campos sin columna.
+    - ``no_negativos``: campos numéricos que rechazan la fila si son negativos.
+    - ``preparar(df)``: ajuste vectorizado sobre los valores ya convertidos.
+    - ``orden``: campos por los que ordenar la inserción (padres antes que hijos).
+    - ``despues(proyecto_ids)``: se ejecuta dentro de la transacción tras insertar.
+    - ``requiere``: carpetas de otros cargadores que deben terminar antes, además de las
+      que se deducen de las FKs y de la calculadora del modelo (ver ``plan_carga.py``).
+    """
+
+    def __init__(self, modelo, carpeta=None, columnas=None, clave=(), actualizar=False, opcionales=(),
+                 fk_opcionales=(), por_defecto=None, no_negativos=(), preparar=None, orden=(),
+                 despues=None, requiere=()):
+        self.modelo = modelo
+        self.carpeta = carpeta or modelo.__name__
+        self.columnas = dict(columnas or {})
+        self.clave = tuple(clave)
+        self.actualizar = actualizar
+        self.opcionales = set(opcionales)
+        self.fk_opcionales = set(fk_opcionales)
+        self.por_defecto = dict(por_defecto or {})
+        self.no_negativos = tuple(no_negativos)
+        self.preparar = preparar
+        self.calculadora = calculadora_de(modelo)
+        self.orden = tuple(orden)
+        self.despues = despues
+        self.requiere = tuple(requiere)
+
+    @property
+    def calculados(self):
+        return self.calculadora.salidas if self.calculadora else ()
+
+    @property
+    def requeridas(self):
+        return [columna for columna in self.columnas if columna not in self.opcionales]
+
+    def campo(self, nombre):
+        return self.modelo._meta.get_field(nombre)
+
+    @property
+    def campo_categoria(self):
+        """FK hacia CategoriaNuevo que determina el proyecto afectado (None si no hay)."""
+        if self.modelo is CategoriaNuevo:
+            return None
+        for campo in self.modelo._meta.concrete_fields:
+            if campo.is_relation and campo.related_model is CategoriaNuevo:
+                return campo
+        return None
+
+
+class ResultadoCarga:
+    """Conteo por archivo de lo que hizo (o haría, si ``simulacion``) la importación."""
+
+    def __init__(self, archivo=None, simulacion=False):
+        self.archivo = archivo
+        self.simulacion = simulacion
+        self.total = 0
+        self.nuevos = 0
+        self.actualizados = 0
+        self.omitidos = 0
+        self.eliminados = 0  # filas que ya no están en el archivo (reimportación incremental)
+        self.sin_cambios = False  # el archivo es idéntico a la versión ya importada
+        self.error = None  # el archivo no se pudo procesar (las filas no se importaron)
+        self.errores = []  # [(fila Excel, mensaje)]
+        self.advertencias = []  # [(fila Excel, mensaje)] de filas que se importan con un valor por defecto
+        self.filas = []  # [(fila Excel, estado, motivo)]
+        self.proyectos = set()
+        self.deltas = []  # variación proyectada del total de cada categoría raíz
+
+    def agregar_fila(self, indice, estado, motivo=None):
+        self.filas.append((indice + 2, estado, motivo))  # +2: encabezado y base 1 de Excel
+
+    def agregar_error(self, indice, mensaje):
+        self.errores.append((indice + 2, mensaje))
+        self.agregar_fila(indice, ERROR, mensaje)
+
+    def agregar_advertencia(self, indice, mensaje):
+        self.advertencias.append((indice + 2, mensaje))
+
+    def como_dict(self):
+        return {
+            'archivo': self.archivo,
+            'simulacion': self.simulacion,
+            'total': self.total,
+            'nuevos': self.nuevos,
+            'actualizados': self.actualizados,
+            'omitidos': self.omitidos,
+            'eliminados': self.eliminados,
+            'sin_cambios': self.sin_cambios,
+            'error': self.error,
+            'errores': len(self.errores),
+            'advertencias': [{'fila': fila, 'motivo': motivo} for fila, motivo in sorted(self.advertencias)],
+            'filas': [
+                {'fila': fila, 'estado': estado, 'motivo': motivo}
+                for fila, estado, motivo in sorted(self.filas, key=lambda f: f[0])
+            ],
+            'delta_por_raiz': self.deltas,
+        }
+
+    def sumar(self, otro):
+        """Acumula el resultado de otro bloque del mismo archivo."""
+        self.total += otro.total
+        self.nuevos += otro.nuevos
+        self.actualizados += otro.actualizados
+        self.omitidos += otro.omitidos
+        self.eliminados += otro.eliminados
+        self.errores.extend(otro.errores)
+        self.advertencias.extend(otro.advertencias)
+        self.filas.extend(otro.filas)
+        self.proyectos |= otro.proyectos
+        self.deltas.extend(otro.deltas)
+        return self
+
+    def registrar_en_log(self):
+        """Resumen del archivo en el log; el detalle por fila queda en ``errores``/``advertencias``."""
+        if self.error:
+            logger.error("%s: no se pudo procesar: %s", self.archivo, self.error)
+            return
+        if self.sin_cambios:
+            logger.info("%s: sin cambios desde la última importación", self.archivo)
+            return
+        for fila, mensaje in sorted(self.errores + self.advertencias):
+            logger.debug("%s, fila %s: %s", self.archivo, fila, mensaje)
+        logger.info(
+            "%s: %s registros, %s nuevos, %s actualizados, %s omitidos, %s eliminados, %s con errores",
+            self.archivo, self.total, self.nuevos, self.actualizados, self.omitidos, self.eliminados,
+            len(self.errores),
+        )
+
+
+# --- Conversión vectorizada de columnas ---------------------------------------------
+
+def _texto(serie):
+    """Texto sin espacios; las celdas vacías quedan como NaN."""
+    texto = serie.astype(object).where(serie.notna(), None).astype(str).str.strip()
+    return texto.where(~texto.str.lower().isin(VALORES_NULOS))
+
+
+def _normalizar_id(serie):
+    """Ids leídos como texto: Excel entrega '4000.0' para la celda 4000."""
+    return _texto(serie).str.replace(r'\.0+$', '', regex=True)
+
+
+def _numeros(texto):
+    """Retorna (float, inválidos) para una columna de texto con coma o punto decimal."""
+    texto = texto.str.replace(',', '.', regex=False)
+    numeros = pd.to_numeric(texto, errors='coerce')
+    invalidos = texto.notna() & ~np.isfinite(numeros.fillna(0)) | texto.notna() & numeros.isna()
+    return texto, numeros.where(~invalidos), invalidos
+
+
+def _decimales(serie):
+    texto, _, invalidos = _numeros(_texto(serie))
+    # Decimal desde el texto original: conserva exactamente lo escrito en la planilla
+    return texto.where(~invalidos).map(Decimal, na_action='ignore'), invalidos
+
+
+def _enteros(serie):
+    _, numeros, invalidos = _numeros(_texto(serie))
+    return numeros.map(int, na_action='ignore').astype(object), invalidos
+
+
+def _booleanos(serie):
+    texto = _texto(serie)
+    return texto.str.lower().isin(VERDADEROS).astype(object).where(texto.notna()), pd.Series(False, index=serie.index)
+
+
+def _fechas(serie):
+    texto = _texto(serie)
+    fechas = pd.to_datetime(texto, format='%d-%m-%Y', errors='coerce')
+    # Celdas con formato fecha en Excel llegan como '2024-01-31 00:00:00'
+    resto = pd.to_datetime(texto.where(fechas.isna()), format='ISO8601', errors='coerce')
+    fechas = fechas.fillna(resto)
+    invalidos = texto.notna() & fechas.isna()
+    return fechas.map(lambda valor: valor.date(), na_action='ignore').astype(object), invalidos
+
+
+def _convertir(campo, serie):
+    """Convierte una columna según el tipo del campo. Retorna (valores, inválidos)."""
+    if campo.is_relation or campo.primary_key:
+        return _normalizar_id(serie), pd.Series(False, index=serie.index)
+    if isinstance(campo, models.BooleanField):
+        return _booleanos(serie)
+    if isinstance(campo, CAMPOS_DECIMALES):
+        return _decimales(serie)
+    if isinstance(campo, CAMPOS_ENTEROS):
+        return _enteros(serie)
+    if isinstance(campo, CAMPOS_FECHA):
+        return _fechas(serie)
+    return _texto(serie), pd.Series(False, index=serie.index)
+
+
+def _valor_vacio(espec, campo):
+    """Valor para celdas vacías: el declarado, el default del campo, 0 en numéricos o None."""
+    if campo.name in espec.por_defecto:
+        valor = espec.por_defecto[campo.name]
+        return valor() if callable(valor) else valor
+    if campo.has_default():
+        return campo.get_default()
+    if isinstance(campo, CAMPOS_DECIMALES):
+        return Decimal('0')
+    if isinstance(campo, CAMPOS_ENTEROS) and not campo.is_relation:
+        return 0
+    if campo.null or campo.is_relation:
+        return None
+    return ''
+
+
+def convertir_dataframe(espec, df, resultado):
+    """Valida columnas y retorna un DataFrame con los campos del modelo ya tipados.
+
+    Las filas con valores inválidos se registran como error en ``resultado`` y se descartan.
+    """
+    faltantes = [columna for columna in espec.requeridas if columna not in df.columns]
+    if faltantes:
+        raise ValueError(f"El archivo debe contener las columnas: {', '.join(espec.requeridas)}")
+
+    convertido = pd.DataFrame(index=df.index)
+    for columna, nombre in espec.columnas.items():
+        if columna not in df.columns:
+            continue
+        campo = espec.campo(nombre)
+        valores, invalidos = _convertir(campo, df[columna])
+        for indice in invalidos[invalidos].index:
+            resultado.agregar_error(indice, f"Valor inválido '{df.at[indice, columna]}' en '{columna}'")
+        vacio = _valor_vacio(espec, campo)
+        if vacio is not None and not campo.is_relation:
+            valores = valores.astype(object).where(valores.notna(), vacio)
+        convertido[nombre] = valores.astype(object).where(valores.notna(), None).where(~invalidos, None)
+        convertido = convertido[~invalidos]
+        df = df.loc[convertido.index]
+
+    for nombre in espec.no_negativos:
+        if nombre in convertido:
+            negativos = convertido[nombre].map(lambda valor: valor is not None and valor < 0)
+            for indice in negativos[negativos].index:
+                resultado.agregar_error(indice, f"El valor de '{nombre}' no puede ser negativo")
+            convertido = convertido[~negativos]
+
+    if espec.preparar:
+        convertido = espec.preparar(convertido)
+    return convertido
+
+
+# --- FKs ------------------------------------------------------------------------------
+
+def _ids_validos(campo, ids):
+    """Normaliza los ids al tipo de la PK destino; descarta los que no se pueden convertir."""
+    destino = campo.target_field
+    validos = {}
+    for valor in ids:
+        try:
+            validos[valor] = destino.to_python(valor)
+        except ValidationError:
+            continue
+    return validos
+
+
+def resolver_fks(espec, convertido, resultado):
+    """Reemplaza los ids de cada FK por su objeto, con un ``in_bulk`` por campo.
+
+    Las FKs a la propia tabla (``id_padre``) también aceptan ids que vienen en el archivo;
+    esas se asignan por id (``<campo>_id``) en vez de por objeto.
+    """
+    for nombre in list(convertido.columns):
+        campo = espec.campo(nombre)
+        if not campo.is_relation:
+            continue
+        serie = convertido[nombre]
+        normalizados = _ids_validos(campo, serie.dropna().unique())
+        encontrados = campo.related_model.objects.in_bulk(list(set(normalizados.values())))
+        propios = {}
+        if campo.related_model is espec.modelo:
+            pk = espec.modelo._meta.pk.name
+            if pk in convertido:
+                propios = {valor: valor for valor in convertido[pk].dropna()}
+
+        if nombre not in espec.fk_opcionales:
+            vacios = serie.isna()
+            for indice in vacios[vacios].index:
+                resultado.agregar_error(indice, f"Falta el valor de '{nombre}'")
+            convertido = convertido[~vacios]
+            serie = serie[~vacios]
+
+        faltantes = serie.notna() & ~serie.map(
+            lambda valor: normalizados.get(valor) in encontrados or valor in propios
+        )
+        for indice in faltantes[faltantes].index:
+            mensaje = f"{campo.related_model.__name__} con ID '{serie[indice]}' no encontrado"
+            if nombre in espec.fk_opcionales:
+                resultado.agregar_advertencia(indice, f"{mensaje} - usando None")
+            else:
+                resultado.agregar_error(indice, mensaje)
+        if nombre not in espec.fk_opcionales:
+            convertido = convertido[~faltantes]
+            serie = serie[~faltantes]
+
+        if propios:
+            # Autorreferencia: se asigna el id, el padre puede insertarse en el mismo lote
+            convertido = convertido.drop(columns=[nombre])
+            convertido[campo.attname] = serie.map(
+                lambda valor: normalizados.get(valor) if normalizados.get(valor) in encontrados else propios.get(valor)
+            )
+        else:
+            convertido[nombre] = serie.map(lambda valor: encontrados.get(normalizados.get(valor)))
+    return convertido
+
+
+# --- Inserción ------------------------------------------------------------------------
+
+def _atributo(espec, nombre):
+    campo = espec.campo(nombre)
+    return campo.attname if campo.is_relation else nombre
+
+
+def _valor_clave(objeto, espec):
+    return tuple(getattr(objeto, _atributo(espec, nombre)) for nombre in espec.clave)
+
+
+def _existentes(espec, objetos):
+    """{clave: pk} de los registros ya guardados que coinciden con la clave del archivo."""
+    if not espec.clave:
+        return {}
+    atributos = [_atributo(espec, nombre) for nombre in espec.clave]
+    consulta = espec.modelo.objects.all()
+    # Acota la consulta por el primer campo de la clave
+    valores = list({getattr(objeto, atributos[0]) for objeto in objetos})
+    existentes = {}
+    for inicio in range(0, len(valores), TAMANO_LOTE_IDS):
+        lote = consulta.filter(**{f'{atributos[0]}__in': valores[inicio:inicio + TAMANO_LOTE_IDS]})
+        for pk, *clave in lote.values_list('pk', *atributos):
+            existentes.setdefault(tuple(clave), pk)
+    return existentes
+
+
+def _proyecto_de(objeto, espec):
+    if espec.modelo is CategoriaNuevo:
+        return objeto.proyecto_id
+    campo = espec.campo_categoria
+    if campo is None:
+        return None
+    categoria = getattr(objeto, campo.name) if campo.is_cached(objeto) else None
+    return categoria.proyecto_id if categoria else None
+
+
+def _campos_actualizables(espec, columnas):
+    campos = []
+    for nombre in columnas:
+        campo = next(c for c in espec.modelo._meta.concrete_fields if nombre in (c.name, c.attname))
+        if not campo.primary_key and nombre not in espec.clave:
+            campos.append(campo.name)
+    return list(dict.fromkeys(campos + list(espec.calculados)))
+
+
+def _acumular_delta(deltas, campo_fk, campo_monto, objeto, antes):
+    """Suma el monto nuevo del registro a su categoría y resta el anterior (si se actualiza)."""
+    categoria_id = getattr(objeto, campo_fk.attname)
+    if categoria_id is not None:
+        deltas[categoria_id] += valor_guardado(campo_monto, getattr(objeto, campo_monto.attname)) or 0
+    if antes is not None:
+        anterior = antes.get(campo_fk.name, categoria_id)
+        if anterior is not None:
+            monto = antes.get(campo_monto.name, getattr(objeto, campo_monto.attname))
+            deltas[anterior] -= valor_guardado(campo_monto, monto) or 0
+
+
+def proyectar_deltas(espec, nuevos, cambiados):
+    """Variación del total de cada categoría raíz si se guardaran los registros, sin escribir.
+
+    ``cambiados`` es [(registro, valores antes de actualizar)]. Cada proyecto afectado se
+    simula con el mismo rollup que usa el recálculo (incluye los costos derivados).
+    """
+    fuentes = [(espec.campo(fk), espec.campo(columna)) for modelo, fk, columna in FUENTES_COSTO if modelo is espec.modelo]
+    if not fuentes:
+        return []
+    movimientos = [(objeto, None) for objeto in nuevos] + list(cambiados)
+
+    directos, adquisiciones = defaultdict(Decimal), defaultdict(Decimal)
+    for campo_fk, campo_monto in fuentes:
+        for objeto, antes in movimientos:
+            _acumular_delta(directos, campo_fk, campo_monto, objeto, antes)
+    if espec.modelo is Adquisiciones:
+        # La asistencia del vendor se calcula sobre el total sin flete
+        for objeto, antes in movimientos:
+            _acumular_delta(adquisiciones, espec.campo('id_categoria'), espec.campo('total'), objeto, antes)
+
+    categoria_ids = list(set(directos) | set(adquisiciones))
+    proyecto_de = {}
+    for inicio in range(0, len(categoria_ids), TAMANO_LOTE_IDS):
+        lote = categoria_ids[inicio:inicio + TAMANO_LOTE_IDS]
+        proyecto_de.update(CategoriaNuevo.objects.filter(id__in=lote).values_list('id', 'proyecto_id'))
+    por_proyecto = defaultdict(lambda: (defaultdict(Decimal), defaultdict(Decimal)))
+    for indice, deltas in enumerate((directos, adquisiciones)):
+        for categoria_id, delta in deltas.items():
+            if delta and proyecto_de.get(categoria_id) is not None:
+                por_proyecto[proyecto_de[categoria_id]][indice][categoria_id] += delta
+
+    filas = []
+    for proyecto_id in sorted(por_proyecto):
+        actual = simular_proyecto(proyecto_id)
+        proyectado = simular_proyecto(proyecto_id, *por_proyecto[proyecto_id])
+        raices = CategoriaNuevo.objects.filter(proyecto_id=proyecto_id, id_padre__isnull=True).order_by('id')
+        for categoria_id, nombre in raices.values_list('id', 'nombre'):
+            filas.append({
+                'proyecto': proyecto_id,
+                'categoria': categoria_id,
+                'nombre': nombre,
+                'total_actual': actual.get(categoria_id, Decimal('0.00')),
+                'total_proyectado': proyectado.get(categoria_id, Decimal('0.00')),
+                'delta': proyectado.get(categoria_id, Decimal('0.00')) - actual.get(categoria_id, Decimal('0.00')),
+            })
+    return filas
+
+
+def importar_dataframe(espec, df, archivo=None, simular=False, rollup=True):
+    """Importa un DataFrame leído de la planilla según ``espec``. Retorna un ``ResultadoCarga``.
+
+    Las inserciones y actualizaciones van en una transacción; los totales de los proyectos
+    afectados se recalculan una vez al salir del ``defer_rollups()`` más externo. Con
+    ``simular`` no escribe nada: solo reporta el resultado de cada fila y la variación
+    proyectada de los totales. Con ``rollup=False`` el recálculo de ``resultado.proyectos``
+    queda a cargo del llamador.
+    """
+    resultado = ResultadoCarga(archivo, simulacion=simular)
+    resultado.total = len(df)
+
+    convertido = convertir_dataframe(espec, df, resultado)
+    convertido = resolver_fks(espec, convertido, resultado)
+    if espec.orden:
+        convertido = convertido.sort_values(list(espec.orden), kind='stable')
+    # Las columnas de texto de pandas representan el vacío con NaN; el modelo espera None
+    convertido = convertido.astype(object).where(convertido.notna(), None)
+
+    columnas = list(convertido.columns)
+    sin_columna = {
+        nombre: valor for nombre, valor in espec.por_defecto.items()
+        if nombre not in columnas and espec.campo(nombre).attname not in columnas
+    }
+    objetos = []
+    for indice, fila in zip(convertido.index, convertido.to_dict('records')):
+        valores = {nombre: (valor() if callable(valor) else valor) for nombre, valor in sin_columna.items()}
+        valores.update(fila)
+        objetos.append((indice, espec.modelo(**valores)))
+
+    # Repetidos dentro del mismo archivo: gana el primero (o el último si se actualiza)
+    if espec.clave:
+        vistos = {}
+        for indice, objeto in objetos:
+            clave = _valor_clave(objeto, espec)
+            if clave in vistos:
+                resultado.omitidos += 1
+                if not espec.actualizar:
+                    resultado.agregar_fila(indice, OMITIDO, f"Repetida en el archivo (fila {vistos[clave][0] + 2})")
+                    continue
+                resultado.agregar_fila(vistos[clave][0], OMITIDO, f"Reemplazada por la fila {indice + 2}")
+            vistos[clave] = (indice, objeto)
+        objetos = list(vistos.values())
+
+    existentes = _existentes(espec, [objeto for _, objeto in objetos])
+    guardados = espec.modelo.objects.in_bulk(list(existentes.values())) if espec.actualizar and existentes else {}
+    campos_actualizables = _campos_actualizables(espec, columnas)
+
+    pendientes = []  # (indice, pk, destino, valores antes de actualizar)
+    for indice, objeto in objetos:
+        pk = existentes.get(_valor_clave(objeto, espec)) if espec.clave else None
+        if pk is not None and not espec.actualizar:
+            resultado.omitidos += 1
+            resultado.agregar_fila(indice, OMITIDO, "Ya existe")
+            continue
+        destino, antes = objeto, None
+        if pk is not None:
+            # Se copian los valores del archivo sobre el registro guardado
+            destino = guardados[pk]
+            antes = {nombre: getattr(destino, espec.campo(nombre).attname) for nombre in campos_actualizables}
+            for nombre in campos_actualizables:
+                campo = espec.campo(nombre)
+                if nombre in espec.calculados:
+                    continue
+                if campo.is_relation and campo.is_cached(objeto):
+                    setattr(destino, campo.name, getattr(objeto, campo.name))
+                else:
+                    setattr(destino, campo.attname, getattr(objeto, campo.attname))
+            for nombre in espec.clave:
+                # Las FKs de la clave no cambian: se reutiliza el objeto ya resuelto
+                campo = espec.campo(nombre)
+                if campo.is_relation and campo.is_cached(objeto):
+                    setattr(destino, campo.name, getattr(objeto, campo.name))
+        pendientes.append((indice, pk, destino, antes))
+
+    # Campos calculados de todo el archivo en una pasada
+    if espec.calculadora:
+        errores = espec.calculadora.aplicar_lote([destino for _, _, destino, _ in pendientes])
+        for posicion, mensaje in errores.items():
+            resultado.agregar_error(pendientes[posicion][0], mensaje)
+        pendientes = [pendiente for posicion, pendiente in enumerate(pendientes) if posicion not in errores]
+
+    nuevos, cambiados = [], []
+    for indice, pk, destino, antes in pendientes:
+        if pk is None:
+            nuevos.append(destino)
+            resultado.agregar_fila(indice, NUEVO)
+            continue
+        distintos = [
+            nombre for nombre, valor in antes.items()
+            if valor_guardado(espec.campo(nombre), getattr(destino, espec.campo(nombre).attname))
+            != valor_guardado(espec.campo(nombre), valor)
+        ]
+        if distintos:
+            cambiados.append((destino, antes))
+            resultado.agregar_fila(indice, ACTUALIZADO, f"Cambia: {', '.join(distintos)}")
+        else:
+            resultado.omitidos += 1
+            resultado.agregar_fila(indice, OMITIDO, "Sin cambios")
+
+    if simular:
+        resultado.nuevos = len(nuevos)
+        resultado.actualizados = len(cambiados)
+        resultado.proyectos = {_proyecto_de(objeto, espec) for objeto in nuevos + [o for o, _ in cambiados]} - {None}
+        resultado.deltas = proyectar_deltas(espec, nuevos, cambiados)
+        return resultado
+
+    cambiados = [destino for destino, _ in cambiados]
+    with transaction.atomic():
+        espec.modelo.objects.bulk_create(nuevos, batch_size=TAMANO_LOTE)
+        if cambiados:
+            espec.modelo.objects.bulk_update(cambiados, campos_actualizables, batch_size=TAMANO_LOTE)
+        resultado.nuevos = len(nuevos)
+        resultado.actualizados = len(cambiados)
+        resultado.proyectos = {_proyecto_de(objeto, espec) for objeto in nuevos + cambiados} - {None}
+        if espec.despues and (nuevos or cambiados):
+            espec.despues(sorted(resultado.proyectos))
+        if nuevos or cambiados:
+            invalidar_resumen(*resultado.proyectos)  # bulk_create/bulk_update no pasan por save()
+        if rollup:
+            for proyecto_id in resultado.proyectos:
+                solicitar_rollup(proyecto_id)
+    return resultado
+
+
+# --- Lectura de planillas por bloques -----------------------------------------------
+
+def _celda(valor):
+    """Valor de celda de openpyxl como el texto que entrega ``pd.read_excel(dtype=str)``."""
+    if valor is None:
+        return None
+    if isinstance(valor, float) and valor.is_integer():
+        valor = int(valor)  # igual que pandas: la celda 4000.0 se lee como '4000'
+    elif isinstance(valor, datetime):
+        valor = pd.Timestamp(valor)
+    elif isinstance(valor, time):
+        return valor.isoformat()
+    return str(valor)
+
+
+def _bloques_xlsx(archivo, tamano):
+    libro = openpyxl.load_workbook(archivo, read_only=True, data_only=True)
+    try:
+        filas = libro.worksheets[0].iter_rows(values_only=True)
+        encabezado = list(next(filas, ()))
+        while encabezado and encabezado[-1] is None:
+            encabezado.pop()
+        columnas = [c if c is not None else f'Unnamed: {i}' for i, c in enumerate(encabezado)]
+        ancho = len(columnas)
+        bloque, indices, entregados = [], [], 0
+        for posicion, fila in enumerate(filas):
+            fila = fila[:ancho]
+            if all(valor is None for valor in fila):
+                continue  # filas vacías: no cuentan pero conservan la numeración de Excel
+            bloque.append([_celda(valor) for valor in fila] + [None] * (ancho - len(fila)))
+            indices.append(posicion)
+            if len(bloque) == tamano:
+                yield pd.DataFrame(bloque, columns=columnas, index=indices, dtype=object)
+                bloque, indices, entregados = [], [], entregados + 1
+        if bloque or not entregados:
+            yield pd.DataFrame(bloque, columns=columnas, index=indices, dtype=object)
+    finally:
+        libro.close()
+
+
+def _bloques_csv(archivo, tamano):
+    if tamano is None:
+        yield pd.read_csv(archivo, dtype=str)
+        return
+    yield from pd.read_csv(archivo, dtype=str, chunksize=tamano)
+
+
+def _bloques_parquet(archivo, tamano):
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ValueError("Leer archivos .parquet requiere instalar pyarrow")
+    inicio = 0
+    for lote in pq.ParquetFile(archivo).iter_batches(batch_size=tamano or TAMANO_BLOQUE):
+        df = lote.to_pandas()
+        df = df.astype(object).where(df.notna(), None).map(lambda v: v if v is None else _celda(v))
+        df.index = pd.RangeIndex(inicio, inicio + len(df))
+        inicio += len(df)
+        yield df
+
+
+LECTORES = {'.xlsx': _bloques_xlsx, '.csv': _bloques_csv, '.parquet': _bloques_parquet}
+
+
+def _en_segundo_plano(bloques, anticipados):
+    """Lee los bloques en otro hilo mientras se procesa el anterior (hasta ``anticipados`` en espera)."""
+    cola = queue.Queue(maxsize=anticipados)
+    detenido = threading.Event()
+
+    def poner(item):
+        while not detenido.is_set():
+            try:
+                cola.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def producir():
+        try:
+            for bloque in bloques:
+                if not poner(('bloque', bloque)):
+                    return
+            poner(('fin', None))
+        except Exception as e:
+            poner(('error', e))
+        finally:
+            bloques.close()
+
+    hilo = threading.Thread(target=producir, daemon=True)
+    hilo.start()
+    try:
+        while True:
+            tipo, valor = cola.get()
+            if tipo == 'fin':
+                return
+            if tipo == 'error':
+                raise valor
+            yield valor
+    finally:
+        detenido.set()
+        hilo.join()
+
+
+def leer_por_bloques(archivo, tamano=TAMANO_BLOQUE, anticipados=1):
+    """Itera una planilla (ruta o archivo subido) en DataFrames de hasta ``tamano`` filas.
+
+    Todas las columnas llegan como texto y el índice es la posición de la fila en el
+    archivo, así los mensajes de ``ResultadoCarga`` conservan el número de fila de Excel.
+    ``tamano=None`` entrega el archivo en un solo bloque. Con ``anticipados > 0`` el
+    siguiente bloque se lee en otro hilo mientras se importa el actual.
+    """
+    extension = os.path.splitext(str(getattr(archivo, 'name', archivo)))[1].lower()
+    lector = LECTORES.get(extension)
+    if lector is None:
+        raise ValueError(f"Formato no soportado: {extension or 'sin extensión'} (use {', '.join(EXTENSIONES)})")
+    bloques = lector(archivo, tamano)
+    return _en_segundo_plano(bloques, anticipados) if anticipados else bloques
+
+
+def filas_estimadas(ruta):
+    """Filas de datos según los metadatos del archivo, sin leerlo; None si no se sabe."""
+    extension = os.path.splitext(ruta)[1].lower()
+    if extension == '.xlsx':
+        libro = openpyxl.load_workbook(ruta, read_only=True)
+        try:
+            maximo = libro.worksheets[0].max_row
+        finally:
+            libro.close()
+        return max(maximo - 1, 0) if maximo else None
+    if extension == '.parquet':
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            return None
+        return pq.ParquetFile(ruta).metadata.num_rows
+    return None
+
+
+def leer_planilla(archivo):
+    """Lee una planilla completa (ruta o archivo subido) con todas las columnas como texto."""
+    # Todo como texto: los ids no pierden ceros y los decimales no pasan por float
+    return next(iter(leer_por_bloques(archivo, tamano=None, anticipados=0)))
+
+
+def importar_archivo(espec, archivo, nombre=None, simular=False, rollup=True, tamano=TAMANO_BLOQUE):
+    """Importa un archivo bloque a bloque y retorna un solo ``ResultadoCarga``.
+
+    Con ``orden`` (padres e hijos en el mismo archivo) o ``simular`` (la proyección de
+    totales necesita el archivo completo) se lee en un solo bloque.
+    """
+    if espec.orden or simular:
+        tamano = None
+    resultado = ResultadoCarga(nombre, simulacion=simular)
+    # Cada bloque solo deja sus proyectos pendientes: se recalculan una vez al terminar el archivo
+    with defer_rollups():
+        for bloque in leer_por_bloques(archivo, tamano):
+            resultado.sumar(importar_dataframe(espec, bloque, nombre, simular=simular, rollup=rollup))
+    return resultado
+
+
+# --- Reimportación incremental --------------------------------------------------------
+
+def hash_archivo(archivo):
+    """SHA-256 del contenido de un archivo (ruta o archivo subido), leído por partes."""
+    digest = hashlib.sha256()
+    if hasattr(archivo, 'chunks'):
+        for parte in archivo.chunks():
+            digest.update(parte)
+        archivo.seek(0)
+    else:
+        with open(archivo, 'rb') as f:
+            for parte in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(parte)
+    return digest.hexdigest()
+
+
+def registro_archivo(espec, nombre, crear=True):
+    """``ArchivoSubido`` de ``uploads/<carpeta>/<nombre>``; los archivos copiados a mano se registran al importarlos."""
+    ruta = os.path.join(espec.carpeta, nombre)
+    registro = ArchivoSubido.objects.filter(archivo=ruta).order_by('-id').first()
+    if registro is None:
+        registro = ArchivoSubido(archivo=ruta, modelo_destino=espec.carpeta)
+        if crear:
+            registro.save()
+    return registro
+
+
+def _texto_columnas(espec, bloque):
+    """Columnas del cargador como texto normalizado (ids sin '.0', vacíos como None)."""
+    texto = pd.DataFrame(index=bloque.index)
+    for columna, nombre in espec.columnas.items():
+        if columna in bloque.columns:
+            campo = espec.campo(nombre)
+            normalizar = _normalizar_id if campo.is_relation or campo.primary_key else _texto
+            texto[columna] = normalizar(bloque[columna])
+    return texto.astype(object).where(texto.notna(), None)
+
+
+def _hashes(df):
+    return [f'{valor:016x}' for valor in pd.util.hash_pandas_object(df, index=False)]
+
+
+class ImportacionIncremental:
+    """Importa un archivo registrado aplicando solo la diferencia con la versión ya importada.
+
+    Cada fila se identifica por la clave natural del cargador (``espec.clave``) y se compara
+    con la huella guardada en ``ArchivoSubido.instantanea``: las filas nuevas o modificadas
+    se importan (las modificadas actualizando el registro), las que desaparecieron se
+    eliminan y el resto se omite. La primera importación usa la especificación tal cual.
+    """
+
+    def __init__(self, espec, ruta, registro):
+        self.espec = espec
+        self.registro = registro
+        self.hash = hash_archivo(ruta)
+        self.sin_cambios = (
+            registro.estado_importacion == ArchivoSubido.IMPORTADO and registro.hash_importado == self.hash
+        )
+        anterior = registro.instantanea or {}
+        self.columnas_anteriores = anterior.get('columnas', [])
+        self.anterior = anterior.get('filas', {})
+        self.incremental = bool(self.anterior)
+        # Una fila modificada de un archivo ya importado actualiza su registro
+        self.espec_lote = espec
+        if self.incremental and not espec.actualizar:
+            self.espec_lote = copy(espec)
+            self.espec_lote.actualizar = True
+        self.columnas = []
+        self.filas = {}  # clave -> [huella, *valores] de la versión actual
+        self.claves = {}  # índice de fila -> clave
+
+    def filtrar(self, bloque):
+        """Registra las filas del bloque y retorna solo las nuevas o modificadas."""
+        texto = _texto_columnas(self.espec, bloque)
+        self.columnas = list(texto.columns)
+        columnas_clave = [c for c in self.columnas if self.espec.columnas[c] in self.espec.clave] or self.columnas
+        claves, huellas = _hashes(texto[columnas_clave]), _hashes(texto)
+        for indice, clave, huella, valores in zip(texto.index, claves, huellas, texto.itertuples(index=False, name=None)):
+            self.filas[clave] = [huella, *valores]
+            self.claves[indice] = clave
+        if not self.incremental:
+            return bloque
+        cambiadas = [self.anterior.get(clave, [None])[0] != huella for clave, huella in zip(claves, huellas)]
+        return bloque[cambiadas]
+
+    def registrar(self, resultado):
+        """Las filas con error quedan sin huella para reintentarlas en la próxima importación."""
+        for fila, _ in resultado.errores:
+            clave = self.claves.get(fila - 2)
+            if clave in self.filas:
+                self.filas[clave][0] = None
+
+    def _objetos(self, filas, columnas):
+        df = pd.DataFrame([valores for _, *valores in filas], columns=columnas, dtype=object)
+        descartes = ResultadoCarga()
+        convertido = resolver_fks(self.espec, convertir_dataframe(self.espec, df, descartes), descartes)
+        convertido = convertido.astype(object).where(convertido.notna(), None)
+        return [self.espec.modelo(**fila) for fila in convertido.to_dict('records')]
+
+    def eliminadas(self):
+        """Registros cuyas filas estaban en la versión anterior y ya no están. Retorna {pk: objeto}."""
+        quitadas = [fila for clave, fila in self.anterior.items() if clave not in self.filas]
+        if not quitadas:
+            return {}
+        objetos = self._objetos(quitadas, self.columnas_anteriores)
+        # Una clave que solo cambió de formato ('Jefe' -> 'jefe') sigue viva en el archivo
+        cambiadas = [fila for clave, fila in self.filas.items() if self.anterior.get(clave, [None])[0] != fila[0]]
+        vigentes = {_valor_clave(objeto, self.espec) for objeto in self._objetos(cambiadas, self.columnas)} if cambiadas else set()
+        existentes = _existentes(self.espec, objetos)
+        return {
+            existentes[clave]: objeto for objeto in objetos
+            if (clave := _valor_clave(objeto, self.espec)) in existentes and clave not in vigentes
+        }
+
+    def terminar(self, resultado, simular=False, rollup=True):
+        """Elimina las filas quitadas del archivo y guarda la nueva versión como importada."""
+        eliminadas = self.eliminadas()
+        resultado.eliminados += len(eliminadas)
+        proyectos = {_proyecto_de(objeto, self.espec) for objeto in eliminadas.values()} - {None}
+        resultado.proyectos |= proyectos
+        if simular:
+            return resultado
+        with transaction.atomic():
+            pks = list(eliminadas)
+            for inicio in range(0, len(pks), TAMANO_LOTE_IDS):
+                self.espec.modelo.objects.filter(pk__in=pks[inicio:inicio + TAMANO_LOTE_IDS]).delete()
+            self.registro.hash_contenido = self.registro.hash_importado = self.hash
+            self.registro.estado_importacion = ArchivoSubido.IMPORTADO
+            self.registro.importado = timezone.now()
+            self.registro.instantanea = {'columnas': self.columnas, 'filas': self.filas}
+            self.registro.save()
+            if rollup:
+                for proyecto_id in proyectos:
+                    solicitar_rollup(proyecto_id)
+        return resultado
+
+    def fallo(self):
+        """Marca el archivo con error; la próxima importación lo vuelve a intentar completo."""
+        self.registro.hash_contenido = self.hash
+        self.registro.estado_importacion = ArchivoSubido.ERROR
+        self.registro.save(update_fields=['hash_contenido', 'estado_importacion'])
+
+
+def importar_incremental(espec, ruta, registro, simular=False, rollup=True, tamano=TAMANO_BLOQUE):
+    """Importa ``ruta`` (registrada en ``registro``) aplicando solo lo que cambió desde la última vez."""
+    nombre = os.path.basename(ruta)
+    resultado = ResultadoCarga(nombre, simulacion=simular)
+    incremental = ImportacionIncremental(espec, ruta, registro)
+    if incremental.sin_cambios:
+        resultado.sin_cambios = True
+        return resultado
+    if espec.orden or simular:
+        tamano = None
+    try:
+        for bloque in leer_por_bloques(ruta, tamano):
+            cambiadas = incremental.filtrar(bloque)
+            parcial = importar_dataframe(incremental.espec_lote, cambiadas, nombre, simular=simular, rollup=rollup)
+            parcial.total = len(bloque)
+            parcial.omitidos += len(bloque) - len(cambiadas)  # sin cambios desde la última importación
+            incremental.registrar(parcial)
+            resultado.sumar(parcial)
+        return incremental.terminar(resultado, simular, rollup)
+    except Exception:
+        if not simular and registro.pk:
+            incremental.fallo()
+        raise
+
+
+def cargar_directorio(espec, simular=False):
+    """Importa las planillas nuevas o modificadas de ``uploads/<carpeta>`` con un solo rollup al final.
+
+    Retorna un ``ResultadoCarga`` por archivo; uno que no se pudo procesar no detiene a los
+    demás y queda con su ``error``.
+    """
+    directorio_archivos = os.path.join(settings.BASE_DIR, 'uploads', espec.carpeta)
+    if not os.path.exists(directorio_archivos):
+        logger.warning("El directorio %s no existe.", directorio_archivos)
+        return []
+
+    resultados = []
+    with defer_rollups():
+        for archivo in sorted(os.listdir(directorio_archivos)):
+            if not archivo.lower().endswith(EXTENSIONES):
+                continue
+            try:
+                # Sin cambios desde la última importación: se salta; modificado: solo la diferencia
+                registro = registro_archivo(espec, archivo, crear=not simular)
+                resultado = importar_incremental(espec, os.path.join(directorio_archivos, archivo), registro, simular)
+            except Exception as e:
+                logger.exception("Error al procesar el archivo %s", archivo)
+                resultado = ResultadoCarga(archivo, simulacion=simular)
+                resultado.error = str(e)
+            resultado.registrar_en_log()
+            resultados.append(resultado)
+    return resultados
@@ -0,0 +1,50 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from proyectoApp.models import CategoriaNuevo, ProyectoNuevo
+from proyectoApp.rollup import CAMPOS_ARBOL, consulta_costos_directos
+
+
+class Command(BaseCommand):
+    help = "Muestra el plan (EXPLAIN) y el tiempo de las consultas del rollup y de la comparación de un proyecto."
+
+    def add_arguments(self, parser):
+        parser.add_argument('proyecto', help="ID del proyecto.")
+        parser.add_argument('--repeticiones', type=int, default=5, help="Ejecuciones por consulta; se informa la mejor.")
+
+    def handle(self, *args, **options):
+        proyecto_id = options['proyecto']
+        if not ProyectoNuevo.objects.filter(id=proyecto_id).exists():
+            raise CommandError(f"Proyecto no encontrado: {proyecto_id}")
+
+        categorias = CategoriaNuevo.objects.del_proyecto(proyecto_id)
+        relacionada = categorias.exclude(categoria_relacionada=None).values_list('categoria_relacionada', flat=True).first()
+        consultas = [
+            ('rollup: costos directos por categoría', *consulta_costos_directos(proyecto_id)),
+            ('rollup: árbol del proyecto', *_sql(categorias.only(*CAMPOS_ARBOL))),
+            ('comparación: categorías del nivel 1', *_sql(categorias.filter(nivel=1))),
+            ('comparación: categoría relacionada', *_sql(categorias.filter(categoria_relacionada=relacionada))),
+            ('resumen: categorías raíz', *_sql(categorias.filter(id_padre__isnull=True))),
+        ]
+        prefijo = connection.ops.explain_query_prefix()
+        with connection.cursor() as cursor:
+            for nombre, sql, params in consultas:
+                cursor.execute(f"{prefijo} {sql}", params)
+                plan = cursor.fetchall()
+                tiempos = []
+                for _ in range(max(options['repeticiones'], 1)):
+                    inicio = time.perf_counter()
+                    cursor.execute(sql, params)
+                    filas = len(cursor.fetchall())
+                    tiempos.append(time.perf_counter() - inicio)
+
+                self.stdout.write(self.style.MIGRATE_HEADING(f"{nombre}: {filas} filas, {min(tiempos) * 1000:.2f} ms"))
+                for fila in plan:
+                    self.stdout.write("  " + " | ".join(str(valor) for valor in fila))
+
+
+def _sql(queryset):
+    sql, params = queryset.query.sql_with_params()
+    return sql, list(params)
@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from proyectoApp.trabajos import ejecutar_trabajo, tomar_trabajo
+
+
+class Command(BaseCommand):
+    help = "Worker de importaciones: ejecuta los trabajos encolados por la vista cargar_datos."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--una-vez', action='store_true', help="Procesa los trabajos pendientes y termina.")
+        parser.add_argument('--intervalo', type=float, default=5, help="Segundos entre consultas a la cola.")
+        parser.add_argument('--procesos', type=int, default=1,
+                            help="Cargadores independientes que se ejecutan a la vez, cada uno en su proceso.")
+
+    def handle(self, *args, **options):
+        while True:
+            trabajo = tomar_trabajo()
+            if trabajo is None:
+                if options['una_vez']:
+                    return
+                time.sleep(options['intervalo'])
+                continue
+
+            self.stdout.write(f"Procesando importación {trabajo.id}: {', '.join(trabajo.cargadores)}")
+            trabajo = ejecutar_trabajo(trabajo, options['procesos'])
+            estilo = self.style.SUCCESS if trabajo.estado == trabajo.COMPLETADO else self.style.WARNING
+            self.stdout.write(estilo(f"Importación {trabajo.id}: {trabajo.estado}"))
+            informe = trabajo.informe
+            self.stdout.write(
+                f"  {informe['segundos']} s con {informe['procesos']} proceso(s); suma de los cargadores "
+                f"{informe['segundos_suma_cargadores']} s (aceleración estimada x{informe['aceleracion_estimada']}), "
+                f"ruta crítica {informe['ruta_critica']} s"
+            )
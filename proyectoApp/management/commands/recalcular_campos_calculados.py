@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from proyectoApp.calculos import CALCULADORAS, TAMANO_LOTE, recalcular_campos
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula en lotes los campos calculados de los modelos de costo (todos o de los "
+        "proyectos indicados) y guarda solo los registros que cambian."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('proyectos', nargs='*', help="IDs de proyecto; si se omiten, se procesan todos.")
+        parser.add_argument('--modelo', action='append', dest='modelos', help="Limita a un modelo (repetible).")
+        parser.add_argument('--batch-size', type=int, default=TAMANO_LOTE)
+
+    def handle(self, *args, **options):
+        disponibles = {modelo.__name__ for modelo in CALCULADORAS}
+        desconocidos = set(options['modelos'] or ()) - disponibles
+        if desconocidos:
+            raise CommandError(f"Modelos sin campos calculados: {', '.join(sorted(desconocidos))}")
+
+        actualizados = recalcular_campos(options['modelos'], options['proyectos'] or None, options['batch_size'])
+        for modelo, total in actualizados.items():
+            self.stdout.write(f" - {modelo}: {total}")
+        self.stdout.write(self.style.SUCCESS(f"Registros actualizados: {sum(actualizados.values())}"))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from proyectoApp.arbol import reconstruir_rutas
+
+
+class Command(BaseCommand):
+    help = "Recalcula la ruta materializada de las categorías (todas o de los proyectos indicados)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('proyectos', nargs='*', help="IDs de proyecto; si se omiten, se procesan todos.")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            actualizadas = reconstruir_rutas(options['proyectos'] or None)
+        self.stdout.write(self.style.SUCCESS(f"Rutas actualizadas: {actualizadas}"))
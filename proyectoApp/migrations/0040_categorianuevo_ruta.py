@@ -0,0 +1,69 @@
+from django.db import migrations, models
+
+
+SEPARADOR_RUTA = '/'
+LARGO_MAXIMO_RUTA = 700  # max_length del campo
+
+
+def calcular_rutas(categorias, rutas_externas=None):
+    """Copia de ``arbol.calcular_rutas``: la migración no importa código de la app que puede cambiar.
+
+    Las categorías que forman un ciclo quedan como raíz para no perder el árbol. Lanza
+    ValueError si algún id contiene el separador o alguna ruta no entra en la columna.
+    """
+    rutas_externas = rutas_externas or {}
+    padres = {c.id: c.id_padre_id for c in categorias}
+    rutas = {}
+
+    for categoria_id in padres:
+        camino = []
+        actual = categoria_id
+        while actual in padres and actual not in rutas and actual not in camino:
+            camino.append(actual)
+            actual = padres[actual]
+
+        if actual in rutas:
+            base = rutas[actual]
+        elif actual in camino:
+            base = SEPARADOR_RUTA  # ciclo: se corta en el nodo repetido
+        elif actual is not None and actual in rutas_externas:
+            base = rutas_externas[actual] or f"{SEPARADOR_RUTA}{actual}{SEPARADOR_RUTA}"
+        else:
+            base = SEPARADOR_RUTA
+        for nodo in reversed(camino):
+            base = f"{base}{nodo}{SEPARADOR_RUTA}"
+            if SEPARADOR_RUTA in str(nodo):
+                raise ValueError(f"El id de categoría '{nodo}' no puede contener '{SEPARADOR_RUTA}'.")
+            if len(base) > LARGO_MAXIMO_RUTA:
+                raise ValueError(
+                    f"La ruta de la categoría {nodo} tendría {len(base)} caracteres (máximo {LARGO_MAXIMO_RUTA}); "
+                    "acorte los ids o los niveles del árbol antes de migrar."
+                )
+            rutas[nodo] = base
+    return rutas
+
+
+def poblar_rutas(apps, schema_editor):
+    """Calcula la ruta materializada de las categorías existentes."""
+    CategoriaNuevo = apps.get_model('proyectoApp', 'CategoriaNuevo')
+    categorias = list(CategoriaNuevo.objects.only('id', 'id_padre_id'))
+    rutas = calcular_rutas(categorias)
+    for categoria in categorias:
+        categoria.ruta = rutas[categoria.id]
+    CategoriaNuevo.objects.bulk_update(categorias, ['ruta'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('proyectoApp', '0039_proyectonuevo_costo_total'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='categorianuevo',
+            name='ruta',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=700),
+        ),
+        migrations.RunPython(poblar_rutas, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.1.5 on 2026-10-18 13:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('proyectoApp', '0040_categorianuevo_ruta'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReglaCostoDerivado',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('base', models.CharField(choices=[('adquisiciones', 'Total de adquisiciones del proyecto'), ('raices', 'Total de las categorías raíz')], max_length=20)),
+                ('tasa', models.DecimalField(decimal_places=6, help_text='Fracción de la base (0.13 = 13%)', max_digits=9)),
+                ('categoria', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='regla_derivada', to='proyectoApp.categorianuevo')),
+                ('proyecto', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reglas_costo_derivado', to='proyectoApp.proyectonuevo')),
+            ],
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.5 on 2026-10-18 13:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('proyectoApp', '0041_reglacostoderivado'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrabajoImportacion',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('cargadores', models.JSONField(default=list)),
+                ('estado', models.CharField(choices=[('pendiente', 'Pendiente'), ('en_curso', 'En curso'), ('completado', 'Completado'), ('cancelado', 'Cancelado'), ('error', 'Error')], db_index=True, default='pendiente', max_length=20)),
+                ('cancelacion_solicitada', models.BooleanField(default=False)),
+                ('progreso', models.JSONField(default=dict)),
+                ('proyectos', models.JSONField(default=list)),
+                ('error', models.TextField(blank=True, default='')),
+                ('creado', models.DateTimeField(auto_now_add=True)),
+                ('actualizado', models.DateTimeField(auto_now=True)),
+                ('iniciado', models.DateTimeField(blank=True, null=True)),
+                ('terminado', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+    ]
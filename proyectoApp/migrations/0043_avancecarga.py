@@ -0,0 +1,42 @@
+# Generated by Django 5.1.5 on 2026-10-18 14:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('proyectoApp', '0042_trabajoimportacion'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='trabajoimportacion',
+            name='progreso',
+        ),
+        migrations.RemoveField(
+            model_name='trabajoimportacion',
+            name='proyectos',
+        ),
+        migrations.AddField(
+            model_name='trabajoimportacion',
+            name='informe',
+            field=models.JSONField(default=dict),
+        ),
+        migrations.CreateModel(
+            name='AvanceCarga',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('carpeta', models.CharField(max_length=50)),
+                ('estado', models.CharField(choices=[('pendiente', 'Pendiente'), ('en_curso', 'En curso'), ('completado', 'Completado'), ('cancelado', 'Cancelado'), ('error', 'Error')], default='pendiente', max_length=20)),
+                ('archivos', models.JSONField(default=dict)),
+                ('proyectos', models.JSONField(default=list)),
+                ('segundos', models.FloatField(default=0)),
+                ('trabajo', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='avances', to='proyectoApp.trabajoimportacion')),
+            ],
+            options={
+                'unique_together': {('trabajo', 'carpeta')},
+            },
+        ),
+    ]
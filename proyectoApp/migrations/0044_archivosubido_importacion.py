@@ -0,0 +1,38 @@
+# Generated by Django 5.1.5 on 2026-10-18 14:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('proyectoApp', '0043_avancecarga'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivosubido',
+            name='estado_importacion',
+            field=models.CharField(choices=[('pendiente', 'Pendiente'), ('importado', 'Importado'), ('error', 'Error')], default='pendiente', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='archivosubido',
+            name='hash_contenido',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='archivosubido',
+            name='hash_importado',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='archivosubido',
+            name='importado',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='archivosubido',
+            name='instantanea',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
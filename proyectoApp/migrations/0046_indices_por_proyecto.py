@@ -0,0 +1,97 @@
+# Generated by Django 5.1.5 on 2026-10-18 14:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('proyectoApp', '0045_tabla_cache_resumen'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='administracionsupervision',
+            index=models.Index(fields=['id_categoria', 'costo_total_us'], name='admin_sup_cat_monto_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='administrativofinanciero',
+            index=models.Index(fields=['id_categoria', 'costo_total'], name='admin_fin_cat_monto_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='adquisiciones',
+            index=models.Index(fields=['id_categoria', 'total_con_flete'], name='adquisiciones_cat_monto_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='categorianuevo',
+            index=models.Index(fields=['proyecto', 'id_padre'], name='categoria_proyecto_padre_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='categorianuevo',
+            index=models.Index(fields=['proyecto', 'nivel'], name='categoria_proyecto_nivel_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='categorianuevo',
+            index=models.Index(fields=['proyecto', 'categoria_relacionada'], name='categoria_proyecto_rel_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='categorianuevo',
+            index=models.Index(fields=['proyecto', 'nombre'], name='categoria_proyecto_nombre_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contratosubcontrato',
+            index=models.Index(fields=['id_categoria', 'total_usd_indirectos_contratista'], name='contrato_cat_monto_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='costonuevo',
+            index=models.Index(fields=['categoria', 'monto'], name='costonuevo_cat_monto_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='datosep',
+            index=models.Index(fields=['id_categoria', 'precio_hh'], name='datosep_cat_monto_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='dueno',
+            index=models.Index(fields=['id_categoria', 'costo_total'], name='dueno_cat_monto_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='equiposconstruccion',
+            index=models.Index(fields=['id_categoria', 'total_usd'], name='equipos_cat_monto_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='especificocategoria',
+            index=models.Index(fields=['id_categoria', 'total'], name='especifico_cat_monto_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='gestionpermisos',
+            index=models.Index(fields=['id_categoria', 'total_usd'], name='permisos_cat_monto_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ingenieriadetallescontraparte',
+            index=models.Index(fields=['id_categoria', 'total_usd'], name='ingenieria_cat_monto_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='manoobra',
+            index=models.Index(fields=['id_categoria', 'total_usd'], name='manoobra_cat_monto_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='materialesotros',
+            index=models.Index(fields=['id_categoria', 'total_sitio'], name='materiales_cat_monto_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='otrosadm',
+            index=models.Index(fields=['id_categoria', 'total_usd'], name='otrosadm_cat_monto_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='personalindirectocontratista',
+            index=models.Index(fields=['id_categoria', 'costo_total_us'], name='personal_ind_cat_monto_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='serviciosapoyo',
+            index=models.Index(fields=['id_categoria', 'total_usd'], name='servicios_cat_monto_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='staffenami',
+            index=models.Index(fields=['categoria', 'costo_total'], name='staff_cat_monto_idx'),
+        ),
+    ]
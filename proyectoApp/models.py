@@ -1,11 +1,56 @@
 from django.db import models
-from django.db.models import Sum, F, DecimalField
+from django.db.models import DEFERRED, Sum, F, DecimalField, Value, Max
+from django.db.models.functions import Concat, Length, Substr
 from decimal import Decimal 
 from django.db import transaction
 import uuid
 # Create your models here.
 
 
+def propagar_cambio_costo(categoria, afecta_adquisiciones=False):
+    """Propaga un cambio de costo desde la categoría hacia sus ancestros, visitando cada uno una vez."""
+    if categoria is None:
+        return
+    from .rollup import propagar_cambio
+
+    propagar_cambio(categoria.id, categoria.proyecto_id, afecta_adquisiciones=afecta_adquisiciones)
+
+
+def calcular_campos(instancia):
+    """Completa los campos calculados con la fórmula compartida del modelo (ver calculos.py)."""
+    from .calculos import calculadora_de
+
+    calculadora_de(type(instancia)).aplicar(instancia)
+
+
+class PorProyectoQuerySet(models.QuerySet):
+    """Consultas acotadas a un proyecto, directo o a través de la categoría de la fila.
+
+    Las tablas de costo no guardan el proyecto: el filtro pasa por su FK a CategoriaNuevo,
+    que se resuelve con el índice (fk, monto) de la tabla y el (proyecto, ...) de categorías.
+    """
+
+    def _campo_proyecto(self):
+        opciones = self.model._meta
+        if any(campo.name == 'proyecto' for campo in opciones.concrete_fields):
+            return 'proyecto_id'
+        for campo in opciones.concrete_fields:
+            if campo.is_relation and campo.related_model is CategoriaNuevo:
+                return f'{campo.name}__proyecto_id'
+        raise TypeError(f"{self.model.__name__} no pertenece a un proyecto")
+
+    def del_proyecto(self, proyecto_id):
+        return self.filter(**{self._campo_proyecto(): proyecto_id})
+
+    def de_proyectos(self, proyecto_ids):
+        return self.filter(**{f'{self._campo_proyecto()}__in': proyecto_ids})
+
+    def proyectos(self):
+        """Ids (sin repetir) de los proyectos a los que pertenecen las filas."""
+        campo = self._campo_proyecto()
+        return self.exclude(**{f'{campo}__isnull': True}).order_by().values_list(campo, flat=True).distinct()
+
+
 
 
 
@@ -36,16 +81,28 @@ class ProyectoNuevo(models.Model):
 
     def save(self, *args, **kwargs):
         """Guardado seguro sin recursión"""
+        from .resumen import invalidar_resumen
+
         skip_recalc = kwargs.pop('skip_cost_recalculation', False)
         if not skip_recalc:
             self.calcular_costo_total(save=True)
         super().save(*args, **kwargs)
+        invalidar_resumen(self.id)
+
+    def delete(self, *args, **kwargs):
+        from .resumen import invalidar_resumen
+
+        proyecto_id = self.id
+        resultado = super().delete(*args, **kwargs)
+        invalidar_resumen(proyecto_id)
+        return resultado
     
     def actualizar_costos_categorias(self):
         """Actualiza costos de categorías y luego recalcula el total"""
-        for categoria in self.categorias.all():
-            categoria.actualizar_total_costo()
-        self.calcular_costo_total(save=True)
+        from .rollup import recalcular_proyecto
+
+        recalcular_proyecto(self.id)
+        self.refresh_from_db(fields=['costo_total'])
     
     
     def __str__(self):
@@ -63,41 +120,137 @@ class CategoriaNuevo(models.Model):
     nivel = models.PositiveIntegerField(default=1)
     final = models.BooleanField(default=False)
     total_costo = models.DecimalField(max_digits=15, decimal_places=2, default=0.00, null=True, blank=True)
+    # Ruta materializada "/raiz/.../id/": subárbol = ruta__startswith, ancestros = ids de la ruta.
+    # El índice de MySQL (utf8mb4) admite hasta 768 caracteres, así que la ruta no puede crecer
+    # más: una categoría cuya ruta no entra se rechaza (ver validar_largo_ruta) en vez de truncarla.
+    ruta = models.CharField(max_length=700, default='', blank=True, editable=False, db_index=True)
+
+    objects = PorProyectoQuerySet.as_manager()
+
+    class Meta:
+        # Todas las lecturas del árbol filtran primero por proyecto (rollup, comparación, resumen)
+        indexes = [
+            models.Index(fields=['proyecto', 'id_padre'], name='categoria_proyecto_padre_idx'),
+            models.Index(fields=['proyecto', 'nivel'], name='categoria_proyecto_nivel_idx'),
+            models.Index(fields=['proyecto', 'categoria_relacionada'], name='categoria_proyecto_rel_idx'),
+            models.Index(fields=['proyecto', 'nombre'], name='categoria_proyecto_nombre_idx'),
+        ]
+
+    SEPARADOR_RUTA = '/'
+    # Campos de los que dependen la ruta y el resumen de proyectos: se recuerdan al leer la fila
+    CAMPOS_SEGUIDOS = ('id_padre_id', 'nombre', 'total_costo', 'proyecto_id')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instancia = super().from_db(db, field_names, values)
+        instancia._recordar_cargados()
+        return instancia
+
+    def _recordar_cargados(self):
+        self._cargados = {campo: self.__dict__.get(campo, DEFERRED) for campo in self.CAMPOS_SEGUIDOS}
+
+    def _campos_cambiados(self):
+        """Campos seguidos que difieren de los leídos (todos si la fila es nueva o no se leyó)."""
+        cargados = getattr(self, '_cargados', None)
+        if self._state.adding or cargados is None:
+            return set(self.CAMPOS_SEGUIDOS)
+        return {
+            campo for campo, anterior in cargados.items()
+            if self.__dict__.get(campo, DEFERRED) is not DEFERRED and self.__dict__[campo] != anterior
+        }
+
+    @classmethod
+    def validar_id_ruta(cls, categoria_id):
+        """Lanza ValueError si el id contiene el separador de la ruta (rompería subárboles y ancestros)."""
+        if cls.SEPARADOR_RUTA in str(categoria_id):
+            raise ValueError(f"El id de categoría '{categoria_id}' no puede contener '{cls.SEPARADOR_RUTA}'.")
+
+    @classmethod
+    def validar_largo_ruta(cls, categoria_id, largo):
+        """Lanza ValueError si una ruta de ``largo`` caracteres no entra en la columna."""
+        maximo = cls._meta.get_field('ruta').max_length
+        if largo > maximo:
+            raise ValueError(
+                f"La ruta de la categoría {categoria_id} tendría {largo} caracteres (máximo {maximo}); "
+                "use ids más cortos o menos niveles."
+            )
 
-    def delete(self, *args, **kwargs):
-        """Sobrescribe delete() para actualizar totales en la categoría al eliminar adquisiciones."""
-        categoria_padre = self.id_padre  # Guardar referencia al padre antes de eliminar
-        super().delete(*args, **kwargs)  # Eliminar la categoría actual
+    def calcular_ruta(self):
+        """Construye la ruta a partir de la del padre (o subiendo por id_padre si aún no la tiene)."""
+        self.validar_id_ruta(self.id)
+        padre = self.id_padre
+        if padre is None:
+            return f"{self.SEPARADOR_RUTA}{self.id}{self.SEPARADOR_RUTA}"
+        ruta_padre = padre.ruta or padre.calcular_ruta()
+        if f"{self.SEPARADOR_RUTA}{self.id}{self.SEPARADOR_RUTA}" in ruta_padre:
+            raise ValueError("Una categoría no puede ser hija de sí misma ni de sus descendientes.")
+        ruta = f"{ruta_padre}{self.id}{self.SEPARADOR_RUTA}"
+        self.validar_largo_ruta(self.id, len(ruta))
+        return ruta
+
+    def ids_ancestros(self):
+        """Ids de los ancestros según la ruta, de la raíz al padre."""
+        return [i for i in self.ruta.split(self.SEPARADOR_RUTA) if i][:-1]
+
+    @property
+    def profundidad(self):
+        """Niveles bajo la raíz (0 para una categoría raíz)."""
+        return max(self.ruta.count(self.SEPARADOR_RUTA) - 2, 0)
+
+    def ancestros(self):
+        """Ancestros de la categoría en una sola consulta."""
+        return CategoriaNuevo.objects.filter(id__in=self.ids_ancestros())
+
+    def descendientes(self):
+        """Subárbol completo (sin la categoría) como un rango sobre el índice de la ruta."""
+        return CategoriaNuevo.objects.filter(ruta__startswith=self.ruta).exclude(id=self.id)
+
+    def save(self, *args, **kwargs):
+        """Mantiene la ruta materializada; si la categoría se mueve, actualiza la de su subárbol.
+
+        La ruta solo se recalcula si la categoría es nueva, cambió de padre o aún no la tiene.
+        """
+        from .resumen import invalidar_resumen
+
+        cambiados = self._campos_cambiados()
+        ruta_anterior = None
+        if 'id_padre_id' in cambiados or self.__dict__.get('ruta') == '':
+            if not self._state.adding:
+                ruta_anterior = CategoriaNuevo.objects.filter(pk=self.pk).values_list('ruta', flat=True).first()
+            self.ruta = self.calcular_ruta()
+            if ruta_anterior and len(self.ruta) > len(ruta_anterior):
+                # Al bajar de nivel, la ruta de todo el subárbol se alarga lo mismo
+                mas_larga = CategoriaNuevo.objects.filter(ruta__startswith=ruta_anterior).aggregate(largo=Max(Length('ruta')))['largo']
+                self.validar_largo_ruta(self.id, (mas_larga or 0) + len(self.ruta) - len(ruta_anterior))
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None and 'ruta' not in update_fields:
+                kwargs['update_fields'] = [*update_fields, 'ruta']
+        super().save(*args, **kwargs)
+        if cambiados:
+            # Nombre, jerarquía o total de las raíces del resumen de proyectos
+            proyecto_anterior = getattr(self, '_cargados', {}).get('proyecto_id')
+            otros = {proyecto_anterior} - {self.proyecto_id, None, DEFERRED}
+            invalidar_resumen(self.proyecto_id, *otros)
+        self._recordar_cargados()
+
+        if ruta_anterior and ruta_anterior != self.ruta:
+            CategoriaNuevo.objects.filter(ruta__startswith=ruta_anterior).exclude(pk=self.pk).update(
+                ruta=Concat(Value(self.ruta), Substr('ruta', len(ruta_anterior) + 1))
+            )
 
-        if categoria_padre:
-            # Recalcular el total de la categoría padre
-            categoria_total = Adquisiciones.objects.filter(id_categoria=categoria_padre).aggregate(total=Sum('total'))['total'] or Decimal('0.00')
-            categoria_padre.total_costo = categoria_total  # Asignar el nuevo total
-            categoria_padre.save()  # Guardar cambios en la categoría padre
+    def delete(self, *args, **kwargs):
+        """Elimina la categoría (con su subárbol) y recalcula su padre, los ancestros y las derivadas."""
+        from .rollup import propagar_eliminacion
 
-            # Actualizar el total de la categoría padre
-            categoria_padre.actualizar_total_costo()
+        proyecto_id, padre_id = self.proyecto_id, self.id_padre_id
+        resultado = super().delete(*args, **kwargs)
+        propagar_eliminacion(proyecto_id, [padre_id] if padre_id else [])
+        return resultado
 
     def calcular_costo_asistencia_vendor(self):
-        """Calcula el costo de 'Asistencia Técnica del Vendor' y propaga el valor a sus categorías padres."""
+        """Calcula el costo de 'Asistencia Técnica del Vendor' (5% x 10% de las adquisiciones del proyecto)."""
         if self.nombre.lower() == "asistencia tecnica del vendor":
-            total_adquisiciones = Adquisiciones.objects.filter(
-                id_categoria__proyecto=self.proyecto
-            ).exclude(id_categoria=self).aggregate(
-                total=Sum('total')
-            )['total'] or Decimal('0.00')
-
-            costo_asistencia = total_adquisiciones * Decimal('0.05') * Decimal('0.1')
-
-            # Asignar y guardar el nuevo valor
-            self.total_costo = costo_asistencia
-            self.save(update_fields=['total_costo'])
-
-            # 🔹 Actualizar categorías padre recursivamente
-            if self.id_padre:
-                self.id_padre.actualizar_total_costo()
-
-            return self.total_costo
+            return self.actualizar_total_costo()
         return Decimal('0.00')
 
     def calcular_costo_ingenieria(self):
@@ -128,112 +281,83 @@ class CategoriaNuevo(models.Model):
     def calcular_costo_contingencia(self):
         """Calcula el costo de contingencia como el 13% del total de las categorías raíz."""
         if self.nombre.strip().lower() == "contingencia":
-           
+            return self.actualizar_total_costo()
+        return Decimal('0.00')
 
-            # Obtener todas las categorías raíz (id_padre es null) en el mismo proyecto
-            categorias_raiz = CategoriaNuevo.objects.filter(id_padre__isnull=True, proyecto=self.proyecto)
-            
+    def actualizar_total_costo(self):
+        """Recalcula los totales de todo el proyecto con el motor de rollup y refresca esta instancia.
 
-            # Sumar los total_costo de todas las categorías raíz (excepto la categoría "Contingencia")
-            total_base = sum(categoria.total_costo or Decimal('0.00') for categoria in categorias_raiz if categoria.id != self.id)
-            
+        Los costos directos, los de las subcategorías, la contingencia y la asistencia del vendor
+        se calculan en un número fijo de consultas (ver ``proyectoApp.rollup``).
+        Dentro de ``defer_rollups()`` solo marca la categoría como pendiente.
+        """
+        from .rollup import solicitar_rollup
 
-            # Calcular el costo de contingencia (13% del total base)
-            costo_contingencia = total_base * Decimal('0.13')
+        totales = solicitar_rollup(self.proyecto_id, self.id)
+        if totales is not None:
+            self.total_costo = totales.get(self.id, self.total_costo)
+        return self.total_costo
 
-            # Asignar el costo de contingencia al campo total_costo y guardar
-            self.total_costo = costo_contingencia
-            self.save(update_fields=['total_costo'])
+    def __str__(self):
+        return f"{self.id}" 
 
-            # Actualizar la categoría padre si existe
-            if self.id_padre:
-                self.id_padre.actualizar_total_costo()
 
-            return costo_contingencia
-        return Decimal('0.00')
+    
 
-    def actualizar_total_costo(self):
-        """Calcula el total_costo sumando costos directos, específicos y los de las subcategorías."""
-        
-        total_costo = Decimal('0.00')
+class ReglaCostoDerivado(models.Model):
+    """Costo de una categoría calculado como un porcentaje de una base del proyecto.
 
-        if self.nombre.lower() == "ingenieria de detalles":
-            total_costo += self.calcular_costo_ingenieria()
-        
-        elif self.nombre.lower() == "gestion de compras":
-            total_costo += self.calcular_costo_gestion_compras()
-
-        elif self.nombre.lower() == "contingencia":
-            total_costo += self.calcular_costo_contingencia()
-
-        elif self.nombre.lower() == "asistencia tecnica del vendor":
-            total_costo += self.calcular_costo_asistencia_vendor()
-
-        else:
-            # 🔹 Sumar costos directos
-            costos_directos = self.costos.aggregate(total=Sum('monto'))['total'] or Decimal('0.00')
-            total_costo += costos_directos
-
-            # 🔹 Sumar costos de otras tablas relacionadas
-            adquisiciones_costo = Adquisiciones.objects.filter(id_categoria=self).aggregate(total=Sum('total_con_flete'))['total'] or Decimal('0.00')
-            materiales_costo = MaterialesOtros.objects.filter(id_categoria=self).aggregate(total=Sum('total_sitio'))['total'] or Decimal('0.00') 
-            equipos_costo = EquiposConstruccion.objects.filter(id_categoria=self).aggregate(total=Sum('total_usd'))['total'] or Decimal('0.00')
-            mano_obra_costo = ManoObra.objects.filter(id_categoria=self).aggregate(total=Sum('total_usd'))['total'] or Decimal('0.00')
-            especifico_costo = EspecificoCategoria.objects.filter(id_categoria=self).aggregate(total=Sum('total'))['total'] or Decimal('0.00')
-            staff_costo = StaffEnami.objects.filter(categoria=self).aggregate(total=Sum('costo_total'))['total'] or Decimal('0.00')
-            datos_costo = DatosEP.objects.filter(id_categoria=self).aggregate(total=Sum('precio_hh'))['total'] or Decimal('0.00')
-            subcontrato_costo = ContratoSubcontrato.objects.filter(id_categoria=self).aggregate(total=Sum('total_usd_indirectos_contratista'))['total'] or Decimal('0.00')
-            ingenieria_detalles_contraparte_costo= IngenieriaDetallesContraparte.objects.filter(id_categoria=self).aggregate(total=Sum('total_usd'))['total'] or Decimal('0.00')
-            gestion_permisos_costo= GestionPermisos.objects.filter(id_categoria=self).aggregate(total=Sum('total_usd'))['total'] or Decimal('0.00')
-            dueno_costo= Dueno.objects.filter(id_categoria=self).aggregate(total=Sum('costo_total'))['total'] or Decimal('0.00')
-            personal_indirecto_contratista_costo= PersonalIndirectoContratista.objects.filter(id_categoria=self).aggregate(total=Sum('costo_total_us'))['total'] or Decimal('0.00')
-            administracion_supervision_costo= AdministracionSupervision.objects.filter(id_categoria=self).aggregate(total=Sum('costo_total_us'))['total'] or Decimal('0.00')
-            servicios_apoyo_costo= ServiciosApoyo.objects.filter(id_categoria=self).aggregate(total=Sum('total_usd'))['total'] or Decimal('0.00')
-            otros_adm_costo= OtrosADM.objects.filter(id_categoria=self).aggregate(total=Sum('total_usd'))['total'] or Decimal('0.00')
-            administrativo_financiero_costo= AdministrativoFinanciero.objects.filter(id_categoria=self).aggregate(total=Sum('costo_total'))['total'] or Decimal('0.00')
-
- 
-            total_costo += (
-                adquisiciones_costo + materiales_costo + equipos_costo +
-                mano_obra_costo + especifico_costo + staff_costo + datos_costo + subcontrato_costo + ingenieria_detalles_contraparte_costo + gestion_permisos_costo + dueno_costo + 
-                personal_indirecto_contratista_costo + administracion_supervision_costo + servicios_apoyo_costo + otros_adm_costo + administrativo_financiero_costo
-            )
+    Se evalúa una sola vez por proyecto, después del rollup de costos directos
+    (ver ``proyectoApp.rollup``). Reemplaza la detección por nombre de "Contingencia"
+    y "Asistencia Técnica del Vendor", que solo se usa si el proyecto no tiene reglas.
+    """
+    BASE_ADQUISICIONES = 'adquisiciones'
+    BASE_RAICES = 'raices'
+    BASES = [
+        (BASE_ADQUISICIONES, 'Total de adquisiciones del proyecto'),
+        (BASE_RAICES, 'Total de las categorías raíz'),
+    ]
 
-            # 🔹 Sumar costos de subcategorías
-            subcategorias_costo = self.subcategorias.filter(proyecto=self.proyecto).aggregate(total=Sum('total_costo'))['total'] or Decimal('0.00')
-            total_costo += subcategorias_costo
+    id = models.AutoField(primary_key=True)
+    proyecto = models.ForeignKey(ProyectoNuevo, on_delete=models.CASCADE, related_name='reglas_costo_derivado')
+    categoria = models.OneToOneField(CategoriaNuevo, on_delete=models.CASCADE, related_name='regla_derivada')
+    base = models.CharField(max_length=20, choices=BASES)
+    tasa = models.DecimalField(max_digits=9, decimal_places=6, help_text="Fracción de la base (0.13 = 13%)")
 
-        # 🔹 Guardar el nuevo total
-        self.total_costo = total_costo
-        self.save(update_fields=['total_costo'])
+    objects = PorProyectoQuerySet.as_manager()
 
-        # 🔹 Si tiene una categoría padre, actualizarla también
-        if self.id_padre and self.id_padre.proyecto == self.proyecto:
-            self.id_padre.actualizar_total_costo()
+    def save(self, *args, **kwargs):
+        """Guarda la regla y recalcula el proyecto."""
+        self.proyecto_id = self.categoria.proyecto_id
+        super().save(*args, **kwargs)
+        from .rollup import solicitar_rollup
 
-         # 🔹 Si es categoría raíz (no tiene padre), actualizar el proyecto
-        if self.id_padre is None and self.proyecto:
-            self.proyecto.calcular_costo_total(save=True)
+        solicitar_rollup(self.proyecto_id)
 
+    def delete(self, *args, **kwargs):
+        """Elimina la regla y recalcula el proyecto."""
+        proyecto_id = self.proyecto_id
+        super().delete(*args, **kwargs)
+        from .rollup import solicitar_rollup
 
-        categoria_contingencia = CategoriaNuevo.objects.filter(
-            nombre__iexact="contingencia",
-            proyecto=self.proyecto
-        ).first()
-        if categoria_contingencia:
-            categoria_contingencia.calcular_costo_contingencia()
+        solicitar_rollup(proyecto_id)
 
     def __str__(self):
-        return f"{self.id}" 
-
+        return f"{self.categoria_id}: {self.tasa} x {self.get_base_display()}"
 
-    
 
 class CostoNuevo(models.Model):
     id = models.AutoField(primary_key=True)
     monto = models.DecimalField(max_digits=15, decimal_places=2, editable=False)
     categoria = models.ForeignKey(CategoriaNuevo, on_delete=models.CASCADE, related_name='costos')
 
+    objects = PorProyectoQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['categoria', 'monto'], name='costonuevo_cat_monto_idx'),
+        ]
+
     def __str__(self):
         """Retorna el nombre de la categoría asociada"""
         return f"{self.categoria.nombre} - Monto: {self.monto}"
@@ -250,93 +374,34 @@ class Adquisiciones(models.Model):
     total = models.DecimalField(max_digits=10, decimal_places=2, editable=False)
     total_con_flete = models.DecimalField(max_digits=10, decimal_places=2, editable=False, default=0)  # Columna de porcentaje de flete
 
+    objects = PorProyectoQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['id_categoria', 'total_con_flete'], name='adquisiciones_cat_monto_idx'),
+        ]
+
     def save(self, *args, **kwargs):
         if self.costo_unitario is None:
             raise ValueError("El campo 'costo_unitario' no puede ser nulo.")
-        
-        # Obtener cantidad final de la categoría
-        cantidad = Cantidades.objects.filter(id_categoria=self.id_categoria).first()
-        cantidad_final = Decimal(cantidad.cantidad_final) if cantidad else Decimal('0.00')
-
-        # Obtener flete_unitario desde CotizacionMateriales
-        cotizacion = CotizacionMateriales.objects.filter(id_categoria=self.id_categoria).first()
-        flete_unitario = Decimal(cotizacion.flete_unitario) if cotizacion else Decimal('0.00')
 
-        # Convertir `costo_unitario` y `crecimiento` a Decimal
-        costo_unitario = Decimal(self.costo_unitario)
-        crecimiento = Decimal(self.crecimiento)
-
-        # Calcular total con crecimiento
-        if crecimiento > Decimal('0.00'):
-            self.total = cantidad_final * costo_unitario * (Decimal('1.00') + crecimiento / Decimal('100.00'))
-        else:
-            self.total = cantidad_final * costo_unitario
-
-        # Calcular flete como porcentaje del total
-        self.flete = self.total * (flete_unitario / Decimal('100.00'))
-
-        # Calcular total con flete
-        self.total_con_flete = self.total + self.flete
+        # total, flete y total_con_flete a partir de la cantidad final y el flete unitario de la categoría
+        calcular_campos(self)
 
         # Guardar el objeto con los nuevos valores
         super().save(*args, **kwargs)
 
-
-        # **Calcular el costo de la categoría "Asistencia Técnica del Vendor"**
-        categoria_vendor = CategoriaNuevo.objects.filter(
-            nombre__iexact="Asistencia Tecnica del Vendor",
-            proyecto=self.id_categoria.proyecto
-        ).first()
-        
-        if categoria_vendor:
-            categoria_vendor.calcular_costo_asistencia_vendor()
-
-            # **Actualizar sus categorías padre en cascada**
-            categoria_actual = categoria_vendor
-            while categoria_actual.id_padre and categoria_actual.id_padre.proyecto == categoria_actual.proyecto:
-                categoria_actual.id_padre.actualizar_total_costo()
-                categoria_actual = categoria_actual.id_padre  # Subir un nivel
-
-        # Actualizar el total_costo de la categoría actual (solo si pertenece al mismo proyecto)
-        if self.id_categoria and self.id_categoria.proyecto == self.id_categoria.proyecto:
-            print(f"Actualizando categoría inmediata: {self.id_categoria.id}")  # Debugging
-            self.id_categoria.actualizar_total_costo()
-            if self.id_categoria.id_padre and self.id_categoria.id_padre.proyecto == self.id_categoria.proyecto:
-                self.id_categoria.id_padre.actualizar_total_costo()
-
-        # ✅ Si la categoría tiene un padre, actualizarlo también
-        if self.id_categoria:
-            categoria_padre = self.id_categoria.id_padre
-            while categoria_padre:
-                print(f"Actualizando categoría padre: {categoria_padre.id}")  # Debugging
-                categoria_padre.actualizar_total_costo()
-                categoria_padre = categoria_padre.id_padre  # Subir a la categoría superior
-
+        # Propagar el cambio a la categoría, sus ancestros y los costos derivados de adquisiciones
+        propagar_cambio_costo(self.id_categoria, afecta_adquisiciones=True)
 
 
     def delete(self, *args, **kwargs):
         """Al eliminar, recalcula y actualiza el total en la categoría y sus superiores."""
-        categoria = self.id_categoria
-        categoria_padre = categoria.id_padre if categoria else None
-
         # Eliminar la adquisición
         super().delete(*args, **kwargs)
 
-        # 🔹 Recalcular y actualizar la categoría eliminada (solo si pertenece al mismo proyecto)
-        if categoria and categoria.proyecto == self.id_categoria.proyecto:
-            categoria.actualizar_total_costo()
-
-        # 🔹 Si la categoría tiene una superior, actualizarla también (solo si pertenece al mismo proyecto)
-        if categoria_padre and categoria_padre.proyecto == self.id_categoria.proyecto:
-            categoria_padre.actualizar_total_costo()
-
-        # 🔹 Actualizar el total_costo de la categoría "Asistencia Técnica del Vendor" si existe (solo si pertenece al mismo proyecto)
-        categoria_vendor = CategoriaNuevo.objects.filter(
-            nombre__iexact="Asistencia Tecnica del Vendor",
-            proyecto=self.id_categoria.proyecto
-        ).first()
-        if categoria_vendor:
-            categoria_vendor.calcular_costo_asistencia_vendor()
+        # 🔹 Propagar a la categoría, sus superiores y los costos derivados de adquisiciones
+        propagar_cambio_costo(self.id_categoria, afecta_adquisiciones=True)
 
     def __str__(self):
         return f"Adquisición en {self.id_categoria.nombre} - Total: {self.total}"
@@ -350,12 +415,14 @@ class Cantidades(models.Model):
     fc = models.DecimalField(max_digits=15, decimal_places=2)
     cantidad_final = models.DecimalField(max_digits=15, decimal_places=2)
 
+    objects = PorProyectoQuerySet.as_manager()
+
     def save(self, *args, **kwargs):
         if self.cantidad is None or self.fc is None:
             raise ValueError("Los campos 'cantidad' y 'fc' no pueden ser nulos.")
         
         # Calcular cantidad_final
-        self.cantidad_final = self.cantidad + (self.cantidad * (self.fc / 100))
+        calcular_campos(self)
         super().save(*args, **kwargs)
 
         # Actualizar los costos asociados a la categoría
@@ -363,39 +430,25 @@ class Cantidades(models.Model):
             for costo in CostoNuevo.objects.filter(categoria=self.id_categoria):
                 costo.save()
         
-        if self.id_categoria:
-            print(f"Actualizando categoría inmediata: {self.id_categoria.id}")  # Debugging
-            self.id_categoria.actualizar_total_costo()
-
-        # ✅ Si la categoría tiene un padre, actualizarlo también
-        if self.id_categoria:
-            categoria_padre = self.id_categoria.id_padre
-            while categoria_padre:
-                print(f"Actualizando categoría padre: {categoria_padre.id}")  # Debugging
-                categoria_padre.actualizar_total_costo()
-                categoria_padre = categoria_padre.id_padre  # Subir a la categoría superior
+        # Propagar el cambio a la categoría y sus ancestros
+        propagar_cambio_costo(self.id_categoria)
 
     def delete(self, *args, **kwargs):
         """Al eliminar, recalcula y actualiza los totales en la categoría y sus superiores."""
         # Guardar referencia a la categoría y su padre antes de eliminar
         categoria = self.id_categoria
-        categoria_padre = categoria.id_padre if categoria else None
 
         # Eliminar la cantidad
         super().delete(*args, **kwargs)
 
-        # 🔹 Recalcular y actualizar la categoría asociada
-        if categoria:
-            categoria.actualizar_total_costo()
+        # 🔹 Recalcular las adquisiciones relacionadas y propagar una sola vez
+        from .rollup import defer_rollups
 
-        # 🔹 Si la categoría tiene una superior, actualizarla también
-        if categoria_padre:
-            categoria_padre.actualizar_total_costo()
-
-        # 🔹 Actualizar las adquisiciones relacionadas con esta categoría
-        adquisiciones = Adquisiciones.objects.filter(id_categoria=categoria)
-        for adquisicion in adquisiciones:
-            adquisicion.save()  # Esto recalculará el total de la adquisición
+        with defer_rollups():
+            adquisiciones = Adquisiciones.objects.filter(id_categoria=categoria)
+            for adquisicion in adquisiciones:
+                adquisicion.save()  # Esto recalculará el total de la adquisición
+            propagar_cambio_costo(categoria)
 
     def __str__(self):
         return f"Cantidad {self.id} - {self.id_categoria.nombre}"
@@ -411,33 +464,16 @@ class MaterialesOtros(models.Model):
     fletes = models.DecimalField(max_digits=12, decimal_places=2, editable=False, default=0)
     total_sitio = models.DecimalField(max_digits=12, decimal_places=2, editable=False, default=0)
 
-    def save(self, *args, **kwargs):
-        # Obtener la cantidad relacionada con la categoría
-        cantidad = Cantidades.objects.filter(id_categoria=self.id_categoria).first()
-
-        # Si no hay cantidad registrada, se asume cantidad_final = 0
-        cantidad_final = cantidad.cantidad_final if cantidad else Decimal('0.00')
-
-        # Asegurar que crecimiento no sea nulo
-        crecimiento = self.crecimiento if self.crecimiento is not None else Decimal('0.00')
-
-        # Obtener el flete_unitario desde la tabla CotizacionMateriales
-        cotizacion_material = CotizacionMateriales.objects.filter(id_categoria=self.id_categoria).first()
-        
-        # Si no se encuentra la cotización, se asume flete_unitario = 0
-        flete_unitario = cotizacion_material.flete_unitario if cotizacion_material else Decimal('0.00')
-
-        # Calcular total_usd basado en crecimiento
-        if crecimiento > 0:
-            self.total_usd = cantidad_final * self.costo_unidad * (1 + crecimiento / 100)
-        else:
-            self.total_usd = cantidad_final * self.costo_unidad
+    objects = PorProyectoQuerySet.as_manager()
 
-        # Calcular fletes como un porcentaje del total_usd
-        self.fletes = self.total_usd * (flete_unitario / 100)
+    class Meta:
+        indexes = [
+            models.Index(fields=['id_categoria', 'total_sitio'], name='materiales_cat_monto_idx'),
+        ]
 
-        # Calcular total en sitio
-        self.total_sitio = self.total_usd + self.fletes
+    def save(self, *args, **kwargs):
+        # total_usd, fletes y total_sitio (sin cantidad o cotización se asumen en 0)
+        calcular_campos(self)
 
         # Guardar el objeto en la base de datos
         super().save(*args, **kwargs)
@@ -447,18 +483,8 @@ class MaterialesOtros(models.Model):
             for costo in CostoNuevo.objects.filter(categoria=self.id_categoria):
                 costo.save()
 
-        # Llamar a actualizar_total_costo() en la categoría relacionada
-        if self.id_categoria:
-            print(f"Actualizando categoría inmediata: {self.id_categoria.id}")  # Debugging
-            self.id_categoria.actualizar_total_costo()
-
-        # ✅ Si la categoría tiene un padre, actualizarlo también
-        if self.id_categoria:
-            categoria_padre = self.id_categoria.id_padre
-            while categoria_padre:
-                print(f"Actualizando categoría padre: {categoria_padre.id}")  # Debugging
-                categoria_padre.actualizar_total_costo()
-                categoria_padre = categoria_padre.id_padre  # Subir a la categoría superior
+        # Propagar el cambio a la categoría y sus ancestros
+        propagar_cambio_costo(self.id_categoria)
 
     def delete(self, *args, **kwargs):
         """Sobrescribe el método delete para actualizar las cantidades y costos al eliminar un material."""
@@ -481,8 +507,8 @@ class MaterialesOtros(models.Model):
             for costo in CostoNuevo.objects.filter(categoria=self.id_categoria):
                 costo.save()
 
-            # Llamar a actualizar_total_costo() en la categoría relacionada
-            self.id_categoria.actualizar_total_costo()
+            # Propagar el cambio a la categoría y sus ancestros
+            propagar_cambio_costo(self.id_categoria)
 
 
     def __str__(self):
@@ -501,47 +527,28 @@ class EquiposConstruccion(models.Model):
     total_horas_maquina = models.DecimalField(max_digits=10, decimal_places=2, editable=False)
     total_usd = models.DecimalField(max_digits=10, decimal_places=2, editable=False)
 
-    def save(self, *args, **kwargs):
-        """Calcula el total y actualiza la categoría correspondiente según la condición de `final`."""
-        cantidad = Cantidades.objects.filter(id_categoria=self.id_categoria).first()
-        cantidad_final = cantidad.cantidad_final if cantidad else 0
+    objects = PorProyectoQuerySet.as_manager()
 
-        self.total_horas_maquina = self.horas_maquina_unidad * cantidad_final
+    class Meta:
+        indexes = [
+            models.Index(fields=['id_categoria', 'total_usd'], name='equipos_cat_monto_idx'),
+        ]
 
-        # ✅ Verificar si la categoría es final
-        if self.id_categoria and self.id_categoria.final:
-            self.total_usd = self.costo_maquina_hora * cantidad_final * self.horas_maquina_unidad  # 🔹 3 columnas cuando es True
-        else:
-            self.total_usd = self.costo_maquina_hora * cantidad_final  # 🔹 2 columnas cuando es False
+    def save(self, *args, **kwargs):
+        """Calcula el total y actualiza la categoría correspondiente según la condición de `final`."""
+        calcular_campos(self)
 
         super().save(*args, **kwargs)
 
-        # 🔹 Actualizar la categoría y sus padres
-        if self.id_categoria:
-            print(f"Actualizando categoría inmediata: {self.id_categoria.id}")  # Debugging
-            self.id_categoria.actualizar_total_costo()
-
-        # ✅ Si la categoría tiene un padre, actualizarlo también
-        if self.id_categoria:
-            categoria_padre = self.id_categoria.id_padre
-            while categoria_padre:
-                print(f"Actualizando categoría padre: {categoria_padre.id}")  # Debugging
-                categoria_padre.actualizar_total_costo()
-                categoria_padre = categoria_padre.id_padre  # Subir a la categoría superior
+        # Propagar el cambio a la categoría y sus ancestros
+        propagar_cambio_costo(self.id_categoria)
 
     def delete(self, *args, **kwargs):
         """Al eliminar, actualiza la categoría y todos sus padres."""
-        categoria_padre = self.id_categoria.id_padre if self.id_categoria else None  # ✅ Obtener el padre antes de eliminar
-
         super().delete(*args, **kwargs)  # ✅ Eliminar el equipo
 
-        if self.id_categoria:
-            self.id_categoria.actualizar_total_costo()
-
-        # ✅ Si la categoría tiene un padre, actualizarlo
-        while categoria_padre:
-            categoria_padre.actualizar_total_costo()
-            categoria_padre = categoria_padre.id_padre  # Seguir subiendo en la jerarquía
+        # Propagar el cambio a la categoría y sus ancestros
+        propagar_cambio_costo(self.id_categoria)
 
     def __str__(self):
         return f"Equipo en {self.id_categoria.nombre} - Total USD: {self.total_usd}"
@@ -568,51 +575,28 @@ class ManoObra(models.Model):
     total_usd_equipos = models.DecimalField(max_digits=10, decimal_places=2, default=Decimal('0.88'), editable=False)
     total_usd = models.DecimalField(max_digits=10, decimal_places=2, editable=False)  # Se ajusta con la nueva lógica
 
-    def save(self, *args, **kwargs):
-        """Calcula los valores antes de guardar el objeto."""
-        self.horas_hombre_final = self.horas_hombre_unidad * self.fp
+    objects = PorProyectoQuerySet.as_manager()
 
-        cantidad = Cantidades.objects.filter(id_categoria=self.id_categoria).first()
-        cantidad_final = cantidad.cantidad_final if cantidad else Decimal(0)
-
-        self.total_hh = cantidad_final * self.rendimiento * self.fp
-        self.cantidad_horas_hombre = self.horas_hombre_final * cantidad_final
-        self.total_usd_mod = self.total_hh * self.tarifas_usd_hh_mod
-        self.total_usd_equipos = self.total_hh * self.tarifa_usd_hh_equipos
+    class Meta:
+        indexes = [
+            models.Index(fields=['id_categoria', 'total_usd'], name='manoobra_cat_monto_idx'),
+        ]
 
-        # Nueva condición para calcular total_usd
-        if self.total_usd_mod == 0 and self.total_usd_equipos == 0:
-            self.total_usd = cantidad_final * self.horas_hombre_final * self.costo_hombre_hora
-        else:
-            self.total_usd = self.total_usd_equipos + self.total_usd_mod
+    def save(self, *args, **kwargs):
+        """Calcula los valores antes de guardar el objeto."""
+        calcular_campos(self)
 
         super().save(*args, **kwargs)
 
-        if self.id_categoria:
-            print(f"Actualizando categoría inmediata: {self.id_categoria.id}")  # Debugging
-            self.id_categoria.actualizar_total_costo()
-
-        # ✅ Si la categoría tiene un padre, actualizarlo también
-        if self.id_categoria:
-            categoria_padre = self.id_categoria.id_padre
-            while categoria_padre:
-                print(f"Actualizando categoría padre: {categoria_padre.id}")  # Debugging
-                categoria_padre.actualizar_total_costo()
-                categoria_padre = categoria_padre.id_padre  # Subir a la categoría superior
+        # Propagar el cambio a la categoría y sus ancestros
+        propagar_cambio_costo(self.id_categoria)
 
     def delete(self, *args, **kwargs):
         """Sobrescribe delete() para actualizar los costos en la categoría al eliminar un registro de mano de obra."""
-        categoria_padre = self.id_categoria.id_padre if self.id_categoria else None  # ✅ Obtener el padre antes de eliminar
-
         super().delete(*args, **kwargs)  # ✅ Eliminar la mano de obra
 
-        if self.id_categoria:
-            self.id_categoria.actualizar_total_costo()
-
-        # ✅ Si la categoría tiene un padre, actualizarlo
-        while categoria_padre:
-            categoria_padre.actualizar_total_costo()
-            categoria_padre = categoria_padre.id_padre  # Seguir subiendo en la jerarquía
+        # Propagar el cambio a la categoría y sus ancestros
+        propagar_cambio_costo(self.id_categoria)
 
     def __str__(self):
         return f"Mano de Obra {self.id} - {self.id_categoria}"
@@ -630,10 +614,12 @@ class ApuEspecifico(models.Model):
     precio_unitario = models.DecimalField(max_digits=10, decimal_places=2)
     total_usd = models.DecimalField(max_digits=10, decimal_places=2, editable=False)
 
+    objects = PorProyectoQuerySet.as_manager()
+
     def save(self, *args, **kwargs):
         """Calcula total_usd y actualiza costo_hombre_hora en ManoObra."""
         # Calcular total_usd
-        self.total_usd = self.cantidad * self.precio_unitario
+        calcular_campos(self)
         super().save(*args, **kwargs)  # Guardar la instancia
 
         # Si id_apu_general es 1, actualizar costo_hombre_hora en ManoObra
@@ -641,33 +627,15 @@ class ApuEspecifico(models.Model):
             mano_obra = self.id_mano_obra
             mano_obra.actualizar_costo_hombre_hora()
 
-        # Llamar a actualizar_total_costo() en la categoría relacionada
-        if self.id_categoria:
-            print(f"Actualizando categoría inmediata: {self.id_categoria.id}")  # Debugging
-            self.id_categoria.actualizar_total_costo()
-
-        # ✅ Si la categoría tiene un padre, actualizarlo también
-        if self.id_categoria:
-            categoria_padre = self.id_categoria.id_padre
-            while categoria_padre:
-                print(f"Actualizando categoría padre: {categoria_padre.id}")  # Debugging
-                categoria_padre.actualizar_total_costo()
-                categoria_padre = categoria_padre.id_padre  # Subir a la categoría superior
+        # Propagar el cambio a la categoría y sus ancestros
+        propagar_cambio_costo(self.id_categoria)
 
     def delete(self, *args, **kwargs):
         """Sobrescribe delete() para actualizar los costos en la categoría y sus padres al eliminar un registro de ApuEspecifico."""
-        categoria_padre = self.id_categoria.id_padre if self.id_categoria else None  # Obtener el padre antes de eliminar
-
         super().delete(*args, **kwargs)  # Eliminar el registro de ApuEspecifico
 
-        # ✅ Actualizar la categoría principal después de la eliminación
-        if self.id_categoria:
-            self.id_categoria.actualizar_total_costo()
-
-        # ✅ Si la categoría tiene un padre, actualizarlo también
-        while categoria_padre:
-            categoria_padre.actualizar_total_costo()  # Actualizar el costo en la categoría padre
-            categoria_padre = categoria_padre.id_padre  # Subir a la categoría superior
+        # Propagar el cambio a la categoría y sus ancestros
+        propagar_cambio_costo(self.id_categoria)
 
     def __str__(self):
         return self.nombre
@@ -692,23 +660,20 @@ class EspecificoCategoria(models.Model):
     costo = models.DecimalField(max_digits=10, decimal_places=2, help_text="Costo en dólares al mes")
     total = models.DecimalField(max_digits=15, decimal_places=2, editable=False, default=Decimal('0.00'))  
 
+    objects = PorProyectoQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['id_categoria', 'total'], name='especifico_cat_monto_idx'),
+        ]
+
     def save(self, *args, **kwargs):
         """Recalcula el total y actualiza el total de la categoría."""
-        self.total = self.cantidad * self.duracion * self.dedicacion * self.costo
+        calcular_campos(self)
         super().save(*args, **kwargs)
 
-        # Actualizar el total_costo de la categoría
-        if self.id_categoria:
-            print(f"Actualizando categoría inmediata: {self.id_categoria.id}")  # Debugging
-            self.id_categoria.actualizar_total_costo()
-
-        # ✅ Si la categoría tiene un padre, actualizarlo también
-        if self.id_categoria:
-            categoria_padre = self.id_categoria.id_padre
-            while categoria_padre:
-                print(f"Actualizando categoría padre: {categoria_padre.id}")  # Debugging
-                categoria_padre.actualizar_total_costo()
-                categoria_padre = categoria_padre.id_padre  # Subir a la categoría superior    
+        # Propagar el cambio a la categoría y sus ancestros
+        propagar_cambio_costo(self.id_categoria)
 
     def delete(self, *args, **kwargs):
         """Asegurar que al eliminar un registro, se actualice el total en la categoría."""
@@ -716,19 +681,9 @@ class EspecificoCategoria(models.Model):
 
         super().delete(*args, **kwargs)  # Eliminar el objeto
 
-        if categoria:
-            # Recalcular el total de la categoría sumando todos los `total` restantes
-            total_costo = EspecificoCategoria.objects.filter(id_categoria=categoria).aggregate(
-                total=Sum('total', output_field=DecimalField())
-            )['total'] or Decimal(0)
-
-            # Actualizar el total en la categoría
-            categoria.total_costo = total_costo
-            categoria.save()
+        # Recalcular la categoría con todas sus fuentes de costo y propagar a los ancestros
+        propagar_cambio_costo(categoria)
 
-            # Actualizar el total de la categoría padre si existe
-            categoria.actualizar_total_costo()
-            
     def __str__(self):
         return f"{self.id_categoria.nombre} - ${self.total}"
 
@@ -749,22 +704,19 @@ class StaffEnami(models.Model):
     costo_total = models.DecimalField(max_digits=15, decimal_places=2, editable=False)
     categoria = models.ForeignKey(CategoriaNuevo, on_delete=models.CASCADE, related_name='staff_enami')
 
+    objects = PorProyectoQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['categoria', 'costo_total'], name='staff_cat_monto_idx'),
+        ]
+
     def save(self, *args, **kwargs):
-        self.total_horas_hombre = self.duracion * self.factor_utilizacion * Decimal(180)
-        self.costo_total = self.valor * self.dotacion * self.total_horas_hombre 
+        calcular_campos(self)
         super().save(*args, **kwargs)
 
-        if self.categoria:
-            print(f"Actualizando categoría inmediata: {self.categoria.id}")  # Debugging
-            self.categoria.actualizar_total_costo()
-
-        # ✅ Si la categoría tiene un padre, actualizarlo también
-        if self.categoria:
-            categoria_padre = self.categoria.id_padre
-            while categoria_padre:
-                print(f"Actualizando categoría padre: {categoria_padre.id}")  # Debugging
-                categoria_padre.actualizar_total_costo()
-                categoria_padre = categoria_padre.id_padre  # Subir a la categoría superior
+        # Propagar el cambio a la categoría y sus ancestros
+        propagar_cambio_costo(self.categoria)
 
     def delete(self, *args, **kwargs):
         """Actualiza la categoría al eliminar un registro de StaffEnami"""
@@ -772,15 +724,8 @@ class StaffEnami(models.Model):
 
         super().delete(*args, **kwargs)  # ✅ Eliminar el objeto
 
-        if categoria:
-            # ✅ Recalcular el total de costo sumando los `costo_total` restantes
-            total_costo = StaffEnami.objects.filter(categoria=categoria).aggregate(
-                total=Sum('costo_total', output_field=DecimalField())
-            )['total'] or Decimal(0)
-
-            # ✅ Guardar el nuevo total en la categoría
-            categoria.total_costo = total_costo
-            categoria.save()
+        # ✅ Recalcular la categoría con todas sus fuentes de costo y propagar a los ancestros
+        propagar_cambio_costo(categoria)
 
     def __str__(self):
         return self.nombre
@@ -793,38 +738,27 @@ class DatosEP(models.Model):
     precio_hh = models.DecimalField(max_digits=10, decimal_places=2)  # Precio por Hora Hombre
     id_categoria = models.ForeignKey(CategoriaNuevo, on_delete=models.CASCADE, related_name='datos_ep')
 
+    objects = PorProyectoQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['id_categoria', 'precio_hh'], name='datosep_cat_monto_idx'),
+        ]
+
     def save(self, *args, **kwargs):
         """Cada vez que se guarde un dato en DatosEP, actualizar la categoría correspondiente."""
         # Calcular el costo antes de guardar
         super().save(*args, **kwargs)  # Guardar la instancia
 
-        # ✅ Si la categoría está definida, actualizar el costo
-        if self.id_categoria:
-            print(f"Actualizando categoría inmediata: {self.id_categoria.id}")  # Debugging
-            self.id_categoria.actualizar_total_costo()
-
-        # ✅ Si la categoría tiene un padre, actualizarlo también
-        if self.id_categoria:
-            categoria_padre = self.id_categoria.id_padre
-            while categoria_padre:
-                print(f"Actualizando categoría padre: {categoria_padre.id}")  # Debugging
-                categoria_padre.actualizar_total_costo()
-                categoria_padre = categoria_padre.id_padre  # Subir a la categoría superior
+        # Propagar el cambio a la categoría y sus ancestros
+        propagar_cambio_costo(self.id_categoria)
 
     def delete(self, *args, **kwargs):
         """Sobrescribe delete() para actualizar los costos en la categoría y sus padres al eliminar un registro de DatosEP."""
-        categoria_padre = self.id_categoria.id_padre if self.id_categoria else None  # ✅ Obtener el padre antes de eliminar
-
         super().delete(*args, **kwargs)  # ✅ Eliminar el registro de DatosEP
 
-        if self.id_categoria:
-            self.id_categoria.actualizar_total_costo()
-
-        # ✅ Si la categoría tiene un padre, actualizarlo
-        while categoria_padre:
-           
-            categoria_padre.actualizar_total_costo()
-            categoria_padre = categoria_padre.id_padre  # Seguir subiendo en la jerarquía
+        # Propagar el cambio a la categoría y sus ancestros
+        propagar_cambio_costo(self.id_categoria)
 
     def __str__(self):
         return f"{self.id} - {self.id_categoria.nombre}"
@@ -842,40 +776,23 @@ class DatosOtrosEP(models.Model):
     viajes = models.DecimalField(max_digits=10, decimal_places=2)
     id_categoria = models.ForeignKey(CategoriaNuevo, on_delete=models.CASCADE, null=True, related_name='datos_otros_ep')
 
+    objects = PorProyectoQuerySet.as_manager()
+
     def save(self, *args, **kwargs):
         """Cada vez que se guarde un dato en DatosOtrosEP, actualizar la categoría correspondiente."""
         # Guardar la instancia antes de realizar cualquier operación
-        self.gestiones = self.comprador * self.plazo * self.sueldo_pax * Decimal(4) * Decimal(160)
+        calcular_campos(self)
         super().save(*args, **kwargs)
 
-        # ✅ Si la categoría está definida, actualizar el costo en la categoría
-        if self.id_categoria:
-            print(f"Actualizando categoría inmediata: {self.id_categoria.id}")  # Debugging
-            self.id_categoria.actualizar_total_costo()
-
-        # ✅ Si la categoría tiene un padre, actualizar también las categorías superiores
-        if self.id_categoria:
-            categoria_padre = self.id_categoria.id_padre
-            while categoria_padre:
-                print(f"Actualizando categoría padre: {categoria_padre.id}")  # Debugging
-                categoria_padre.actualizar_total_costo()  # Actualizar el costo en la categoría padre
-                categoria_padre = categoria_padre.id_padre  # Subir a la categoría superior
+        # Propagar el cambio a la categoría y sus ancestros
+        propagar_cambio_costo(self.id_categoria)
 
     def delete(self, *args, **kwargs):
         """Sobrescribe delete() para actualizar los costos en la categoría y sus padres al eliminar un registro de DatosOtrosEP."""
-        categoria_padre = self.id_categoria.id_padre if self.id_categoria else None  # Obtener el padre antes de eliminar
-
         super().delete(*args, **kwargs)  # Eliminar el registro de DatosOtrosEP
 
-        # ✅ Actualizar la categoría principal después de la eliminación
-        if self.id_categoria:
-            self.id_categoria.actualizar_total_costo()
-
-        # ✅ Si la categoría tiene un padre, actualizarlo también
-        while categoria_padre:
-            
-            categoria_padre.actualizar_total_costo()  # Actualizar el costo en la categoría padre
-            categoria_padre = categoria_padre.id_padre  # Subir a la categoría superior
+        # Propagar el cambio a la categoría y sus ancestros
+        propagar_cambio_costo(self.id_categoria)
 
     def __str__(self):
         return f"{self.id} - {self.id_categoria.nombre}"
@@ -898,36 +815,22 @@ class CotizacionMateriales(models.Model):
     moneda_origen = models.CharField(max_length=10)
     tasa_cambio = models.DecimalField(max_digits=10, decimal_places=4)
 
+    objects = PorProyectoQuerySet.as_manager()
+
     def save(self, *args, **kwargs):
         """Cada vez que se guarde un dato en DatosOtrosEP, actualizar la categoría correspondiente."""
         # Guardar la instancia antes de realizar cualquier operación
         super().save(*args, **kwargs)
 
-        # ✅ Si la categoría está definida, actualizar el costo en la categoría
-        if self.id_categoria:
-            print(f"Actualizando categoría inmediata: {self.id_categoria.id}")  # Debugging
-            self.id_categoria.actualizar_total_costo()
-
-        # ✅ Si la categoría tiene un padre, actualizar también las categorías superiores
-        if self.id_categoria:
-            categoria_padre = self.id_categoria.id_padre
-            while categoria_padre:
-                print(f"Actualizando categoría padre: {categoria_padre.id}")  # Debugging
-                categoria_padre.actualizar_total_costo()  # Actualizar el costo en la categoría padre
-                categoria_padre = categoria_padre.id_padre  # Subir a la categoría superior
+        # Propagar el cambio a la categoría y sus ancestros
+        propagar_cambio_costo(self.id_categoria)
     
     def delete(self, *args, **kwargs):
            
-        categoria_padre = self.id_categoria.id_padre if self.id_categoria else None  
-
         super().delete(*args, **kwargs)  
 
-        if self.id_categoria:
-            self.id_categoria.actualizar_total_costo()
-
-        while categoria_padre:
-            categoria_padre.actualizar_total_costo()
-            categoria_padre = categoria_padre.id_padre       
+        # Propagar el cambio a la categoría y sus ancestros
+        propagar_cambio_costo(self.id_categoria)
     
     def __str__(self):
         return f"{self.tipo_suministro} - {self.pais_entrega} ({self.fecha_cotizacion_referencia})"
@@ -944,55 +847,28 @@ class ContratoSubcontrato(models.Model):
     costo_contrato_total = models.DecimalField(max_digits=12, decimal_places=2, blank=True, null=True)
     costo_contrato_unitario = models.DecimalField(max_digits=12, decimal_places=2, blank=True, null=True)
 
+    objects = PorProyectoQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['id_categoria', 'total_usd_indirectos_contratista'], name='contrato_cat_monto_idx'),
+        ]
+
     def save(self, *args, **kwargs):
-        # Obtener valores de otras tablas
-        cantidad = Cantidades.objects.filter(id_categoria=self.id_categoria).first()
-        mano_obra = ManoObra.objects.filter(id_categoria=self.id_categoria).first()
-        materiales_otros = MaterialesOtros.objects.filter(id_categoria=self.id_categoria).first()
-        cotizacion = CotizacionMateriales.objects.filter(id_categoria=self.id_categoria).first()  
+        # Calcular valores a partir de la cantidad, mano de obra, materiales y cotización de la categoría
+        calcular_campos(self)
 
-        # Calcular valores
-        self.total_usd_indirectos_contratista = (mano_obra.total_hh if mano_obra else 0) * self.costo_laboral_indirecto_usd_hh
-        
-        # Solo calcular usd_por_unidad si tipo_suministro es "SUB"
-        if cotizacion and cotizacion.tipo_suministro == "SUB":
-            self.usd_por_unidad = (cotizacion.moneda_aplicada if cotizacion else 0) * (1 + self.fc_subcontrato / 100)
-        else:
-            self.usd_por_unidad = 0  # O el valor por defecto que prefieras
-
-        self.usd_total_subcontrato = (cantidad.cantidad_final if cantidad else 0) * self.usd_por_unidad
-        self.costo_contrato_total = self.usd_total_subcontrato + self.total_usd_indirectos_contratista + (materiales_otros.total_sitio if materiales_otros else 0) + (mano_obra.total_usd if mano_obra else 0)
-        self.costo_contrato_unitario = self.costo_contrato_total / (cantidad.cantidad_final if cantidad and cantidad.cantidad_final > 0 else 1)
-        
         super().save(*args, **kwargs)
 
-        # ✅ Si la categoría está definida, actualizar el costo en la categoría
-        if self.id_categoria:
-            print(f"Actualizando categoría inmediata: {self.id_categoria.id}")  # Debugging
-            self.id_categoria.actualizar_total_costo()
-
-        # ✅ Si la categoría tiene un padre, actualizar también las categorías superiores
-        if self.id_categoria:
-            categoria_padre = self.id_categoria.id_padre
-            while categoria_padre:
-                print(f"Actualizando categoría padre: {categoria_padre.id}")  # Debugging
-                categoria_padre.actualizar_total_costo()  # Actualizar el costo en la categoría padre
-                categoria_padre = categoria_padre.id_padre  # Subir a la categoría superior
+        # Propagar el cambio a la categoría y sus ancestros
+        propagar_cambio_costo(self.id_categoria)
 
     def delete(self, *args, **kwargs):
         """Sobrescribe delete() para actualizar los costos en la categoría y sus padres al eliminar un registro de ContratoSubcontrato."""
-        categoria_padre = self.id_categoria.id_padre if self.id_categoria else None  # Obtener el padre antes de eliminar
-
         super().delete(*args, **kwargs)  # Eliminar el registro de ContratoSubcontrato
 
-        # ✅ Actualizar la categoría principal después de la eliminación
-        if self.id_categoria:
-            self.id_categoria.actualizar_total_costo()
-
-        # ✅ Si la categoría tiene un padre, actualizarlo también
-        while categoria_padre:
-            categoria_padre.actualizar_total_costo()  # Actualizar el costo en la categoría padre
-            categoria_padre = categoria_padre.id_padre  # Subir a la categoría superior
+        # Propagar el cambio a la categoría y sus ancestros
+        propagar_cambio_costo(self.id_categoria)
 
     def __str__(self):
         return f"Contrato {self.id} - Categoría: {self.id_categoria.nombre}"
@@ -1007,39 +883,28 @@ class IngenieriaDetallesContraparte(models.Model):
     MB = models.ForeignKey('MB', on_delete=models.SET_NULL, null=True, blank=True)  # Selección manual de MB
     total_usd = models.DecimalField(max_digits=10, decimal_places=2, default=0)
 
+    objects = PorProyectoQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['id_categoria', 'total_usd'], name='ingenieria_cat_monto_idx'),
+        ]
+
     def save(self, *args, **kwargs):
         """Guarda el modelo y actualiza la categoría padre."""
-        self.total_usd = self.UF * self.MB.mb
+        calcular_campos(self)
         super().save(*args, **kwargs)  # Guarda el objeto primero
 
 
-        # ✅ Actualizar la categoría actual
-        if self.id_categoria:
-            print(f"Actualizando categoría inmediata: {self.id_categoria.id}")  # Debugging
-            self.id_categoria.actualizar_total_costo()
-
-            # ✅ Recorrer las categorías superiores y actualizar costos
-            categoria_padre = self.id_categoria.id_padre
-            while categoria_padre:
-                print(f"Actualizando categoría padre: {categoria_padre.id}")  # Debugging
-                categoria_padre.actualizar_total_costo()
-                categoria_padre = categoria_padre.id_padre  # Subir a la categoría superior
+        # Propagar el cambio a la categoría y sus ancestros
+        propagar_cambio_costo(self.id_categoria)
 
     def delete(self, *args, **kwargs):
         """Elimina el registro y actualiza las categorías padre."""
-        categoria_padre = self.id_categoria.id_padre if self.id_categoria else None  # Obtener el padre antes de eliminar
-
         super().delete(*args, **kwargs)  # Eliminar el registro
 
-        # ✅ Actualizar la categoría después de la eliminación
-        if self.id_categoria:
-            self.id_categoria.actualizar_total_costo()
-
-        # ✅ Recorrer las categorías superiores y actualizar costos
-        while categoria_padre:
-            print(f"Actualizando categoría padre después de eliminar: {categoria_padre.id}")  # Debugging
-            categoria_padre.actualizar_total_costo()
-            categoria_padre = categoria_padre.id_padre  # Subir a la categoría superior
+        # Propagar el cambio a la categoría y sus ancestros
+        propagar_cambio_costo(self.id_categoria)
 
     def __str__(self):
         return self.nombre
@@ -1058,38 +923,26 @@ class GestionPermisos(models.Model):
     HH = models.DecimalField(max_digits=10, decimal_places=2, default=0)  # Se calculará antes de guardar
     total_usd = models.DecimalField(max_digits=15, decimal_places=2, default=0)  # Se calculará antes de guardar
 
+    objects = PorProyectoQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['id_categoria', 'total_usd'], name='permisos_cat_monto_idx'),
+        ]
+
     def save(self, *args, **kwargs):
-        self.HH = (self.dedicacion / 100) * self.meses * self.cantidad * 180
-        self.total_usd = self.HH * self.MB.mb
+        calcular_campos(self)
         super().save(*args, **kwargs)
 
-         # ✅ Actualizar la categoría actual
-        if self.id_categoria:
-            print(f"Actualizando categoría inmediata: {self.id_categoria.id}")  # Debugging
-            self.id_categoria.actualizar_total_costo()
-
-            # ✅ Recorrer las categorías superiores y actualizar costos
-            categoria_padre = self.id_categoria.id_padre
-            while categoria_padre:
-                print(f"Actualizando categoría padre: {categoria_padre.id}")  # Debugging
-                categoria_padre.actualizar_total_costo()
-                categoria_padre = categoria_padre.id_padre  # Subir a la categoría superior
+        # Propagar el cambio a la categoría y sus ancestros
+        propagar_cambio_costo(self.id_categoria)
 
     def delete(self, *args, **kwargs):
         """Elimina el registro y actualiza las categorías padre."""
-        categoria_padre = self.id_categoria.id_padre if self.id_categoria else None  # Obtener el padre antes de eliminar
-
         super().delete(*args, **kwargs)  # Eliminar el registro
 
-        # ✅ Actualizar la categoría después de la eliminación
-        if self.id_categoria:
-            self.id_categoria.actualizar_total_costo()
-
-        # ✅ Recorrer las categorías superiores y actualizar costos
-        while categoria_padre:
-            print(f"Actualizando categoría padre después de eliminar: {categoria_padre.id}")  # Debugging
-            categoria_padre.actualizar_total_costo()
-            categoria_padre = categoria_padre.id_padre  # Subir a la categoría superior
+        # Propagar el cambio a la categoría y sus ancestros
+        propagar_cambio_costo(self.id_categoria)
 
 
     def __str__(self):
@@ -1104,38 +957,27 @@ class Dueno(models.Model):
     costo_hh_us = models.DecimalField(max_digits=10, decimal_places=2)
     costo_total = models.DecimalField(max_digits=15, decimal_places=2, editable=False)
 
+    objects = PorProyectoQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['id_categoria', 'costo_total'], name='dueno_cat_monto_idx'),
+        ]
+
     def save(self, *args, **kwargs):
-        self.costo_total = self.total_hh * self.costo_hh_us
+        calcular_campos(self)
         super().save(*args, **kwargs)
 
-         # ✅ Actualizar la categoría actual (directa)
-        if self.id_categoria:
-            print(f"Actualizando categoría inmediata: {self.id_categoria.id}")  # Debugging
-            self.id_categoria.actualizar_total_costo()
-
-            # ✅ Recorrer las categorías superiores y actualizar costos
-            categoria_padre = self.id_categoria.id_padre
-            while categoria_padre:
-                print(f"Actualizando categoría padre: {categoria_padre.id}")  # Debugging
-                categoria_padre.actualizar_total_costo()
-                categoria_padre = categoria_padre.id_padre  # Subir a la siguiente categoría superior
+        # Propagar el cambio a la categoría y sus ancestros
+        propagar_cambio_costo(self.id_categoria)
 
                 
     def delete(self, *args, **kwargs):
         """Elimina el registro y actualiza las categorías padre."""
-        categoria_padre = self.id_categoria.id_padre if self.id_categoria else None  # Obtener el padre antes de eliminar
-
         super().delete(*args, **kwargs)  # Eliminar el registro
 
-        # ✅ Actualizar la categoría después de la eliminación
-        if self.id_categoria:
-            self.id_categoria.actualizar_total_costo()
-
-        # ✅ Recorrer las categorías superiores y actualizar costos
-        while categoria_padre:
-            print(f"Actualizando categoría padre después de eliminar: {categoria_padre.id}")  # Debugging
-            categoria_padre.actualizar_total_costo()
-            categoria_padre = categoria_padre.id_padre  # Subir a la categoría superior
+        # Propagar el cambio a la categoría y sus ancestros
+        propagar_cambio_costo(self.id_categoria)
 
     def __str__(self):
         return self.nombre
@@ -1174,45 +1016,28 @@ class AdministracionSupervision(models.Model):
     costo_total_us = models.DecimalField(max_digits=15, decimal_places=2, editable=False)
     costo_total_mb = models.DecimalField(max_digits=15, decimal_places=2, editable=False)
 
-    def save(self, *args, **kwargs):
-        self.costo_total_clp = self.precio_unitario_clp * self.total_unitario
+    objects = PorProyectoQuerySet.as_manager()
 
-        if self.mb_seleccionado:
-            self.costo_total_us = self.costo_total_clp / self.mb_seleccionado.mb
-            self.costo_total_mb = self.costo_total_us * self.mb_seleccionado.fc
-        else:
-            self.costo_total_us = 0
-            self.costo_total_mb = 0
+    class Meta:
+        indexes = [
+            models.Index(fields=['id_categoria', 'costo_total_us'], name='admin_sup_cat_monto_idx'),
+        ]
 
-        super().save(*args, **kwargs)
+    def save(self, *args, **kwargs):
+        # Los montos en US$ y MB quedan en 0 si no hay MB seleccionado
+        calcular_campos(self)
 
-        # ✅ Actualizar la categoría actual
-        if self.id_categoria:
-            print(f"Actualizando categoría inmediata: {self.id_categoria.id}")  # Debugging
-            self.id_categoria.actualizar_total_costo()
+        super().save(*args, **kwargs)
 
-            # ✅ Recorrer las categorías superiores y actualizar costos
-            categoria_padre = self.id_categoria.id_padre
-            while categoria_padre:
-                print(f"Actualizando categoría padre: {categoria_padre.id}")  # Debugging
-                categoria_padre.actualizar_total_costo()
-                categoria_padre = categoria_padre.id_padre  # Subir a la categoría superior
+        # Propagar el cambio a la categoría y sus ancestros
+        propagar_cambio_costo(self.id_categoria)
 
     def delete(self, *args, **kwargs):
         """Elimina el registro y actualiza las categorías padre."""
-        categoria_padre = self.id_categoria.id_padre if self.id_categoria else None  # Obtener el padre antes de eliminar
-
         super().delete(*args, **kwargs)  # Eliminar el registro
 
-        # ✅ Actualizar la categoría después de la eliminación
-        if self.id_categoria:
-            self.id_categoria.actualizar_total_costo()
-
-        # ✅ Recorrer las categorías superiores y actualizar costos
-        while categoria_padre:
-            print(f"Actualizando categoría padre después de eliminar: {categoria_padre.id}")  # Debugging
-            categoria_padre.actualizar_total_costo()
-            categoria_padre = categoria_padre.id_padre  # Subir a la categoría superior
+        # Propagar el cambio a la categoría y sus ancestros
+        propagar_cambio_costo(self.id_categoria)
 
     def __str__(self):
         return f"Administración y Supervisión - {self.id_categoria} - CLP: {self.costo_total_clp}, US$: {self.costo_total_us}, MB: {self.costo_total_mb}"
@@ -1235,52 +1060,28 @@ class PersonalIndirectoContratista(models.Model):
     costo_total_us = models.DecimalField(max_digits=15, decimal_places=2, editable=False)
     costo_total_mb = models.DecimalField(max_digits=15, decimal_places=2, editable=False)
 
+    objects = PorProyectoQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['id_categoria', 'costo_total_us'], name='personal_ind_cat_monto_idx'),
+        ]
+
     def save(self, *args, **kwargs):
-        self.total_hh = self.plazo_mes * self.hh_mes
-
-        if self.mb_seleccionado:
-            mb_value = self.mb_seleccionado.mb
-            fc_value = self.mb_seleccionado.fc
-
-            self.tarifa_usd_hh = self.precio_unitario_clp_hh / (mb_value * fc_value)
-            self.costo_total_clp = self.precio_unitario_clp_hh * self.plazo_mes * self.hh_mes
-            self.costo_total_us = self.costo_total_clp / mb_value
-            self.costo_total_mb = self.costo_total_us * fc_value
-        else:
-            self.tarifa_usd_hh = 0
-            self.costo_total_clp = 0
-            self.costo_total_us = 0
-            self.costo_total_mb = 0
+        # Los montos quedan en 0 si no hay MB seleccionado
+        calcular_campos(self)
 
         super().save(*args, **kwargs)
 
-        # ✅ Actualizar la categoría actual
-        if self.id_categoria:
-            print(f"Actualizando categoría inmediata: {self.id_categoria.id}")  # Debugging
-            self.id_categoria.actualizar_total_costo()
-
-            # ✅ Recorrer las categorías superiores y actualizar costos
-            categoria_padre = self.id_categoria.id_padre
-            while categoria_padre:
-                print(f"Actualizando categoría padre: {categoria_padre.id}")  # Debugging
-                categoria_padre.actualizar_total_costo()
-                categoria_padre = categoria_padre.id_padre  # Subir a la categoría superior
+        # Propagar el cambio a la categoría y sus ancestros
+        propagar_cambio_costo(self.id_categoria)
 
     def delete(self, *args, **kwargs):
         """Elimina el registro y actualiza las categorías padre."""
-        categoria_padre = self.id_categoria.id_padre if self.id_categoria else None  # Obtener el padre antes de eliminar
-
         super().delete(*args, **kwargs)  # Eliminar el registro
 
-        # ✅ Actualizar la categoría después de la eliminación
-        if self.id_categoria:
-            self.id_categoria.actualizar_total_costo()
-
-        # ✅ Recorrer las categorías superiores y actualizar costos
-        while categoria_padre:
-            print(f"Actualizando categoría padre después de eliminar: {categoria_padre.id}")  # Debugging
-            categoria_padre.actualizar_total_costo()
-            categoria_padre = categoria_padre.id_padre  # Subir a la categoría superior
+        # Propagar el cambio a la categoría y sus ancestros
+        propagar_cambio_costo(self.id_categoria)
 
     
 
@@ -1294,36 +1095,27 @@ class ServiciosApoyo(models.Model):
     mb = models.ForeignKey('MB', on_delete=models.SET_NULL, null=True, blank=True)  # Selección de MB
     total_usd = models.DecimalField(max_digits=15, decimal_places=2, editable=False)
 
+    objects = PorProyectoQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['id_categoria', 'total_usd'], name='servicios_cat_monto_idx'),
+        ]
+
     def save(self, *args, **kwargs):
-        # ✅ Asegurar que `mb` tiene un valor antes de multiplicar
-        self.total_usd = self.hh_totales * self.mb.mb if self.hh_totales and self.mb else Decimal('0')
+        # ✅ total_usd queda en 0 si no hay `mb` seleccionado
+        calcular_campos(self)
         super().save(*args, **kwargs)
 
-        # ✅ Actualizar la categoría actual
-        if self.id_categoria:
-            self.id_categoria.actualizar_total_costo()
-
-            # ✅ Recorrer las categorías superiores y actualizar costos
-            categoria_padre = self.id_categoria.id_padre
-            while categoria_padre:
-                categoria_padre.actualizar_total_costo()
-                categoria_padre = categoria_padre.id_padre  # Subir a la categoría superior
+        # Propagar el cambio a la categoría y sus ancestros
+        propagar_cambio_costo(self.id_categoria)
 
     def delete(self, *args, **kwargs):
         """Elimina el registro y actualiza las categorías padre."""
-        categoria_padre = self.id_categoria.id_padre if self.id_categoria else None  # Obtener el padre antes de eliminar
-
         super().delete(*args, **kwargs)  # Eliminar el registro
 
-        # ✅ Actualizar la categoría después de la eliminación
-        if self.id_categoria:
-            self.id_categoria.actualizar_total_costo()
-
-        # ✅ Recorrer las categorías superiores y actualizar costos
-        while categoria_padre:
-            print(f"Actualizando categoría padre después de eliminar: {categoria_padre.id}")  # Debugging
-            categoria_padre.actualizar_total_costo()
-            categoria_padre = categoria_padre.id_padre  # Subir a la categoría superior
+        # Propagar el cambio a la categoría y sus ancestros
+        propagar_cambio_costo(self.id_categoria)
 
     def __str__(self):
         return f"{self.id_categoria} - {self.unidad} - {self.total_usd} USD"
@@ -1340,39 +1132,27 @@ class OtrosADM(models.Model):
     cantidad = models.IntegerField()
     turno = models.CharField(max_length=50)
 
+    objects = PorProyectoQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['id_categoria', 'total_usd'], name='otrosadm_cat_monto_idx'),
+        ]
+
     def save(self, *args, **kwargs):
         # Calculamos HH y Total_USD antes de guardar
-        self.HH = (self.dedicacion/100) * self.meses * self.cantidad * 180
-        self.total_usd = self.HH * self.MB.mb if self.MB else 0
+        calcular_campos(self)
         super().save(*args, **kwargs)
 
-         # ✅ Actualizar la categoría actual
-        if self.id_categoria:
-            print(f"Actualizando categoría inmediata: {self.id_categoria.id}")  # Debugging
-            self.id_categoria.actualizar_total_costo()
-
-            # ✅ Recorrer las categorías superiores y actualizar costos
-            categoria_padre = self.id_categoria.id_padre
-            while categoria_padre:
-                print(f"Actualizando categoría padre: {categoria_padre.id}")  # Debugging
-                categoria_padre.actualizar_total_costo()
-                categoria_padre = categoria_padre.id_padre  # Subir a la categoría superior
+        # Propagar el cambio a la categoría y sus ancestros
+        propagar_cambio_costo(self.id_categoria)
 
     def delete(self, *args, **kwargs):
         """Elimina el registro y actualiza las categorías padre."""
-        categoria_padre = self.id_categoria.id_padre if self.id_categoria else None  # Obtener el padre antes de eliminar
-
         super().delete(*args, **kwargs)  # Eliminar el registro
 
-        # ✅ Actualizar la categoría después de la eliminación
-        if self.id_categoria:
-            self.id_categoria.actualizar_total_costo()
-
-        # ✅ Recorrer las categorías superiores y actualizar costos
-        while categoria_padre:
-            print(f"Actualizando categoría padre después de eliminar: {categoria_padre.id}")  # Debugging
-            categoria_padre.actualizar_total_costo()
-            categoria_padre = categoria_padre.id_padre  # Subir a la categoría superior
+        # Propagar el cambio a la categoría y sus ancestros
+        propagar_cambio_costo(self.id_categoria)
 
     def __str__(self):
         return f"OtrosADM - {self.id_categoria.nombre if self.id_categoria else 'Sin categoría'}"
@@ -1387,36 +1167,25 @@ class AdministrativoFinanciero(models.Model):
     sobre_contrato_base = models.DecimalField(max_digits=5, decimal_places=2)
     costo_total = models.DecimalField(max_digits=15, decimal_places=2)
 
+    objects = PorProyectoQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['id_categoria', 'costo_total'], name='admin_fin_cat_monto_idx'),
+        ]
+
     def save(self, *args, **kwargs):
         super().save(*args, **kwargs)
 
-         # ✅ Actualizar la categoría actual
-        if self.id_categoria:
-            print(f"Actualizando categoría inmediata: {self.id_categoria.id}")  # Debugging
-            self.id_categoria.actualizar_total_costo()
-
-            # ✅ Recorrer las categorías superiores y actualizar costos
-            categoria_padre = self.id_categoria.id_padre
-            while categoria_padre:
-                print(f"Actualizando categoría padre: {categoria_padre.id}")  # Debugging
-                categoria_padre.actualizar_total_costo()
-                categoria_padre = categoria_padre.id_padre  # Subir a la categoría superior
+        # Propagar el cambio a la categoría y sus ancestros
+        propagar_cambio_costo(self.id_categoria)
 
     def delete(self, *args, **kwargs):
         """Elimina el registro y actualiza las categorías padre."""
-        categoria_padre = self.id_categoria.id_padre if self.id_categoria else None  # Obtener el padre antes de eliminar
-
         super().delete(*args, **kwargs)  # Eliminar el registro
 
-        # ✅ Actualizar la categoría después de la eliminación
-        if self.id_categoria:
-            self.id_categoria.actualizar_total_costo()
-
-        # ✅ Recorrer las categorías superiores y actualizar costos
-        while categoria_padre:
-            print(f"Actualizando categoría padre después de eliminar: {categoria_padre.id}")  # Debugging
-            categoria_padre.actualizar_total_costo()
-            categoria_padre = categoria_padre.id_padre  # Subir a la categoría superior
+        # Propagar el cambio a la categoría y sus ancestros
+        propagar_cambio_costo(self.id_categoria)
 
     def __str__(self):
         return f"{self.id_categoria.nombre} - {self.unidad} ({self.meses} meses)"
@@ -1456,11 +1225,79 @@ class ArchivoSubido(models.Model):
         
         
     ])
+
+    # Estado de la última importación (ver importacion.ImportacionIncremental)
+    PENDIENTE = 'pendiente'
+    IMPORTADO = 'importado'
+    ERROR = 'error'
+    ESTADOS_IMPORTACION = [
+        (PENDIENTE, 'Pendiente'),
+        (IMPORTADO, 'Importado'),
+        (ERROR, 'Error'),
+    ]
+    hash_contenido = models.CharField(max_length=64, blank=True, default='')  # SHA-256 del archivo subido
+    hash_importado = models.CharField(max_length=64, blank=True, default='')  # SHA-256 de la versión importada
+    estado_importacion = models.CharField(max_length=20, choices=ESTADOS_IMPORTACION, default=PENDIENTE)
+    importado = models.DateTimeField(null=True, blank=True)
+    # Filas de la versión importada por clave natural: {'columnas': [...], 'filas': {clave: [huella, *valores]}}
+    instantanea = models.JSONField(default=dict, blank=True)
     
     def __str__(self):
         return f"{self.archivo.name} - {self.modelo_destino}"
 
 
+class TrabajoImportacion(models.Model):
+    """Importación de planillas encolada para el worker ``procesar_importaciones``.
+
+    El avance de cada cargador está en ``AvanceCarga``: cada lote se confirma junto con su
+    avance, así que un trabajo cancelado o interrumpido se reanuda desde el último lote
+    guardado (ver ``proyectoApp.trabajos``).
+    """
+    PENDIENTE = 'pendiente'
+    EN_CURSO = 'en_curso'
+    COMPLETADO = 'completado'
+    CANCELADO = 'cancelado'
+    ERROR = 'error'
+    ESTADOS = [
+        (PENDIENTE, 'Pendiente'),
+        (EN_CURSO, 'En curso'),
+        (COMPLETADO, 'Completado'),
+        (CANCELADO, 'Cancelado'),
+        (ERROR, 'Error'),
+    ]
+
+    id = models.AutoField(primary_key=True)
+    cargadores = models.JSONField(default=list)  # carpetas de cargar_datos.CARGAS
+    estado = models.CharField(max_length=20, choices=ESTADOS, default=PENDIENTE, db_index=True)
+    cancelacion_solicitada = models.BooleanField(default=False)
+    informe = models.JSONField(default=dict)  # tiempos de la última ejecución (paralela vs. secuencial)
+    error = models.TextField(blank=True, default='')
+    creado = models.DateTimeField(auto_now_add=True)
+    actualizado = models.DateTimeField(auto_now=True)  # también sirve de latido del worker
+    iniciado = models.DateTimeField(null=True, blank=True)
+    terminado = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Importación {self.id} ({self.estado})"
+
+
+class AvanceCarga(models.Model):
+    """Avance de un cargador dentro de un trabajo; cada proceso del worker escribe solo el suyo."""
+    id = models.AutoField(primary_key=True)
+    trabajo = models.ForeignKey(TrabajoImportacion, on_delete=models.CASCADE, related_name='avances')
+    carpeta = models.CharField(max_length=50)
+    estado = models.CharField(max_length=20, choices=TrabajoImportacion.ESTADOS, default=TrabajoImportacion.PENDIENTE)
+    archivos = models.JSONField(default=dict)  # {archivo: filas, procesadas, lotes, conteos y errores}
+    proyectos = models.JSONField(default=list)  # proyectos afectados por los lotes ya confirmados
+    segundos = models.FloatField(default=0)  # tiempo acumulado de ejecución del cargador
+
+    class Meta:
+        unique_together = ('trabajo', 'carpeta')
+
+    def __str__(self):
+        return f"{self.trabajo_id} - {self.carpeta} ({self.estado})"
+
+
 
 
 
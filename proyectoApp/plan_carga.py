@@ -0,0 +1,114 @@
+"""Orden de ejecución de los cargadores según sus dependencias.
+
+Los prerrequisitos de cada cargador se deducen de su modelo: las tablas a las que apuntan
+sus FKs y las que lee su calculadora (``calculos.Fuente``), p. ej. Adquisiciones necesita
+Cantidades y CotizacionMateriales, y ContratoSubcontrato necesita ManoObra. Los cargadores
+sin dependencias pendientes entre sí se ejecutan a la vez en un pool de procesos, cada uno
+con su propia conexión a la BD.
+"""
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+import multiprocessing
+
+
+def prerrequisitos(espec, disponibles):
+    """Carpetas de ``disponibles`` que deben cargarse antes que ``espec``."""
+    # Import diferido: los procesos del pool importan este módulo antes de django.setup()
+    from .calculos import calculadora_de
+
+    modelos = {
+        campo.related_model for campo in espec.modelo._meta.concrete_fields
+        if campo.is_relation and campo.related_model is not espec.modelo
+    }
+    calculadora = calculadora_de(espec.modelo)
+    if calculadora:
+        modelos.update(fuente.modelo for _, fuente in calculadora.relacionadas.values())
+    modelos.discard(espec.modelo)
+    carpetas = {modelo.__name__ for modelo in modelos} | set(espec.requiere)
+    return carpetas & set(disponibles)
+
+
+def grafo_carga(cargas):
+    """{carpeta: prerrequisitos} restringido a los cargadores de ``cargas`` ({carpeta: espec})."""
+    return {carpeta: prerrequisitos(espec, cargas) for carpeta, espec in cargas.items()}
+
+
+def orden_topologico(grafo):
+    """Carpetas en un orden que respeta las dependencias (estable respecto a ``grafo``)."""
+    orden, hechas = [], set()
+    pendientes = list(grafo)
+    while pendientes:
+        listas = [carpeta for carpeta in pendientes if grafo[carpeta] <= hechas]
+        if not listas:
+            raise ValueError(f"Dependencias circulares entre: {', '.join(pendientes)}")
+        orden.extend(listas)
+        hechas.update(listas)
+        pendientes = [carpeta for carpeta in pendientes if carpeta not in hechas]
+    return orden
+
+
+def ruta_critica(grafo, segundos):
+    """Duración de la cadena de dependencias más larga: el mínimo tiempo posible en paralelo."""
+    fin = {}
+    for carpeta in orden_topologico(grafo):
+        fin[carpeta] = segundos.get(carpeta, 0) + max((fin[p] for p in grafo[carpeta]), default=0)
+    return max(fin.values(), default=0)
+
+
+def ejecutar_plan(grafo, funcion, argumentos=(), procesos=1, ejecutor=None, detener=None):
+    """Ejecuta ``funcion(*argumentos, carpeta)`` para cada carpeta respetando ``grafo``.
+
+    Con ``procesos > 1`` cada cargador listo se envía al pool en cuanto terminan sus
+    prerrequisitos. ``detener(error)`` decide si una excepción impide lanzar los que faltan
+    (por defecto cualquiera lo impide); los que ya corren terminan igual.
+    Retorna (segundos reales, {carpeta: resultado}, [(carpeta, excepción)]).
+    """
+    detener = detener or (lambda error: True)
+    resultados, errores = {}, []
+    inicio = time.perf_counter()
+
+    if procesos <= 1 and ejecutor is None:
+        for carpeta in orden_topologico(grafo):
+            if errores and any(detener(error) for _, error in errores):
+                break
+            try:
+                resultados[carpeta] = funcion(*argumentos, carpeta)
+            except Exception as error:
+                errores.append((carpeta, error))
+        return time.perf_counter() - inicio, resultados, errores
+
+    orden_topologico(grafo)  # valida que no haya ciclos antes de lanzar nada
+    if ejecutor is None:
+        ejecutor = ProcessPoolExecutor(max_workers=procesos, mp_context=multiprocessing.get_context('spawn'),
+                                       initializer=_iniciar_proceso)
+    hechas, en_curso = set(), {}
+    pendientes = list(grafo)
+    with ejecutor:
+        while pendientes or en_curso:
+            if not errores or not any(detener(error) for _, error in errores):
+                listas = [carpeta for carpeta in pendientes if grafo[carpeta] <= hechas]
+                for carpeta in listas:
+                    en_curso[ejecutor.submit(funcion, *argumentos, carpeta)] = carpeta
+                pendientes = [carpeta for carpeta in pendientes if carpeta not in listas]
+            elif not en_curso:
+                break
+            if not en_curso:
+                break  # quedan cargadores cuyos prerrequisitos fallaron
+            terminados, _ = wait(en_curso, return_when=FIRST_COMPLETED)
+            for futuro in terminados:
+                carpeta = en_curso.pop(futuro)
+                try:
+                    resultados[carpeta] = futuro.result()
+                    hechas.add(carpeta)
+                except Exception as error:
+                    errores.append((carpeta, error))
+    return time.perf_counter() - inicio, resultados, errores
+
+
+def _iniciar_proceso():
+    """Cada proceso del pool configura Django y abre su propia conexión a la BD."""
+    import django
+    from django.db import connections
+
+    django.setup()
+    connections.close_all()
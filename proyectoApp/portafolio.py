@@ -0,0 +1,140 @@
+"""Matriz de costos categoría × proyecto para comparar un portafolio de proyectos.
+
+Las categorías de todos los proyectos se leen con una sola consulta y se pivotean con
+pandas: una fila por ``categoria_relacionada`` y una columna por proyecto. Sobre la matriz
+se calculan con NumPy el mínimo, el máximo y la mediana de cada fila, los subtotales por
+nivel y los costos atípicos (ver ``atipicos``).
+"""
+import io
+import json
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from .models import CategoriaNuevo
+
+
+# Z-score modificado (Iglewicz y Hoaglin): |x - mediana| / escala robusta mayor a esto
+UMBRAL_ATIPICO = 3.5
+# Con menos proyectos con costo en la fila no hay base para marcar atípicos
+MINIMO_ATIPICOS = 3
+FILAS_POR_BLOQUE = 500
+
+
+def _valor(numero):
+    return None if pd.isna(numero) else float(numero)
+
+
+def atipicos(valores):
+    """Matriz booleana de costos atípicos por fila según el z-score modificado.
+
+    La escala es 1.4826 × MAD; si la MAD es 0 (más de la mitad de los costos iguales) se
+    usa 1.2533 × la desviación absoluta media, y si también es 0 no hay atípicos.
+    """
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)  # filas sin ningún costo
+        mediana = np.nanmedian(valores, axis=1, keepdims=True)
+        desvio = np.abs(valores - mediana)
+        escala = 1.4826 * np.nanmedian(desvio, axis=1, keepdims=True)
+        escala = np.where(escala == 0, 1.2533 * np.nanmean(desvio, axis=1, keepdims=True), escala)
+    presentes = np.sum(~np.isnan(valores), axis=1, keepdims=True)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        resultado = (desvio / escala) > UMBRAL_ATIPICO
+    return resultado & (escala > 0) & (presentes >= MINIMO_ATIPICOS)
+
+
+def matriz_portafolio(proyecto_ids, nivel=None):
+    """Pivotea los costos de ``proyecto_ids`` por ``categoria_relacionada``.
+
+    Cada proyecto aporta su primera categoría (por id) de cada ``categoria_relacionada``;
+    el nombre y el nivel de la fila son los del primer proyecto de la lista que la tiene.
+    Retorna (filas, subtotales): ``filas`` es un DataFrame con nombre, nivel, una columna
+    por proyecto, minimo, maximo, mediana y atipicos (ids de proyecto); ``subtotales``
+    suma cada proyecto por nivel.
+    """
+    proyecto_ids = list(proyecto_ids)
+    consulta = CategoriaNuevo.objects.de_proyectos(proyecto_ids).exclude(categoria_relacionada=None)
+    if nivel is not None:
+        consulta = consulta.filter(nivel=nivel)
+    categorias = pd.DataFrame.from_records(
+        list(consulta.order_by('proyecto_id', 'id').values_list(
+            'proyecto_id', 'categoria_relacionada', 'nombre', 'nivel', 'total_costo'
+        )),
+        columns=['proyecto', 'categoria_relacionada', 'nombre', 'nivel', 'costo'],
+    )
+    categorias = categorias.drop_duplicates(['proyecto', 'categoria_relacionada'])
+    categorias['costo'] = categorias['costo'].fillna(0).astype(float)
+
+    orden = {proyecto_id: posicion for posicion, proyecto_id in enumerate(proyecto_ids)}
+    categorias['posicion'] = categorias['proyecto'].map(orden)
+    datos = (
+        categorias.sort_values(['posicion'], kind='stable')
+        .groupby('categoria_relacionada')[['nombre', 'nivel']].first()
+    )
+    matriz = (
+        categorias.pivot(index='categoria_relacionada', columns='proyecto', values='costo')
+        .reindex(index=datos.index, columns=proyecto_ids)
+    )
+
+    valores = matriz.to_numpy(dtype=float)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        filas = datos.assign(
+            minimo=np.nanmin(valores, axis=1) if len(valores) else [],
+            maximo=np.nanmax(valores, axis=1) if len(valores) else [],
+            mediana=np.nanmedian(valores, axis=1) if len(valores) else [],
+        )
+    marcas = atipicos(valores) if len(valores) else np.zeros((0, len(proyecto_ids)), dtype=bool)
+    filas['atipicos'] = [[proyecto_ids[j] for j in np.flatnonzero(fila)] for fila in marcas]
+    filas = pd.concat([filas, matriz], axis=1).sort_values(['nivel', 'categoria_relacionada'], kind='stable')
+
+    subtotales = matriz.groupby(datos['nivel']).sum(min_count=1)
+    return filas, subtotales
+
+
+def json_portafolio(proyectos, filas, subtotales):
+    """Genera el JSON de la matriz por partes, para enviarlo con StreamingHttpResponse."""
+    ids = [proyecto['id'] for proyecto in proyectos]
+    yield '{"proyectos": ' + json.dumps(proyectos) + ', "filas": ['
+    separador = ''
+    for inicio in range(0, len(filas), FILAS_POR_BLOQUE):
+        bloque = []
+        for categoria, fila in filas.iloc[inicio:inicio + FILAS_POR_BLOQUE].iterrows():
+            bloque.append(json.dumps({
+                'categoria_relacionada': categoria,
+                'nombre': fila['nombre'],
+                'nivel': int(fila['nivel']),
+                'costos': [_valor(fila[proyecto_id]) for proyecto_id in ids],
+                'minimo': _valor(fila['minimo']),
+                'maximo': _valor(fila['maximo']),
+                'mediana': _valor(fila['mediana']),
+                'atipicos': fila['atipicos'],
+            }))
+        yield separador + ', '.join(bloque)
+        separador = ', '
+    yield '], "subtotales": ' + json.dumps([
+        {'nivel': int(nivel), 'costos': [_valor(fila[proyecto_id]) for proyecto_id in ids]}
+        for nivel, fila in subtotales.iterrows()
+    ]) + '}'
+
+
+def parquet_portafolio(filas, subtotales):
+    """Matriz y subtotales (``tipo`` = 'categoria' o 'subtotal') como archivo Parquet en memoria."""
+    try:
+        import pyarrow  # noqa: F401  (pandas lo usa para escribir Parquet)
+    except ImportError:
+        raise ValueError("Exportar a .parquet requiere instalar pyarrow") from None
+
+    subtotales = subtotales.reset_index()
+    subtotales = subtotales.assign(
+        tipo='subtotal',
+        nombre='Subtotal nivel ' + subtotales['nivel'].astype(str),
+        atipicos=[[] for _ in range(len(subtotales))],
+    )
+    tabla = pd.concat([filas.reset_index().assign(tipo='categoria'), subtotales], ignore_index=True)
+    tabla.columns = [str(columna) for columna in tabla.columns]
+    salida = io.BytesIO()
+    tabla.to_parquet(salida, index=False)
+    salida.seek(0)
+    return salida
@@ -0,0 +1,104 @@
+"""Resumen cacheado de los proyectos (total y desglose por categoría raíz).
+
+``Inicio``, ``ListadoProyectoNuevo`` y el gráfico de categorías raíz leen el resumen de
+todos los proyectos desde la caché ``resumen``, bajo una clave que incluye la versión
+vigente. Si no está, se arma con dos consultas sin importar cuántos proyectos haya.
+
+El motor de rollup y los ``save()``/``delete()`` de proyectos y categorías cambian la
+versión (``invalidar_resumen``) al confirmarse la transacción, así que ninguna lectura
+guarda bajo la versión nueva totales sin confirmar. Cada proyecto tiene además su propia
+versión, que usan las cachés de un solo proyecto (p. ej. la comparación de costos). La caché ``resumen`` vive en la base
+de datos (ver ``CACHES`` en settings) para que la versión la vean todos los procesos,
+incluido el worker de importaciones.
+"""
+from collections import defaultdict
+from decimal import Decimal
+from functools import partial
+from uuid import uuid4
+
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import Q, Sum
+
+
+CACHE = 'resumen'
+CLAVE_VERSION = 'resumen_proyectos:version'
+DURACION = 60 * 60  # respaldo: el resumen se invalida por versión, no por tiempo
+
+
+def _clave_proyecto(proyecto_id):
+    return f'proyecto:{proyecto_id}:version'
+
+
+def _nueva_version(proyecto_ids=()):
+    # Un token nuevo y no un contador: dos invalidaciones simultáneas nunca dejan la misma versión
+    claves = [CLAVE_VERSION, *(_clave_proyecto(proyecto_id) for proyecto_id in proyecto_ids)]
+    caches[CACHE].set_many({clave: uuid4().hex for clave in claves}, None)
+
+
+def invalidar_resumen(*proyecto_ids):
+    """Cambia la versión del resumen, y la de los proyectos indicados, al confirmar la transacción."""
+    transaction.on_commit(partial(_nueva_version, proyecto_ids))
+
+
+def _version():
+    cache = caches[CACHE]
+    version = cache.get(CLAVE_VERSION)
+    if version is None:
+        cache.add(CLAVE_VERSION, uuid4().hex, None)
+        version = cache.get(CLAVE_VERSION)
+    return version
+
+
+def versiones_proyectos(proyecto_ids):
+    """{proyecto_id: versión vigente}; la versión cambia con cada rollup o edición del proyecto."""
+    cache = caches[CACHE]
+    claves = {_clave_proyecto(proyecto_id): proyecto_id for proyecto_id in proyecto_ids}
+    versiones = cache.get_many(claves)
+    faltantes = [clave for clave in claves if clave not in versiones]
+    if faltantes:
+        for clave in faltantes:
+            cache.add(clave, uuid4().hex, None)
+        versiones.update(cache.get_many(faltantes))
+    return {claves[clave]: version for clave, version in versiones.items()}
+
+
+def calcular_resumen():
+    """Resumen de todos los proyectos leído de la BD: una consulta de proyectos y una de raíces."""
+    from .models import CategoriaNuevo, ProyectoNuevo
+
+    raices = defaultdict(list)
+    consulta = CategoriaNuevo.objects.filter(id_padre__isnull=True).order_by('proyecto_id', 'id')
+    for raiz in consulta.values('proyecto_id', 'id', 'nombre', 'total_costo'):
+        raices[raiz.pop('proyecto_id')].append(raiz)
+
+    proyectos = ProyectoNuevo.objects.annotate(
+        total_raices=Sum('categorias__total_costo', filter=Q(categorias__id_padre__isnull=True)),
+    ).order_by('id').values('id', 'nombre', 'proyecto_relacionado', 'total_raices')
+    return [
+        {
+            'id': proyecto['id'],
+            'nombre': proyecto['nombre'],
+            'proyecto_relacionado': proyecto['proyecto_relacionado'],
+            # Igual que ProyectoNuevo.calcular_costo_total(): suma de las categorías raíz
+            'costo_total': proyecto['total_raices'] or Decimal('0.00'),
+            'raices': raices.get(proyecto['id'], []),
+        }
+        for proyecto in proyectos
+    ]
+
+
+def resumen_proyectos():
+    """Resumen de todos los proyectos: [{id, nombre, proyecto_relacionado, costo_total, raices}]."""
+    cache = caches[CACHE]
+    clave = f'resumen_proyectos:{_version()}'
+    resumen = cache.get(clave)
+    if resumen is None:
+        resumen = calcular_resumen()
+        cache.set(clave, resumen, DURACION)
+    return resumen
+
+
+def resumen_proyecto(proyecto_id):
+    """Resumen de un proyecto (None si no existe), tomado del resumen general."""
+    return next((proyecto for proyecto in resumen_proyectos() if proyecto['id'] == proyecto_id), None)
@@ -0,0 +1,488 @@
+"""Motor de recálculo (rollup) de costos por proyecto.
+
+En lugar de recorrer la jerarquía de categorías con una consulta por tabla y por
+nivel, se carga el árbol completo del proyecto y las sumas agrupadas por
+categoría en un número fijo de consultas (las tablas de costo directo se
+consultan juntas con un único UNION ALL + GROUP BY, ver ``registrar_fuente_costo``).
+Los totales se calculan en memoria desde las hojas hacia la raíz y se escriben con
+un único ``bulk_update``.
+
+Los ``save()``/``delete()`` de las tablas de costos usan ``propagar_cambio``, que
+recalcula solo el camino de la categoría modificada hasta la raíz (leído de la ruta
+materializada de ``CategoriaNuevo``). Para ediciones
+masivas e importaciones, ``defer_rollups()`` acumula las categorías modificadas y
+ejecuta un único recálculo por proyecto al salir del bloque.
+"""
+import threading
+from collections import defaultdict, namedtuple
+from contextlib import ContextDecorator
+from decimal import Decimal
+
+from django.db import connection, transaction
+from django.db.models import Sum, F, Q
+
+from .resumen import invalidar_resumen
+from .models import (
+    ProyectoNuevo, CategoriaNuevo, CostoNuevo, Adquisiciones, MaterialesOtros, EquiposConstruccion,
+    ManoObra, EspecificoCategoria, StaffEnami, DatosEP, DatosOtrosEP, ContratoSubcontrato,
+    IngenieriaDetallesContraparte, GestionPermisos, Dueno, PersonalIndirectoContratista,
+    AdministracionSupervision, ServiciosApoyo, OtrosADM, AdministrativoFinanciero, ReglaCostoDerivado,
+)
+
+
+CERO = Decimal('0.00')
+CENTAVO = Decimal('0.01')
+
+# Nombres de categorías con cálculo especial (comparados en minúsculas)
+NOMBRE_INGENIERIA = "ingenieria de detalles"
+NOMBRE_GESTION_COMPRAS = "gestion de compras"
+NOMBRE_CONTINGENCIA = "contingencia"
+NOMBRE_ASISTENCIA_VENDOR = "asistencia tecnica del vendor"
+
+TASA_CONTINGENCIA = Decimal('0.13')
+TASA_ASISTENCIA_VENDOR = Decimal('0.05') * Decimal('0.1')
+
+# Etapa de costos derivados: primero los que dependen de adquisiciones y luego los que
+# dependen de las raíces, para que la contingencia incluya la asistencia del vendor.
+ORDEN_BASES = (ReglaCostoDerivado.BASE_ADQUISICIONES, ReglaCostoDerivado.BASE_RAICES)
+
+# Reglas usadas cuando el proyecto no tiene ReglaCostoDerivado: {nombre: (base, tasa)}
+REGLAS_POR_DEFECTO = {
+    NOMBRE_ASISTENCIA_VENDOR: (ReglaCostoDerivado.BASE_ADQUISICIONES, TASA_ASISTENCIA_VENDOR),
+    NOMBRE_CONTINGENCIA: (ReglaCostoDerivado.BASE_RAICES, TASA_CONTINGENCIA),
+}
+
+Regla = namedtuple('Regla', 'categoria_id base tasa')
+
+# Registro de fuentes de costo directo: (modelo, campo FK a CategoriaNuevo, columna de monto)
+FUENTES_COSTO = []
+
+
+def registrar_fuente_costo(modelo, campo_fk, columna):
+    """Registra una tabla cuyo monto suma al costo directo de la categoría.
+
+    Agregar una nueva tabla de costos al rollup es una sola llamada a esta función.
+    """
+    modelo._meta.get_field(campo_fk)
+    modelo._meta.get_field(columna)
+    if (modelo, campo_fk, columna) not in FUENTES_COSTO:
+        FUENTES_COSTO.append((modelo, campo_fk, columna))
+
+
+registrar_fuente_costo(CostoNuevo, 'categoria', 'monto')
+registrar_fuente_costo(Adquisiciones, 'id_categoria', 'total_con_flete')
+registrar_fuente_costo(MaterialesOtros, 'id_categoria', 'total_sitio')
+registrar_fuente_costo(EquiposConstruccion, 'id_categoria', 'total_usd')
+registrar_fuente_costo(ManoObra, 'id_categoria', 'total_usd')
+registrar_fuente_costo(EspecificoCategoria, 'id_categoria', 'total')
+registrar_fuente_costo(StaffEnami, 'categoria', 'costo_total')
+registrar_fuente_costo(DatosEP, 'id_categoria', 'precio_hh')
+registrar_fuente_costo(ContratoSubcontrato, 'id_categoria', 'total_usd_indirectos_contratista')
+registrar_fuente_costo(IngenieriaDetallesContraparte, 'id_categoria', 'total_usd')
+registrar_fuente_costo(GestionPermisos, 'id_categoria', 'total_usd')
+registrar_fuente_costo(Dueno, 'id_categoria', 'costo_total')
+registrar_fuente_costo(PersonalIndirectoContratista, 'id_categoria', 'costo_total_us')
+registrar_fuente_costo(AdministracionSupervision, 'id_categoria', 'costo_total_us')
+registrar_fuente_costo(ServiciosApoyo, 'id_categoria', 'total_usd')
+registrar_fuente_costo(OtrosADM, 'id_categoria', 'total_usd')
+registrar_fuente_costo(AdministrativoFinanciero, 'id_categoria', 'costo_total')
+
+# Máximo de ids por cláusula IN al consultar un conjunto de categorías
+TAMANO_LOTE_IDS = 500
+
+
+def _redondear(valor):
+    """Redondea a 2 decimales igual que lo hace el DecimalField al guardar."""
+    return (valor or CERO).quantize(CENTAVO)
+
+
+def _sumas_por_categoria(modelo, campo_fk, expresion, proyecto_id):
+    """Devuelve {id_categoria: suma} para las filas del modelo dentro del proyecto."""
+    filas = (
+        modelo.objects
+        .del_proyecto(proyecto_id)
+        .values(campo_fk)
+        .annotate(total=Sum(expresion))
+        .order_by()
+    )
+    return {fila[campo_fk]: fila['total'] or CERO for fila in filas}
+
+
+def _sql_costos_directos(filtro):
+    """Arma el UNION ALL + GROUP BY sobre todas las fuentes registradas.
+
+    ``filtro`` es el SQL que restringe la columna FK de cada rama (``IN (...)``).
+    """
+    q = connection.ops.quote_name
+    ramas = []
+    for modelo, campo_fk, columna in FUENTES_COSTO:
+        fk = q(modelo._meta.get_field(campo_fk).column)
+        monto = q(modelo._meta.get_field(columna).column)
+        ramas.append(
+            f"SELECT {fk} AS categoria_id, {monto} AS monto "
+            f"FROM {q(modelo._meta.db_table)} WHERE {fk} {filtro}"
+        )
+    return (
+        "SELECT fuentes.categoria_id, SUM(fuentes.monto) FROM ("
+        + " UNION ALL ".join(ramas)
+        + ") fuentes GROUP BY fuentes.categoria_id"
+    )
+
+
+def _ejecutar_costos_directos(filtro, params, directos):
+    _sumar_costos_directos(_sql_costos_directos(filtro), params * len(FUENTES_COSTO), directos)
+
+
+def _sumar_costos_directos(sql, params, directos):
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        for categoria_id, total in cursor.fetchall():
+            if total is not None:
+                # SQLite devuelve float en SUM; MySQL devuelve Decimal
+                directos[categoria_id] += total if isinstance(total, Decimal) else Decimal(str(total))
+
+
+def consulta_costos_directos(proyecto_id):
+    """(sql, params) de la suma de costos directos por categoría de un proyecto."""
+    q = connection.ops.quote_name
+    filtro = (
+        f"IN (SELECT {q('id')} FROM {q(CategoriaNuevo._meta.db_table)} "
+        f"WHERE {q(CategoriaNuevo._meta.get_field('proyecto').column)} = %s)"
+    )
+    return _sql_costos_directos(filtro), [proyecto_id] * len(FUENTES_COSTO)
+
+
+def costos_directos_por_categoria(proyecto_id=None, categoria_ids=None):
+    """Suma, por categoría, los montos de todas las fuentes registradas en una sola consulta.
+
+    Acepta un proyecto completo o un conjunto arbitrario de ids de categoría.
+    """
+    directos = defaultdict(lambda: CERO)
+    if categoria_ids is not None:
+        categoria_ids = list(categoria_ids)
+        for inicio in range(0, len(categoria_ids), TAMANO_LOTE_IDS):
+            lote = categoria_ids[inicio:inicio + TAMANO_LOTE_IDS]
+            filtro = "IN (" + ", ".join(["%s"] * len(lote)) + ")"
+            _ejecutar_costos_directos(filtro, lote, directos)
+    elif proyecto_id is not None:
+        _sumar_costos_directos(*consulta_costos_directos(proyecto_id), directos)
+    return directos
+
+
+CAMPOS_ARBOL = ('id', 'nombre', 'id_padre_id', 'total_costo', 'ruta')
+# Categorías cuyo total no es la suma de sus hijas
+NOMBRES_ESPECIALES = (NOMBRE_INGENIERIA, NOMBRE_GESTION_COMPRAS)
+
+
+def _profundidades(por_id):
+    """Devuelve {id: distancia a la categoría más alta cargada} para ordenar de hojas a raíz."""
+    profundidad = {}
+    for categoria_id in por_id:
+        camino = []
+        actual = categoria_id
+        while actual in por_id and actual not in profundidad and actual not in camino:
+            camino.append(actual)
+            actual = por_id[actual].id_padre_id
+        base = profundidad.get(actual, -1)
+        for nivel, nodo in enumerate(reversed(camino), start=1):
+            profundidad[nodo] = base + nivel
+    return profundidad
+
+
+def reglas_explicitas(proyecto_id):
+    """Reglas de costo derivado configuradas para el proyecto."""
+    return [
+        Regla(*fila) for fila in
+        ReglaCostoDerivado.objects.filter(proyecto_id=proyecto_id).values_list('categoria_id', 'base', 'tasa')
+    ]
+
+
+def reglas_por_nombre(categorias):
+    """Reglas por defecto (contingencia y asistencia del vendor) detectadas por nombre."""
+    reglas = []
+    for categoria in categorias:
+        regla = REGLAS_POR_DEFECTO.get(categoria.nombre.strip().lower())
+        if regla:
+            reglas.append(Regla(categoria.id, *regla))
+    return reglas
+
+
+def _calcular_totales(proyecto_id, por_id, sucias, directos, reglas, ajustes_adquisiciones=None):
+    """Calcula en memoria los totales de las categorías ``sucias`` sin escribir nada.
+
+    ``por_id`` debe contener las categorías sucias, sus hijas y las raíces del proyecto.
+    Las categorías con una regla de costo derivado se calculan en una segunda etapa,
+    una sola vez, a partir de los totales base. ``ajustes_adquisiciones``
+    ({categoria_id: delta}) se suma al total de adquisiciones guardado.
+    """
+    hijos = defaultdict(list)
+    for categoria in por_id.values():
+        if categoria.id_padre_id in por_id:
+            hijos[categoria.id_padre_id].append(categoria.id)
+
+    reglas = [r for r in reglas if r.categoria_id in por_id]
+    derivadas = {r.categoria_id for r in reglas}
+    reglas_sucias = [r for r in reglas if r.categoria_id in sucias]
+
+    nombres = {cid: c.nombre.lower() for cid, c in por_id.items()}
+    nombres_sucios = {nombres[cid] for cid in sucias if cid not in derivadas}
+
+    ingenieria = {}
+    if NOMBRE_INGENIERIA in nombres_sucios:
+        ingenieria = _sumas_por_categoria(DatosEP, 'id_categoria', F('hh_profesionales') * F('precio_hh'), proyecto_id)
+
+    gestion_compras = {}
+    if NOMBRE_GESTION_COMPRAS in nombres_sucios:
+        gestion_compras = _sumas_por_categoria(DatosOtrosEP, 'id_categoria', F('gestiones') + F('viajes'), proyecto_id)
+
+    totales = {}
+
+    def valor(categoria_id):
+        if categoria_id in totales:
+            return totales[categoria_id]
+        return _redondear(por_id[categoria_id].total_costo)
+
+    # 1. Rollup base desde las hojas; las categorías derivadas valen 0 hasta la etapa 2
+    profundidad = _profundidades(por_id)
+    for categoria_id in sorted(sucias, key=profundidad.get, reverse=True):
+        nombre = nombres[categoria_id]
+        if categoria_id in derivadas:
+            total = CERO
+        elif nombre == NOMBRE_INGENIERIA:
+            total = ingenieria.get(categoria_id, CERO)
+        elif nombre == NOMBRE_GESTION_COMPRAS:
+            total = gestion_compras.get(categoria_id, CERO)
+        else:
+            total = directos.get(categoria_id, CERO) + sum((valor(h) for h in hijos.get(categoria_id, ())), CERO)
+        totales[categoria_id] = _redondear(total)
+
+    # 2. Costos derivados: cada base se calcula una vez y el monto solo sube a los ancestros,
+    # sin volver a disparar la etapa (no hay ciclo contingencia -> padres -> contingencia)
+    raices = [cid for cid, c in por_id.items() if c.id_padre_id is None]
+    for base_regla in ORDEN_BASES:
+        reglas_etapa = [r for r in reglas_sucias if r.base == base_regla]
+        if not reglas_etapa:
+            continue
+
+        if base_regla == ReglaCostoDerivado.BASE_ADQUISICIONES:
+            adquisiciones_total = _sumas_por_categoria(Adquisiciones, 'id_categoria', 'total', proyecto_id)
+            for categoria_id, delta in (ajustes_adquisiciones or {}).items():
+                adquisiciones_total[categoria_id] = adquisiciones_total.get(categoria_id, CERO) + delta
+            total_adquisiciones = sum(adquisiciones_total.values(), CERO)
+            bases = {r.categoria_id: total_adquisiciones - adquisiciones_total.get(r.categoria_id, CERO)
+                     for r in reglas_etapa}
+        else:
+            derivadas_raices = {r.categoria_id for r in reglas if r.base == ReglaCostoDerivado.BASE_RAICES}
+            total_raices = sum((valor(r) for r in raices if r not in derivadas_raices), CERO)
+            bases = {r.categoria_id: total_raices for r in reglas_etapa}
+
+        for regla in reglas_etapa:
+            monto = _redondear(bases[regla.categoria_id] * regla.tasa)
+            totales[regla.categoria_id] = monto
+            padre_id = por_id[regla.categoria_id].id_padre_id
+            while padre_id in totales and padre_id not in derivadas and nombres[padre_id] not in NOMBRES_ESPECIALES:
+                totales[padre_id] += monto
+                padre_id = por_id[padre_id].id_padre_id
+
+    return totales
+
+
+def _recalcular(proyecto_id, por_id, sucias, directos, reglas):
+    """Recalcula las categorías ``sucias`` usando los totales guardados para el resto.
+
+    Escribe solo los totales que cambian y actualiza el costo_total del proyecto.
+    """
+    totales = _calcular_totales(proyecto_id, por_id, sucias, directos, reglas)
+
+    # 3. Escribir solo las categorías cuyo total cambió
+    modificadas = []
+    for categoria_id, total in totales.items():
+        categoria = por_id[categoria_id]
+        if categoria.total_costo is None or Decimal(categoria.total_costo) != total:
+            categoria.total_costo = total
+            modificadas.append(categoria)
+    if modificadas:
+        CategoriaNuevo.objects.bulk_update(modificadas, ['total_costo'], batch_size=500)
+
+    raices = [cid for cid, c in por_id.items() if c.id_padre_id is None]
+    costo_total = sum((totales.get(r, _redondear(por_id[r].total_costo)) for r in raices), CERO)
+    ProyectoNuevo.objects.filter(id=proyecto_id).update(costo_total=costo_total)
+    invalidar_resumen(proyecto_id)
+
+    return totales
+
+
+@transaction.atomic
+def recalcular_proyecto(proyecto_id):
+    """Recalcula el total_costo de todas las categorías del proyecto y su costo_total.
+
+    Retorna un diccionario {id_categoria: total_costo}.
+    """
+    por_id = {
+        c.id: c for c in CategoriaNuevo.objects.del_proyecto(proyecto_id).only(*CAMPOS_ARBOL)
+    }
+    if not por_id:
+        ProyectoNuevo.objects.filter(id=proyecto_id).update(costo_total=CERO)
+        invalidar_resumen(proyecto_id)
+        return {}
+
+    reglas = reglas_explicitas(proyecto_id) or reglas_por_nombre(por_id.values())
+    directos = costos_directos_por_categoria(proyecto_id=proyecto_id)
+    return _recalcular(proyecto_id, por_id, set(por_id), directos, reglas)
+
+
+def simular_proyecto(proyecto_id, deltas_directos=None, deltas_adquisiciones=None):
+    """Totales {id_categoria: total} que dejaría un recálculo completo del proyecto, sin escribir.
+
+    ``deltas_directos`` ({categoria_id: delta}) se suma al costo directo guardado de cada
+    categoría y ``deltas_adquisiciones`` al total de adquisiciones (base del vendor).
+    """
+    por_id = {
+        c.id: c for c in CategoriaNuevo.objects.del_proyecto(proyecto_id).only(*CAMPOS_ARBOL)
+    }
+    if not por_id:
+        return {}
+
+    reglas = reglas_explicitas(proyecto_id) or reglas_por_nombre(por_id.values())
+    directos = costos_directos_por_categoria(proyecto_id=proyecto_id)
+    for categoria_id, delta in (deltas_directos or {}).items():
+        directos[categoria_id] += delta
+    return _calcular_totales(proyecto_id, por_id, set(por_id), directos, reglas, deltas_adquisiciones)
+
+
+@transaction.atomic
+def _recalcular_camino(proyecto_id, categoria_ids, afecta_adquisiciones):
+    """Recalcula solo las categorías modificadas, sus ancestros y las categorías derivadas.
+
+    Los ancestros se leen de la ruta materializada en una sola consulta; solo para
+    categorías sin ruta se sube por ``id_padre`` un nivel por consulta. Las reglas
+    basadas en adquisiciones se reevalúan solo si ``afecta_adquisiciones``.
+    """
+    bases = set(ORDEN_BASES) if afecta_adquisiciones else {ReglaCostoDerivado.BASE_RAICES}
+
+    reglas = reglas_explicitas(proyecto_id)
+    if reglas:
+        filtro_derivadas = Q(id__in=[r.categoria_id for r in reglas if r.base in bases])
+    else:
+        filtro_derivadas = Q(pk__in=[])
+        for nombre, (base, _) in REGLAS_POR_DEFECTO.items():
+            if base in bases:
+                filtro_derivadas |= Q(proyecto_id=proyecto_id, nombre__iexact=nombre)
+
+    por_id = {
+        c.id: c for c in CategoriaNuevo.objects.filter(Q(id__in=categoria_ids) | filtro_derivadas).only(*CAMPOS_ARBOL)
+    }
+    if not reglas:
+        reglas = [r for r in reglas_por_nombre(por_id.values()) if r.base in bases]
+
+    def ancestros_pendientes(categorias):
+        ids = set()
+        for categoria in categorias:
+            ids.update(categoria.ids_ancestros() if categoria.ruta else [categoria.id_padre_id])
+        return ids - set(por_id) - {None}
+
+    # Cada ancestro se visita una sola vez aunque lo compartan varias ramas
+    pendientes = ancestros_pendientes(por_id.values())
+    while pendientes:
+        nivel = list(CategoriaNuevo.objects.filter(id__in=pendientes).only(*CAMPOS_ARBOL))
+        por_id.update((c.id, c) for c in nivel)
+        pendientes = ancestros_pendientes(nivel)
+
+    sucias = set(por_id)
+
+    # Hermanas de los nodos sucios y raíces del proyecto, con su total guardado
+    contexto = CategoriaNuevo.objects.filter(
+        Q(id_padre_id__in=sucias) | Q(proyecto_id=proyecto_id, id_padre__isnull=True)
+    ).only(*CAMPOS_ARBOL)
+    for categoria in contexto:
+        por_id.setdefault(categoria.id, categoria)
+
+    directos = costos_directos_por_categoria(categoria_ids=sucias)
+    return _recalcular(proyecto_id, por_id, sucias, directos, reglas)
+
+
+# Estado por hilo del recálculo diferido: profundidad de anidamiento y
+# {proyecto_id: {ids de categorías modificadas}}
+_estado = threading.local()
+
+
+def rollups_diferidos():
+    """Indica si el hilo actual está dentro de un bloque ``defer_rollups()``."""
+    return getattr(_estado, 'profundidad', 0) > 0
+
+
+def solicitar_rollup(proyecto_id, categoria_id=None):
+    """Pide el recálculo del proyecto tras modificar una categoría.
+
+    Dentro de ``defer_rollups()`` solo registra la categoría como pendiente y retorna None;
+    fuera de él recalcula de inmediato y retorna los totales.
+    """
+    if proyecto_id is None:
+        return None
+    if rollups_diferidos():
+        pendientes = _estado.pendientes.setdefault(proyecto_id, set())
+        if categoria_id is not None:
+            pendientes.add(categoria_id)
+        return None
+    return recalcular_proyecto(proyecto_id)
+
+
+def propagar_cambio(categoria_id, proyecto_id, afecta_adquisiciones=False):
+    """Propaga un cambio de costo directo desde la categoría hacia la raíz.
+
+    Es el único punto de propagación de los ``save()``/``delete()`` de las tablas de
+    costos. ``afecta_adquisiciones`` indica que cambió el total de adquisiciones del proyecto.
+    Dentro de ``defer_rollups()`` solo registra la categoría como pendiente.
+    """
+    if categoria_id is None or proyecto_id is None:
+        return None
+    if rollups_diferidos():
+        return solicitar_rollup(proyecto_id, categoria_id)
+    return _recalcular_camino(proyecto_id, [categoria_id], afecta_adquisiciones)
+
+
+def propagar_eliminacion(proyecto_id, padre_ids):
+    """Recalcula el proyecto tras eliminar categorías cuyos padres (que siguen existiendo) son ``padre_ids``.
+
+    Los padres y sus ancestros se recalculan juntos, una vez cada uno; sin padres (se
+    borraron raíces) solo se recalculan las categorías derivadas y el costo del proyecto.
+    Dentro de ``defer_rollups()`` solo registra los padres como pendientes.
+    """
+    if proyecto_id is None:
+        return None
+    if rollups_diferidos():
+        solicitar_rollup(proyecto_id)
+        for padre_id in padre_ids:
+            solicitar_rollup(proyecto_id, padre_id)
+        return None
+    # Las adquisiciones de las categorías borradas dejan de contar para el vendor
+    return _recalcular_camino(proyecto_id, list(padre_ids), afecta_adquisiciones=True)
+
+
+class defer_rollups(ContextDecorator):
+    """Difiere los recálculos de costos hasta el final del bloque.
+
+    Uso como context manager (``with defer_rollups(): ...``) o como decorador de
+    vistas (``@defer_rollups()``). Los bloques anidados se acumulan en el más externo,
+    que al salir ejecuta un recálculo por cada proyecto afectado.
+    """
+
+    def __enter__(self):
+        profundidad = getattr(_estado, 'profundidad', 0)
+        if profundidad == 0:
+            _estado.pendientes = {}
+        _estado.profundidad = profundidad + 1
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _estado.profundidad -= 1
+        if _estado.profundidad:
+            return False
+
+        pendientes, _estado.pendientes = _estado.pendientes, {}
+        # Si la transacción en curso quedó marcada para rollback no se puede consultar
+        if exc_type is not None and transaction.get_connection().needs_rollback:
+            return False
+        for proyecto_id in pendientes:
+            recalcular_proyecto(proyecto_id)
+        return False
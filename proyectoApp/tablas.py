@@ -0,0 +1,162 @@
+"""Paginación, orden y filtros en el servidor para las tablas AJAX de los Listado*.
+
+Cada página se lee por *keyset*: el ``cursor`` guarda el valor de la columna de orden y
+el id de la última fila entregada, y la página siguiente se pide con ``WHERE (col, id) >
+(valor, id)``. Así el costo de una página no crece con su posición en la tabla, a
+diferencia de un OFFSET. ``desplazamiento`` queda como respaldo para saltar a una página
+arbitraria (p. ej. "Último" en la tabla).
+
+Parámetros (GET): ``limite``, ``orden`` (columna, con ``-`` para descendente),
+``cursor``, ``desplazamiento``, ``proyecto``, ``buscar`` (texto en las columnas de texto)
+y ``filtro[<columna>]`` (contiene en columnas de texto, igualdad en las demás).
+"""
+import base64
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F, Q
+from django.http import JsonResponse
+
+
+LIMITE_DEFECTO = 50
+LIMITE_MAXIMO = 500
+TIPOS_TEXTO = ('CharField', 'TextField')
+
+
+def _es_texto(campo):
+    return campo.get_internal_type() in TIPOS_TEXTO
+
+
+def _entero(parametros, nombre, defecto, minimo=0, maximo=None):
+    valor = parametros.get(nombre)
+    if valor in (None, ''):
+        return defecto
+    try:
+        valor = int(valor)
+    except ValueError:
+        raise ValueError(f"{nombre} debe ser un entero") from None
+    if valor < minimo:
+        raise ValueError(f"{nombre} debe ser mayor o igual a {minimo}")
+    return min(valor, maximo) if maximo else valor
+
+
+def _valor(campo, texto, nombre):
+    """Convierte ``texto`` al tipo de ``campo`` (para filtros y cursores)."""
+    if texto is None:
+        return None
+    try:
+        return campo.to_python(texto)
+    except ValidationError:
+        raise ValueError(f"Valor no válido para {nombre}: {texto}") from None
+
+
+def codificar_cursor(orden, valor, pk):
+    datos = json.dumps([orden, valor, pk], cls=DjangoJSONEncoder)
+    return base64.urlsafe_b64encode(datos.encode()).decode()
+
+
+def decodificar_cursor(cursor):
+    try:
+        orden, valor, pk = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError):
+        raise ValueError("cursor no válido") from None
+    return orden, valor, pk
+
+
+def _despues_de(columna, valor, pk, descendente):
+    """Filas posteriores a (valor, pk) en el orden de la tabla; los nulos van al final."""
+    mayor = 'lt' if descendente else 'gt'
+    if valor is None:
+        return Q(**{f'{columna}__isnull': True, f'pk__{mayor}': pk})
+    return (
+        Q(**{f'{columna}__{mayor}': valor})
+        | Q(**{columna: valor, f'pk__{mayor}': pk})
+        | Q(**{f'{columna}__isnull': True})
+    )
+
+
+def pagina_tabla(queryset, columnas, parametros):
+    """Una página de ``queryset`` con las ``columnas`` pedidas.
+
+    Retorna {data, total, siguiente, orden, limite}; ``total`` cuenta las filas que pasan
+    los filtros y ``siguiente`` es el cursor de la página siguiente (None en la última).
+    Lanza ValueError si algún parámetro no es válido.
+    """
+    modelo = queryset.model
+    campos = {columna: modelo._meta.get_field(columna) for columna in columnas}
+    pk = modelo._meta.pk.name
+
+    # ``proyecto`` solo aplica a las tablas con PorProyectoQuerySet (ver models.py)
+    if parametros.get('proyecto') and hasattr(queryset, 'del_proyecto'):
+        queryset = queryset.del_proyecto(parametros['proyecto'])
+
+    for columna, campo in campos.items():
+        texto = parametros.get(f'filtro[{columna}]', '').strip()
+        if not texto:
+            continue
+        if _es_texto(campo):
+            queryset = queryset.filter(**{f'{columna}__icontains': texto})
+        else:
+            queryset = queryset.filter(**{columna: _valor(campo, texto, columna)})
+
+    buscar = parametros.get('buscar', '').strip()
+    if buscar:
+        condicion = Q()
+        for columna, campo in campos.items():
+            if _es_texto(campo):
+                condicion |= Q(**{f'{columna}__icontains': buscar})
+        if condicion:
+            queryset = queryset.filter(condicion)
+
+    orden = parametros.get('orden') or pk
+    descendente = orden.startswith('-')
+    columna = orden.lstrip('-')
+    if columna != pk and columna not in campos:
+        raise ValueError(f"No se puede ordenar por {columna}")
+    limite = _entero(parametros, 'limite', LIMITE_DEFECTO, minimo=1, maximo=LIMITE_MAXIMO)
+
+    total = queryset.count()
+    if descendente:
+        queryset = queryset.order_by(F(columna).desc(nulls_last=True), f'-{pk}')
+    else:
+        queryset = queryset.order_by(F(columna).asc(nulls_last=True), pk)
+
+    cursor = parametros.get('cursor')
+    desplazamiento = 0
+    if cursor:
+        orden_cursor, valor, ultimo = decodificar_cursor(cursor)
+        if orden_cursor != orden:
+            raise ValueError("El cursor corresponde a otro orden")
+        campo = campos.get(columna) or modelo._meta.pk
+        valor = _valor(campo, valor, columna)
+        queryset = queryset.filter(_despues_de(columna, valor, ultimo, descendente))
+    else:
+        desplazamiento = _entero(parametros, 'desplazamiento', 0)
+
+    # Una fila extra indica si hay página siguiente sin contar de nuevo
+    valores = list(dict.fromkeys((*columnas, pk, columna)))
+    filas = list(queryset.values(*valores)[desplazamiento:desplazamiento + limite + 1])
+    siguiente = None
+    if len(filas) > limite:
+        filas = filas[:limite]
+        siguiente = codificar_cursor(orden, filas[-1][columna], filas[-1][pk])
+    data = [{c: fila[c] for c in columnas} for fila in filas]
+    return {'data': data, 'total': total, 'siguiente': siguiente, 'orden': orden, 'limite': limite}
+
+
+class TablaAjaxMixin:
+    """Responde las peticiones AJAX de un ListView con una página de ``pagina_tabla``.
+
+    ``columnas`` son los campos que se envían (y por los que se puede ordenar y filtrar).
+    """
+    columnas = ()
+
+    def get(self, request, *args, **kwargs):
+        if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+            try:
+                pagina = pagina_tabla(self.get_queryset(), self.columnas, request.GET)
+            except ValueError as error:
+                return JsonResponse({'error': str(error)}, status=400)
+            return JsonResponse(pagina)
+        return super().get(request, *args, **kwargs)
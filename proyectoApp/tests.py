@@ -1,3 +1,1333 @@
-from django.test import TestCase
+import hashlib
+import importlib
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+import openpyxl
+import pandas as pd
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import F
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.test.utils import CaptureQueriesContext
+
+from .models import (
+    ProyectoNuevo, CategoriaNuevo, Adquisiciones, Cantidades, ManoObra, StaffEnami, DatosEP, ReglaCostoDerivado,
+    MB, CotizacionMateriales, AdministracionSupervision, PersonalIndirectoContratista, TrabajoImportacion,
+    ArchivoSubido, ApuGeneral, ApuEspecifico,
+)
+from .calculos import CALCULADORAS, calcular_adquisicion, valor_guardado
+from .rollup import recalcular_proyecto, costos_directos_por_categoria, defer_rollups
+from .importacion import cargar_directorio, importar_archivo, importar_dataframe, leer_por_bloques
+from . import trabajos
+from .cargar_datos import CARGAS, CARGA_ADQUISICIONES, CARGA_CATEGORIA_NUEVA
+from .arbol import calcular_rutas, reconstruir_rutas
+from .plan_carga import ejecutar_plan, grafo_carga, orden_topologico
+from .resumen import CACHE, resumen_proyecto
+
+
+def crear_arbol_prueba():
+    """Proyecto con raíz -> intermedia -> hoja, Ingeniería de Detalles, Vendor y Contingencia."""
+    proyecto = ProyectoNuevo.objects.create(id='P1', nombre='Proyecto 1')
+    raiz = CategoriaNuevo.objects.create(id='1', nombre='Directos', proyecto=proyecto, nivel=1)
+    intermedia = CategoriaNuevo.objects.create(id='11', nombre='Obras', proyecto=proyecto, id_padre=raiz, nivel=2)
+    hoja = CategoriaNuevo.objects.create(id='111', nombre='Hormigon', proyecto=proyecto, id_padre=intermedia, nivel=3, final=True)
+    indirectos = CategoriaNuevo.objects.create(id='2', nombre='Indirectos', proyecto=proyecto, nivel=1)
+    ingenieria = CategoriaNuevo.objects.create(id='21', nombre='Ingenieria de Detalles', proyecto=proyecto, id_padre=indirectos, nivel=2)
+    vendor = CategoriaNuevo.objects.create(id='22', nombre='Asistencia Tecnica del Vendor', proyecto=proyecto, id_padre=indirectos, nivel=2)
+    contingencia = CategoriaNuevo.objects.create(id='3', nombre='Contingencia', proyecto=proyecto, nivel=1)
+
+    Cantidades.objects.create(id_categoria=hoja, unidad_medida='m3', cantidad=Decimal('10'), fc=Decimal('0'))
+    Adquisiciones.objects.create(id_categoria=hoja, tipo_origen='N', tipo_categoria='M', costo_unitario=Decimal('100'), crecimiento=Decimal('0'))
+    ManoObra.objects.create(id_categoria=intermedia, horas_hombre_unidad=Decimal('2'), fp=Decimal('1'), costo_hombre_hora=Decimal('5'))
+    StaffEnami.objects.create(nombre='jefe', valor=Decimal('1'), dotacion=1, duracion=1, factor_utilizacion=Decimal('1'), categoria=raiz)
+    DatosEP.objects.create(id='EP1', hh_profesionales=Decimal('10'), precio_hh=Decimal('3'), id_categoria=ingenieria)
+
+    return proyecto, {c.id: c for c in (raiz, intermedia, hoja, indirectos, ingenieria, vendor, contingencia)}
+
+
+class RollupProyectoTests(TestCase):
+    def setUp(self):
+        self.proyecto, self.categorias = crear_arbol_prueba()
+
+    def totales_bd(self):
+        return dict(CategoriaNuevo.objects.filter(proyecto=self.proyecto).values_list('id', 'total_costo'))
+
+    def test_totales_coinciden_con_calculo_recursivo(self):
+        totales = self.totales_bd()
+
+        # Hoja: 10 * 100 de adquisiciones; intermedia suma la mano de obra sin cantidades (0)
+        self.assertEqual(totales['111'], Decimal('1000.00'))
+        self.assertEqual(totales['11'], Decimal('1000.00'))
+        # Raíz: intermedia + staff (1 * 1 * 180)
+        self.assertEqual(totales['1'], Decimal('1180.00'))
+        # Ingeniería de detalles: hh * precio; vendor: 5% x 10% de las adquisiciones del proyecto
+        self.assertEqual(totales['21'], Decimal('30.00'))
+        self.assertEqual(totales['22'], Decimal('5.00'))
+        self.assertEqual(totales['2'], Decimal('35.00'))
+        # Contingencia: 13% de las demás raíces
+        self.assertEqual(totales['3'], Decimal('157.95'))
+
+        self.proyecto.refresh_from_db()
+        self.assertEqual(self.proyecto.costo_total, Decimal('1372.95'))
+
+    def test_recalcular_restaura_totales_alterados(self):
+        esperados = self.totales_bd()
+        CategoriaNuevo.objects.filter(proyecto=self.proyecto).update(total_costo=Decimal('0'))
+
+        totales = recalcular_proyecto(self.proyecto.id)
+
+        self.assertEqual(totales, esperados)
+        self.assertEqual(self.totales_bd(), esperados)
+
+    def test_numero_de_consultas_no_depende_del_tamano_del_arbol(self):
+        padre = self.categorias['111']
+        for nivel in range(4, 30):
+            padre = CategoriaNuevo.objects.create(
+                id=f'n{nivel}', nombre=f'Nivel {nivel}', proyecto=self.proyecto, id_padre=padre, nivel=nivel
+            )
+        CategoriaNuevo.objects.filter(proyecto=self.proyecto).update(total_costo=Decimal('1'))
+
+        with self.assertNumQueries(9):
+            recalcular_proyecto(self.proyecto.id)
+
+    def test_costos_directos_en_una_consulta_para_un_conjunto_de_categorias(self):
+        with self.assertNumQueries(1):
+            directos = costos_directos_por_categoria(categoria_ids=['111', '1', '21'])
+
+        self.assertEqual(directos['111'], Decimal('1000.00'))
+        self.assertEqual(directos['1'], Decimal('180.00'))
+        # DatosEP aporta su precio_hh como costo directo
+        self.assertEqual(directos['21'], Decimal('3.00'))
+        self.assertNotIn('11', directos)
+
+
+class DeferRollupsTests(TestCase):
+    def setUp(self):
+        self.proyecto, self.categorias = crear_arbol_prueba()
+
+    def test_recalcula_una_vez_al_salir_del_bloque(self):
+        hoja = self.categorias['111']
+        with defer_rollups():
+            with defer_rollups():
+                for _ in range(3):
+                    Adquisiciones.objects.create(id_categoria=hoja, tipo_origen='N', tipo_categoria='M',
+                                                 costo_unitario=Decimal('100'), crecimiento=Decimal('0'))
+            # Dentro del bloque los totales aún no se recalculan
+            self.assertEqual(CategoriaNuevo.objects.get(id='111').total_costo, Decimal('1000.00'))
+
+        self.assertEqual(CategoriaNuevo.objects.get(id='111').total_costo, Decimal('4000.00'))
+        self.assertEqual(CategoriaNuevo.objects.get(id='1').total_costo, Decimal('4180.00'))
+        # Vendor: 5% x 10% de 4000
+        self.assertEqual(CategoriaNuevo.objects.get(id='22').total_costo, Decimal('20.00'))
+
+    def test_decorador_difiere_dentro_de_la_funcion(self):
+        @defer_rollups()
+        def eliminar_adquisiciones():
+            for adquisicion in Adquisiciones.objects.all():
+                adquisicion.delete()
+
+        eliminar_adquisiciones()
+        self.assertEqual(CategoriaNuevo.objects.get(id='111').total_costo, Decimal('0.00'))
+        self.proyecto.refresh_from_db()
+        self.assertEqual(self.proyecto.costo_total, Decimal('237.30'))
+
+
+class PropagacionCaminoTests(TestCase):
+    def setUp(self):
+        self.proyecto, self.categorias = crear_arbol_prueba()
+
+    def crear_rama(self, profundidad):
+        padre = self.categorias['111']
+        for nivel in range(4, 4 + profundidad):
+            padre = CategoriaNuevo.objects.create(
+                id=f'r{nivel}', nombre=f'Rama {nivel}', proyecto=self.proyecto, id_padre=padre, nivel=nivel
+            )
+        return padre
+
+    def consultas_al_editar_hoja(self, hoja):
+        with CaptureQueriesContext(connection) as consultas:
+            StaffEnami.objects.create(nombre='residente', valor=Decimal('1'), dotacion=1, duracion=1,
+                                      factor_utilizacion=Decimal('1'), categoria=hoja)
+        return len(consultas)
+
+    def test_consultas_acotadas_por_profundidad(self):
+        hoja = self.crear_rama(20)
+        profundidad = hoja.nivel
+
+        # Una consulta por nivel para subir por id_padre más un número fijo
+        self.assertLessEqual(self.consultas_al_editar_hoja(hoja), profundidad + 10)
+
+        # Agregar categorías hermanas no cambia el costo de editar la hoja
+        for i in range(50):
+            CategoriaNuevo.objects.create(id=f'h{i}', nombre=f'Hermana {i}', proyecto=self.proyecto,
+                                          id_padre=self.categorias['11'], nivel=3)
+        self.assertLessEqual(self.consultas_al_editar_hoja(hoja), profundidad + 10)
+
+    def test_camino_coincide_con_recalculo_completo(self):
+        hoja = self.crear_rama(5)
+        StaffEnami.objects.create(nombre='residente', valor=Decimal('2'), dotacion=1, duracion=1,
+                                  factor_utilizacion=Decimal('1'), categoria=hoja)
+        Adquisiciones.objects.create(id_categoria=self.categorias['111'], tipo_origen='N', tipo_categoria='M',
+                                     costo_unitario=Decimal('50'), crecimiento=Decimal('0'))
+
+        totales = dict(CategoriaNuevo.objects.filter(proyecto=self.proyecto).values_list('id', 'total_costo'))
+        self.assertEqual(totales['r8'], Decimal('360.00'))
+        self.assertEqual(recalcular_proyecto(self.proyecto.id), totales)
+
+    def test_vista_eliminar_datos_ep_no_recalcula_el_proyecto(self):
+        # delete() ya sube por el camino: la vista no agrega rollups completos
+        with mock.patch('proyectoApp.rollup.recalcular_proyecto', wraps=recalcular_proyecto) as rollup:
+            respuesta = self.client.post(reverse('eliminar_datos_ep'), {'id': 'EP1'})
+        self.assertTrue(respuesta.json()['success'])
+        self.assertEqual(rollup.call_count, 0)
+        totales = dict(CategoriaNuevo.objects.filter(proyecto=self.proyecto).values_list('id', 'total_costo'))
+        self.assertEqual(totales['21'], Decimal('0.00'))
+        self.assertEqual(recalcular_proyecto(self.proyecto.id), totales)
+
+    def test_vista_eliminar_personal_indirecto_no_recalcula_el_proyecto(self):
+        personal = PersonalIndirectoContratista.objects.create(
+            id_categoria=self.crear_rama(3), turno='5x2', unidad='hh', hh_mes=Decimal('180'), plazo_mes=Decimal('1'),
+            precio_unitario_clp_hh=Decimal('1000'),
+        )
+        with mock.patch('proyectoApp.rollup.recalcular_proyecto', wraps=recalcular_proyecto) as rollup:
+            respuesta = self.client.post(reverse('eliminar_personal_indirecto_contratista'), {'id': personal.id})
+        self.assertTrue(respuesta.json()['success'])
+        self.assertEqual(rollup.call_count, 0)
+        self.assertFalse(PersonalIndirectoContratista.objects.exists())
+
+
+class RutaMaterializadaTests(TestCase):
+    def setUp(self):
+        self.proyecto, self.categorias = crear_arbol_prueba()
+
+    def test_ruta_subarbol_y_ancestros(self):
+        hoja = CategoriaNuevo.objects.get(id='111')
+        self.assertEqual(hoja.ruta, '/1/11/111/')
+        self.assertEqual(hoja.profundidad, 2)
+
+        with self.assertNumQueries(1):
+            self.assertEqual([c.id for c in hoja.ancestros().order_by('ruta')], ['1', '11'])
+        with self.assertNumQueries(1):
+            self.assertEqual(set(self.categorias['1'].descendientes().values_list('id', flat=True)), {'11', '111'})
+
+    def test_mover_categoria_actualiza_su_subarbol(self):
+        intermedia = CategoriaNuevo.objects.get(id='11')
+        intermedia.id_padre = self.categorias['2']
+        intermedia.save()
+
+        self.assertEqual(CategoriaNuevo.objects.get(id='111').ruta, '/2/11/111/')
+
+        # Colgar una raíz de su propio descendiente formaría un ciclo
+        raiz = CategoriaNuevo.objects.get(id='2')
+        raiz.id_padre = CategoriaNuevo.objects.get(id='111')
+        with self.assertRaises(ValueError):
+            raiz.save()
+
+    def test_ruta_que_no_entra_en_la_columna_se_rechaza(self):
+        # Ids de 50 caracteres: bajo '/1/11/111/' entran 13 niveles (673 caracteres)
+        padre = self.categorias['111']
+        for nivel in range(13):
+            padre = CategoriaNuevo.objects.create(id=f"{'x' * 48}{nivel:02d}", nombre='Larga', proyecto=self.proyecto,
+                                                  id_padre=padre, nivel=nivel + 4)
+        self.assertEqual(len(padre.ruta), 673)
+        with self.assertRaises(ValueError):
+            CategoriaNuevo.objects.create(id='z' * 50, nombre='Larga', proyecto=self.proyecto, id_padre=padre, nivel=17)
+        self.assertFalse(CategoriaNuevo.objects.filter(id='z' * 50).exists())
+
+        # Mover '11' bajo una categoría de ruta larga alargaría todo su subárbol
+        destino = CategoriaNuevo.objects.create(id='y' * 50, nombre='Larga', proyecto=self.proyecto,
+                                                id_padre=self.categorias['21'], nivel=3)
+        intermedia = CategoriaNuevo.objects.get(id='11')
+        intermedia.id_padre = destino
+        with self.assertRaises(ValueError):
+            intermedia.save()
+        self.assertEqual(CategoriaNuevo.objects.get(id='11').ruta, '/1/11/')
+
+        CategoriaNuevo.objects.filter(id='11').update(id_padre=destino)
+        with self.assertRaises(ValueError):
+            reconstruir_rutas(['P1'])
+
+    def test_guardar_sin_mover_no_recalcula_la_ruta(self):
+        hoja = CategoriaNuevo.objects.get(id='111')
+        hoja.nombre = 'Hormigon H30'
+        with self.assertNumQueries(1):
+            hoja.save()
+        hoja.total_costo = Decimal('5')
+        with self.assertNumQueries(1):
+            hoja.save(update_fields=['total_costo'])
+
+        # Con update_fields, mover la categoría también guarda su ruta nueva antes de la del subárbol
+        intermedia = CategoriaNuevo.objects.get(id='11')
+        intermedia.id_padre = self.categorias['2']
+        intermedia.save(update_fields=['id_padre'])
+        self.assertEqual(CategoriaNuevo.objects.get(id='11').ruta, '/2/11/')
+        self.assertEqual(CategoriaNuevo.objects.get(id='111').ruta, '/2/11/111/')
+
+    def test_id_con_separador_se_rechaza(self):
+        with self.assertRaises(ValueError):
+            CategoriaNuevo.objects.create(id='4/1', nombre='Barra', proyecto=self.proyecto, id_padre=self.categorias['1'], nivel=2)
+        with self.assertRaises(ValueError):
+            calcular_rutas([CategoriaNuevo(id='5/2', id_padre_id=None)])
+
+    def test_migracion_calcula_las_mismas_rutas(self):
+        migracion = importlib.import_module('proyectoApp.migrations.0040_categorianuevo_ruta')
+        categorias = list(CategoriaNuevo.objects.all())
+        self.assertEqual(migracion.calcular_rutas(categorias), calcular_rutas(categorias))
+        cadena = [CategoriaNuevo(id=f"{'x' * 48}{i:02d}", id_padre_id=f"{'x' * 48}{i - 1:02d}" if i else None) for i in range(14)]
+        with self.assertRaises(ValueError):
+            migracion.calcular_rutas(cadena)
+
+    def test_comando_reconstruye_rutas(self):
+        esperadas = dict(CategoriaNuevo.objects.values_list('id', 'ruta'))
+        CategoriaNuevo.objects.update(ruta='')
+
+        call_command('reconstruir_rutas_categorias', self.proyecto.id, stdout=io.StringIO())
+
+        self.assertEqual(dict(CategoriaNuevo.objects.values_list('id', 'ruta')), esperadas)
+
+    def test_editar_hoja_no_depende_de_la_profundidad(self):
+        consultas = []
+        padre = self.categorias['111']
+        for nivel in range(4, 24):
+            padre = CategoriaNuevo.objects.create(
+                id=f'p{nivel}', nombre=f'Nivel {nivel}', proyecto=self.proyecto, id_padre=padre, nivel=nivel
+            )
+            if nivel in (5, 23):
+                with CaptureQueriesContext(connection) as capturadas:
+                    StaffEnami.objects.create(nombre='residente', valor=Decimal('1'), dotacion=1, duracion=1,
+                                              factor_utilizacion=Decimal('1'), categoria=padre)
+                consultas.append(len(capturadas))
+
+        self.assertEqual(consultas[0], consultas[1])
+
+
+class SubarbolApiTests(TestCase):
+    def setUp(self):
+        self.proyecto, self.categorias = crear_arbol_prueba()
+        padre = self.categorias['111']
+        for nivel in range(4, 10):
+            padre = CategoriaNuevo.objects.create(
+                id=f's{nivel}', nombre=f'Nivel {nivel}', proyecto=self.proyecto, id_padre=padre, nivel=nivel
+            )
+
+    def test_subarbol_completo_en_una_consulta_recursiva(self):
+        url = reverse('obtener_subcategorias', args=['1'])
+        with self.assertNumQueries(2):
+            data = self.client.get(url).json()
+
+        self.assertEqual([n['id'] for n in data], ['11'])
+        self.assertEqual(Decimal(str(data[0]['costo'])), Decimal('1000.00'))
+        nodo, niveles = data[0], 1
+        while nodo['sub_subcategorias']:
+            nodo, niveles = nodo['sub_subcategorias'][0], niveles + 1
+        self.assertEqual((nodo['id'], niveles), ('s9', 8))
+
+    def test_max_depth_y_fields(self):
+        url = reverse('obtener_subarbol_categoria', args=['1'])
+        data = self.client.get(url, {'max_depth': 2, 'fields': 'id,nivel,final'}).json()
+
+        self.assertEqual(data, [{
+            'id': '11', 'nivel': 2, 'final': False,
+            'hijos': [{'id': '111', 'nivel': 3, 'final': True, 'hijos': [], 'tiene_hijos': True}],
+        }])
+
+    def test_parametros_invalidos(self):
+        url = reverse('obtener_subarbol_categoria', args=['1'])
+        self.assertEqual(self.client.get(url, {'max_depth': 'x'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'fields': 'id,clave'}).status_code, 400)
+        self.assertEqual(self.client.get(reverse('obtener_subarbol_categoria', args=['zz'])).status_code, 404)
+
+
+class ReglasCostoDerivadoTests(TestCase):
+    def setUp(self):
+        self.proyecto, self.categorias = crear_arbol_prueba()
+
+    def total(self, categoria_id):
+        return CategoriaNuevo.objects.get(id=categoria_id).total_costo
+
+    def test_reglas_explicitas_reemplazan_la_deteccion_por_nombre(self):
+        # Solo una regla: la contingencia pasa a 10% y el vendor deja de ser derivado
+        ReglaCostoDerivado.objects.create(categoria=self.categorias['3'], base=ReglaCostoDerivado.BASE_RAICES,
+                                          tasa=Decimal('0.10'))
+
+        self.assertEqual(self.total('22'), Decimal('0.00'))
+        self.assertEqual(self.total('2'), Decimal('30.00'))
+        self.assertEqual(self.total('3'), Decimal('121.00'))
+
+    def test_regla_sobre_cualquier_categoria_y_recalculo_al_editar(self):
+        gestion = CategoriaNuevo.objects.create(id='23', nombre='Gestion del Proyecto', proyecto=self.proyecto,
+                                                id_padre=self.categorias['2'], nivel=2)
+        ReglaCostoDerivado.objects.create(categoria=gestion, base=ReglaCostoDerivado.BASE_ADQUISICIONES,
+                                          tasa=Decimal('0.02'))
+        ReglaCostoDerivado.objects.create(categoria=self.categorias['3'], base=ReglaCostoDerivado.BASE_RAICES,
+                                          tasa=Decimal('0.13'))
+        self.assertEqual(self.total('23'), Decimal('20.00'))
+
+        # Una nueva adquisición actualiza la regla de adquisiciones y luego la de raíces
+        Adquisiciones.objects.create(id_categoria=self.categorias['111'], tipo_origen='N', tipo_categoria='M',
+                                     costo_unitario=Decimal('100'), crecimiento=Decimal('0'))
+        self.assertEqual(self.total('23'), Decimal('40.00'))
+        self.assertEqual(self.total('2'), Decimal('70.00'))
+        self.assertEqual(self.total('3'), Decimal('292.50'))
+
+        totales = dict(CategoriaNuevo.objects.filter(proyecto=self.proyecto).values_list('id', 'total_costo'))
+        self.assertEqual(recalcular_proyecto(self.proyecto.id), totales)
+
+
+class ImportacionMasivaTests(TestCase):
+    def setUp(self):
+        self.proyecto, self.categorias = crear_arbol_prueba()
+
+    def hoja_adquisiciones(self, filas):
+        return pd.DataFrame(filas, columns=['id_categoria', 'tipo_origen', 'tipo_categoria', 'costo_unitario', 'crecimiento'], dtype=str)
+
+    def test_adquisiciones_calculadas_omitidas_y_rechazadas(self):
+        df = self.hoja_adquisiciones([
+            ['111.0', 'N', 'M', '100', '0'],   # ya existe: se omite
+            ['111', 'I', 'M', '50', '10'],
+            ['111', 'X', 'M', '1,5', None],
+            ['zz', 'N', 'M', '10', '0'],       # categoría inexistente
+            ['111', 'Y', 'M', '10', '-1'],     # crecimiento negativo
+            ['111', 'Z', 'M', 'abc', '0'],     # número inválido
+        ])
+
+        resultado = importar_dataframe(CARGA_ADQUISICIONES, df)
+
+        self.assertEqual((resultado.nuevos, resultado.omitidos, len(resultado.errores)), (2, 1, 3))
+        self.assertEqual([fila for fila, _ in resultado.errores], [7, 6, 5])
+        nueva = Adquisiciones.objects.get(tipo_origen='I')
+        # Mismas fórmulas que save(): cantidad final 10 * 50 * 1,10
+        self.assertEqual(nueva.total, Decimal('550.00'))
+        self.assertEqual(nueva.total_con_flete, Decimal('550.00'))
+        self.assertEqual(Adquisiciones.objects.get(tipo_origen='X').total, Decimal('15.00'))
+        # El rollup final deja los totales igual que un recálculo completo
+        self.assertEqual(CategoriaNuevo.objects.get(id='111').total_costo, Decimal('1565.00'))
+        totales = dict(CategoriaNuevo.objects.filter(proyecto=self.proyecto).values_list('id', 'total_costo'))
+        self.assertEqual(recalcular_proyecto(self.proyecto.id), totales)
+
+    def test_lectura_por_bloques_equivale_a_read_excel(self):
+        libro = openpyxl.Workbook()
+        hoja = libro.active
+        hoja.append(['id', 'monto', 'texto', 'fecha'])
+        hoja.append([4000.0, 12.5, '0012', datetime(2024, 1, 5)])
+        hoja.append([None, None, None, None])  # fila vacía: se salta sin correr la numeración
+        hoja.append([7, 3, None, '05-01-2024'])
+        hoja.append([8, 0.1, 'x', None])
+        ruta = os.path.join(tempfile.mkdtemp(), 'planilla.xlsx')
+        self.addCleanup(os.remove, ruta)
+        libro.save(ruta)
+
+        bloques = list(leer_por_bloques(ruta, tamano=2))
+
+        self.assertEqual([list(bloque.index) for bloque in bloques], [[0, 2], [3]])
+        esperado = pd.read_excel(ruta, dtype=str).dropna(how='all')
+        pd.testing.assert_frame_equal(pd.concat(bloques).fillna(np.nan), esperado.astype(object), check_dtype=False)
+
+    def test_csv_por_bloques_conserva_filas_y_conteos(self):
+        csv = self.hoja_adquisiciones(
+            [['111', f'T{i}', 'M', '2', '0'] for i in range(5)] + [['zz', 'T9', 'M', '1', '0']]
+        ).to_csv(index=False).encode()
+
+        with mock.patch('proyectoApp.rollup.recalcular_proyecto', wraps=recalcular_proyecto) as rollup:
+            resultado = importar_archivo(CARGA_ADQUISICIONES, SimpleUploadedFile('adq.csv', csv), 'adq.csv', tamano=2)
+
+        self.assertEqual((resultado.total, resultado.nuevos, [fila for fila, _ in resultado.errores]), (6, 5, [7]))
+        self.assertEqual(rollup.call_count, 1)  # un rollup por archivo, no por bloque
+        self.assertEqual(CategoriaNuevo.objects.get(id='111').total_costo, Decimal('1100.00'))
+
+    def test_consultas_no_dependen_del_numero_de_filas(self):
+        consultas = []
+        for prefijo, filas in (('A', 5), ('B', 60)):
+            df = self.hoja_adquisiciones([['111', f'{prefijo}{i}', 'M', '1', '0'] for i in range(filas)])
+            with CaptureQueriesContext(connection) as contexto:
+                resultado = importar_dataframe(CARGA_ADQUISICIONES, df)
+            self.assertEqual(resultado.nuevos, filas)
+            consultas.append(len(contexto))
+        self.assertEqual(consultas[0], consultas[1])
+
+    def test_fk_opcional_inexistente_queda_en_el_reporte(self):
+        df = pd.DataFrame([['42', 'Huerfana', 'P1', '99', None, '0', '2']],
+                          columns=['id', 'nombre', 'proyecto', 'id_padre', 'categoria_relacionada', 'final', 'nivel'], dtype=str)
+
+        simulado = importar_dataframe(CARGA_CATEGORIA_NUEVA, df, simular=True)
+
+        self.assertEqual((simulado.nuevos, simulado.errores), (1, []))
+        self.assertEqual(simulado.como_dict()['advertencias'],
+                         [{'fila': 2, 'motivo': "CategoriaNuevo con ID '99' no encontrado - usando None"}])
+
+    def test_categorias_con_padres_en_el_mismo_archivo(self):
+        df = pd.DataFrame([
+            ['411', 'Sub', 'P1', '41.0', None, '1', '3'],
+            ['4', 'Nueva raiz', 'P1', None, None, '0', '1'],
+            ['41', 'Rama', 'P1', '4', '4000.0', 'False', '2'],
+            ['11', 'Obras civiles', 'P1', '1', None, '0', '2'],  # existente: se actualiza
+        ], columns=['id', 'nombre', 'proyecto', 'id_padre', 'categoria_relacionada', 'final', 'nivel'], dtype=str)
+
+        resultado = importar_dataframe(CARGA_CATEGORIA_NUEVA, df)
+
+        self.assertEqual((resultado.nuevos, resultado.actualizados), (3, 1))
+        hoja = CategoriaNuevo.objects.get(id='411')
+        self.assertEqual(hoja.ruta, '/4/41/411/')
+        self.assertTrue(hoja.final)
+        self.assertEqual(CategoriaNuevo.objects.get(id='41').categoria_relacionada, '4000')
+        self.assertEqual(CategoriaNuevo.objects.get(id='11').nombre, 'Obras civiles')
+        self.assertEqual(CategoriaNuevo.objects.get(id='111').total_costo, Decimal('1000.00'))
+
+    def test_simulacion_no_escribe_y_proyecta_los_totales(self):
+        df = self.hoja_adquisiciones([
+            ['111', 'N', 'M', '100', '0'],     # ya existe
+            ['111', 'I', 'M', '50', '10'],
+            ['111', 'I', 'M', '60', '0'],      # repetida
+            ['111', 'Z', 'M', 'abc', '0'],
+        ])
+
+        with CaptureQueriesContext(connection) as contexto:
+            simulado = importar_dataframe(CARGA_ADQUISICIONES, df, simular=True)
+
+        self.assertFalse([q for q in contexto.captured_queries if q['sql'].lstrip().upper().startswith(('INSERT', 'UPDATE'))])
+        self.assertEqual(Adquisiciones.objects.count(), 1)
+        reporte = simulado.como_dict()
+        self.assertEqual(
+            [(f['fila'], f['estado']) for f in reporte['filas']],
+            [(2, 'omitido'), (3, 'nuevo'), (4, 'omitido'), (5, 'error')],
+        )
+        deltas = {d['categoria']: d for d in reporte['delta_por_raiz']}
+        self.assertEqual(deltas['1']['delta'], Decimal('550.00'))
+
+        # La proyección coincide con los totales que deja la importación real
+        importar_dataframe(CARGA_ADQUISICIONES, df)
+        totales = dict(CategoriaNuevo.objects.filter(id_padre__isnull=True).values_list('id', 'total_costo'))
+        self.assertEqual({cid: d['total_proyectado'] for cid, d in deltas.items()}, totales)
+
+    def test_endpoint_valida_planilla_subida(self):
+        contenido = io.BytesIO()
+        self.hoja_adquisiciones([['111', 'I', 'M', '50', '10'], ['zz', 'N', 'M', '1', '0']]).to_excel(contenido, index=False)
+        archivo = SimpleUploadedFile('adquisiciones.xlsx', contenido.getvalue())
+
+        respuesta = self.client.post(reverse('validar_importacion'), {'archivo': archivo, 'modelo_destino': 'Adquisiciones'})
+
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual((respuesta.data['nuevos'], respuesta.data['errores']), (1, 1))
+        self.assertEqual(Adquisiciones.objects.count(), 1)
+        respuesta = self.client.post(reverse('validar_importacion'), {'modelo_destino': 'Otro'})
+        self.assertEqual(respuesta.status_code, 400)
+
+
+class CamposCalculadosTests(TestCase):
+    def setUp(self):
+        self.proyecto, self.categorias = crear_arbol_prueba()
+        hoja, intermedia = self.categorias['111'], self.categorias['11']
+        mb = MB.objects.create(id='MB1', mb=Decimal('943.123456'), fc=Decimal('1.075'), anio='2024-01-01')
+        CotizacionMateriales.objects.create(
+            id_categoria=hoja, tipo_suministro='SUB', tipo_moneda='USD', pais_entrega='CL',
+            fecha_cotizacion_referencia='2024-01-01', cotizacion_usd=1, cotizacion_clp=1, factor_correccion=1,
+            moneda_aplicada=1, flete_unitario=Decimal('3.33'), origen_precio='-', cotizacion='-', moneda_origen='USD',
+            tasa_cambio=1,
+        )
+        Adquisiciones.objects.get(tipo_origen='N').save()  # toma el flete de la nueva cotización
+        for costo, crecimiento in (('99.99', '0'), ('12.35', '7.25'), ('0.07', '33.33')):
+            Adquisiciones.objects.create(id_categoria=hoja, tipo_origen=costo, tipo_categoria='M',
+                                         costo_unitario=Decimal(costo), crecimiento=Decimal(crecimiento))
+        ManoObra.objects.create(id_categoria=hoja, horas_hombre_unidad=Decimal('1.33'), fp=Decimal('1.17'),
+                                tarifas_usd_hh_mod=Decimal('41.27'), tarifa_usd_hh_equipos=Decimal('3.01'))
+        for seleccionado in (mb, None):
+            AdministracionSupervision.objects.create(
+                id_categoria=intermedia, unidad='mes', precio_unitario_clp=Decimal('1234567.89'),
+                total_unitario=Decimal('3.5'), factor_uso=1, cantidad_u_persona=1, mb_seleccionado=seleccionado,
+            )
+            PersonalIndirectoContratista.objects.create(
+                id_categoria=intermedia, mb_seleccionado=seleccionado, turno='5x2', unidad='hh',
+                hh_mes=Decimal('180'), plazo_mes=Decimal('7.5'), precio_unitario_clp_hh=Decimal('15432.1'),
+            )
+        self.modelos = (Adquisiciones, ManoObra, AdministracionSupervision, PersonalIndirectoContratista)
+
+    def test_lote_coincide_con_save_al_centavo(self):
+        for modelo in self.modelos:
+            calculadora = CALCULADORAS[modelo]
+            guardados = list(modelo.objects.order_by('pk'))
+            recalculados = list(modelo.objects.order_by('pk'))
+            self.assertEqual(calculadora.aplicar_lote(recalculados), {})
+            for guardado, recalculado in zip(guardados, recalculados):
+                for nombre in calculadora.salidas:
+                    campo = modelo._meta.get_field(nombre)
+                    with self.subTest(modelo=modelo.__name__, pk=guardado.pk, campo=nombre):
+                        self.assertEqual(valor_guardado(campo, getattr(recalculado, nombre)), getattr(guardado, nombre))
+
+    def test_formula_escalar_y_vectorizada_son_identicas(self):
+        entradas = {
+            'costo_unitario': [Decimal('99.99'), Decimal('12.35'), Decimal('0.07')],
+            'crecimiento': [Decimal('0'), Decimal('7.25'), Decimal('33.33')],
+            'cantidad_final': [Decimal('10'), Decimal('3.7'), Decimal('0')],
+            'flete_unitario': [Decimal('3.33'), Decimal('0'), Decimal('12.5')],
+        }
+        lote = calcular_adquisicion(**{nombre: pd.Series(valores, dtype=object) for nombre, valores in entradas.items()})
+        for posicion in range(3):
+            escalar = calcular_adquisicion(**{nombre: valores[posicion] for nombre, valores in entradas.items()})
+            for nombre, valor in escalar.items():
+                self.assertEqual(lote[nombre].iloc[posicion], valor)
+
+    def test_comando_recalcula_solo_los_desactualizados(self):
+        esperado = {modelo: list(modelo.objects.order_by('pk').values()) for modelo in self.modelos}
+        Adquisiciones.objects.filter(tipo_origen='12.35').update(total=0, total_con_flete=0)
+        AdministracionSupervision.objects.filter(mb_seleccionado__isnull=False).update(costo_total_us=0)
+
+        salida = io.StringIO()
+        call_command('recalcular_campos_calculados', 'P1', stdout=salida)
+
+        self.assertIn('Registros actualizados: 2', salida.getvalue())
+        for modelo, filas in esperado.items():
+            self.assertEqual(list(modelo.objects.order_by('pk').values()), filas)
+        self.assertEqual(Adquisiciones.objects.get(tipo_origen='12.35').total, Decimal('132.45'))  # 10 * 12,35 * 1,0725
+        totales = dict(CategoriaNuevo.objects.filter(proyecto=self.proyecto).values_list('id', 'total_costo'))
+        self.assertEqual(recalcular_proyecto(self.proyecto.id), totales)
+
+        call_command('recalcular_campos_calculados', 'P1', stdout=salida)
+        self.assertIn('Registros actualizados: 0', salida.getvalue())
+
+
+class TrabajosImportacionTests(TestCase):
+    def setUp(self):
+        self.proyecto, self.categorias = crear_arbol_prueba()
+        self.directorio = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directorio.cleanup)
+        carpeta = os.path.join(self.directorio.name, 'uploads', 'Adquisiciones')
+        os.makedirs(carpeta)
+        pd.DataFrame(
+            [['111', f'T{i}', 'M', '2', '0'] for i in range(25)],
+            columns=['id_categoria', 'tipo_origen', 'tipo_categoria', 'costo_unitario', 'crecimiento'],
+        ).to_excel(os.path.join(carpeta, 'adquisiciones.xlsx'), index=False)
+        ajustes = override_settings(BASE_DIR=self.directorio.name)
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+        lote = mock.patch.object(trabajos, 'TAMANO_LOTE_TRABAJO', 10)
+        lote.start()
+        self.addCleanup(lote.stop)
+
+    def encolar(self):
+        respuesta = self.client.post(reverse('cargar_datos'), {'archivo': 'adquisiciones'})
+        self.assertEqual(respuesta.status_code, 202)
+        return respuesta.json()['trabajo']
+
+    def avance(self, trabajo_id):
+        estado = self.client.get(reverse('estado_trabajo_importacion', args=[trabajo_id])).data
+        return estado, estado['cargadores'][0]['archivos']['adquisiciones.xlsx']
+
+    def test_vista_encola_y_worker_procesa_por_lotes(self):
+        trabajo_id = self.encolar()
+        self.assertEqual(Adquisiciones.objects.count(), 1)  # la vista no importa nada
+
+        call_command('procesar_importaciones', '--una-vez', stdout=io.StringIO())
+
+        estado, avance = self.avance(trabajo_id)
+        self.assertEqual(estado['estado'], 'completado')
+        self.assertEqual((avance['lotes'], avance['procesadas'], avance['nuevos']), (3, 25, 25))
+        self.assertEqual(Adquisiciones.objects.count(), 26)
+        totales = dict(CategoriaNuevo.objects.filter(proyecto=self.proyecto).values_list('id', 'total_costo'))
+        self.assertEqual(totales['111'], Decimal('1500.00'))
+        self.assertEqual(recalcular_proyecto(self.proyecto.id), totales)
+
+    def test_cancelar_y_reanudar_desde_el_ultimo_lote(self):
+        trabajo_id = self.encolar()
+        importar = trabajos.importar_dataframe
+        lotes = []
+
+        def importar_y_cancelar(*args, **kwargs):
+            resultado = importar(*args, **kwargs)
+            lotes.append(resultado)
+            if len(lotes) == 2:
+                self.client.post(reverse('cancelar_trabajo_importacion', args=[trabajo_id]))
+            return resultado
+
+        with mock.patch.object(trabajos, 'importar_dataframe', side_effect=importar_y_cancelar):
+            call_command('procesar_importaciones', '--una-vez', stdout=io.StringIO())
+
+        estado, avance = self.avance(trabajo_id)
+        self.assertEqual((estado['estado'], avance['procesadas']), ('cancelado', 20))
+        self.assertEqual(Adquisiciones.objects.count(), 21)
+        # El rollup de lo ya confirmado se hace igual al cancelar
+        self.assertEqual(CategoriaNuevo.objects.get(id='111').total_costo, Decimal('1400.00'))
+
+        respuesta = self.client.post(reverse('reanudar_trabajo_importacion', args=[trabajo_id]))
+        self.assertEqual(respuesta.data['estado'], 'pendiente')
+        call_command('procesar_importaciones', '--una-vez', stdout=io.StringIO())
+
+        estado, avance = self.avance(trabajo_id)
+        self.assertEqual((estado['estado'], avance['lotes'], avance['nuevos'], avance['omitidos']), ('completado', 3, 25, 0))
+        self.assertEqual(Adquisiciones.objects.count(), 26)
+        self.assertEqual(estado['proyectos'], ['P1'])
+        self.assertEqual(estado['informe']['procesos'], 1)
+        self.assertIn('aceleracion_estimada', estado['informe'])
+
+    def escribir_adquisiciones(self, filas):
+        ruta = os.path.join(self.directorio.name, 'uploads', 'Adquisiciones', 'adquisiciones.xlsx')
+        pd.DataFrame(
+            filas, columns=['id_categoria', 'tipo_origen', 'tipo_categoria', 'costo_unitario', 'crecimiento'],
+        ).to_excel(ruta, index=False)
+
+    def test_reimportacion_incremental_por_clave(self):
+        primera, = cargar_directorio(CARGA_ADQUISICIONES)
+        self.assertEqual(primera.nuevos, 25)
+        registro = ArchivoSubido.objects.get(archivo='Adquisiciones/adquisiciones.xlsx')
+        self.assertEqual(registro.estado_importacion, ArchivoSubido.IMPORTADO)
+
+        # Archivo idéntico: ni se lee
+        with mock.patch('proyectoApp.importacion.leer_por_bloques') as leer:
+            repetida, = cargar_directorio(CARGA_ADQUISICIONES)
+        self.assertTrue(repetida.sin_cambios)
+        leer.assert_not_called()
+
+        # T20 cambia de costo, T21-T24 desaparecen y entra N1
+        filas = [['111', f'T{i}', 'M', '5' if i == 20 else '2', '0'] for i in range(21)] + [['111', 'N1', 'M', '2', '0']]
+        self.escribir_adquisiciones(filas)
+        diferencia, = cargar_directorio(CARGA_ADQUISICIONES)
+
+        self.assertEqual(
+            (diferencia.nuevos, diferencia.actualizados, diferencia.omitidos, diferencia.eliminados), (1, 1, 20, 4)
+        )
+        self.assertEqual(Adquisiciones.objects.count(), 23)
+        self.assertEqual(Adquisiciones.objects.get(tipo_origen='T20').total, Decimal('50.00'))
+        self.assertFalse(Adquisiciones.objects.filter(tipo_origen='T21').exists())
+        totales = dict(CategoriaNuevo.objects.filter(proyecto=self.proyecto).values_list('id', 'total_costo'))
+        self.assertEqual(totales['111'], Decimal('1470.00'))
+        self.assertEqual(recalcular_proyecto(self.proyecto.id), totales)
+
+    def test_archivo_con_error_queda_en_los_resultados(self):
+        with open(os.path.join(self.directorio.name, 'uploads', 'Adquisiciones', 'roto.xlsx'), 'wb') as archivo:
+            archivo.write(b'no es una planilla')
+
+        with self.assertLogs('proyectoApp.importacion', level='INFO') as log:
+            bueno, roto = cargar_directorio(CARGA_ADQUISICIONES)
+
+        self.assertEqual((bueno.nuevos, bueno.error), (25, None))
+        self.assertEqual(roto.archivo, 'roto.xlsx')
+        self.assertTrue(roto.error)
+        self.assertEqual(roto.como_dict()['error'], roto.error)
+        self.assertTrue(any(r.levelname == 'ERROR' and 'roto.xlsx' in r.getMessage() for r in log.records))
+
+    def test_worker_salta_archivos_ya_importados(self):
+        self.encolar()
+        call_command('procesar_importaciones', '--una-vez', stdout=io.StringIO())
+        trabajo_id = self.encolar()
+        call_command('procesar_importaciones', '--una-vez', stdout=io.StringIO())
+
+        estado, avance = self.avance(trabajo_id)
+        self.assertEqual((estado['estado'], avance['sin_cambios'], avance['lotes']), ('completado', True, 0))
+        self.assertEqual(Adquisiciones.objects.count(), 26)
+
+    def test_subir_el_mismo_archivo_reutiliza_su_registro(self):
+        with open(os.path.join(self.directorio.name, 'uploads', 'Adquisiciones', 'adquisiciones.xlsx'), 'rb') as f:
+            contenido = f.read()
+        for _ in range(2):
+            self.client.post(reverse('subir_archivo'), {
+                'archivo': SimpleUploadedFile('adquisiciones.xlsx', contenido), 'modelo_destino': 'Adquisiciones',
+            })
+        registro = ArchivoSubido.objects.get()
+        self.assertEqual((registro.archivo.name, registro.estado_importacion), ('Adquisiciones/adquisiciones.xlsx', 'pendiente'))
+        self.assertEqual(len(registro.hash_contenido), 64)
+
+
+class PlanCargaTests(TestCase):
+    def test_grafo_deduce_prerrequisitos_de_fks_y_calculadoras(self):
+        grafo = grafo_carga(CARGAS)
+        self.assertLessEqual({'Cantidades', 'CotizacionMateriales', 'CategoriaNuevo'}, grafo['Adquisiciones'])
+        self.assertIn('ManoObra', grafo['ContratoSubcontrato'])
+        self.assertIn('ProyectoNuevo', grafo['CategoriaNuevo'])
+        self.assertEqual(grafo['ProyectoNuevo'], set())
+
+        orden = orden_topologico(grafo)
+        self.assertEqual(sorted(orden), sorted(CARGAS))
+        for carpeta, previos in grafo.items():
+            self.assertTrue(all(orden.index(previo) < orden.index(carpeta) for previo in previos), carpeta)
+
+    def test_dependencias_circulares(self):
+        with self.assertRaises(ValueError):
+            orden_topologico({'A': {'B'}, 'B': {'A'}, 'C': set()})
+
+    def test_plan_paralelo_respeta_dependencias(self):
+        grafo = {'raiz': set(), 'a': {'raiz'}, 'b': {'raiz'}, 'c': {'a', 'b'}}
+        eventos, activos, maximo = [], set(), []
+        candado = threading.Lock()
+
+        def cargar(carpeta):
+            with candado:
+                eventos.append(('inicio', carpeta))
+                activos.add(carpeta)
+                maximo.append(len(activos))
+            time.sleep(0.05)
+            with candado:
+                activos.discard(carpeta)
+                eventos.append(('fin', carpeta))
+            return carpeta
+
+        _, resultados, errores = ejecutar_plan(grafo, cargar, procesos=2, ejecutor=ThreadPoolExecutor(2))
+        self.assertEqual((set(resultados), errores), (set(grafo), []))
+        for carpeta, previos in grafo.items():
+            for previo in previos:
+                self.assertLess(eventos.index(('fin', previo)), eventos.index(('inicio', carpeta)))
+        self.assertEqual(max(maximo), 2)  # a y b corren a la vez
+
+    def test_error_detiene_los_dependientes(self):
+        def cargar(carpeta):
+            if carpeta == 'a':
+                raise RuntimeError('falla')
+            return carpeta
+
+        _, resultados, errores = ejecutar_plan({'a': set(), 'b': {'a'}}, cargar, procesos=2, ejecutor=ThreadPoolExecutor(2))
+        self.assertEqual(resultados, {})
+        self.assertEqual([carpeta for carpeta, _ in errores], ['a'])
+
+
+class ResumenProyectosTests(TestCase):
+    def setUp(self):
+        self.proyecto, self.categorias = crear_arbol_prueba()
+        caches[CACHE].clear()
+        self.addCleanup(caches[CACHE].clear)
+
+    def agregar_proyectos(self, cantidad):
+        for i in range(cantidad):
+            proyecto = ProyectoNuevo.objects.create(id=f'X{i}', nombre=f'Extra {i}')
+            CategoriaNuevo.objects.create(id=f'X{i}-1', nombre='Directos', proyecto=proyecto, nivel=1, total_costo=Decimal('10'))
+
+    def consultas(self, url):
+        with CaptureQueriesContext(connection) as consultas:
+            self.assertEqual(self.client.get(url).status_code, 200)
+        return len(consultas)
+
+    def test_inicio_y_listado_en_consultas_constantes(self):
+        for url in (reverse('inicio'), reverse('tabla_proyecto_nuevo')):
+            caches[CACHE].clear()
+            pocos = self.consultas(url)
+            self.assertLess(self.consultas(url), pocos)  # desde la caché
+
+            self.agregar_proyectos(5)
+            caches[CACHE].clear()
+            self.assertEqual(self.consultas(url), pocos)
+            ProyectoNuevo.objects.filter(id__startswith='X').delete()
+
+        respuesta = self.client.get(reverse('tabla_proyecto_nuevo'))
+        totales = {p['id']: p['costo_total'] for p in respuesta.context['proyectonuevo']}
+        self.assertEqual(totales['P1'], self.proyecto.calcular_costo_total())
+
+    def test_rollup_invalida_el_resumen(self):
+        self.assertEqual(resumen_proyecto('P1')['costo_total'], Decimal('1372.95'))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Adquisiciones.objects.create(
+                id_categoria=self.categorias['111'], tipo_origen='I', tipo_categoria='M',
+                costo_unitario=Decimal('10'), crecimiento=Decimal('0'),
+            )
+
+        resumen = resumen_proyecto('P1')
+        self.assertEqual(resumen['costo_total'], self.proyecto.calcular_costo_total())
+        self.assertNotEqual(resumen['costo_total'], Decimal('1372.95'))
+        raices = self.client.get(reverse('categorias-raiz-json', args=['P1'])).json()
+        self.assertEqual({r['name'] for r in raices}, {'Directos', 'Indirectos', 'Contingencia'})
+
+
+class TablaPaginadaTests(TestCase):
+    def setUp(self):
+        self.proyecto, self.categorias = crear_arbol_prueba()
+        otro = ProyectoNuevo.objects.create(id='P2', nombre='Proyecto 2')
+        hoja = CategoriaNuevo.objects.create(id='9', nombre='Otra', proyecto=otro, nivel=1, final=True)
+        # Valores repetidos y categorías nulas para probar el desempate del cursor
+        Adquisiciones.objects.bulk_create(
+            Adquisiciones(
+                id_categoria=None if i % 7 == 0 else hoja if i % 3 == 0 else self.categorias['111'],
+                tipo_origen=f'origen {i % 4}', tipo_categoria='M', costo_unitario=Decimal(i % 5), total=Decimal('0'),
+            )
+            for i in range(24)
+        )
+
+    def paginas(self, **parametros):
+        url, filas, cursor = reverse('tabla_adquisiciones'), [], None
+        while True:
+            consulta = dict(parametros, limite=5, **({'cursor': cursor} if cursor else {}))
+            respuesta = self.client.get(url, consulta, HTTP_X_REQUESTED_WITH='XMLHttpRequest').json()
+            self.assertLessEqual(len(respuesta['data']), 5)
+            filas += respuesta['data']
+            cursor = respuesta['siguiente']
+            if not cursor:
+                return respuesta['total'], filas
+
+    def test_cursor_recorre_todas_las_filas_en_orden(self):
+        for orden in ('id', '-costo_unitario', 'id_categoria', '-id_categoria'):
+            total, filas = self.paginas(orden=orden)
+            columna = F(orden.lstrip('-'))
+            esperado = Adquisiciones.objects.order_by(
+                columna.desc(nulls_last=True) if orden.startswith('-') else columna.asc(nulls_last=True),
+                '-id' if orden.startswith('-') else 'id',
+            )
+            self.assertEqual(total, 25)
+            self.assertEqual([f['id'] for f in filas], list(esperado.values_list('id', flat=True)), orden)
+
+    def test_filtros_busqueda_y_proyecto(self):
+        total, filas = self.paginas(proyecto='P2')
+        self.assertEqual((total, {f['id_categoria'] for f in filas}), (6, {'9'}))
+
+        total, filas = self.paginas(**{'filtro[tipo_origen]': 'origen 1', 'filtro[costo_unitario]': '1'})
+        self.assertEqual([f['id'] for f in filas], list(
+            Adquisiciones.objects.filter(tipo_origen='origen 1', costo_unitario=1).order_by('id').values_list('id', flat=True)
+        ))
+        self.assertEqual(total, len(filas))
+
+        total, _ = self.paginas(buscar='ORIGEN 2')
+        self.assertEqual(total, 6)
+
+    def test_una_pagina_en_consultas_constantes_y_parametros_invalidos(self):
+        url = reverse('tabla_adquisiciones')
+        with self.assertNumQueries(2):
+            respuesta = self.client.get(url, {'desplazamiento': 20, 'limite': 10}, HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        self.assertEqual((len(respuesta.json()['data']), respuesta.json()['siguiente']), (5, None))
+
+        for parametros in ({'orden': 'clave'}, {'limite': 'x'}, {'cursor': 'zz'}, {'filtro[costo_unitario]': 'abc'}):
+            respuesta = self.client.get(url, parametros, HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+            self.assertEqual(respuesta.status_code, 400, parametros)
+
+
+class ConsultasPorProyectoTests(TestCase):
+    def setUp(self):
+        self.proyecto, self.categorias = crear_arbol_prueba()
+        otro = ProyectoNuevo.objects.create(id='P2', nombre='Proyecto 2')
+        hoja = CategoriaNuevo.objects.create(id='9', nombre='Otra', proyecto=otro, nivel=1, final=True)
+        Adquisiciones.objects.create(id_categoria=hoja, tipo_origen='N', tipo_categoria='M', costo_unitario=Decimal('5'))
+
+    def test_filtro_por_proyecto_directo_o_por_categoria(self):
+        self.assertEqual(set(CategoriaNuevo.objects.del_proyecto('P2').values_list('id', flat=True)), {'9'})
+        self.assertEqual(Adquisiciones.objects.del_proyecto('P1').count(), 1)
+        self.assertEqual(StaffEnami.objects.del_proyecto('P2').count(), 0)
+        self.assertEqual(Adquisiciones.objects.de_proyectos(['P1', 'P2']).count(), 2)
+
+    def test_comando_explica_las_consultas_del_proyecto(self):
+        salida = io.StringIO()
+        call_command('explicar_consultas', 'P1', '--repeticiones', '1', stdout=salida)
+        self.assertIn('rollup: costos directos por categoría', salida.getvalue())
+        self.assertIn('comparación: categoría relacionada', salida.getvalue())
+
+
+class ComparacionCostosTests(TestCase):
+    def setUp(self):
+        self.proyecto, self.categorias = crear_arbol_prueba()
+        caches[CACHE].clear()
+        self.addCleanup(caches[CACHE].clear)
+        ProyectoNuevo.objects.filter(id='P1').update(proyecto_relacionado=7)
+        for categoria_id in ('1', '2', '3'):
+            CategoriaNuevo.objects.filter(id=categoria_id).update(categoria_relacionada=f'R{categoria_id}')
+        for proyecto_id, costo in (('P2', Decimal('500')), ('P3', Decimal('0'))):
+            proyecto = ProyectoNuevo.objects.create(id=proyecto_id, nombre=f'Proyecto {proyecto_id}', proyecto_relacionado=7)
+            CategoriaNuevo.objects.bulk_create([
+                CategoriaNuevo(id=f'{proyecto_id}-1', nombre='Directos', proyecto=proyecto, categoria_relacionada='R1', total_costo=costo),
+                CategoriaNuevo(id=f'{proyecto_id}-2', nombre='Indirectos', proyecto=proyecto, categoria_relacionada='R2', total_costo=Decimal('10')),
+            ])
+
+    def consultar(self, **parametros):
+        with CaptureQueriesContext(connection) as consultas:
+            respuesta = self.client.get(reverse('obtener_comparacion_costos', args=['P1']), parametros)
+        self.assertEqual(respuesta.status_code, 200)
+        return respuesta.json(), len(consultas)
+
+    def test_compara_contra_todos_los_relacionados_por_categoria_y_nivel(self):
+        data, _ = self.consultar(nivel='1')
+        directos = CategoriaNuevo.objects.get(id='1').total_costo
+        self.assertEqual(data['categorias'], ['Directos', 'Indirectos', 'Contingencia'])
+        self.assertEqual(data['costos_proyecto_comparar'], [500.0, 10.0, 0])
+        self.assertEqual([p['id'] for p in data['proyectos']], ['P2', 'P3'])
+
+        fila = data['detalle'][0]['comparados']
+        self.assertEqual(fila['P2']['diferencia'], float(directos - 500))
+        self.assertAlmostEqual(fila['P2']['diferencia_pct'], float((directos - 500) / 500 * 100))
+        self.assertEqual((fila['P3']['costo'], fila['P3']['diferencia_pct']), (0.0, None))
+        self.assertEqual(data['detalle'][2]['comparados']['P2']['costo'], None)  # R3 no existe en P2
+
+        self.assertEqual([n['nivel'] for n in data['por_nivel']], [1])
+        self.assertEqual(data['por_nivel'][0]['comparados']['P2']['costo'], 510.0)
+        self.assertEqual(self.consultar(comparar='P3')[0]['costos_proyecto_comparar'], [0, 0, 0, 10.0, 0, 0, 0])
+
+    def test_consultas_constantes_cache_y_rollup_la_invalida(self):
+        _, pocas = self.consultar()
+        _, desde_cache = self.consultar()
+        self.assertLess(desde_cache, pocas)
+
+        for i in range(10):
+            CategoriaNuevo.objects.create(id=f'x{i}', nombre=f'Extra {i}', proyecto=self.proyecto, id_padre=self.categorias['1'],
+                                          nivel=2, categoria_relacionada=f'R{i}')
+        caches[CACHE].clear()
+        self.assertEqual(self.consultar()[1], pocas)
+
+        antes = self.consultar(nivel='1')[0]['costos_proyecto_actual'][0]
+        with self.captureOnCommitCallbacks(execute=True):
+            Adquisiciones.objects.create(
+                id_categoria=self.categorias['111'], tipo_origen='I', tipo_categoria='M',
+                costo_unitario=Decimal('10'), crecimiento=Decimal('0'),
+            )
+        self.assertGreater(self.consultar(nivel='1')[0]['costos_proyecto_actual'][0], antes)
+
+
+class PortafolioTests(TestCase):
+    def setUp(self):
+        costos = {'P1': (100, 10), 'P2': (110, 10), 'P3': (90, 10), 'P4': (105, 10), 'P5': (1000, 50)}
+        for proyecto_id, (directos, indirectos) in costos.items():
+            proyecto = ProyectoNuevo.objects.create(id=proyecto_id, nombre=f'Proyecto {proyecto_id}', proyecto_relacionado=9)
+            categorias = [CategoriaNuevo(id=f'{proyecto_id}-1', nombre='Directos', nivel=1, proyecto=proyecto,
+                                         categoria_relacionada='R1', total_costo=Decimal(directos))]
+            if indirectos is not None:
+                categorias.append(CategoriaNuevo(id=f'{proyecto_id}-2', nombre='Indirectos', nivel=2, proyecto=proyecto,
+                                                 categoria_relacionada='R2', total_costo=Decimal(indirectos)))
+            CategoriaNuevo.objects.bulk_create(categorias)
+        CategoriaNuevo.objects.create(id='P1-3', nombre='Otros', nivel=2, proyecto_id='P1', categoria_relacionada='R3',
+                                      total_costo=Decimal('5'))
+
+    def consultar(self, **parametros):
+        with CaptureQueriesContext(connection) as consultas:
+            respuesta = self.client.get(reverse('portafolio_costos'), parametros)
+            contenido = b''.join(respuesta.streaming_content) if respuesta.streaming else respuesta.content
+        return respuesta, json.loads(contenido), len(consultas)
+
+    def test_matriz_estadisticas_y_atipicos(self):
+        respuesta, data, consultas = self.consultar(proyecto_relacionado='9')
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(consultas, 2)
+        self.assertEqual([p['id'] for p in data['proyectos']], ['P1', 'P2', 'P3', 'P4', 'P5'])
+
+        directos, indirectos, otros = data['filas']
+        self.assertEqual(directos['costos'], [100.0, 110.0, 90.0, 105.0, 1000.0])
+        self.assertEqual((directos['minimo'], directos['maximo'], directos['mediana']), (90.0, 1000.0, 105.0))
+        self.assertEqual(directos['atipicos'], ['P5'])
+        # MAD 0: la escala cae a la desviación absoluta media
+        self.assertEqual(indirectos['costos'], [10.0, 10.0, 10.0, 10.0, 50.0])
+        self.assertEqual(indirectos['atipicos'], ['P5'])
+        self.assertEqual((otros['costos'], otros['atipicos']), ([5.0, None, None, None, None], []))
+        self.assertEqual(data['subtotales'][1], {'nivel': 2, 'costos': [15.0, 10.0, 10.0, 10.0, 50.0]})
+
+    def test_orden_de_proyectos_nivel_y_errores(self):
+        _, data, _ = self.consultar(proyectos='P3,P1', nivel='2')
+        self.assertEqual([p['id'] for p in data['proyectos']], ['P3', 'P1'])
+        self.assertEqual([(f['categoria_relacionada'], f['costos'], f['atipicos']) for f in data['filas']],
+                         [('R2', [10.0, 10.0], []), ('R3', [None, 5.0], [])])
+
+        self.assertEqual(self.consultar(proyectos='P1,X')[0].status_code, 404)
+        self.assertEqual(self.consultar()[0].status_code, 400)
+        self.assertEqual(self.consultar(proyectos='P1', formato='xml')[0].status_code, 400)
+
+
+class ExportacionTests(TestCase):
+    def setUp(self):
+        self.proyecto, self.categorias = crear_arbol_prueba()
+        otro = ProyectoNuevo.objects.create(id='P2', nombre='Proyecto 2')
+        categoria = CategoriaNuevo.objects.create(id='P2-1', nombre='Directos', proyecto=otro, nivel=1)
+        Adquisiciones.objects.create(id_categoria=categoria, tipo_origen='I', tipo_categoria='M',
+                                     costo_unitario=Decimal('7'), crecimiento=Decimal('0'))
+        Adquisiciones.objects.create(id_categoria=self.categorias['21'], tipo_origen='I', tipo_categoria='M',
+                                     costo_unitario=Decimal('3'), crecimiento=Decimal('0'))
+
+    def exportar(self, modelo, **parametros):
+        return self.client.get(reverse('exportar_excel', args=[modelo]), parametros)
+
+    def test_xlsx_por_bloques_filtrado_por_proyecto(self):
+        with mock.patch('proyectoApp.exportacion.TAMANO_BLOQUE', 1):
+            respuesta = self.exportar('Adquisiciones', proyecto='P1')
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertIn('Adquisiciones.xlsx', respuesta['Content-Disposition'])
+        hoja = openpyxl.load_workbook(io.BytesIO(b''.join(respuesta.streaming_content))).active
+        filas = list(hoja.values)
+        self.assertEqual(filas[0][:2], ('id', 'id_categoria_id'))
+        self.assertEqual(sorted(fila[1] for fila in filas[1:]), ['111', '21'])
+
+    def test_csv_filtrado_por_subarbol_de_categoria(self):
+        respuesta = self.exportar('Adquisiciones', formato='csv', categoria='1')
+        lineas = b''.join(respuesta.streaming_content).decode('utf-8-sig').splitlines()
+        self.assertEqual(len(lineas), 2)
+        self.assertIn(',111,', lineas[1])
+
+        categorias = self.exportar('CategoriaNuevo', formato='csv', categoria='2')
+        self.assertEqual(len(b''.join(categorias.streaming_content).decode().splitlines()), 4)
+
+    def test_errores(self):
+        self.assertEqual(self.exportar('NoExiste').status_code, 404)
+        self.assertEqual(self.exportar('Adquisiciones', formato='xls').status_code, 400)
+        self.assertEqual(self.exportar('Adquisiciones', categoria='X').status_code, 400)
+        self.assertEqual(self.exportar('ApuGeneral', proyecto='P1').status_code, 400)
+
+    def test_categoria_sin_ruta_no_exporta_toda_la_tabla(self):
+        # Filas insertadas por fuera del importador: ruta vacía
+        CategoriaNuevo.objects.filter(id='111').update(ruta='')
+        self.assertEqual(self.exportar('Adquisiciones', formato='csv', categoria='111').status_code, 400)
+        respuesta = self.client.patch(reverse('editar_masivo', args=['Adquisiciones']),
+                                      {'cambios': {'crecimiento': '50'}, 'categoria': '111'}, content_type='application/json')
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertFalse(Adquisiciones.objects.filter(crecimiento=Decimal('50')).exists())
+
+
+class ClonarProyectoTests(TestCase):
+    def setUp(self):
+        self.proyecto, self.categorias = crear_arbol_prueba()
+        recalcular_proyecto('P1')
+        mano_obra = ManoObra.objects.get()
+        ApuEspecifico.objects.create(id_categoria=self.categorias['11'], id_apu_general=ApuGeneral.objects.create(nombre='APU'),
+                                     id_mano_obra=mano_obra, nombre='x', unidad_medida='m', cantidad=Decimal('1'),
+                                     precio_unitario=Decimal('2'))
+        ReglaCostoDerivado.objects.create(categoria=self.categorias['3'], base=ReglaCostoDerivado.BASE_RAICES,
+                                          tasa=Decimal('0.10'))
+
+    def duplicar(self, proyecto_id='P1', **datos):
+        return self.client.post(reverse('duplicar_proyecto', args=[proyecto_id]), datos, content_type='application/json')
+
+    def test_copia_arbol_costos_y_totales(self):
+        respuesta = self.duplicar()
+        self.assertEqual(respuesta.status_code, 201)
+        data = respuesta.json()
+        self.assertEqual((data['id'], data['nombre']), ('cP1', 'Copia de Proyecto 1'))
+        self.assertEqual((data['filas']['CategoriaNuevo'], data['filas']['Adquisiciones']), (7, 1))
+
+        copia = CategoriaNuevo.objects.get(id='c111')
+        self.assertEqual((copia.proyecto_id, copia.id_padre_id, copia.ruta), ('cP1', 'c11', '/c1/c11/c111/'))
+        original = dict(CategoriaNuevo.objects.del_proyecto('P1').values_list('id', 'total_costo'))
+        copiado = dict(CategoriaNuevo.objects.del_proyecto('cP1').values_list('id', 'total_costo'))
+        self.assertEqual(copiado, {f'c{i}': total for i, total in original.items()})
+        self.assertEqual(ProyectoNuevo.objects.get(id='cP1').costo_total, ProyectoNuevo.objects.get(id='P1').costo_total)
+
+        apu = ApuEspecifico.objects.del_proyecto('cP1').get()
+        self.assertEqual(apu.id_mano_obra.id_categoria_id, 'c11')
+        self.assertEqual(ReglaCostoDerivado.objects.del_proyecto('cP1').get().categoria_id, 'c3')
+        self.assertEqual(ManoObra.objects.del_proyecto('P1').count(), 1)  # el original no cambia
+
+    def test_ids_ocupados(self):
+        self.assertEqual(self.duplicar().status_code, 201)
+        self.assertEqual(self.duplicar().status_code, 400)
+        self.assertEqual(self.duplicar(prefijo='d', nombre='Otra').json()['nombre'], 'Otra')
+        self.assertEqual(self.duplicar('X').status_code, 404)
+        self.assertEqual(self.client.get(reverse('duplicar_proyecto', args=['P1'])).status_code, 405)
+
+    def test_datos_ep_ocupado_o_prefijo_invalido_no_copia_nada(self):
+        DatosEP.objects.create(id='cEP1', hh_profesionales=Decimal('1'), precio_hh=Decimal('1'),
+                               id_categoria=self.categorias['22'])
+        self.assertEqual(self.duplicar().status_code, 400)
+        self.assertEqual(self.duplicar(prefijo='a/b').status_code, 400)
+        self.assertEqual(self.duplicar(prefijo='x' * 48).status_code, 400)  # 'x' * 48 + 'EP1' no entra en 50
+        self.assertEqual(self.duplicar(prefijo=5).status_code, 400)
+        self.assertEqual(ProyectoNuevo.objects.count(), 1)
+
+    def test_ids_autonumericos_se_mapean_por_fila(self):
+        otra = ManoObra.objects.create(id_categoria=self.categorias['111'], horas_hombre_unidad=Decimal('1'),
+                                       fp=Decimal('1'), costo_hombre_hora=Decimal('1'))
+        ApuEspecifico.objects.create(id_categoria=self.categorias['111'], id_apu_general=ApuGeneral.objects.get(),
+                                     id_mano_obra=otra, nombre='y', unidad_medida='m', cantidad=Decimal('1'),
+                                     precio_unitario=Decimal('2'))
+        self.assertEqual(self.duplicar().status_code, 201)
+        copias = dict(ApuEspecifico.objects.del_proyecto('cP1').values_list('nombre', 'id_mano_obra__id_categoria_id'))
+        self.assertEqual(copias, {'x': 'c11', 'y': 'c111'})
+
+
+class ArchivoProyectoTests(TestCase):
+    def setUp(self):
+        self.proyecto, self.categorias = crear_arbol_prueba()
+
+    def descargar(self, **parametros):
+        respuesta = self.client.get(reverse('archivo_proyecto', args=['P1']), parametros)
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertTrue(respuesta.streaming)
+        return zipfile.ZipFile(io.BytesIO(b''.join(respuesta.streaming_content)))
+
+    def test_zip_por_tabla_con_manifiesto(self):
+        with mock.patch('proyectoApp.exportacion.TAMANO_BLOQUE', 2):
+            archivo = self.descargar()
+        manifiesto = json.loads(archivo.read('manifest.json'))
+        filas = {item['modelo']: item['filas'] for item in manifiesto['archivos']}
+        self.assertEqual((filas['ProyectoNuevo'], filas['CategoriaNuevo'], filas['Adquisiciones']), (1, 7, 1))
+        for item in manifiesto['archivos']:
+            contenido = archivo.read(item['nombre'])
+            self.assertEqual(hashlib.sha256(contenido).hexdigest(), item['sha256'])
+        categorias = archivo.read('CategoriaNuevo.csv').decode('utf-8-sig').splitlines()
+        self.assertEqual(len(categorias), 8)
+
+        hoja = openpyxl.load_workbook(io.BytesIO(self.descargar(formato='xlsx').read('CategoriaNuevo.xlsx'))).active
+        self.assertEqual(hoja.max_row, 8)
+
+    def test_errores(self):
+        self.assertEqual(self.client.get(reverse('archivo_proyecto', args=['X'])).status_code, 404)
+        self.assertEqual(self.client.get(reverse('archivo_proyecto', args=['P1']), {'formato': 'xls'}).status_code, 400)
+
+
+class EliminarMasivoTests(TestCase):
+    def setUp(self):
+        self.proyecto, self.categorias = crear_arbol_prueba()
+        self.adquisiciones = [
+            Adquisiciones.objects.create(id_categoria=self.categorias['111'], tipo_origen='N', tipo_categoria='M',
+                                         costo_unitario=Decimal(i), crecimiento=Decimal('0'))
+            for i in range(1, 6)
+        ]
+
+    def eliminar(self, modelo, ids):
+        return self.client.post(reverse('eliminar_masivo', args=[modelo]), {'ids': ids}, content_type='application/json')
+
+    def test_un_rollup_y_totales_iguales_al_recalculo(self):
+        ids = [a.id for a in self.adquisiciones]
+        with mock.patch('proyectoApp.rollup.recalcular_proyecto', wraps=recalcular_proyecto) as rollup:
+            respuesta = self.eliminar('Adquisiciones', ids)
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual((respuesta.json()['eliminados'], respuesta.json()['proyectos']), (5, ['P1']))
+        self.assertEqual(rollup.call_count, 1)
+
+        guardados = dict(CategoriaNuevo.objects.del_proyecto('P1').values_list('id', 'total_costo'))
+        self.assertEqual(guardados, recalcular_proyecto('P1'))
+
+    def test_recalcula_los_campos_que_leian_las_filas_borradas(self):
+        cantidad = Cantidades.objects.get()
+        self.assertNotEqual(Adquisiciones.objects.filter(id_categoria='111').first().total, 0)
+        respuesta = self.client.post(reverse('eliminar_masivo', args=['Cantidades']), {'ids[]': [cantidad.id]})
+        self.assertEqual(respuesta.json()['eliminados'], 1)
+        self.assertEqual(set(Adquisiciones.objects.filter(id_categoria='111').values_list('total', flat=True)), {0})
+
+    def test_errores(self):
+        self.assertEqual(self.eliminar('NoExiste', [1]).status_code, 404)
+        self.assertEqual(self.eliminar('CategoriaNuevo', ['1']).status_code, 400)
+        self.assertEqual(self.eliminar('MB', ['1']).status_code, 400)
+        self.assertEqual(self.eliminar('Adquisiciones', []).status_code, 400)
+        self.assertEqual(self.eliminar('Adquisiciones', ['x']).status_code, 400)
+
+
+class EditarMasivoTests(TestCase):
+    def setUp(self):
+        self.proyecto, self.categorias = crear_arbol_prueba()
+        recalcular_proyecto('P1')
+
+    def editar(self, modelo, datos):
+        return self.client.patch(reverse('editar_masivo', args=[modelo]), datos, content_type='application/json')
+
+    def test_un_rollup_y_delta_del_total(self):
+        antes = ProyectoNuevo.objects.get(id='P1').costo_total
+        with mock.patch('proyectoApp.rollup.recalcular_proyecto', wraps=recalcular_proyecto) as rollup:
+            respuesta = self.editar('Adquisiciones', {'cambios': {'crecimiento': '50'}, 'proyecto': 'P1'})
+        self.assertEqual(respuesta.status_code, 200)
+        datos = respuesta.json()
+        self.assertEqual(rollup.call_count, 1)
+        # 10 m3 * 100 * (1 + 50%): el total con flete sube 500
+        self.assertEqual((datos['filas'], datos['modificadas'], datos['delta_monto']), (1, 1, 500.0))
+        self.assertEqual(Adquisiciones.objects.get().total_con_flete, Decimal('1500.00'))
+
+        despues = ProyectoNuevo.objects.get(id='P1').costo_total
+        self.assertAlmostEqual(datos['delta_total'], float(despues - antes), places=2)
+        self.assertEqual(datos['proyectos'][0]['id'], 'P1')
+        guardados = dict(CategoriaNuevo.objects.del_proyecto('P1').values_list('id', 'total_costo'))
+        self.assertEqual(guardados, recalcular_proyecto('P1'))
+
+        # Repetir el mismo cambio no modifica filas
+        repetido = self.editar('Adquisiciones', {'cambios': {'crecimiento': '50'}, 'ids': [Adquisiciones.objects.get().id]})
+        self.assertEqual(repetido.json()['modificadas'], 0)
+
+    def test_recalcula_los_modelos_que_leen_al_editado(self):
+        respuesta = self.editar('Cantidades', {'cambios': {'fc': '100'}, 'categoria': '11'})
+        self.assertEqual(respuesta.json()['modificadas'], 1)
+        self.assertEqual(Cantidades.objects.get().cantidad_final, Decimal('20.00'))
+        self.assertEqual(Adquisiciones.objects.get().total_con_flete, Decimal('2000.00'))
+        self.assertEqual(CategoriaNuevo.objects.get(id='111').total_costo, Decimal('2000.00'))
+
+    def test_mover_filas_a_otro_proyecto_recalcula_ambos(self):
+        destino = ProyectoNuevo.objects.create(id='PB', nombre='Proyecto B')
+        hoja = CategoriaNuevo.objects.create(id='B1', nombre='Hormigon', proyecto=destino, nivel=1, final=True)
+        Cantidades.objects.create(id_categoria=hoja, unidad_medida='m3', cantidad=Decimal('20'), fc=Decimal('0'))
+        antes = ProyectoNuevo.objects.get(id='P1').costo_total
+
+        respuesta = self.editar('Adquisiciones', {'cambios': {'id_categoria': 'B1'}, 'proyecto': 'P1'})
+
+        datos = respuesta.json()
+        self.assertEqual((respuesta.status_code, datos['modificadas']), (200, 1))
+        # 20 m3 * 100 en B1 en vez de 10 m3 * 100 en '111'
+        self.assertEqual(datos['delta_monto'], 1000.0)
+        self.assertEqual(CategoriaNuevo.objects.get(id='B1').total_costo, Decimal('2000.00'))
+        totales = {p.id: p.costo_total for p in ProyectoNuevo.objects.all()}
+        self.assertEqual(totales['PB'], Decimal('2000.00'))
+        self.assertLess(totales['P1'], antes)
+        for proyecto_id in ('P1', 'PB'):
+            guardados = dict(CategoriaNuevo.objects.del_proyecto(proyecto_id).values_list('id', 'total_costo'))
+            self.assertEqual(guardados, recalcular_proyecto(proyecto_id))
+        self.assertEqual([p['id'] for p in datos['proyectos']], ['P1', 'PB'])
+        self.assertAlmostEqual(datos['delta_total'], float(totales['P1'] - antes + totales['PB']), places=2)
+
+    def test_errores(self):
+        self.assertEqual(self.editar('NoExiste', {'cambios': {'x': 1}, 'proyecto': 'P1'}).status_code, 404)
+        for modelo, datos in (
+            ('CategoriaNuevo', {'cambios': {'nombre': 'x'}, 'proyecto': 'P1'}),
+            ('Adquisiciones', {'cambios': {}, 'proyecto': 'P1'}),
+            ('Adquisiciones', {'cambios': {'crecimiento': '1'}}),
+            ('Adquisiciones', {'cambios': {'total': '1'}, 'proyecto': 'P1'}),
+            ('Adquisiciones', {'cambios': {'no_existe': '1'}, 'proyecto': 'P1'}),
+            ('Adquisiciones', {'cambios': {'crecimiento': 'abc'}, 'proyecto': 'P1'}),
+            ('AdministracionSupervision', {'cambios': {'mb_seleccionado': 999}, 'proyecto': 'P1'}),
+        ):
+            with self.subTest(modelo=modelo, datos=datos):
+                self.assertEqual(self.editar(modelo, datos).status_code, 400)
+        self.assertEqual(self.client.get(reverse('editar_masivo', args=['Adquisiciones'])).status_code, 405)
+
+
+class EliminarCategoriasMasivoTests(TestCase):
+    def setUp(self):
+        self.proyecto, self.categorias = crear_arbol_prueba()
+        recalcular_proyecto('P1')
+
+    def eliminar(self, ids):
+        return self.client.post(reverse('eliminar_categorias_masivo'), {'ids[]': ids})
+
+    def assertTotalesActualizados(self):
+        guardados = dict(CategoriaNuevo.objects.del_proyecto('P1').values_list('id', 'total_costo'))
+        self.assertEqual(guardados, recalcular_proyecto('P1'))
+        self.assertEqual(ProyectoNuevo.objects.get(id='P1').costo_total,
+                         sum(t for i, t in guardados.items() if i in ('1', '2', '3')))
+
+    def test_padres_y_proyecto_quedan_al_dia(self):
+        antes = ProyectoNuevo.objects.get(id='P1').costo_total
+        respuesta = self.eliminar(['111', '11', '21'])
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual((respuesta.json()['eliminados'] > 3, respuesta.json()['proyectos']), (True, ['P1']))
+        self.assertFalse(CategoriaNuevo.objects.filter(id__in=['11', '111', '21']).exists())
+        self.assertLess(ProyectoNuevo.objects.get(id='P1').costo_total, antes)
+        self.assertTotalesActualizados()
+
+    def test_delete_de_una_categoria_recalcula_con_todas_las_fuentes(self):
+        # Antes el padre se recalculaba solo con adquisiciones y perdía la mano de obra de '11'
+        CategoriaNuevo.objects.get(id='111').delete()
+        self.assertTotalesActualizados()
+        self.assertEqual(self.eliminar([]).status_code, 400)
+
+    def test_benchmark_mil_categorias_de_un_arbol_profundo(self):
+        # Una cadena de 200 niveles con 4 hojas por nivel: 1000 categorías debajo de la raíz '1'.
+        # Ids de dos letras ('aa', 'ab', ...) para que la ruta más profunda entre en la columna
+        padre, nuevas = self.categorias['1'], []
+        for nivel in range(200):
+            eslabon = CategoriaNuevo(id=chr(97 + nivel // 26) + chr(97 + nivel % 26), nombre=f'Nivel {nivel}',
+                                     proyecto=self.proyecto, id_padre=padre, nivel=nivel + 2)
+            nuevas.append(eslabon)
+            nuevas.extend(CategoriaNuevo(id=f'{eslabon.id}{h}', nombre='Hoja', proyecto=self.proyecto, id_padre=eslabon,
+                                         nivel=nivel + 3, final=True) for h in range(4))
+            padre = eslabon
+        CategoriaNuevo.objects.bulk_create(nuevas)
+        reconstruir_rutas(['P1'])
+        largo = max(len(ruta) for ruta in CategoriaNuevo.objects.del_proyecto('P1').values_list('ruta', flat=True))
+        self.assertLessEqual(largo, CategoriaNuevo._meta.get_field('ruta').max_length)
+        Adquisiciones.objects.bulk_create(
+            Adquisiciones(id_categoria=c, tipo_origen='N', tipo_categoria='M', costo_unitario=Decimal('1'),
+                          crecimiento=Decimal('0'), total=Decimal('10')) for c in nuevas if c.final
+        )
+        recalcular_proyecto('P1')
+
+        inicio = time.perf_counter()
+        with CaptureQueriesContext(connection) as consultas:
+            respuesta = self.eliminar([c.id for c in nuevas])
+        duracion = time.perf_counter() - inicio
+        self.assertEqual(respuesta.json()['por_modelo']['CategoriaNuevo'], 1000)
+        self.assertLess(len(consultas), 80)
+        self.assertLess(duracion, 10)
+        self.assertTotalesActualizados()
@@ -0,0 +1,295 @@
+"""Cola de importaciones en segundo plano respaldada por la base de datos.
+
+La vista ``cargar_datos`` solo encola un ``TrabajoImportacion``; el comando
+``procesar_importaciones`` toma los trabajos pendientes y ejecuta sus cargadores por
+lotes de filas. Los cargadores independientes entre sí corren en paralelo según el grafo
+de ``plan_carga``. Cada lote se confirma en la misma transacción que el ``AvanceCarga`` de
+su cargador, de modo que cancelar (o perder el worker) nunca deja un lote a medias y el
+trabajo se reanuda desde el último lote guardado. Los totales de los proyectos afectados
+se recalculan una sola vez al terminar (o al cancelar) la ejecución.
+"""
+import os
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .cargar_datos import CARGAS
+from .importacion import (
+    EXTENSIONES, ImportacionIncremental, ResultadoCarga, filas_estimadas, importar_dataframe, leer_por_bloques, registro_archivo,
+)
+from .models import AvanceCarga, TrabajoImportacion
+from .plan_carga import ejecutar_plan, grafo_carga, ruta_critica
+from .rollup import defer_rollups, solicitar_rollup
+
+
+TAMANO_LOTE_TRABAJO = 1000
+# Un trabajo en curso sin latido por más de este tiempo se considera abandonado
+TIEMPO_ABANDONO = timedelta(minutes=10)
+MAX_ERRORES_REPORTADOS = 100
+
+
+class TrabajoCancelado(Exception):
+    pass
+
+
+def encolar_importacion(carpetas):
+    """Crea un trabajo pendiente para los cargadores indicados (claves de ``CARGAS``)."""
+    desconocidas = [carpeta for carpeta in carpetas if carpeta not in CARGAS]
+    if desconocidas:
+        raise ValueError(f"Cargadores no válidos: {', '.join(desconocidas)}")
+    return TrabajoImportacion.objects.create(cargadores=list(carpetas))
+
+
+def cancelar_trabajo(trabajo):
+    """Cancela un trabajo pendiente o pide al worker que detenga uno en curso tras el lote actual."""
+    if trabajo.estado == TrabajoImportacion.PENDIENTE:
+        trabajo.estado = TrabajoImportacion.CANCELADO
+        trabajo.terminado = timezone.now()
+        trabajo.save(update_fields=['estado', 'terminado', 'actualizado'])
+    elif trabajo.estado == TrabajoImportacion.EN_CURSO:
+        trabajo.cancelacion_solicitada = True
+        trabajo.save(update_fields=['cancelacion_solicitada', 'actualizado'])
+    else:
+        raise ValueError(f"No se puede cancelar un trabajo {trabajo.estado}")
+    return trabajo
+
+
+def reanudar_trabajo(trabajo):
+    """Vuelve a encolar un trabajo cancelado o con error; retoma desde el último lote guardado."""
+    if trabajo.estado not in (TrabajoImportacion.CANCELADO, TrabajoImportacion.ERROR):
+        raise ValueError(f"No se puede reanudar un trabajo {trabajo.estado}")
+    # Los archivos que fallaron se reintentan desde su último lote confirmado
+    for progreso in trabajo.avances.all():
+        fallidos = [avance for avance in progreso.archivos.values() if avance['error']]
+        for avance in fallidos:
+            avance['error'] = None
+        if fallidos:
+            progreso.estado = TrabajoImportacion.EN_CURSO
+            progreso.save(update_fields=['estado', 'archivos'])
+    trabajo.estado = TrabajoImportacion.PENDIENTE
+    trabajo.cancelacion_solicitada = False
+    trabajo.error = ''
+    trabajo.terminado = None
+    trabajo.save(update_fields=['estado', 'cancelacion_solicitada', 'error', 'terminado', 'actualizado'])
+    return trabajo
+
+
+def tomar_trabajo():
+    """Reserva el trabajo pendiente (o abandonado) más antiguo; None si no hay.
+
+    La reserva es un UPDATE condicionado al estado y latido leídos, así que dos workers
+    no pueden tomar el mismo trabajo.
+    """
+    ahora = timezone.now()
+    candidatos = TrabajoImportacion.objects.filter(
+        Q(estado=TrabajoImportacion.PENDIENTE)
+        | Q(estado=TrabajoImportacion.EN_CURSO, actualizado__lt=ahora - TIEMPO_ABANDONO)
+    ).order_by('creado', 'id')
+    for trabajo in candidatos[:10]:
+        tomado = TrabajoImportacion.objects.filter(
+            pk=trabajo.pk, estado=trabajo.estado, actualizado=trabajo.actualizado,
+        ).update(estado=TrabajoImportacion.EN_CURSO, actualizado=ahora, iniciado=trabajo.iniciado or ahora)
+        if tomado:
+            trabajo.refresh_from_db()
+            return trabajo
+    return None
+
+
+def _verificar_cancelacion(trabajo_id):
+    if TrabajoImportacion.objects.filter(pk=trabajo_id, cancelacion_solicitada=True).exists():
+        raise TrabajoCancelado()
+
+
+def _latido(trabajo_id):
+    # Fuera de la transacción del lote para no bloquear la fila del trabajo entre procesos
+    TrabajoImportacion.objects.filter(pk=trabajo_id).update(actualizado=timezone.now())
+
+
+def _acumular(avance, resultado):
+    avance['nuevos'] += resultado.nuevos
+    avance['actualizados'] += resultado.actualizados
+    avance['omitidos'] += resultado.omitidos
+    avance['errores'] += len(resultado.errores)
+    espacio = MAX_ERRORES_REPORTADOS - len(avance['detalle_errores'])
+    avance['detalle_errores'].extend([fila, mensaje] for fila, mensaje in resultado.errores[:max(espacio, 0)])
+    # Trabajos guardados antes de existir las advertencias no traen estas claves
+    detalle = avance.setdefault('detalle_advertencias', [])
+    avance['advertencias'] = avance.get('advertencias', 0) + len(resultado.advertencias)
+    espacio = MAX_ERRORES_REPORTADOS - len(detalle)
+    detalle.extend([fila, mensaje] for fila, mensaje in resultado.advertencias[:max(espacio, 0)])
+
+
+def _ejecutar_archivo(progreso, espec, ruta, avance):
+    """Importa lo que cambió del archivo leyéndolo por bloques; cada bloque es un lote confirmado."""
+    nombre = os.path.basename(ruta)
+    incremental = ImportacionIncremental(espec, ruta, registro_archivo(espec, nombre))
+    if incremental.sin_cambios:
+        avance.update(filas=0, sin_cambios=True, terminado=True)
+        progreso.save(update_fields=['archivos'])
+        return
+    if avance['filas'] is None:
+        avance['filas'] = filas_estimadas(ruta)  # solo para mostrar avance; se corrige al terminar
+    # Con ``orden`` (padres e hijos en el mismo archivo) el archivo va en un solo lote
+    tamano = None if espec.orden else TAMANO_LOTE_TRABAJO
+    try:
+        for bloque in leer_por_bloques(ruta, tamano):
+            # Todas las filas pasan por filtrar() para armar la nueva instantánea, pero al
+            # reanudar (el índice es la posición de la fila) se saltan las ya confirmadas
+            cambiadas = incremental.filtrar(bloque)
+            pendientes = int((bloque.index >= avance['procesadas']).sum())
+            if not pendientes:
+                continue
+            _verificar_cancelacion(progreso.trabajo_id)
+            lote = cambiadas[cambiadas.index >= avance['procesadas']]
+            with transaction.atomic():
+                # El rollup se hace una sola vez al final del trabajo (ver ejecutar_trabajo)
+                resultado = importar_dataframe(incremental.espec_lote, lote, nombre, rollup=False)
+                resultado.omitidos += pendientes - len(lote)  # sin cambios desde la última importación
+                incremental.registrar(resultado)
+                _acumular(avance, resultado)
+                avance['procesadas'] = int(bloque.index[-1]) + 1
+                avance['lotes'] += 1
+                progreso.proyectos = sorted(set(progreso.proyectos) | resultado.proyectos)
+                progreso.save(update_fields=['archivos', 'proyectos'])
+            _latido(progreso.trabajo_id)
+
+        with transaction.atomic():
+            resultado = incremental.terminar(ResultadoCarga(nombre), rollup=False)
+            avance['eliminados'] += resultado.eliminados
+            avance['filas'] = avance['procesadas']
+            avance['terminado'] = True
+            progreso.proyectos = sorted(set(progreso.proyectos) | resultado.proyectos)
+            progreso.save(update_fields=['archivos', 'proyectos'])
+    except TrabajoCancelado:
+        raise
+    except Exception:
+        incremental.fallo()
+        raise
+
+
+def ejecutar_cargador(trabajo_id, carpeta):
+    """Ejecuta un cargador del trabajo; retorna los segundos que tomó en esta ejecución.
+
+    Es una función de módulo para poder enviarla al pool de procesos de ``plan_carga``.
+    """
+    progreso, _ = AvanceCarga.objects.get_or_create(trabajo_id=trabajo_id, carpeta=carpeta)
+    if progreso.estado == TrabajoImportacion.COMPLETADO:
+        return 0
+    inicio = time.perf_counter()
+    progreso.estado = TrabajoImportacion.EN_CURSO
+    progreso.save(update_fields=['estado'])
+
+    espec = CARGAS[carpeta]
+    directorio = os.path.join(settings.BASE_DIR, 'uploads', espec.carpeta)
+    archivos = sorted(a for a in os.listdir(directorio) if a.lower().endswith(EXTENSIONES)) if os.path.isdir(directorio) else []
+    try:
+        for archivo in archivos:
+            avance = progreso.archivos.setdefault(archivo, {
+                'filas': None, 'procesadas': 0, 'lotes': 0, 'nuevos': 0, 'actualizados': 0, 'omitidos': 0,
+                'eliminados': 0, 'errores': 0, 'detalle_errores': [], 'advertencias': 0, 'detalle_advertencias': [],
+                'error': None, 'sin_cambios': False,
+                'terminado': False,
+            })
+            if avance['error'] or avance['terminado']:
+                continue
+            try:
+                _ejecutar_archivo(progreso, espec, os.path.join(directorio, archivo), avance)
+            except TrabajoCancelado:
+                raise
+            except Exception as e:
+                # Igual que cargar_directorio: un archivo con problemas no detiene a los demás
+                avance['error'] = str(e)
+                progreso.save(update_fields=['archivos'])
+        progreso.estado = TrabajoImportacion.COMPLETADO
+    except TrabajoCancelado:
+        progreso.estado = TrabajoImportacion.CANCELADO
+        raise
+    finally:
+        segundos = time.perf_counter() - inicio
+        progreso.segundos += segundos
+        progreso.save(update_fields=['estado', 'segundos'])
+    return segundos
+
+
+def ejecutar_trabajo(trabajo, procesos=1, ejecutor=None):
+    """Ejecuta (o reanuda) los cargadores del trabajo y deja su estado final.
+
+    Con ``procesos > 1`` los cargadores sin dependencias pendientes corren a la vez, cada
+    uno en su proceso. ``informe`` compara el tiempo real con la suma de los tiempos de
+    cada cargador medidos en esta misma ejecución: con varios procesos compiten entre sí,
+    así que la suma y la aceleración son una estimación, no una ejecución en secuencia.
+    """
+    grafo = grafo_carga({carpeta: CARGAS[carpeta] for carpeta in trabajo.cargadores})
+    for carpeta in grafo:
+        AvanceCarga.objects.get_or_create(trabajo=trabajo, carpeta=carpeta)
+
+    segundos, duraciones, errores = ejecutar_plan(grafo, ejecutar_cargador, (trabajo.id,), procesos, ejecutor)
+    cancelado = any(isinstance(error, TrabajoCancelado) for _, error in errores)
+    fallidos = [(carpeta, error) for carpeta, error in errores if not isinstance(error, TrabajoCancelado)]
+
+    # Un único rollup por proyecto, incluidos los tocados por ejecuciones anteriores
+    with defer_rollups():
+        for proyecto_id in _proyectos(trabajo):
+            solicitar_rollup(proyecto_id)
+
+    if fallidos:
+        trabajo.estado = TrabajoImportacion.ERROR
+        trabajo.error = '\n'.join(
+            f"{carpeta}: {''.join(traceback.format_exception(error))}" for carpeta, error in fallidos
+        )
+    elif cancelado:
+        trabajo.estado = TrabajoImportacion.CANCELADO
+    else:
+        trabajo.estado = TrabajoImportacion.COMPLETADO
+
+    suma = sum(duraciones.values())
+    trabajo.informe = {
+        'procesos': procesos,
+        'segundos': round(segundos, 3),
+        'segundos_suma_cargadores': round(suma, 3),
+        'aceleracion_estimada': round(suma / segundos, 2) if segundos else None,
+        'ruta_critica': round(ruta_critica(grafo, duraciones), 3),
+    }
+    trabajo.cancelacion_solicitada = False
+    trabajo.terminado = timezone.now()
+    trabajo.save(update_fields=['estado', 'error', 'informe', 'cancelacion_solicitada', 'terminado', 'actualizado'])
+    return trabajo
+
+
+def _proyectos(trabajo):
+    proyectos = set()
+    for lista in trabajo.avances.values_list('proyectos', flat=True):
+        proyectos.update(lista)
+    return sorted(proyectos)
+
+
+def estado_trabajo(trabajo):
+    """Resumen serializable del trabajo: estado general y avance por cargador y archivo."""
+    avances = {avance.carpeta: avance for avance in trabajo.avances.all()}
+    cargadores = []
+    for carpeta in trabajo.cargadores:
+        avance = avances.get(carpeta) or AvanceCarga(carpeta=carpeta)
+        cargadores.append({
+            'cargador': carpeta, 'estado': avance.estado, 'segundos': round(avance.segundos, 3),
+            'archivos': avance.archivos,
+        })
+    archivos = [archivo for avance in avances.values() for archivo in avance.archivos.values()]
+    return {
+        'id': trabajo.id,
+        'estado': trabajo.estado,
+        'cancelacion_solicitada': trabajo.cancelacion_solicitada,
+        'creado': trabajo.creado,
+        'iniciado': trabajo.iniciado,
+        'terminado': trabajo.terminado,
+        'filas_procesadas': sum(archivo['procesadas'] for archivo in archivos),
+        'filas_totales': sum(archivo['filas'] or 0 for archivo in archivos),
+        'cargadores': cargadores,
+        'proyectos': _proyectos(trabajo),
+        'informe': trabajo.informe,
+        'error': trabajo.error,
+    }
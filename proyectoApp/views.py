@@ -1,20 +1,32 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.core.files.storage import FileSystemStorage
-from .models import ProyectoNuevo, CategoriaNuevo, CostoNuevo, Adquisiciones, MaterialesOtros, EquiposConstruccion, ManoObra, ApuGeneral, ApuEspecifico, ArchivoSubido, EspecificoCategoria, StaffEnami, DatosOtrosEP, DatosEP, Cantidades, ContratoSubcontrato, CotizacionMateriales, IngenieriaDetallesContraparte, GestionPermisos, Dueno, MB, AdministracionSupervision, PersonalIndirectoContratista, ServiciosApoyo, OtrosADM, AdministrativoFinanciero
+from .models import ProyectoNuevo, CategoriaNuevo, CostoNuevo, Adquisiciones, MaterialesOtros, EquiposConstruccion, ManoObra, ApuGeneral, ApuEspecifico, ArchivoSubido, EspecificoCategoria, StaffEnami, DatosOtrosEP, DatosEP, Cantidades, ContratoSubcontrato, CotizacionMateriales, IngenieriaDetallesContraparte, GestionPermisos, Dueno, MB, AdministracionSupervision, PersonalIndirectoContratista, ServiciosApoyo, OtrosADM, AdministrativoFinanciero, TrabajoImportacion
 import os
 from django.conf import settings
 from .forms import ArchivoSubidoForm, ProyectoNuevoForm, CategoriaNuevoForm, CostoNuevoForm, AdquisicionesForm, MaterialesOtrosForm, EquiposConstruccionForm, ManoObraForm, APUGeneralForm, APUEspecificoForm, EspecificoCategoriaForm, StaffEnamiForm, DatosOtrosEPForm, DatosEPForm, CantidadesForm, ContratoSubcontratoForm, CotizacionMaterialesForm, IngenieriaDetallesContraparteForm, GestionPermisosForm, DuenoForm, MBForm, AdministracionSupervisionForm, PersonalIndirectoContratistaForm, ServiciosApoyoForm, OtrosADMForm, AdministrativoFinancieroForm
 import pandas as pd
 from django.contrib import messages
-from django.http import HttpResponse
+from django.http import HttpResponse, StreamingHttpResponse, FileResponse
 from django.views.generic import ListView, TemplateView, CreateView, UpdateView, DeleteView
-from .cargar_datos import cargar_proyecto_nuevo, cargar_categoria_nueva, cargar_costo_nuevo, cargar_adquisiciones, cargar_equipos_construccion, cargar_mano_obra, cargar_materiales_otros, cargar_apu_especifico, cargar_apu_general, cargar_especifico_categoria, cargar_staff_enami, cargar_datos_ep, cargar_datos_otros_ep, cargar_cantidades, cargar_contrato_subcontrato, cargar_cotizacion_materiales, cargar_ingenieria_detalles_contraparte, cargar_gestion_permisos, cargar_dueno, cargar_mb, cargar_administracion_supervision, cargar_personal_indirecto_contratista, cargar_servicios_apoyo, cargar_otros_adm, cargar_administrativo_financiero
+from .arbol import filas_subarbol, armar_subarbol, CAMPOS_SUBARBOL, CAMPOS_SUBARBOL_DEFECTO
+from .resumen import resumen_proyecto, resumen_proyectos
+from .comparacion import comparacion_proyecto
+from .exportacion import EXPORTADORES, FORMATOS, columnas_exportacion, filtrar_exportacion
+from .clonacion import clonar_proyecto
+from .edicion import editar_filas
+from .eliminacion import eliminar_categorias, eliminar_filas
+from .archivo_proyecto import zip_proyecto
+from .portafolio import json_portafolio, matriz_portafolio, parquet_portafolio
+from .tablas import TablaAjaxMixin
+from .importacion import hash_archivo, importar_dataframe, leer_planilla
+from .cargar_datos import CARGAS, CARGAS_POR_NOMBRE
+from .trabajos import encolar_importacion, cancelar_trabajo, reanudar_trabajo, estado_trabajo
 from django.db.models import Sum, Q, F, Subquery, OuterRef
 from django.http import JsonResponse
 from django.db import transaction
 from django.apps import apps
 from django import forms
-from django.urls import reverse_lazy
+from django.urls import reverse, reverse_lazy
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from django.core.paginator import Paginator
@@ -32,7 +44,7 @@ import sys
 import io
 from django.template.loader import render_to_string
 from functools import wraps
-from django.views.decorators.http import require_POST
+from django.views.decorators.http import require_http_methods, require_POST
 
 
 def obtener_proyecto_relacionado(request, proyecto_id):
@@ -108,76 +120,97 @@ def comparar_costos(proyecto_id):
 
 
 def obtener_comparacion_costos(request, proyecto_id):
+    """Costos de un proyecto frente a todos sus proyectos relacionados.
+
+    ``nivel`` limita las categorías del proyecto a ese nivel y ``comparar`` elige el
+    relacionado que alimenta las series del gráfico (por defecto el primero). ``detalle``
+    y ``por_nivel`` traen la diferencia y el porcentaje contra cada relacionado.
+    """
     try:
-        # 1. Obtener parámetro de nivel si existe
-        nivel = request.GET.get('nivel')
-        
-        # 2. Obtener proyectos
         proyecto_actual = ProyectoNuevo.objects.get(id=proyecto_id)
-        
-        if not proyecto_actual.proyecto_relacionado:
-            return JsonResponse({'error': 'El proyecto no tiene proyecto relacionado'}, status=404)
-        
-        # Buscar proyectos con el mismo proyecto_relacionado (excluyendo el actual)
-        proyectos_relacionados = ProyectoNuevo.objects.filter(
-            proyecto_relacionado=proyecto_actual.proyecto_relacionado
-        ).exclude(id=proyecto_actual.id)
-        
-        if not proyectos_relacionados.exists():
-            return JsonResponse({'error': 'No se encontraron proyectos relacionados'}, status=404)
-            
-        proyecto_comparar = proyectos_relacionados.first()
-
-        # 3. Obtener categorías con posible filtro por nivel
-        categorias_actual = CategoriaNuevo.objects.filter(proyecto=proyecto_actual)
-        categorias_comparar = CategoriaNuevo.objects.filter(proyecto=proyecto_comparar)
-        
-        # Aplicar filtro por nivel si se especificó
-        if nivel and nivel.isdigit():
-            nivel_int = int(nivel)
-            categorias_actual = categorias_actual.filter(nivel=nivel_int)
-            # Mantenemos todas las categorías de comparación para poder hacer match
-            # pero solo mostraremos las que correspondan al nivel filtrado
-
-        # 4. Preparar datos para comparación
-        datos_comparacion = []
-        categorias = []
-        costos_actual = []
-        costos_comparar = []
-        niveles = []  # Nuevo campo para almacenar niveles
-        
-        # Comparar categorías existentes en ambos proyectos
-        for cat_actual in categorias_actual:
-            cat_comparada = categorias_comparar.filter(
-                categoria_relacionada=cat_actual.categoria_relacionada
-            ).first()
-            
-            categorias.append(cat_actual.nombre)
-            costos_actual.append(float(cat_actual.total_costo) if cat_actual.total_costo else 0)
-            niveles.append(cat_actual.nivel)  # Almacenar nivel de cada categoría
-            
-            if cat_comparada:
-                costos_comparar.append(float(cat_comparada.total_costo) if cat_comparada.total_costo else 0)
-            else:
-                costos_comparar.append(0)
-
-        # 5. Retornar respuesta estructurada
-        response_data = {
-            'categorias': categorias,
-            'costos_proyecto_actual': costos_actual,
-            'costos_proyecto_comparar': costos_comparar,
-            'niveles': niveles,  # Nuevo campo con información de niveles
-            'nombres': {
-                'actual': proyecto_actual.nombre,
-                'comparar': proyecto_comparar.nombre
-            }
-        }
-        
-        return JsonResponse(response_data)
-        
     except ProyectoNuevo.DoesNotExist:
         return JsonResponse({'error': 'Proyecto no encontrado'}, status=404)
 
+    if not proyecto_actual.proyecto_relacionado:
+        return JsonResponse({'error': 'El proyecto no tiene proyecto relacionado'}, status=404)
+
+    # Todos los proyectos con el mismo proyecto_relacionado (excluyendo el actual)
+    relacionados = list(
+        ProyectoNuevo.objects.filter(proyecto_relacionado=proyecto_actual.proyecto_relacionado)
+        .exclude(id=proyecto_actual.id).order_by('id').only('id', 'nombre')
+    )
+    if not relacionados:
+        return JsonResponse({'error': 'No se encontraron proyectos relacionados'}, status=404)
+
+    proyecto_comparar = relacionados[0]
+    if request.GET.get('comparar'):
+        proyecto_comparar = next((p for p in relacionados if p.id == request.GET['comparar']), None)
+        if proyecto_comparar is None:
+            return JsonResponse({'error': 'El proyecto a comparar no está relacionado'}, status=400)
+
+    nivel = request.GET.get('nivel')
+    nivel = int(nivel) if nivel and nivel.isdigit() else None
+    comparacion = comparacion_proyecto(proyecto_actual, relacionados, nivel)
+
+    detalle = comparacion['categorias']
+    return JsonResponse({
+        'categorias': [c['nombre'] for c in detalle],
+        'costos_proyecto_actual': [c['costo'] for c in detalle],
+        'costos_proyecto_comparar': [c['comparados'][proyecto_comparar.id]['costo'] or 0 for c in detalle],
+        'niveles': [c['nivel'] for c in detalle],
+        'nombres': {
+            'actual': proyecto_actual.nombre,
+            'comparar': proyecto_comparar.nombre
+        },
+        'proyectos': [{'id': p.id, 'nombre': p.nombre} for p in relacionados],
+        'detalle': detalle,
+        'por_nivel': comparacion['niveles'],
+    })
+
+
+def portafolio_costos(request):
+    """Matriz de costos categoría × proyecto de un portafolio de proyectos.
+
+    Los proyectos se eligen con ``proyectos`` (ids separados por coma, en el orden de las
+    columnas) o con ``proyecto_relacionado``; ``nivel`` limita las categorías y ``formato``
+    es ``json`` (por defecto, enviado por partes) o ``parquet``.
+    """
+    formato = request.GET.get('formato', 'json')
+    if formato not in ('json', 'parquet'):
+        return JsonResponse({'error': 'formato debe ser json o parquet'}, status=400)
+
+    if request.GET.get('proyectos'):
+        ids = list(dict.fromkeys(i.strip() for i in request.GET['proyectos'].split(',') if i.strip()))
+        nombres = dict(ProyectoNuevo.objects.filter(id__in=ids).values_list('id', 'nombre'))
+        faltantes = [proyecto_id for proyecto_id in ids if proyecto_id not in nombres]
+        if faltantes:
+            return JsonResponse({'error': f'Proyectos no encontrados: {", ".join(faltantes)}'}, status=404)
+    elif request.GET.get('proyecto_relacionado', '').isdigit():
+        nombres = dict(
+            ProyectoNuevo.objects.filter(proyecto_relacionado=request.GET['proyecto_relacionado'])
+            .order_by('id').values_list('id', 'nombre')
+        )
+        ids = list(nombres)
+    else:
+        return JsonResponse({'error': 'Indique proyectos o proyecto_relacionado'}, status=400)
+    if not ids:
+        return JsonResponse({'error': 'No se encontraron proyectos'}, status=404)
+
+    nivel = request.GET.get('nivel')
+    nivel = int(nivel) if nivel and nivel.isdigit() else None
+    filas, subtotales = matriz_portafolio(ids, nivel)
+
+    if formato == 'parquet':
+        try:
+            archivo = parquet_portafolio(filas, subtotales)
+        except ValueError as error:
+            return JsonResponse({'error': str(error)}, status=400)
+        return FileResponse(archivo, as_attachment=True, filename='portafolio.parquet',
+                            content_type='application/vnd.apache.parquet')
+
+    proyectos = [{'id': proyecto_id, 'nombre': nombres[proyecto_id]} for proyecto_id in ids]
+    return StreamingHttpResponse(json_portafolio(proyectos, filas, subtotales), content_type='application/json')
+
 
 def obtener_niveles_proyecto(request, proyecto_id):
     try:
@@ -194,102 +227,36 @@ def obtener_niveles_proyecto(request, proyecto_id):
 
 
 def Inicio(request):
-    proyectos = ProyectoNuevo.objects.prefetch_related('categorias')
-    
-    for proyecto in proyectos:
-        proyecto.costo_total = proyecto.calcular_costo_total()  # Precalcular el costo total
-    
+    # Resumen cacheado: el mismo número de consultas sin importar cuántos proyectos haya
     context = {
-        'proyectonuevo': proyectos
+        'proyectonuevo': resumen_proyectos()
     }
     return render(request, 'inicio.html', context)
 
 
 def cargar_datos(request):
+    """Encola la carga seleccionada y retorna de inmediato el id del trabajo.
+
+    El worker ``procesar_importaciones`` la ejecuta; el avance se consulta en
+    ``estado_trabajo_importacion``.
+    """
     if request.method == 'POST':
         archivo = request.POST.get('archivo')  # Archivo a cargar seleccionado por el usuario
 
-        if archivo == "proyecto":
-            cargar_proyecto_nuevo()
-        elif archivo == "categoria":
-            cargar_categoria_nueva()
-        elif archivo == "costo":
-            cargar_costo_nuevo()
-        elif archivo == "adquisiciones":
-            cargar_adquisiciones()
-        elif archivo == "materiales_otros":
-            cargar_materiales_otros()
-        elif archivo == "mano_obra":
-            cargar_mano_obra()
-        elif archivo == "equipos_construccion":
-            cargar_equipos_construccion()
-        elif archivo == "apu_general":
-            cargar_apu_general()
-        elif archivo == "apu_especifico":
-            cargar_apu_especifico()
-        elif archivo == "especifico_categoria":
-            cargar_especifico_categoria()
-        elif archivo == "staff_enami":
-            cargar_staff_enami()
-        elif archivo == "datos_ep":
-            cargar_datos_ep()
-        elif archivo == "datos_otros_ep":
-            cargar_datos_otros_ep()
-        elif archivo == "cantidades":
-            cargar_cantidades()
-        elif archivo == "contrato_subcontrato":
-            cargar_contrato_subcontrato()
-        elif archivo == "cotizacion_materiales":
-            cargar_cotizacion_materiales()
-        elif archivo == "ingenieria_detalles_contraparte":
-            cargar_ingenieria_detalles_contraparte()
-        elif archivo == "gestion_permisos":
-            cargar_gestion_permisos()
-        elif archivo == "dueno":
-            cargar_dueno()
-        elif archivo == "mb":
-            cargar_mb()
-        elif archivo == "administracion_supervision":
-            cargar_administracion_supervision()
-        elif archivo == "personal_indirecto_contratista":
-            cargar_personal_indirecto_contratista()
-        elif archivo == "servicios_apoyo":
-            cargar_servicios_apoyo()
-        elif archivo == "otros_adm":
-            cargar_otros_adm()
-        elif archivo == "administrativo_financiero":
-            cargar_administrativo_financiero()
-        elif archivo == "todos":
+        if archivo == "todos":
             # Si se selecciona "todos", se cargan todos los archivos
-            cargar_proyecto_nuevo()
-            cargar_categoria_nueva()
-            cargar_costo_nuevo()
-            cargar_adquisiciones()
-            cargar_materiales_otros()
-            cargar_mano_obra()
-            cargar_equipos_construccion()
-            cargar_apu_general()
-            cargar_apu_especifico()
-            cargar_especifico_categoria()
-            cargar_staff_enami()
-            cargar_datos_ep()
-            cargar_datos_otros_ep()
-            cargar_cantidades()
-            cargar_contrato_subcontrato()
-            cargar_cotizacion_materiales()
-            cargar_ingenieria_detalles_contraparte()
-            cargar_gestion_permisos()
-            cargar_dueno()
-            cargar_mb()
-            cargar_administracion_supervision()
-            cargar_personal_indirecto_contratista()
-            cargar_servicios_apoyo()
-            cargar_otros_adm()
-            cargar_administrativo_financiero()
+            cargas = list(CARGAS_POR_NOMBRE.values())
+        elif archivo in CARGAS_POR_NOMBRE:
+            cargas = [CARGAS_POR_NOMBRE[archivo]]
         else:
             return JsonResponse({'error': 'Archivo no válido'}, status=400)
 
-        return JsonResponse({'mensaje': f'Datos de {archivo} cargados exitosamente'}, status=200)
+        trabajo = encolar_importacion([espec.carpeta for espec in cargas])
+        return JsonResponse({
+            'mensaje': f'Carga de {archivo} encolada',
+            'trabajo': trabajo.id,
+            'estado_url': reverse('estado_trabajo_importacion', args=[trabajo.id]),
+        }, status=202)
 
     return JsonResponse({'error': 'Método no permitido'}, status=405)
 
@@ -334,11 +301,8 @@ class ListadoProyectoNuevo(ListView):
     context_object_name = 'proyectonuevo'
 
     def get_queryset(self):
-        proyectos = ProyectoNuevo.objects.prefetch_related('categorias')
-        
-        for proyecto in proyectos:
-            proyecto.costo_total = proyecto.calcular_costo_total()  # Precalcular el costo total
-        return proyectos
+        # Id, nombre y costo total de cada proyecto desde el resumen cacheado
+        return resumen_proyectos()
     
 
     
@@ -365,18 +329,20 @@ class CrearProyectoNuevo(CreateView):
     template_name = 'crear_proyecto_nuevo.html'
     success_url = reverse_lazy('tabla_proyecto_nuevo')
 
-class ListadoCategoriaNuevo(ListView):
+class ListadoCategoriaNuevo(TablaAjaxMixin, ListView):
     model = CategoriaNuevo
     template_name = 'tabla_categoria_nuevo.html'
     context_object_name = 'categorianuevo'
-
-    
-    def get(self, request, *args, **kwargs):
-        if request.headers.get('X-Requested-With') == 'XMLHttpRequest':  
-            data = list(self.get_queryset().values("id", "nombre", "proyecto", "id_padre", "categoria_relacionada","nivel", "final", "total_costo"))  # ✅ Convertimos a lista de diccionarios
-            return JsonResponse(data, safe=False)  
-
-        return super().get(request, *args, **kwargs)
+    columnas = (
+        'id',
+        'nombre',
+        'proyecto',
+        'id_padre',
+        'categoria_relacionada',
+        'nivel',
+        'final',
+        'total_costo',
+    )
     
 
 class ActualizarCategoriaNuevo(UpdateView):
@@ -436,17 +402,21 @@ class CrearCostoNuevo(CreateView):
     template_name = 'crear_costo_nuevo.html'
     success_url = reverse_lazy('tabla_costo_nuevo')
 
-class ListadoAdquisiciones(ListView):
+class ListadoAdquisiciones(TablaAjaxMixin, ListView):
     model = Adquisiciones
     template_name = 'tabla_adquisiciones.html'
     context_object_name = 'adquisiciones'
-
-    def get(self, request, *args, **kwargs):
-        if request.headers.get('X-Requested-With') == 'XMLHttpRequest':  
-            data = list(self.get_queryset().values("id","id_categoria","tipo_origen","tipo_categoria","costo_unitario","crecimiento","flete","total","total_con_flete"))  # ✅ Convertimos a lista de diccionarios
-            return JsonResponse(data, safe=False)  
-
-        return super().get(request, *args, **kwargs)
+    columnas = (
+        'id',
+        'id_categoria',
+        'tipo_origen',
+        'tipo_categoria',
+        'costo_unitario',
+        'crecimiento',
+        'flete',
+        'total',
+        'total_con_flete',
+    )
 
 class ActualizarAdquisiciones(UpdateView):
     model = Adquisiciones
@@ -481,17 +451,11 @@ class CrearAdquisiciones(CreateView):
     template_name = 'crear_adquisiciones.html'
     success_url = reverse_lazy('tabla_adquisiciones')
 
-class ListadoMaterialesOtros(ListView):
+class ListadoMaterialesOtros(TablaAjaxMixin, ListView):
     model = MaterialesOtros
     template_name = 'tabla_materiales_otros.html'
     context_object_name = 'materiales_otros'
-
-    def get(self, request, *args, **kwargs):
-        if request.headers.get('X-Requested-With') == 'XMLHttpRequest':  
-            data = list(self.get_queryset().values("id", "id_categoria", "costo_unidad", "crecimiento","total_usd","fletes","total_sitio"))  # ✅ Convertimos a lista de diccionarios
-            return JsonResponse(data, safe=False)  
-
-        return super().get(request, *args, **kwargs)
+    columnas = ('id', 'id_categoria', 'costo_unidad', 'crecimiento', 'total_usd', 'fletes', 'total_sitio')
 
 class ActualizarMaterialesOtros(UpdateView):
     model = MaterialesOtros
@@ -525,17 +489,11 @@ class CrearMaterialesOtros(CreateView):
     template_name = 'crear_materiales_otros.html'
     success_url = reverse_lazy('tabla_materiales_otros')
 
-class ListadoCantidades(ListView):
+class ListadoCantidades(TablaAjaxMixin, ListView):
     model = Cantidades
     template_name = "tabla_cantidades.html"
     context_object_name = "cantidades"
-
-    def get(self, request, *args, **kwargs):
-        if request.headers.get('X-Requested-With') == 'XMLHttpRequest':  
-            data = list(self.get_queryset().values("id", "id_categoria", "unidad_medida", "cantidad", "fc", "cantidad_final"))  # ✅ Convertimos a lista de diccionarios
-            return JsonResponse(data, safe=False)  
-
-        return super().get(request, *args, **kwargs)
+    columnas = ('id', 'id_categoria', 'unidad_medida', 'cantidad', 'fc', 'cantidad_final')
     
 class ActualizarCantidades(UpdateView):
     model = Cantidades
@@ -569,17 +527,18 @@ def eliminar_cantidad(request):
 
 
 
-class ListadoEquiposConstruccion(ListView):
+class ListadoEquiposConstruccion(TablaAjaxMixin, ListView):
     model = EquiposConstruccion
     template_name = 'tabla_equipos_construccion.html'
     context_object_name = 'equipos_construccion'
-
-    def get(self, request, *args, **kwargs):
-        if request.headers.get('X-Requested-With') == 'XMLHttpRequest':  
-            data = list(self.get_queryset().values("id", "id_categoria", "horas_maquina_unidad", "costo_maquina_hora", "total_horas_maquina", "total_usd"))  # ✅ Convertimos a lista de diccionarios
-            return JsonResponse(data, safe=False)  
-
-        return super().get(request, *args, **kwargs)
+    columnas = (
+        'id',
+        'id_categoria',
+        'horas_maquina_unidad',
+        'costo_maquina_hora',
+        'total_horas_maquina',
+        'total_usd',
+    )
     
 
 class ActualizarEquiposConstruccion(UpdateView):
@@ -615,34 +574,26 @@ class CrearEquiposConstruccion(CreateView):
     template_name = 'crear_equipos_construccion.html'
     success_url = reverse_lazy('tabla_equipos_construccion')
 
-class ListadoManoObra(ListView):
+class ListadoManoObra(TablaAjaxMixin, ListView):
     model = ManoObra
     template_name = 'tabla_mano_obra.html'
     context_object_name = 'mano_obra'
-
-    def get(self, request, *args, **kwargs):
-        if request.headers.get('X-Requested-With') == 'XMLHttpRequest':  
-            data = list(self.get_queryset().values(
-                "id",
-                "id_categoria",  # ✅ Devuelve el nombre en lugar del ID
-                "horas_hombre_unidad",
-                "fp",
-                "rendimiento",  # ✅ Nuevo campo
-                "horas_hombre_final",
-                "cantidad_horas_hombre",
-                "costo_hombre_hora",
-                "tarifas_usd_hh_mod",  # ✅ Nuevo campo
-                "total_hh",
-                "total_usd_mod",
-                "tarifa_usd_hh_equipos",
-                "total_usd_equipos",
-                "total_usd",  # ✅ Nuevo cálculo agregado
-                
-                
-            ))
-            return JsonResponse(data, safe=False)  
-
-        return super().get(request, *args, **kwargs)
+    columnas = (
+        'id',
+        'id_categoria',
+        'horas_hombre_unidad',
+        'fp',
+        'rendimiento',
+        'horas_hombre_final',
+        'cantidad_horas_hombre',
+        'costo_hombre_hora',
+        'tarifas_usd_hh_mod',
+        'total_hh',
+        'total_usd_mod',
+        'tarifa_usd_hh_equipos',
+        'total_usd_equipos',
+        'total_usd',
+    )
 
 class ActualizarManoObra(UpdateView):
     model = ManoObra
@@ -729,17 +680,11 @@ class CrearAPUEspecifico(CreateView):
     template_name = 'crear_apu_especifico.html'
     success_url = reverse_lazy('tabla_apu_especifico')
 
-class ListadoEspecificoCategoria(ListView):
+class ListadoEspecificoCategoria(TablaAjaxMixin, ListView):
     model = EspecificoCategoria
     template_name = 'tabla_especifico_categoria.html'
     context_object_name = 'especifico_categoria'
-
-    def get(self, request, *args, **kwargs):
-        if request.headers.get('X-Requested-With') == 'XMLHttpRequest':  
-            data = list(self.get_queryset().values('id', 'id_categoria', 'unidad', 'cantidad', 'dedicacion', 'duracion', 'costo', 'total'))  # ✅ Convertimos a lista de diccionarios
-            return JsonResponse(data, safe=False)  
-
-        return super().get(request, *args, **kwargs)
+    columnas = ('id', 'id_categoria', 'unidad', 'cantidad', 'dedicacion', 'duracion', 'costo', 'total')
 
 class ActualizarEspecificoCategoria(UpdateView):
     model = EspecificoCategoria
@@ -776,17 +721,21 @@ class CrearEspecificoCategoria(CreateView):
     template_name = 'crear_especifico_categoria.html'
     success_url = reverse_lazy('tabla_especifico_categoria')
 
-class ListadoStaffEnami(ListView):
+class ListadoStaffEnami(TablaAjaxMixin, ListView):
     model = StaffEnami
     template_name = 'tabla_staff_enami.html'
     context_object_name = 'staff_enami'
-
-    def get(self, request, *args, **kwargs):
-        if request.headers.get('X-Requested-With') == 'XMLHttpRequest':  
-            data = list(self.get_queryset().values('id', 'nombre', 'valor', 'dotacion', 'duracion', 'factor_utilizacion', 'total_horas_hombre', 'costo_total','categoria'))  # ✅ Convertimos a lista de diccionarios
-            return JsonResponse(data, safe=False)  
-
-        return super().get(request, *args, **kwargs)
+    columnas = (
+        'id',
+        'nombre',
+        'valor',
+        'dotacion',
+        'duracion',
+        'factor_utilizacion',
+        'total_horas_hombre',
+        'costo_total',
+        'categoria',
+    )
 
 class ActualizarStaffEnami(UpdateView):
     model = StaffEnami
@@ -824,17 +773,11 @@ class CrearStaffEnami(CreateView):
     template_name = 'crear_staff_enami.html'
     success_url = reverse_lazy('tabla_staff_enami')
 
-class ListadoDatosOtrosEP(ListView):
+class ListadoDatosOtrosEP(TablaAjaxMixin, ListView):
     model = DatosOtrosEP
     template_name = 'tabla_datos_otros_ep.html'
     context_object_name = 'datos_otros_ep'
-
-    def get(self, request, *args, **kwargs):
-        if request.headers.get('X-Requested-With') == 'XMLHttpRequest':  
-            data = list(self.get_queryset().values('id', 'comprador', 'dedicacion', 'plazo','sueldo_pax','gestiones','viajes','id_categoria'))  # ✅ Convertimos a lista de diccionarios
-            return JsonResponse(data, safe=False)  
-
-        return super().get(request, *args, **kwargs)
+    columnas = ('id', 'comprador', 'dedicacion', 'plazo', 'sueldo_pax', 'gestiones', 'viajes', 'id_categoria')
 
 class ActualizarDatosOtrosEP(UpdateView):
     model = DatosOtrosEP
@@ -855,22 +798,9 @@ def eliminar_datos_otros_ep(request):
         try:
             datos = DatosOtrosEP.objects.get(id=datos_id)
             
-            # Guardamos referencia a la categoría antes de eliminar
-            categoria = datos.id_categoria
-            categoria_padre = categoria.id_padre if categoria else None
-            
-            # Eliminamos el registro
+            # delete() recalcula la categoría y sus ancestros
             datos.delete()
             
-            # Actualizamos costos en la jerarquía
-            if categoria:
-                categoria.actualizar_total_costo()
-            
-            # Actualizamos categorías padres
-            while categoria_padre:
-                categoria_padre.actualizar_total_costo()
-                categoria_padre = categoria_padre.id_padre
-            
             return JsonResponse({'success': True, 'message': 'Registro eliminado correctamente'})
             
         except DatosOtrosEP.DoesNotExist:
@@ -883,17 +813,11 @@ class CrearDatosOtrosEP(CreateView):
     template_name = 'crear_datos_otros_ep.html'
     success_url = reverse_lazy('tabla_datos_otros_ep')
 
-class ListadoDatosEP(ListView):
+class ListadoDatosEP(TablaAjaxMixin, ListView):
     model = DatosEP
     template_name = 'tabla_datos_ep.html'
     context_object_name = 'datos_ep'
-
-    def get(self, request, *args, **kwargs):
-        if request.headers.get('X-Requested-With') == 'XMLHttpRequest':  
-            data = list(self.get_queryset().values('id', 'hh_profesionales', 'precio_hh', 'id_categoria'))  # ✅ Convertimos a lista de diccionarios
-            return JsonResponse(data, safe=False)  
-
-        return super().get(request, *args, **kwargs)
+    columnas = ('id', 'hh_profesionales', 'precio_hh', 'id_categoria')
 
 class ActualizarDatosEP(UpdateView):
     model = DatosEP
@@ -914,22 +838,9 @@ def eliminar_datos_ep(request):
         try:
             datos_ep = DatosEP.objects.get(id=datos_ep_id)
             
-            # Guardamos referencia a la categoría antes de eliminar
-            categoria = datos_ep.id_categoria
-            categoria_padre = categoria.id_padre if categoria else None
-            
-            # Eliminamos el registro
+            # delete() recalcula la categoría y sus ancestros
             datos_ep.delete()
             
-            # Actualizamos costos
-            if categoria:
-                categoria.actualizar_total_costo()
-            
-            # Actualizamos categorías padres
-            while categoria_padre:
-                categoria_padre.actualizar_total_costo()
-                categoria_padre = categoria_padre.id_padre
-            
             return JsonResponse({'success': True})
             
         except DatosEP.DoesNotExist:
@@ -943,17 +854,27 @@ class CrearDatosEP(CreateView):
     template_name = 'crear_datos_ep.html'
     success_url = reverse_lazy('tabla_datos_ep')
 
-class ListadoCotizacionMateriales(ListView):
+class ListadoCotizacionMateriales(TablaAjaxMixin, ListView):
     model = CotizacionMateriales
     template_name = 'tabla_cotizacion_materiales.html'
     context_object_name = 'cotizacion_materiales'
-
-    def get(self, request, *args, **kwargs):
-        if request.headers.get('X-Requested-With') == 'XMLHttpRequest':  
-            data = list(self.get_queryset().values('id', 'id_categoria', 'tipo_suministro', 'tipo_moneda', 'pais_entrega', 'fecha_cotizacion_referencia', 'cotizacion_usd', 'cotizacion_clp','factor_correccion','moneda_aplicada','flete_unitario','origen_precio','cotizacion','moneda_origen','tasa_cambio'))  # ✅ Convertimos a lista de diccionarios
-            return JsonResponse(data, safe=False)  
-
-        return super().get(request, *args, **kwargs)
+    columnas = (
+        'id',
+        'id_categoria',
+        'tipo_suministro',
+        'tipo_moneda',
+        'pais_entrega',
+        'fecha_cotizacion_referencia',
+        'cotizacion_usd',
+        'cotizacion_clp',
+        'factor_correccion',
+        'moneda_aplicada',
+        'flete_unitario',
+        'origen_precio',
+        'cotizacion',
+        'moneda_origen',
+        'tasa_cambio',
+    )
     
 class ActualizarCotizacionMateriales(UpdateView):
     model = CotizacionMateriales
@@ -985,17 +906,21 @@ def eliminar_cotizacion_materiales(request):
             return JsonResponse({'success': False, 'error': 'Registro no encontrado'})
     return JsonResponse({'success': False, 'error': 'Método no permitido'})
 
-class ListadoContratoSubcontrato(ListView):
+class ListadoContratoSubcontrato(TablaAjaxMixin, ListView):
     model = ContratoSubcontrato
     template_name = 'tabla_contrato_subcontrato.html'
     context_object_name = 'contrato_subcontrato'
-
-    def get(self, request, *args, **kwargs):
-        if request.headers.get('X-Requested-With') == 'XMLHttpRequest':  
-            data = list(self.get_queryset().values('id', 'id_categoria', 'costo_laboral_indirecto_usd_hh', 'total_usd_indirectos_contratista', 'usd_por_unidad', 'fc_subcontrato', 'usd_total_subcontrato', 'costo_contrato_total','costo_contrato_unitario'))  # ✅ Convertimos a lista de diccionarios
-            return JsonResponse(data, safe=False)  
-
-        return super().get(request, *args, **kwargs)
+    columnas = (
+        'id',
+        'id_categoria',
+        'costo_laboral_indirecto_usd_hh',
+        'total_usd_indirectos_contratista',
+        'usd_por_unidad',
+        'fc_subcontrato',
+        'usd_total_subcontrato',
+        'costo_contrato_total',
+        'costo_contrato_unitario',
+    )
     
 class ActualizarContratoSubcontrato(UpdateView):
     model = ContratoSubcontrato
@@ -1028,17 +953,11 @@ def eliminar_contrato_subcontrato(request):
     return JsonResponse({'success': False, 'error': 'Método no permitido'})
 
 
-class ListadoIngenieriaDetallesContraparte(ListView):
+class ListadoIngenieriaDetallesContraparte(TablaAjaxMixin, ListView):
     model = IngenieriaDetallesContraparte
     template_name = 'tabla_ingenieria_detalles_contraparte.html'
     context_object_name = 'ingenieria_detalles_contraparte'
-
-    def get(self, request, *args, **kwargs):
-        if request.headers.get('X-Requested-With') == 'XMLHttpRequest':  
-            data = list(self.get_queryset().values('id', 'id_categoria', 'nombre', 'UF', 'MB','total_usd'))  # ✅ Convertimos a lista de diccionarios
-            return JsonResponse(data, safe=False)  
-
-        return super().get(request, *args, **kwargs)
+    columnas = ('id', 'id_categoria', 'nombre', 'UF', 'MB', 'total_usd')
     
 class ActualizarIngenieriaDetallesContraparte(UpdateView):
     model = IngenieriaDetallesContraparte
@@ -1070,17 +989,22 @@ def eliminar_ingenieria_detalles_contraparte(request):
             return JsonResponse({'success': False, 'error': 'Registro no encontrado'})
     return JsonResponse({'success': False, 'error': 'Método no permitido'})
 
-class ListadoGestionPermisos(ListView):
+class ListadoGestionPermisos(TablaAjaxMixin, ListView):
     model = GestionPermisos
     template_name = 'tabla_gestion_permisos.html'
     context_object_name = 'gestion_permisos'
-
-    def get(self, request, *args, **kwargs):
-        if request.headers.get('X-Requested-With') == 'XMLHttpRequest':  
-            data = list(self.get_queryset().values('id', 'id_categoria', 'nombre', 'dedicacion', 'meses','cantidad','turno','MB','HH','total_usd'))  # ✅ Convertimos a lista de diccionarios
-            return JsonResponse(data, safe=False)  
-
-        return super().get(request, *args, **kwargs)
+    columnas = (
+        'id',
+        'id_categoria',
+        'nombre',
+        'dedicacion',
+        'meses',
+        'cantidad',
+        'turno',
+        'MB',
+        'HH',
+        'total_usd',
+    )
     
 class ActualizarGestionPermisos(UpdateView):
     model = GestionPermisos
@@ -1112,17 +1036,11 @@ def eliminar_gestion_permisos(request):
             return JsonResponse({'success': False, 'error': 'Registro no encontrado'})
     return JsonResponse({'success': False, 'error': 'Método no permitido'})
 
-class ListadoDueno(ListView):
+class ListadoDueno(TablaAjaxMixin, ListView):
     model = Dueno
     template_name = 'tabla_dueno.html'
     context_object_name = 'dueno'
-
-    def get(self, request, *args, **kwargs):
-        if request.headers.get('X-Requested-With') == 'XMLHttpRequest':  
-            data = list(self.get_queryset().values('id', 'id_categoria', 'nombre', 'total_hh', 'costo_hh_us','costo_total'))  # ✅ Convertimos a lista de diccionarios
-            return JsonResponse(data, safe=False)  
-
-        return super().get(request, *args, **kwargs)
+    columnas = ('id', 'id_categoria', 'nombre', 'total_hh', 'costo_hh_us', 'costo_total')
     
 class ActualizarDueno(UpdateView):
     model = Dueno
@@ -1154,17 +1072,11 @@ def eliminar_dueno(request):
             return JsonResponse({'success': False, 'error': 'Registro no encontrado'})
     return JsonResponse({'success': False, 'error': 'Método no permitido'})
 
-class ListadoMB(ListView):
+class ListadoMB(TablaAjaxMixin, ListView):
     model = MB
     template_name = "tabla_mb.html"
     context_object_name = "mb"
-
-    def get(self, request, *args, **kwargs):
-        if request.headers.get('X-Requested-With') == 'XMLHttpRequest':  
-            data = list(self.get_queryset().values('id', 'mb', 'fc', 'anio'))  # ✅ Convertimos a lista de diccionarios
-            return JsonResponse(data, safe=False)  
-
-        return super().get(request, *args, **kwargs)
+    columnas = ('id', 'mb', 'fc', 'anio')
     
 class ActualizarMB(UpdateView):
     model = MB
@@ -1196,17 +1108,23 @@ def eliminar_mb(request):
             return JsonResponse({'success': False, 'error': 'Registro no encontrado'})
     return JsonResponse({'success': False, 'error': 'Método no permitido'})
 
-class ListadoAdministracionSupervision(ListView):
+class ListadoAdministracionSupervision(TablaAjaxMixin, ListView):
     model = AdministracionSupervision
     template_name = "tabla_administracion_supervision.html"
     context_object_name = "administracion_supervision"
-
-    def get(self, request, *args, **kwargs):
-        if request.headers.get('X-Requested-With') == 'XMLHttpRequest':  
-            data = list(self.get_queryset().values('id', 'id_categoria', 'unidad', 'precio_unitario_clp', 'total_unitario','factor_uso','cantidad_u_persona','mb_seleccionado','costo_total_clp','costo_total_us','costo_total_mb'))  # ✅ Convertimos a lista de diccionarios
-            return JsonResponse(data, safe=False)  
-
-        return super().get(request, *args, **kwargs)
+    columnas = (
+        'id',
+        'id_categoria',
+        'unidad',
+        'precio_unitario_clp',
+        'total_unitario',
+        'factor_uso',
+        'cantidad_u_persona',
+        'mb_seleccionado',
+        'costo_total_clp',
+        'costo_total_us',
+        'costo_total_mb',
+    )
     
 class ActualizarAdministracionSupervision(UpdateView):
     model = AdministracionSupervision
@@ -1242,17 +1160,25 @@ def eliminar_administracion_supervision(request):
             return JsonResponse({'success': False, 'error': 'Registro no encontrado'})
     return JsonResponse({'success': False, 'error': 'Método no permitido'})
 
-class ListadoPersonalIndirectoContratista(ListView):
+class ListadoPersonalIndirectoContratista(TablaAjaxMixin, ListView):
     model = PersonalIndirectoContratista
     template_name = "tabla_personal_indirecto_contratista.html"
     context_object_name = "personal_indirecto_contratista"
-
-    def get(self, request, *args, **kwargs):
-        if request.headers.get('X-Requested-With') == 'XMLHttpRequest':  
-            data = list(self.get_queryset().values('id', 'id_categoria', 'mb_seleccionado', 'turno', 'unidad','hh_mes','plazo_mes','total_hh','precio_unitario_clp_hh','tarifa_usd_hh','costo_total_clp','costo_total_us','costo_total_mb'))  # ✅ Convertimos a lista de diccionarios
-            return JsonResponse(data, safe=False)  
-
-        return super().get(request, *args, **kwargs)
+    columnas = (
+        'id',
+        'id_categoria',
+        'mb_seleccionado',
+        'turno',
+        'unidad',
+        'hh_mes',
+        'plazo_mes',
+        'total_hh',
+        'precio_unitario_clp_hh',
+        'tarifa_usd_hh',
+        'costo_total_clp',
+        'costo_total_us',
+        'costo_total_mb',
+    )
     
 class ActualizarPersonalIndirectoContratista(UpdateView):
     model = PersonalIndirectoContratista
@@ -1281,37 +1207,19 @@ def eliminar_personal_indirecto_contratista(request):
             # Buscar el objeto por ID
             personal = PersonalIndirectoContratista.objects.get(id=personal_id)
             
-            # Guardar la categoría padre antes de eliminar
-            categoria_padre = personal.id_categoria.id_padre if personal.id_categoria else None
-            
-            # Eliminar el objeto
+            # delete() recalcula la categoría y sus ancestros
             personal.delete()
-            
-            # Actualizar la categoría y sus categorías superiores
-            if personal.id_categoria:
-                personal.id_categoria.actualizar_total_costo()
-            
-            while categoria_padre:
-                print(f"Actualizando categoría padre después de eliminar: {categoria_padre.id}")  # Debugging
-                categoria_padre.actualizar_total_costo()
-                categoria_padre = categoria_padre.id_padre  # Subir a la categoría superior
 
             return JsonResponse({'success': True})
         except PersonalIndirectoContratista.DoesNotExist:
             return JsonResponse({'success': False, 'error': 'Registro no encontrado'})
     return JsonResponse({'success': False, 'error': 'Método no permitido'})
 
-class ListadoServiciosApoyo(ListView):
+class ListadoServiciosApoyo(TablaAjaxMixin, ListView):
     model = ServiciosApoyo
     template_name = "tabla_servicios_apoyo.html"
     context_object_name = "servicios_apoyo"
-
-    def get(self, request, *args, **kwargs):
-        if request.headers.get('X-Requested-With') == 'XMLHttpRequest':  
-            data = list(self.get_queryset().values('id', 'id_categoria', 'unidad', 'cantidad', 'hh_totales','tarifas_clp','mb','total_usd'))  # ✅ Convertimos a lista de diccionarios
-            return JsonResponse(data, safe=False)  
-
-        return super().get(request, *args, **kwargs)
+    columnas = ('id', 'id_categoria', 'unidad', 'cantidad', 'hh_totales', 'tarifas_clp', 'mb', 'total_usd')
     
 class ActualizarServiciosApoyo(UpdateView):
     model = ServiciosApoyo
@@ -1346,17 +1254,11 @@ def eliminar_servicios_apoyo(request):
             return JsonResponse({'success': False, 'error': 'Registro no encontrado'})
     return JsonResponse({'success': False, 'error': 'Método no permitido'})
 
-class ListadoOtrosADM(ListView):
+class ListadoOtrosADM(TablaAjaxMixin, ListView):
     model = OtrosADM
     template_name = "tabla_otros_adm.html"
     context_object_name = "otros_adm"
-
-    def get(self, request, *args, **kwargs):
-        if request.headers.get('X-Requested-With') == 'XMLHttpRequest':  
-            data = list(self.get_queryset().values('id', 'id_categoria', 'HH', 'MB', 'total_usd','dedicacion','meses','cantidad','turno'))  # ✅ Convertimos a lista de diccionarios
-            return JsonResponse(data, safe=False)  
-
-        return super().get(request, *args, **kwargs)
+    columnas = ('id', 'id_categoria', 'HH', 'MB', 'total_usd', 'dedicacion', 'meses', 'cantidad', 'turno')
     
 class ActualizarOtrosADM(UpdateView):
     model = OtrosADM
@@ -1392,17 +1294,11 @@ def eliminar_otros_adm(request):
     return JsonResponse({'success': False, 'error': 'Método no permitido'})
 
 
-class ListadoAdministrativoFinanciero(ListView):
+class ListadoAdministrativoFinanciero(TablaAjaxMixin, ListView):
     model = AdministrativoFinanciero
     template_name = "tabla_administrativo_financiero.html"
     context_object_name = "administrativo_financiero"
-
-    def get(self, request, *args, **kwargs):
-        if request.headers.get('X-Requested-With') == 'XMLHttpRequest':  
-            data = list(self.get_queryset().values('id', 'id_categoria', 'unidad', 'valor', 'meses','sobre_contrato_base','costo_total'))  # ✅ Convertimos a lista de diccionarios
-            return JsonResponse(data, safe=False)  
-
-        return super().get(request, *args, **kwargs)
+    columnas = ('id', 'id_categoria', 'unidad', 'valor', 'meses', 'sobre_contrato_base', 'costo_total')
     
 class ActualizarAdministrativoFinanciero(UpdateView):
     model = AdministrativoFinanciero
@@ -1462,33 +1358,99 @@ def obtener_subcategorias(request, categoria_id):
 
 @api_view(['GET'])
 def obtener_subcategorias(request, categoria_id):
-    try:
-        categoria = CategoriaNuevo.objects.get(id=categoria_id)
-    except CategoriaNuevo.DoesNotExist:
+    """Subárbol completo de la categoría para desplegable.html (una consulta recursiva)."""
+    if not CategoriaNuevo.objects.filter(id=categoria_id).exists():
         return Response({"error": "Categoría no encontrada"}, status=404)
 
-    # Obtener subcategorías de primer nivel
-    subcategorias = categoria.subcategorias.all()
-
-    # Función recursiva para obtener todos los niveles de subcategorías
-    def get_all_subcategorias(categoria):
-        subcategoria_data = []
-        for subcategoria in categoria.subcategorias.all():
-            sub_subcategorias = get_all_subcategorias(subcategoria)  # Recursión para obtener sub-subcategorías
-            subcategoria_data.append({
-                'id': subcategoria.id,
-                'nombre': subcategoria.nombre,
-                'costo': subcategoria.total_costo,
-                'sub_subcategorias': sub_subcategorias
-            })
-        return subcategoria_data
-
-    # Obtener todas las subcategorías para la categoría
-    subcategoria_data = get_all_subcategorias(categoria)
-
+    filas = filas_subarbol(categoria_id)
+    subcategoria_data = armar_subarbol(
+        filas, categoria_id, clave_hijos='sub_subcategorias', renombrar={'total_costo': 'costo'}
+    )
     return Response(subcategoria_data)
 
 
+@api_view(['GET'])
+def obtener_subarbol_categoria(request, categoria_id):
+    """Subárbol de una categoría con carga por niveles.
+
+    Parámetros opcionales: ``max_depth`` (niveles bajo la categoría) y ``fields``
+    (lista separada por comas de los campos de cada nodo).
+    """
+    if not CategoriaNuevo.objects.filter(id=categoria_id).exists():
+        return Response({"error": "Categoría no encontrada"}, status=404)
+
+    max_depth = request.GET.get('max_depth')
+    if max_depth is not None:
+        try:
+            max_depth = int(max_depth)
+        except ValueError:
+            max_depth = 0
+        if max_depth < 1:
+            return Response({"error": "max_depth debe ser un entero mayor o igual a 1"}, status=400)
+
+    campos = CAMPOS_SUBARBOL_DEFECTO
+    if request.GET.get('fields'):
+        campos = tuple(c.strip() for c in request.GET['fields'].split(',') if c.strip())
+        invalidos = [c for c in campos if c not in CAMPOS_SUBARBOL]
+        if invalidos:
+            return Response({"error": f"Campos no permitidos: {', '.join(invalidos)}"}, status=400)
+
+    filas = filas_subarbol(categoria_id, max_depth=max_depth, campos=campos)
+    return Response(armar_subarbol(filas, categoria_id, campos=campos, max_depth=max_depth))
+
+
+@api_view(['POST'])
+def validar_importacion(request):
+    """Simula la importación de una planilla sin escribir nada.
+
+    Recibe ``archivo`` (.xlsx, .csv o .parquet) y ``modelo_destino`` y retorna qué pasaría con cada fila
+    (nuevo, actualizado, omitido o error, con el motivo) y la variación proyectada del
+    total de cada categoría raíz de los proyectos afectados.
+    """
+    espec = CARGAS.get(request.data.get('modelo_destino'))
+    if espec is None:
+        return Response({'error': 'Modelo de destino no válido'}, status=400)
+    archivo = request.FILES.get('archivo')
+    if archivo is None:
+        return Response({'error': 'Debe adjuntar un archivo'}, status=400)
+
+    try:
+        df = leer_planilla(archivo)
+        resultado = importar_dataframe(espec, df, archivo.name, simular=True)
+    except Exception as e:  # planilla ilegible o sin las columnas requeridas
+        return Response({'error': f'No se pudo validar el archivo: {e}'}, status=400)
+    return Response(resultado.como_dict())
+
+
+@api_view(['GET'])
+def estado_trabajo_importacion(request, trabajo_id):
+    """Estado y avance por cargador y por lote de un trabajo de importación."""
+    trabajo = get_object_or_404(TrabajoImportacion, id=trabajo_id)
+    return Response(estado_trabajo(trabajo))
+
+
+@api_view(['POST'])
+def cancelar_trabajo_importacion(request, trabajo_id):
+    """Cancela el trabajo; si está en curso se detiene al terminar el lote actual."""
+    trabajo = get_object_or_404(TrabajoImportacion, id=trabajo_id)
+    try:
+        cancelar_trabajo(trabajo)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=409)
+    return Response(estado_trabajo(trabajo))
+
+
+@api_view(['POST'])
+def reanudar_trabajo_importacion(request, trabajo_id):
+    """Vuelve a encolar un trabajo cancelado o fallido desde su último lote confirmado."""
+    trabajo = get_object_or_404(TrabajoImportacion, id=trabajo_id)
+    try:
+        reanudar_trabajo(trabajo)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=409)
+    return Response(estado_trabajo(trabajo))
+
+
 
 
 
@@ -1515,9 +1477,19 @@ def subir_archivo(request):
             with open(destino_path, 'wb+') as destination:
                 for chunk in archivo.archivo.chunks():
                     destination.write(chunk)
-            
-            # Ahora guardamos el modelo con la nueva ubicación del archivo
-            archivo.archivo.name = os.path.join(modelo_destino, archivo_nombre)
+            hash_contenido = hash_archivo(destino_path)
+
+            # Un archivo con el mismo nombre reemplaza al anterior: se reutiliza su registro
+            # para que la próxima carga aplique solo lo que cambió (o lo salte si es idéntico)
+            ruta_relativa = os.path.join(modelo_destino, archivo_nombre)
+            existente = ArchivoSubido.objects.filter(archivo=ruta_relativa).order_by('-id').first()
+            if existente is not None:
+                archivo = existente
+            # Como texto: el archivo ya está escrito y el FileField no debe guardar otra copia
+            archivo.archivo = ruta_relativa
+            archivo.hash_contenido = hash_contenido
+            if archivo.hash_importado != hash_contenido:
+                archivo.estado_importacion = ArchivoSubido.PENDIENTE
             archivo.save()  # Guardar el modelo con la ruta actualizada
 
             # Guardamos el nombre del archivo en la sesión para usarlo después
@@ -1534,8 +1506,9 @@ def subir_archivo(request):
 ####################################################################################################################
 
 def categorias_raiz_json(request, proyecto_id):
-    categorias = CategoriaNuevo.objects.filter(id_padre__isnull=True, proyecto_id=proyecto_id).values('nombre', 'total_costo')
-    data = [{'name': c['nombre'], 'value': float(c['total_costo'])} for c in categorias]
+    proyecto = resumen_proyecto(proyecto_id)
+    categorias = proyecto['raices'] if proyecto else []
+    data = [{'name': c['nombre'], 'value': float(c['total_costo'] or 0)} for c in categorias]
     return JsonResponse(data, safe=False)
 
 def listar_proyectos(request):
@@ -1545,237 +1518,143 @@ def listar_proyectos(request):
 #####################################################################################################################
 
 def exportar_excel(request, modelo_nombre):
+    """Descarga la tabla de ``modelo_nombre`` leyéndola por bloques (ver exportacion.py).
+
+    ``formato`` es ``xlsx`` (por defecto), ``csv`` o ``parquet``; ``proyecto`` y
+    ``categoria`` (con su subárbol) filtran las filas.
+    """
     try:
         # Obtener el modelo dinámicamente
         Modelo = apps.get_model(app_label='proyectoApp', model_name=modelo_nombre)
-        
-        # Obtener los datos de la tabla
-        data = Modelo.objects.all().values()
-        
-        # Convertir datos a un DataFrame de Pandas
-        df = pd.DataFrame(list(data))
-        
-        # Crear la respuesta HTTP con el archivo Excel
-        response = HttpResponse(content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-        response['Content-Disposition'] = f'attachment; filename={modelo_nombre}.xlsx'
-        
-        # Guardar el DataFrame en la respuesta
-        with pd.ExcelWriter(response, engine='xlsxwriter') as writer:
-            df.to_excel(writer, index=False, sheet_name='Datos')
-        
-        return response
+    except LookupError:
+        return HttpResponse(f"Modelo no encontrado: {modelo_nombre}", status=404)
+
+    formato = request.GET.get('formato', 'xlsx')
+    if formato not in FORMATOS:
+        return HttpResponse(f"Formato no soportado: {formato}", status=400)
+
+    try:
+        queryset = filtrar_exportacion(Modelo.objects.all(), request.GET)
+        contenido = EXPORTADORES[formato](queryset, columnas_exportacion(Modelo))
+    except ValueError as e:
+        return HttpResponse(f"Error al exportar: {str(e)}", status=400)
     except Exception as e:
         return HttpResponse(f"Error al exportar: {str(e)}", status=500)
 
+    nombre = f'{modelo_nombre}.{formato}'
+    if formato == 'csv':
+        response = StreamingHttpResponse(contenido, content_type=FORMATOS[formato])
+        response['Content-Disposition'] = f'attachment; filename={nombre}'
+        return response
+    return FileResponse(contenido, as_attachment=True, filename=nombre, content_type=FORMATOS[formato])
+
 
 
 
 #########################################################################################################################
 
 
+@require_POST
 def duplicar_proyecto(request, proyecto_id):
+    """Copia el proyecto en la base de datos (ver clonacion.py) y responde con el proyecto nuevo.
+
+    El cuerpo JSON puede traer ``prefijo`` (por defecto "c") y ``nombre``.
+    """
     try:
-        # 1. Configuración de modelos y campos permitidos
-        MODELOS = [
-            'ProyectoNuevo',
-            'CategoriaNuevo',
-            'CostoNuevo',
-            'Adquisiciones',
-            'MaterialesOtros',
-            'ManoObra',
-            'EquiposConstruccion',
-            'ApuGeneral',
-            'ApuEspecifico',
-            'EspecificoCategoria',
-            'StaffEnami',
-            'DatosEP',
-            'DatosOtrosEP',
-            'Cantidades',
-            'ContratoSubcontrato',
-            'CotizacionMateriales',
-            'IngenieriaDetallesContraparte',
-            'GestionPermisos',
-            'Dueno',
-            'MB',
-            'AdministracionSupervision',
-            'PersonalIndirectoContratista',
-            'ServiciosApoyo',
-            'OtrosADM',
-            'AdministrativoFinanciero',
-        ]
-
-        CAMPOS_PERMITIDOS = {
-            'ProyectoNuevo': ['id', 'nombre', 'proyecto_relacionado'],
-            'CategoriaNuevo': ['id', 'nombre', 'proyecto', 'id_padre', 'categoria_relacionada', 'final', 'nivel'],
-            'CostoNuevo': ['id', 'monto', 'categoria'],
-            'Adquisiciones': ['id_categoria', 'tipo_origen', 'tipo_categoria', 'costo_unitario', 'crecimiento'],
-            'MaterialesOtros': ['id_categoria', 'costo_unidad', 'crecimiento'],
-            'ManoObra': ['id_categoria', 'horas_hombre_unidad', 'fp', 'costo_hombre_hora', 'rendimiento', 'tarifas_usd_hh_mod', 'tarifa_usd_hh_equipos'],
-            'EquiposConstruccion': ['id_categoria', 'horas_maquina_unidad', 'costo_maquina_hora'],
-            'ApuGeneral': ['id', 'nombre'],
-            'ApuEspecifico': ['id_apu_general', 'id_mano_obra', 'nombre', 'unidad_medida', 'cantidad', 'precio_unitario', 'id_categoria'],
-            'EspecificoCategoria': ['id_categoria', 'unidad', 'cantidad', 'dedicacion', 'duracion', 'costo'],
-            'StaffEnami': ['categoria', 'nombre', 'valor', 'dotacion', 'duracion', 'factor_utilizacion'],
-            'DatosEP': ['id', 'hh_profesionales', 'precio_hh', 'id_categoria'],
-            'DatosOtrosEP': ['comprador', 'dedicacion', 'plazo', 'sueldo_pax', 'viajes', 'id_categoria'],
-            'Cantidades': ['id_categoria', 'unidad_medida', 'cantidad', 'fc'],
-            'ContratoSubcontrato': ['id_categoria', 'costo_laboral_indirecto_usd_hh', 'fc_subcontrato'],
-            'CotizacionMateriales': ['id_categoria', 'tipo_suministro', 'tipo_moneda', 'pais_entrega', 
-                                   'fecha_cotizacion_referencia', 'cotizacion_usd', 'cotizacion_clp', 
-                                   'factor_correccion', 'moneda_aplicada', 'origen_precio', 'cotizacion', 
-                                   'moneda_origen', 'tasa_cambio', 'flete_unitario'],
-            'IngenieriaDetallesContraparte': ['id_categoria', 'nombre', 'UF', 'MB'],
-            'GestionPermisos': ['id_categoria', 'nombre', 'dedicacion', 'meses', 'cantidad', 'turno', 'MB'],
-            'Dueno': ['id_categoria', 'nombre', 'total_hh', 'costo_hh_us'],
-            'MB': ['id', 'mb', 'fc', 'anio'],
-            'AdministracionSupervision': ['id_categoria', 'unidad', 'precio_unitario_clp', 'total_unitario', 'factor_uso', 'cantidad_u_persona', 'mb_seleccionado'],
-            'PersonalIndirectoContratista': ['id_categoria', 'unidad', 'hh_mes', 'plazo_mes', 'precio_unitario_clp_hh', 'mb_seleccionado', 'turno'],
-            'ServiciosApoyo': ['id_categoria', 'unidad', 'cantidad', 'hh_totales', 'tarifas_clp', 'mb'],
-            'OtrosADM': ['id_categoria', 'dedicacion', 'meses', 'cantidad', 'turno', 'MB'],
-            'AdministrativoFinanciero': ['id_categoria', 'unidad', 'valor', 'meses', 'sobre_contrato_base', 'costo_total'],
-        }
+        datos = json.loads(request.body or '{}')
+    except json.JSONDecodeError:
+        return JsonResponse({'error': 'JSON no válido'}, status=400)
+    try:
+        nuevo, copiadas = clonar_proyecto(proyecto_id, prefijo=datos.get('prefijo') or 'c', nombre=datos.get('nombre'))
+    except ProyectoNuevo.DoesNotExist:
+        return JsonResponse({'error': 'Proyecto no encontrado'}, status=404)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    return JsonResponse({
+        'id': nuevo.id,
+        'nombre': nuevo.nombre,
+        'costo_total': float(nuevo.costo_total),
+        'filas': copiadas,
+    }, status=201)
 
-        # 2. Crear directorio temporal
-        with tempfile.TemporaryDirectory() as temp_dir:
-            zip_path = os.path.join(temp_dir, f"duplicado_{proyecto_id}.zip")
-            
-            with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-                # Diccionario para mapear todos los IDs
-                id_mapping = {
-                    'ProyectoNuevo': {},
-                    'CategoriaNuevo': {},
-                    # Agregar otros modelos si necesitas mapear sus IDs
-                }
-
-                # 3. Procesar ProyectoNuevo
-                Proyecto = apps.get_model('proyectoApp', 'ProyectoNuevo')
-                proyecto = Proyecto.objects.get(id=proyecto_id)
-                id_mapping['ProyectoNuevo'][proyecto.id] = f"c{proyecto.id}"
-                
-                data_proyecto = [{
-                    'id': id_mapping['ProyectoNuevo'][proyecto.id],
-                    'nombre': f"Copia de {proyecto.nombre}",
-                    'proyecto_relacionado': proyecto.proyecto_relacionado
-                }]
-                
-                df_proyecto = pd.DataFrame(data_proyecto)
-                excel_path = os.path.join(temp_dir, "ProyectoNuevo.xlsx")
-                df_proyecto.to_excel(excel_path, index=False)
-                zip_file.write(excel_path, "ProyectoNuevo.xlsx")
-                
-                # 4. Procesar CategoriaNuevo
-                Categoria = apps.get_model('proyectoApp', 'CategoriaNuevo')
-                categorias = Categoria.objects.filter(proyecto_id=proyecto_id)
-                
-                data_categorias = []
-                for cat in categorias:
-                    new_id = f"c{cat.id}"
-                    id_mapping['CategoriaNuevo'][cat.id] = new_id
-                    
-                    item = {
-                        'id': new_id,
-                        'nombre': cat.nombre,
-                        'proyecto': id_mapping['ProyectoNuevo'][proyecto.id],
-                        'id_padre': f"c{cat.id_padre}" if cat.id_padre else None,
-                        'categoria_relacionada': cat.categoria_relacionada,
-                        'nivel': cat.nivel,
-                        'final': cat.final,
-                        
-                    }
-                    data_categorias.append(item)
-                
-                if data_categorias:
-                    df_categorias = pd.DataFrame(data_categorias)
-                    excel_path = os.path.join(temp_dir, "CategoriaNuevo.xlsx")
-                    df_categorias.to_excel(excel_path, index=False)
-                    zip_file.write(excel_path, "CategoriaNuevo.xlsx")
-                
-                # 5. Procesar otros modelos
-                for model_name in MODELOS[2:]:  # Saltar los primeros dos
-                    try:
-                        Model = apps.get_model('proyectoApp', model_name)
-                        campos = CAMPOS_PERMITIDOS.get(model_name, [])
-                        
-                        # Obtener todos los campos que son relaciones
-                        relation_fields = [
-                            f.name for f in Model._meta.get_fields() 
-                            if (f.is_relation and f.many_to_one) or 
-                               (f.name.endswith('_id') and f.name != 'id')
-                        ]
-                        
-                        # Filtrar por relaciones con categorías
-                        categoria_fields = [f for f in relation_fields 
-                                          if f in ['id_categoria', 'categoria'] or 
-                                             (f.endswith('_id') and 'categoria' in f.lower())]
-                        
-                        queryset = Model.objects.filter(**{f"{categoria_fields[0]}__in": list(id_mapping['CategoriaNuevo'].keys())})
-                        
-                        data = []
-                        for obj in queryset:
-                            item = {'id': f"c{obj.id}"}
-                            
-                            for field_name in campos:
-                                if field_name == 'id':
-                                    continue
-                                    
-                                try:
-                                    value = getattr(obj, field_name)
-                                    
-                                    # Aplicar prefijo 'c' a:
-                                    # 1. Campos que terminan en '_id'
-                                    # 2. Campos de relación (ForeignKey)
-                                    if field_name.endswith('_id') or field_name in relation_fields:
-                                        if value:
-                                            item[field_name] = f"c{value}"
-                                        else:
-                                            item[field_name] = None
-                                    else:
-                                        item[field_name] = value
-                                except AttributeError:
-                                    continue
-                            
-                            data.append(item)
-                        
-                        if data:
-                            df = pd.DataFrame(data)
-                            # Ordenar columnas según configuración
-                            ordered_columns = [col for col in campos if col in df.columns]
-                            df = df[ordered_columns]
-                            
-                            excel_path = os.path.join(temp_dir, f"{model_name}.xlsx")
-                            df.to_excel(excel_path, index=False)
-                            zip_file.write(excel_path, f"{model_name}.xlsx")
-                    
-                    except Exception as e:
-                        print(f"Error en {model_name}: {str(e)}")
-                        continue
-
-            # 6. Leer y enviar ZIP
-            with open(zip_path, 'rb') as f:
-                zip_data = f.read()
-
-        # 7. Preparar respuesta
-        response = HttpResponse(zip_data, content_type='application/zip')
-        response['Content-Disposition'] = f'attachment; filename="duplicado_completo_{proyecto_id}.zip"'
-        return response
 
-    except Exception as e:
+def archivo_proyecto(request, proyecto_id):
+    """Descarga el proyecto completo como ZIP generado mientras se envía (ver archivo_proyecto.py).
+
+    ``formato`` elige el tipo de cada tabla: ``csv`` (por defecto), ``xlsx`` o ``parquet``.
+    """
+    if not ProyectoNuevo.objects.filter(id=proyecto_id).exists():
+        return JsonResponse({'error': 'Proyecto no encontrado'}, status=404)
+    try:
+        contenido = zip_proyecto(proyecto_id, request.GET.get('formato', 'csv'))
+    except ValueError as e:
         return JsonResponse({'error': str(e)}, status=400)
+    response = StreamingHttpResponse(contenido, content_type='application/zip')
+    response['Content-Disposition'] = f'attachment; filename="proyecto_{proyecto_id}.zip"'
+    return response
     
 
 
 
+@require_POST
+def eliminar_masivo(request, modelo_nombre):
+    """Elimina varias filas de una tabla de costo con un solo recálculo por proyecto (ver eliminacion.py).
+
+    Los ids llegan como JSON (``{"ids": [...]}``) o como ``ids[]`` de un formulario.
+    """
+    try:
+        Modelo = apps.get_model(app_label='proyectoApp', model_name=modelo_nombre)
+    except LookupError:
+        return JsonResponse({'success': False, 'error': f'Modelo no encontrado: {modelo_nombre}'}, status=404)
+
+    if request.content_type == 'application/json':
+        try:
+            ids = json.loads(request.body or '{}').get('ids') or []
+        except (json.JSONDecodeError, AttributeError):
+            return JsonResponse({'success': False, 'error': 'JSON no válido'}, status=400)
+    else:
+        ids = request.POST.getlist('ids[]')
+
+    try:
+        resultado = eliminar_filas(Modelo, ids)
+    except ValueError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+    return JsonResponse({'success': True, **resultado})
+
+
+@require_http_methods(['PATCH', 'POST'])
+def editar_masivo(request, modelo_nombre):
+    """Aplica los mismos cambios a varias filas de una tabla de costo (ver edicion.py).
+
+    Cuerpo JSON: ``{"cambios": {campo: valor}, "ids": [...], "proyecto": ..., "categoria": ...}``;
+    las filas se eligen por ids, por proyecto y/o por categoría (con su subárbol).
+    """
+    try:
+        Modelo = apps.get_model(app_label='proyectoApp', model_name=modelo_nombre)
+    except LookupError:
+        return JsonResponse({'success': False, 'error': f'Modelo no encontrado: {modelo_nombre}'}, status=404)
+
+    try:
+        datos = json.loads(request.body or '{}')
+        cambios = datos.get('cambios')
+        filtros = {clave: datos.get(clave) for clave in ('ids', 'proyecto', 'categoria')}
+    except (json.JSONDecodeError, AttributeError):
+        return JsonResponse({'success': False, 'error': 'JSON no válido'}, status=400)
+
+    try:
+        resultado = editar_filas(Modelo, cambios, filtros)
+    except ValueError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+    return JsonResponse({'success': True, **resultado})
+
+
 ########################################################################################################################
 
 @require_POST
 def eliminar_categorias_masivo(request):
+    """Elimina varias categorías (con sus subárboles) y recalcula una vez cada proyecto afectado."""
     try:
-        ids = request.POST.getlist('ids[]')  # Obtener lista de IDs
-        # Aquí implementas la lógica para eliminar múltiples categorías
-        # Ejemplo:
-        from .models import CategoriaNuevo
-        CategoriaNuevo.objects.filter(id__in=ids).delete()
-        
-        return JsonResponse({'success': True})
-    except Exception as e:
-        return JsonResponse({'success': False, 'error': str(e)})
\ No newline at end of file
+        resultado = eliminar_categorias(request.POST.getlist('ids[]'))
+    except ValueError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+    return JsonResponse({'success': True, **resultado})
@@ -1,76 +1,134 @@
-function listadoCategoria() {
-    $.ajax({
-        url: "/tabla_categoria_nuevo/",
-        type: "GET",
-        dataType: "json",
-        headers: { "X-Requested-With": "XMLHttpRequest" },
-        success: function(response) {
-            // ✅ Destruir instancia previa de DataTable si existe
-            if ($.fn.DataTable.isDataTable('#tabla_categorias')) {
-                $('#tabla_categorias').DataTable().destroy();
+// ✅ Tablas paginadas en el servidor (ver proyectoApp/tablas.py): DataTables pide solo la
+// página visible y aquí se traduce a limite/orden/buscar/filtro. Al avanzar página por
+// página se usa el cursor que entregó la página anterior; al saltar, el desplazamiento.
+function tablaServidor(url) {
+    var cursores = {};
+    var consultaPrevia = null;
+
+    return {
+        serverSide: true,
+        processing: true,
+        searchDelay: 400,
+        ajax: function (datos, callback) {
+            var parametros = { limite: datos.length > 0 ? datos.length : 500 };
+            var orden = datos.order && datos.order[0];
+            var columna = orden ? datos.columns[orden.column].data : null;
+            if (columna) {
+                parametros.orden = (orden.dir === "desc" ? "-" : "") + columna;
             }
-            
-            // ✅ Inicializar DataTable con los datos correctos
-            var table = $('#tabla_categorias').DataTable({
-                data: response,
-                columns: [
-                    { 
-                        data: null,
-                        orderable: false,
-                        className: 'select-checkbox',
-                        defaultContent: '',
-                        render: function(data, type, row) {
-                            return `<input type="checkbox" class="select-row" data-id="${row.id}">`;
-                        }
-                    },
-                    { data: "id" },
-                    { data: "nombre" },
-                    { data: "proyecto" },
-                    { data: "id_padre" },
-                    { data: "categoria_relacionada"
-                     },
-                    { data: "nivel" },
-                    { data: "final" },
-                    { data: "total_costo",
-                        render: function (data) {
-                            return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { 
-                        data: null, 
-                        render: function(data, type, row) {
-                            return `<a href="/editar-categoria/${row.id}/" class="btn btn-warning btn-sm">Editar</a>`;
-                        }
-                    },
-                    { 
-                        data: null, 
-                        render: function(data, type, row) {
-                            return `<button class="btn-eliminar-categoria btn btn-danger btn-sm" data-id="${row.id}">Eliminar</button>`;
-                        }
-                    }
-                ],
-                language: {
-                    search: "Buscar:",
-                    lengthMenu: "Mostrar _MENU_ entradas",
-                    info: "Mostrando _START_ a _END_ de _TOTAL_ entradas",
-                    paginate: {
-                        first: "Primero",
-                        last: "Último",
-                        next: "Siguiente",
-                        previous: "Anterior"
-                    }
+            if (datos.search.value) {
+                parametros.buscar = datos.search.value;
+            }
+            datos.columns.forEach(function (c) {
+                if (c.data && c.search.value) {
+                    parametros["filtro[" + c.data + "]"] = c.search.value;
                 }
             });
+            var proyecto = new URLSearchParams(window.location.search).get("proyecto");
+            if (proyecto) {
+                parametros.proyecto = proyecto;
+            }
 
-            // Manejar selección/deselección de todas las casillas
-            $('#select-all').on('click', function() {
-                var isChecked = $(this).prop('checked');
-                $('.select-row').prop('checked', isChecked);
+            // Los cursores solo sirven para el mismo orden, filtros y tamaño de página
+            var consulta = JSON.stringify(parametros);
+            if (consulta !== consultaPrevia) {
+                cursores = {};
+                consultaPrevia = consulta;
+            }
+            if (cursores[datos.start]) {
+                parametros.cursor = cursores[datos.start];
+            } else {
+                parametros.desplazamiento = datos.start;
+            }
+
+            $.ajax({
+                url: url,
+                type: "GET",
+                dataType: "json",
+                data: parametros,
+                headers: { "X-Requested-With": "XMLHttpRequest" },
+                success: function (respuesta) {
+                    if (respuesta.siguiente) {
+                        cursores[datos.start + parametros.limite] = respuesta.siguiente;
+                    }
+                    callback({
+                        draw: datos.draw,
+                        recordsTotal: respuesta.total,
+                        recordsFiltered: respuesta.total,
+                        data: respuesta.data
+                    });
+                },
+                error: function (xhr, status, error) {
+                    console.error("Error en la petición AJAX:", xhr.responseJSON?.error || error);
+                    callback({ draw: datos.draw, recordsTotal: 0, recordsFiltered: 0, data: [] });
+                }
             });
-        },
-        error: function(xhr, status, error) {
-            console.error("Error en la petición AJAX:", error);
         }
+    };
+}
+
+function listadoCategoria() {
+    // ✅ Destruir instancia previa de DataTable si existe
+    if ($.fn.DataTable.isDataTable('#tabla_categorias')) {
+        $('#tabla_categorias').DataTable().destroy();
+    }
+    
+    // ✅ Inicializar DataTable con los datos correctos
+    var table = $('#tabla_categorias').DataTable({
+        ...tablaServidor("/tabla_categoria_nuevo/"),
+        columns: [
+            { 
+                data: null,
+                orderable: false,
+                className: 'select-checkbox',
+                defaultContent: '',
+                render: function(data, type, row) {
+                    return `<input type="checkbox" class="select-row" data-id="${row.id}">`;
+                }
+            },
+            { data: "id" },
+            { data: "nombre" },
+            { data: "proyecto" },
+            { data: "id_padre" },
+            { data: "categoria_relacionada"
+             },
+            { data: "nivel" },
+            { data: "final" },
+            { data: "total_costo",
+                render: function (data) {
+                    return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
+                }
+             },
+            { 
+                data: null, 
+                render: function(data, type, row) {
+                    return `<a href="/editar-categoria/${row.id}/" class="btn btn-warning btn-sm">Editar</a>`;
+                }
+            },
+            { 
+                data: null, 
+                render: function(data, type, row) {
+                    return `<button class="btn-eliminar-categoria btn btn-danger btn-sm" data-id="${row.id}">Eliminar</button>`;
+                }
+            }
+        ],
+        language: {
+            search: "Buscar:",
+            lengthMenu: "Mostrar _MENU_ entradas",
+            info: "Mostrando _START_ a _END_ de _TOTAL_ entradas",
+            paginate: {
+                first: "Primero",
+                last: "Último",
+                next: "Siguiente",
+                previous: "Anterior"
+            }
+        }
+    });
+
+    // Manejar selección/deselección de todas las casillas
+    $('#select-all').on('click', function() {
+        var isChecked = $(this).prop('checked');
+        $('.select-row').prop('checked', isChecked);
     });
 }
 
@@ -148,78 +206,67 @@ function getCSRFToken() {
 
 
 function listadoAdquisiciones() {
-    $.ajax({
-        url: "/tabla_adquisiciones/",
-        type: "GET",
-        dataType: "json",
-        headers: { "X-Requested-With": "XMLHttpRequest" },
-        success: function(response) {
-            // ✅ Destruir instancia previa de DataTable si existe
-            if ($.fn.DataTable.isDataTable('#tabla_adquisiciones')) {
-                $('#tabla_adquisiciones').DataTable().destroy();
-            }
-            
-            // ✅ Inicializar DataTable con los datos correctos
-            $('#tabla_adquisiciones').DataTable({
-                data: response,
-                columns: [
-                    { data: "id" },
-                    { data: "id_categoria" },
-                    { data: "tipo_origen" },
-                    { data: "tipo_categoria" },
-                    { data: "costo_unitario",
-                        render: function (data) {
-                            return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { data: "crecimiento",
-                        render: function (data) {
-                            return `${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { data: "flete",
-                        render: function (data) {
-                            return `${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { data: "total",
-                        render: function (data) {
-                            return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { data: "total_con_flete",
-                        render: function (data) {
-                            return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { 
-                        data: null, 
-                        render: function(data, type, row) {
-                            return `<a href="/editar-adquisicion/${row.id}/" class="btn btn-warning btn-sm">Editar</a>`;
-                        }
-                    },
-                    { 
-                        data: null, 
-                        render: function(data, type, row) {
-                            return `<button class="btn-eliminar-adquisicion btn btn-danger btn-sm" data-id="${row.id}">Eliminar</button>`;
-                        }
-                    }
-                ],
-                language: {
-                    search: "Buscar:",
-                    lengthMenu: "Mostrar _MENU_ entradas",
-                    info: "Mostrando _START_ a _END_ de _TOTAL_ entradas",
-                    paginate: {
-                        first: "Primero",
-                        last: "Último",
-                        next: "Siguiente",
-                        previous: "Anterior"
-                    }
+    // ✅ Destruir instancia previa de DataTable si existe
+    if ($.fn.DataTable.isDataTable('#tabla_adquisiciones')) {
+        $('#tabla_adquisiciones').DataTable().destroy();
+    }
+    
+    // ✅ Inicializar DataTable con los datos correctos
+    $('#tabla_adquisiciones').DataTable({
+        ...tablaServidor("/tabla_adquisiciones/"),
+        columns: [
+            { data: "id" },
+            { data: "id_categoria" },
+            { data: "tipo_origen" },
+            { data: "tipo_categoria" },
+            { data: "costo_unitario",
+                render: function (data) {
+                    return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
                 }
-            });
-        },
-        error: function(xhr, status, error) {
-            console.error("Error en la petición AJAX:", error);
+             },
+            { data: "crecimiento",
+                render: function (data) {
+                    return `${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
+                }
+             },
+            { data: "flete",
+                render: function (data) {
+                    return `${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
+                }
+             },
+            { data: "total",
+                render: function (data) {
+                    return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
+                }
+             },
+            { data: "total_con_flete",
+                render: function (data) {
+                    return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
+                }
+             },
+            { 
+                data: null, 
+                render: function(data, type, row) {
+                    return `<a href="/editar-adquisicion/${row.id}/" class="btn btn-warning btn-sm">Editar</a>`;
+                }
+            },
+            { 
+                data: null, 
+                render: function(data, type, row) {
+                    return `<button class="btn-eliminar-adquisicion btn btn-danger btn-sm" data-id="${row.id}">Eliminar</button>`;
+                }
+            }
+        ],
+        language: {
+            search: "Buscar:",
+            lengthMenu: "Mostrar _MENU_ entradas",
+            info: "Mostrando _START_ a _END_ de _TOTAL_ entradas",
+            paginate: {
+                first: "Primero",
+                last: "Último",
+                next: "Siguiente",
+                previous: "Anterior"
+            }
         }
     });
 }
@@ -272,69 +319,58 @@ function getCSRFToken() {
 
 
 function listadoEquiposConstruccion() {
-    $.ajax({
-        url: "/tabla_equipos_construccion/",
-        type: "GET",
-        dataType: "json",
-        headers: { "X-Requested-With": "XMLHttpRequest" },
-        success: function(response) {
-            if ($.fn.DataTable.isDataTable('#tabla_equipos_construccion')) {
-                $('#tabla_equipos_construccion').DataTable().destroy();
-            }
-            
-            $('#tabla_equipos_construccion').DataTable({
-                data: response,
-                columns: [
-                    { data: "id" },
-                    { data: "id_categoria" },
-                    { data: "horas_maquina_unidad",
-                        render: function (data) {
-                            return `${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { data: "costo_maquina_hora",
-                        render: function (data) {
-                            return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { data: "total_horas_maquina",
-                        render: function (data) {
-                            return `${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { data: "total_usd",
-                        render: function (data) {
-                            return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { 
-                        data: null, 
-                        render: function(data, type, row) {
-                            return `<a href="/editar-equipo-construccion/${row.id}/" class="btn btn-warning btn-sm">Editar</a>`;
-                        }
-                    },
-                    { 
-                        data: null, 
-                        render: function(data, type, row) {
-                            return `<button class="btn-eliminar-equipo-construccion btn btn-danger btn-sm" data-id="${row.id}">Eliminar</button>`;
-                        }
-                    }
-                ],
-                language: {
-                    search: "Buscar:",
-                    lengthMenu: "Mostrar _MENU_ entradas",
-                    info: "Mostrando _START_ a _END_ de _TOTAL_ entradas",
-                    paginate: {
-                        first: "Primero",
-                        last: "Último",
-                        next: "Siguiente",
-                        previous: "Anterior"
-                    }
+    if ($.fn.DataTable.isDataTable('#tabla_equipos_construccion')) {
+        $('#tabla_equipos_construccion').DataTable().destroy();
+    }
+    
+    $('#tabla_equipos_construccion').DataTable({
+        ...tablaServidor("/tabla_equipos_construccion/"),
+        columns: [
+            { data: "id" },
+            { data: "id_categoria" },
+            { data: "horas_maquina_unidad",
+                render: function (data) {
+                    return `${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
                 }
-            });
-        },
-        error: function(xhr, status, error) {
-            console.error("Error en la petición AJAX:", error);
+             },
+            { data: "costo_maquina_hora",
+                render: function (data) {
+                    return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
+                }
+             },
+            { data: "total_horas_maquina",
+                render: function (data) {
+                    return `${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
+                }
+             },
+            { data: "total_usd",
+                render: function (data) {
+                    return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
+                }
+             },
+            { 
+                data: null, 
+                render: function(data, type, row) {
+                    return `<a href="/editar-equipo-construccion/${row.id}/" class="btn btn-warning btn-sm">Editar</a>`;
+                }
+            },
+            { 
+                data: null, 
+                render: function(data, type, row) {
+                    return `<button class="btn-eliminar-equipo-construccion btn btn-danger btn-sm" data-id="${row.id}">Eliminar</button>`;
+                }
+            }
+        ],
+        language: {
+            search: "Buscar:",
+            lengthMenu: "Mostrar _MENU_ entradas",
+            info: "Mostrando _START_ a _END_ de _TOTAL_ entradas",
+            paginate: {
+                first: "Primero",
+                last: "Último",
+                next: "Siguiente",
+                previous: "Anterior"
+            }
         }
     });
 }
@@ -382,110 +418,99 @@ function getCSRFToken() {
 
 
 function listadoManoObra() {
-    $.ajax({
-        url: "/tabla_mano_obra/",
-        type: "GET",
-        dataType: "json",
-        headers: { "X-Requested-With": "XMLHttpRequest" },
-        success: function(response) {
-            if ($.fn.DataTable.isDataTable('#tabla_mano_obra')) {
-                $('#tabla_mano_obra').DataTable().destroy();
-            }
+    if ($.fn.DataTable.isDataTable('#tabla_mano_obra')) {
+        $('#tabla_mano_obra').DataTable().destroy();
+    }
+    
+    $('#tabla_mano_obra').DataTable({
+        ...tablaServidor("/tabla_mano_obra/"),
+        columns: [
+            { data: "id" },
+            { data: "id_categoria" },  // ✅ Mostrar nombre en lugar de ID
+            { data: "horas_hombre_unidad",
+                render: function (data) {
+                    return `${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
+                }
+             },
+            { data: "fp",
+                render: function (data) {
+                    return `${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
+                }
+             },
+            { data: "rendimiento",
+                render: function (data) {
+                    return `${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
+                }
+             },  // ✅ Nuevo campo
+            { data: "horas_hombre_final",
+                render: function (data) {
+                    return `${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
+                }
+             },  // ✅ Nuevo campo calculado
+            { data: "cantidad_horas_hombre",
+                render: function (data) {
+                    return `${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
+                }
+             },  // ✅ Nuevo campo calculado
+            { data: "costo_hombre_hora",
+                render: function (data) {
+                    return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
+                }
+             },
+            { data: "tarifas_usd_hh_mod",
+                render: function (data) {
+                    return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
+                }
+             },
+            { data: "tarifa_usd_hh_equipos",
+                render: function (data) {
+                    return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
+                }
+             },
+            { data: "total_hh",
+                render: function (data) {
+                    return `${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
+                }
+             },
+            { data: "total_usd_mod",
+                render: function (data) {
+                    return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
+                }
+             },
+            { data: "total_usd_equipos",
+                render: function (data) {
+                    return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
+                }
+             },
+            { data: "total_usd",
+                render: function (data) {
+                    return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
+                }
+             },  // ✅ Nuevo cálculo
             
-            $('#tabla_mano_obra').DataTable({
-                data: response,
-                columns: [
-                    { data: "id" },
-                    { data: "id_categoria" },  // ✅ Mostrar nombre en lugar de ID
-                    { data: "horas_hombre_unidad",
-                        render: function (data) {
-                            return `${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { data: "fp",
-                        render: function (data) {
-                            return `${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { data: "rendimiento",
-                        render: function (data) {
-                            return `${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },  // ✅ Nuevo campo
-                    { data: "horas_hombre_final",
-                        render: function (data) {
-                            return `${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },  // ✅ Nuevo campo calculado
-                    { data: "cantidad_horas_hombre",
-                        render: function (data) {
-                            return `${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },  // ✅ Nuevo campo calculado
-                    { data: "costo_hombre_hora",
-                        render: function (data) {
-                            return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { data: "tarifas_usd_hh_mod",
-                        render: function (data) {
-                            return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { data: "tarifa_usd_hh_equipos",
-                        render: function (data) {
-                            return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { data: "total_hh",
-                        render: function (data) {
-                            return `${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { data: "total_usd_mod",
-                        render: function (data) {
-                            return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { data: "total_usd_equipos",
-                        render: function (data) {
-                            return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { data: "total_usd",
-                        render: function (data) {
-                            return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },  // ✅ Nuevo cálculo
-                    
-                    { 
-                        data: null, 
-                        render: function(data, type, row) {
-                            return `<a href="/editar-mano-obra/${row.id}/" class="btn btn-warning btn-sm">Editar</a>`;
-                        }
-                    },
-                    { 
-                        data: null, 
-                        render: function(data, type, row) {
-                            return `<button class="btn-eliminar-mano-obra btn btn-danger btn-sm" data-id="${row.id}">Eliminar</button>`;
-                        }
-                    }
-                ],
-                language: {
-                    search: "Buscar:",
-                    lengthMenu: "Mostrar _MENU_ entradas",
-                    info: "Mostrando _START_ a _END_ de _TOTAL_ entradas",
-                    paginate: {
-                        first: "Primero",
-                        last: "Último",
-                        next: "Siguiente",
-                        previous: "Anterior"
-                    }
+            { 
+                data: null, 
+                render: function(data, type, row) {
+                    return `<a href="/editar-mano-obra/${row.id}/" class="btn btn-warning btn-sm">Editar</a>`;
                 }
-            });
-        },
-        error: function(xhr, status, error) {
-            console.error("Error en la petición AJAX:", error);
+            },
+            { 
+                data: null, 
+                render: function(data, type, row) {
+                    return `<button class="btn-eliminar-mano-obra btn btn-danger btn-sm" data-id="${row.id}">Eliminar</button>`;
+                }
+            }
+        ],
+        language: {
+            search: "Buscar:",
+            lengthMenu: "Mostrar _MENU_ entradas",
+            info: "Mostrando _START_ a _END_ de _TOTAL_ entradas",
+            paginate: {
+                first: "Primero",
+                last: "Último",
+                next: "Siguiente",
+                previous: "Anterior"
+            }
         }
     });
 }
@@ -533,79 +558,68 @@ function getCSRFToken() {
 
 
 function listadoMaterialesOtros() {
-    $.ajax({
-        url: "/tabla_materiales_otros/",
-        type: "GET",
-        dataType: "json",
-        headers: { "X-Requested-With": "XMLHttpRequest" },
-        success: function(response) {
-            // ✅ Destruir instancia previa de DataTable si existe
-            if ($.fn.DataTable.isDataTable('#tabla_materiales_otros')) {
-                $('#tabla_materiales_otros').DataTable().destroy();
-            }
+    // ✅ Destruir instancia previa de DataTable si existe
+    if ($.fn.DataTable.isDataTable('#tabla_materiales_otros')) {
+        $('#tabla_materiales_otros').DataTable().destroy();
+    }
+    
+    // ✅ Inicializar DataTable con los datos correctos
+    $('#tabla_materiales_otros').DataTable({
+        ...tablaServidor("/tabla_materiales_otros/"),
+        columns: [
+            { data: "id" },
+            { data: "id_categoria" },
+            { data: "costo_unidad",
+                render: function (data) {
+                    return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
+                }
+             },
+            { data: "crecimiento",
+                render: function (data) {
+                    return `${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
+                }
+             },
             
-            // ✅ Inicializar DataTable con los datos correctos
-            $('#tabla_materiales_otros').DataTable({
-                data: response,
-                columns: [
-                    { data: "id" },
-                    { data: "id_categoria" },
-                    { data: "costo_unidad",
-                        render: function (data) {
-                            return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { data: "crecimiento",
-                        render: function (data) {
-                            return `${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    
-                    { 
-                        data: "total_usd",
-                        render: function (data) {
-                            return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                    },
-                    { data: "fletes",
-                        render: function (data) {
-                            return `${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }    
-                     },
-                    { data: "total_sitio",
-                        render: function (data) {
-                            return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { 
-                        data: null, 
-                        render: function(data, type, row) {
-                            return `<a href="/editar-material-otro/${row.id}/" class="btn btn-warning btn-sm">Editar</a>`;
-                        }
-                    },
-                    { 
-                        data: null, 
-                        render: function(data, type, row) {
-                            return `<button class="btn-eliminar-material btn btn-danger btn-sm" data-id="${row.id}">Eliminar</button>`;
-                        }
-                    }
-                    
-                ],
-                language: {
-                    search: "Buscar:",
-                    lengthMenu: "Mostrar _MENU_ entradas",
-                    info: "Mostrando _START_ a _END_ de _TOTAL_ entradas",
-                    paginate: {
-                        first: "Primero",
-                        last: "Último",
-                        next: "Siguiente",
-                        previous: "Anterior"
-                    }
+            { 
+                data: "total_usd",
+                render: function (data) {
+                    return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
                 }
-            });
-        },
-        error: function(xhr, status, error) {
-            console.error("Error en la petición AJAX:", error);
+            },
+            { data: "fletes",
+                render: function (data) {
+                    return `${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
+                }    
+             },
+            { data: "total_sitio",
+                render: function (data) {
+                    return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
+                }
+             },
+            { 
+                data: null, 
+                render: function(data, type, row) {
+                    return `<a href="/editar-material-otro/${row.id}/" class="btn btn-warning btn-sm">Editar</a>`;
+                }
+            },
+            { 
+                data: null, 
+                render: function(data, type, row) {
+                    return `<button class="btn-eliminar-material btn btn-danger btn-sm" data-id="${row.id}">Eliminar</button>`;
+                }
+            }
+            
+        ],
+        language: {
+            search: "Buscar:",
+            lengthMenu: "Mostrar _MENU_ entradas",
+            info: "Mostrando _START_ a _END_ de _TOTAL_ entradas",
+            paginate: {
+                first: "Primero",
+                last: "Último",
+                next: "Siguiente",
+                previous: "Anterior"
+            }
         }
     });
 }
@@ -653,77 +667,66 @@ function getCSRFToken() {
 
 
 function listadoEspecificoCategoria() {
-    $.ajax({
-        url: "/tabla_especifico_categoria/", // Asegúrate de crear esta URL en Django
-        type: "GET",
-        dataType: "json",
-        headers: { "X-Requested-With": "XMLHttpRequest" },
-        success: function(response) {
-            // ✅ Destruir instancia previa de DataTable si existe
-            if ($.fn.DataTable.isDataTable('#tabla_especifico_categoria')) {
-                $('#tabla_especifico_categoria').DataTable().destroy();
-            }
-            
-            // ✅ Inicializar DataTable con los datos correctos
-            $('#tabla_especifico_categoria').DataTable({
-                data: response,
-                columns: [
-                    { data: "id" },
-                    { data: "id_categoria" },
-                    { data: "unidad" },
-                    { data: "cantidad",
-                        render: function (data) {
-                            return `${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { data: "dedicacion",
-                        render: function (data) {
-                            return `${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { data: "duracion",
-                        render: function (data) {
-                            return `${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { data: "costo",
-                        render: function (data) {
-                            return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { data: "total",
-                        render: function (data) {
-                            return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { 
-                        data: null, 
-                        render: function(data, type, row) {
-                            return `<a href="/editar-especifico-categoria/${row.id}/" class="btn btn-warning btn-sm">Editar</a>`;
-                        }
-                    },
-                    { 
-                        data: null, 
-                        render: function(data, type, row) {
-                            return `<button class="btn-eliminar-especifico btn btn-danger btn-sm" data-id="${row.id}">Eliminar</button>`;
-                        }
-                    }
-                ],
-                language: {
-                    search: "Buscar:",
-                    lengthMenu: "Mostrar _MENU_ entradas",
-                    info: "Mostrando _START_ a _END_ de _TOTAL_ entradas",
-                    paginate: {
-                        first: "Primero",
-                        last: "Último",
-                        next: "Siguiente",
-                        previous: "Anterior"
-                    }
+    // ✅ Destruir instancia previa de DataTable si existe
+    if ($.fn.DataTable.isDataTable('#tabla_especifico_categoria')) {
+        $('#tabla_especifico_categoria').DataTable().destroy();
+    }
+    
+    // ✅ Inicializar DataTable con los datos correctos
+    $('#tabla_especifico_categoria').DataTable({
+        ...tablaServidor("/tabla_especifico_categoria/"),
+        columns: [
+            { data: "id" },
+            { data: "id_categoria" },
+            { data: "unidad" },
+            { data: "cantidad",
+                render: function (data) {
+                    return `${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
                 }
-            });
-        },
-        error: function(xhr, status, error) {
-            console.error("Error en la petición AJAX:", error);
+             },
+            { data: "dedicacion",
+                render: function (data) {
+                    return `${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
+                }
+             },
+            { data: "duracion",
+                render: function (data) {
+                    return `${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
+                }
+             },
+            { data: "costo",
+                render: function (data) {
+                    return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
+                }
+             },
+            { data: "total",
+                render: function (data) {
+                    return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
+                }
+             },
+            { 
+                data: null, 
+                render: function(data, type, row) {
+                    return `<a href="/editar-especifico-categoria/${row.id}/" class="btn btn-warning btn-sm">Editar</a>`;
+                }
+            },
+            { 
+                data: null, 
+                render: function(data, type, row) {
+                    return `<button class="btn-eliminar-especifico btn btn-danger btn-sm" data-id="${row.id}">Eliminar</button>`;
+                }
+            }
+        ],
+        language: {
+            search: "Buscar:",
+            lengthMenu: "Mostrar _MENU_ entradas",
+            info: "Mostrando _START_ a _END_ de _TOTAL_ entradas",
+            paginate: {
+                first: "Primero",
+                last: "Último",
+                next: "Siguiente",
+                previous: "Anterior"
+            }
         }
     });
 }
@@ -769,83 +772,72 @@ function getCSRFToken() {
 ///////////////////////////////////////////////////////////////////////////////////////////////////////////////////7
 
 function listadoStaffEnami() {
-    $.ajax({
-        url: "/tabla_staff_enami/",  // Asegúrate de configurar la URL en Django
-        type: "GET",
-        dataType: "json",
-        headers: { "X-Requested-With": "XMLHttpRequest" },
-        success: function(response) {
-            // ✅ Destruir instancia previa de DataTable si existe
-            if ($.fn.DataTable.isDataTable('#tabla_staff_enami')) {
-                $('#tabla_staff_enami').DataTable().destroy();
-            }
+    // ✅ Destruir instancia previa de DataTable si existe
+    if ($.fn.DataTable.isDataTable('#tabla_staff_enami')) {
+        $('#tabla_staff_enami').DataTable().destroy();
+    }
+    
+    // ✅ Inicializar DataTable con los datos correctos
+    $('#tabla_staff_enami').DataTable({
+        ...tablaServidor("/tabla_staff_enami/"),
+        columns: [
+            { data: "id" },
+            { data: "categoria" },
+            { data: "nombre" },
+            { data: "valor",
+                render: function (data) {
+                    return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
+                }
+             },
+            { data: "dotacion",
+                render: function (data) {
+                    return `${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
+                }
+             },
+            { data: "duracion",
+                render: function (data) {
+                    return `${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
+                }
+             },
+            { data: "factor_utilizacion",
+                render: function (data) {
+                    return `${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
+                }
+             },
+            { data: "total_horas_hombre",
+                render: function (data) {
+                    return `${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
+                }
+             },
+            { data: "costo_total",
+                render: function (data) {
+                    return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
+                }
+             },
             
-            // ✅ Inicializar DataTable con los datos correctos
-            $('#tabla_staff_enami').DataTable({
-                data: response,
-                columns: [
-                    { data: "id" },
-                    { data: "categoria" },
-                    { data: "nombre" },
-                    { data: "valor",
-                        render: function (data) {
-                            return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { data: "dotacion",
-                        render: function (data) {
-                            return `${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { data: "duracion",
-                        render: function (data) {
-                            return `${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { data: "factor_utilizacion",
-                        render: function (data) {
-                            return `${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { data: "total_horas_hombre",
-                        render: function (data) {
-                            return `${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { data: "costo_total",
-                        render: function (data) {
-                            return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    
-                    { 
-                        data: null, 
-                        render: function(data, type, row) {
-                            return `<a href="/editar-staff-enami/${row.id}/" class="btn btn-warning btn-sm">Editar</a>`;
-                        }
-                    },
-                    { 
-                        data: null, 
-                        render: function(data, type, row) {
-                            return `<button class="btn-eliminar-staff btn btn-danger btn-sm" data-id="${row.id}">Eliminar</button>`;
-                        }
-                    }
-                ],
-                language: {
-                    search: "Buscar:",
-                    lengthMenu: "Mostrar _MENU_ entradas",
-                    info: "Mostrando _START_ a _END_ de _TOTAL_ entradas",
-                    paginate: {
-                        first: "Primero",
-                        last: "Último",
-                        next: "Siguiente",
-                        previous: "Anterior"
-                    }
+            { 
+                data: null, 
+                render: function(data, type, row) {
+                    return `<a href="/editar-staff-enami/${row.id}/" class="btn btn-warning btn-sm">Editar</a>`;
                 }
-            });
-        },
-        error: function(xhr, status, error) {
-            console.error("Error en la petición AJAX:", error);
+            },
+            { 
+                data: null, 
+                render: function(data, type, row) {
+                    return `<button class="btn-eliminar-staff btn btn-danger btn-sm" data-id="${row.id}">Eliminar</button>`;
+                }
+            }
+        ],
+        language: {
+            search: "Buscar:",
+            lengthMenu: "Mostrar _MENU_ entradas",
+            info: "Mostrando _START_ a _END_ de _TOTAL_ entradas",
+            paginate: {
+                first: "Primero",
+                last: "Último",
+                next: "Siguiente",
+                previous: "Anterior"
+            }
         }
     });
 }
@@ -889,67 +881,56 @@ function getCSRFToken() {
 
 
 function listadoCantidades() {
-    $.ajax({
-        url: "/tabla_cantidades/",
-        type: "GET",
-        dataType: "json",
-        headers: { "X-Requested-With": "XMLHttpRequest" },
-        success: function(response) {
-            // ✅ Destruir instancia previa de DataTable si existe
-            if ($.fn.DataTable.isDataTable('#tabla_cantidades')) {
-                $('#tabla_cantidades').DataTable().destroy();
-            }
-            
-            // ✅ Inicializar DataTable con los datos correctos
-            $('#tabla_cantidades').DataTable({
-                data: response,
-                columns: [
-                    { data: "id" },
-                    { data: "id_categoria" },
-                    { data: "unidad_medida" },
-                    { data: "cantidad",
-                        render: function (data) {
-                            return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { data: "fc",
-                        render: function (data) {
-                            return `${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { data: "cantidad_final",
-                        render: function (data) {
-                            return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { 
-                        data: null, 
-                        render: function(data, type, row) {
-                            return `<a href="/editar-cantidad/${row.id}/" class="btn btn-warning btn-sm">Editar</a>`;
-                        }
-                    },
-                    { 
-                        data: null, 
-                        render: function(data, type, row) {
-                            return `<button class="btn-eliminar-cantidad btn btn-danger btn-sm" data-id="${row.id}">Eliminar</button>`;
-                        }
-                    }
-                ],
-                language: {
-                    search: "Buscar:",
-                    lengthMenu: "Mostrar _MENU_ entradas",
-                    info: "Mostrando _START_ a _END_ de _TOTAL_ entradas",
-                    paginate: {
-                        first: "Primero",
-                        last: "Último",
-                        next: "Siguiente",
-                        previous: "Anterior"
-                    }
+    // ✅ Destruir instancia previa de DataTable si existe
+    if ($.fn.DataTable.isDataTable('#tabla_cantidades')) {
+        $('#tabla_cantidades').DataTable().destroy();
+    }
+    
+    // ✅ Inicializar DataTable con los datos correctos
+    $('#tabla_cantidades').DataTable({
+        ...tablaServidor("/tabla_cantidades/"),
+        columns: [
+            { data: "id" },
+            { data: "id_categoria" },
+            { data: "unidad_medida" },
+            { data: "cantidad",
+                render: function (data) {
+                    return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
                 }
-            });
-        },
-        error: function(xhr, status, error) {
-            console.error("Error en la petición AJAX:", error);
+             },
+            { data: "fc",
+                render: function (data) {
+                    return `${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
+                }
+             },
+            { data: "cantidad_final",
+                render: function (data) {
+                    return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
+                }
+             },
+            { 
+                data: null, 
+                render: function(data, type, row) {
+                    return `<a href="/editar-cantidad/${row.id}/" class="btn btn-warning btn-sm">Editar</a>`;
+                }
+            },
+            { 
+                data: null, 
+                render: function(data, type, row) {
+                    return `<button class="btn-eliminar-cantidad btn btn-danger btn-sm" data-id="${row.id}">Eliminar</button>`;
+                }
+            }
+        ],
+        language: {
+            search: "Buscar:",
+            lengthMenu: "Mostrar _MENU_ entradas",
+            info: "Mostrando _START_ a _END_ de _TOTAL_ entradas",
+            paginate: {
+                first: "Primero",
+                last: "Último",
+                next: "Siguiente",
+                previous: "Anterior"
+            }
         }
     });
 }
@@ -998,86 +979,75 @@ function getCSRFToken() {
 ////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////
 
 function listadoContratoSubcontrato() {
-    $.ajax({
-        url: "/tabla_contrato_subcontrato/",
-        type: "GET",
-        dataType: "json",
-        headers: { "X-Requested-With": "XMLHttpRequest" },
-        success: function(response) {
-            // ✅ Destruir instancia previa de DataTable si existe
-            if ($.fn.DataTable.isDataTable('#tabla_contrato_subcontrato')) {
-                $('#tabla_contrato_subcontrato').DataTable().destroy();
-            }
-            
-            // ✅ Inicializar DataTable con los datos correctos
-            $('#tabla_contrato_subcontrato').DataTable({
-                data: response,
-                columns: [
-                    { data: "id" },
-                    { data: "id_categoria" },
-                    { data: "costo_laboral_indirecto_usd_hh",
-                        render: function (data) {
-                            return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { data: "total_usd_indirectos_contratista",
-                        render: function (data) {
-                            return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { data: "usd_por_unidad",
-                        render: function (data) {
-                            return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { data: "fc_subcontrato",
-                        render: function (data) {
-                            return `${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { data: "usd_total_subcontrato",
-                        render: function (data) {
-                            return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { data: "costo_contrato_total",
-                        render: function (data) {
-                            return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { data: "costo_contrato_unitario",
-                        render: function (data) {
-                            return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { 
-                        data: null, 
-                        render: function(data, type, row) {
-                            return `<a href="/editar-contrato-subcontrato/${row.id}/" class="btn btn-warning btn-sm">Editar</a>`;
-                        }
-                    },
-                    { 
-                        data: null, 
-                        render: function(data, type, row) {
-                            return `<button class="btn-eliminar-contrato btn btn-danger btn-sm" data-id="${row.id}">Eliminar</button>`;
-                        }
-                    }
-                ],
-                language: {
-                    search: "Buscar:",
-                    lengthMenu: "Mostrar _MENU_ entradas",
-                    info: "Mostrando _START_ a _END_ de _TOTAL_ entradas",
-                    paginate: {
-                        first: "Primero",
-                        last: "Último",
-                        next: "Siguiente",
-                        previous: "Anterior"
-                    }
+    // ✅ Destruir instancia previa de DataTable si existe
+    if ($.fn.DataTable.isDataTable('#tabla_contrato_subcontrato')) {
+        $('#tabla_contrato_subcontrato').DataTable().destroy();
+    }
+    
+    // ✅ Inicializar DataTable con los datos correctos
+    $('#tabla_contrato_subcontrato').DataTable({
+        ...tablaServidor("/tabla_contrato_subcontrato/"),
+        columns: [
+            { data: "id" },
+            { data: "id_categoria" },
+            { data: "costo_laboral_indirecto_usd_hh",
+                render: function (data) {
+                    return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
                 }
-            });
-        },
-        error: function(xhr, status, error) {
-            console.error("Error en la petición AJAX:", error);
+             },
+            { data: "total_usd_indirectos_contratista",
+                render: function (data) {
+                    return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
+                }
+             },
+            { data: "usd_por_unidad",
+                render: function (data) {
+                    return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
+                }
+             },
+            { data: "fc_subcontrato",
+                render: function (data) {
+                    return `${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
+                }
+             },
+            { data: "usd_total_subcontrato",
+                render: function (data) {
+                    return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
+                }
+             },
+            { data: "costo_contrato_total",
+                render: function (data) {
+                    return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
+                }
+             },
+            { data: "costo_contrato_unitario",
+                render: function (data) {
+                    return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
+                }
+             },
+            { 
+                data: null, 
+                render: function(data, type, row) {
+                    return `<a href="/editar-contrato-subcontrato/${row.id}/" class="btn btn-warning btn-sm">Editar</a>`;
+                }
+            },
+            { 
+                data: null, 
+                render: function(data, type, row) {
+                    return `<button class="btn-eliminar-contrato btn btn-danger btn-sm" data-id="${row.id}">Eliminar</button>`;
+                }
+            }
+        ],
+        language: {
+            search: "Buscar:",
+            lengthMenu: "Mostrar _MENU_ entradas",
+            info: "Mostrando _START_ a _END_ de _TOTAL_ entradas",
+            paginate: {
+                first: "Primero",
+                last: "Último",
+                next: "Siguiente",
+                previous: "Anterior"
+            }
         }
     });
 }
@@ -1127,88 +1097,77 @@ function getCSRFToken() {
 
 
 function listadoCotizacionMateriales() {
-    $.ajax({
-        url: "/tabla_cotizacion_materiales/",
-        type: "GET",
-        dataType: "json",
-        headers: { "X-Requested-With": "XMLHttpRequest" },
-        success: function(response) {
-            // ✅ Destruir instancia previa de DataTable si existe
-            if ($.fn.DataTable.isDataTable('#tabla_cotizacion_materiales')) {
-                $('#tabla_cotizacion_materiales').DataTable().destroy();
-            }
-            
-            // ✅ Inicializar DataTable con los datos correctos
-            $('#tabla_cotizacion_materiales').DataTable({
-                data: response,
-                columns: [
-                    { data: "id" },
-                    { data: "id_categoria" },
-                    { data: "tipo_suministro" },
-                    { data: "tipo_moneda" },
-                    { data: "pais_entrega" },
-                    { data: "fecha_cotizacion_referencia" },
-                    { data: "cotizacion_usd",
-                        render: function (data) {
-                            return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { data: "cotizacion_clp",
-                        render: function (data) {
-                            return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { data: "factor_correccion",
-                        render: function (data) {
-                            return `${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { data: "moneda_aplicada",
-                        render: function (data) {
-                            return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { data: "flete_unitario",
-                        render: function (data) {
-                            return `${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { data: "origen_precio" },
-                    { data: "cotizacion" },
-                    { data: "moneda_origen" },
-                    { data: "tasa_cambio",
-                        render: function (data) {
-                            return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { 
-                        data: null, 
-                        render: function(data, type, row) {
-                            return `<a href="/editar-cotizacion-materiales/${row.id}/" class="btn btn-warning btn-sm">Editar</a>`;
-                        }
-                    },
-                    { 
-                        data: null, 
-                        render: function(data, type, row) {
-                            return `<button class="btn-eliminar-cotizacion btn btn-danger btn-sm" data-id="${row.id}">Eliminar</button>`;
-                        }
-                    }
-                ],
-                language: {
-                    search: "Buscar:",
-                    lengthMenu: "Mostrar _MENU_ entradas",
-                    info: "Mostrando _START_ a _END_ de _TOTAL_ entradas",
-                    paginate: {
-                        first: "Primero",
-                        last: "Último",
-                        next: "Siguiente",
-                        previous: "Anterior"
-                    }
+    // ✅ Destruir instancia previa de DataTable si existe
+    if ($.fn.DataTable.isDataTable('#tabla_cotizacion_materiales')) {
+        $('#tabla_cotizacion_materiales').DataTable().destroy();
+    }
+    
+    // ✅ Inicializar DataTable con los datos correctos
+    $('#tabla_cotizacion_materiales').DataTable({
+        ...tablaServidor("/tabla_cotizacion_materiales/"),
+        columns: [
+            { data: "id" },
+            { data: "id_categoria" },
+            { data: "tipo_suministro" },
+            { data: "tipo_moneda" },
+            { data: "pais_entrega" },
+            { data: "fecha_cotizacion_referencia" },
+            { data: "cotizacion_usd",
+                render: function (data) {
+                    return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
                 }
-            });
-        },
-        error: function(xhr, status, error) {
-            console.error("Error en la petición AJAX:", error);
+             },
+            { data: "cotizacion_clp",
+                render: function (data) {
+                    return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
+                }
+             },
+            { data: "factor_correccion",
+                render: function (data) {
+                    return `${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
+                }
+             },
+            { data: "moneda_aplicada",
+                render: function (data) {
+                    return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
+                }
+             },
+            { data: "flete_unitario",
+                render: function (data) {
+                    return `${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
+                }
+             },
+            { data: "origen_precio" },
+            { data: "cotizacion" },
+            { data: "moneda_origen" },
+            { data: "tasa_cambio",
+                render: function (data) {
+                    return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
+                }
+             },
+            { 
+                data: null, 
+                render: function(data, type, row) {
+                    return `<a href="/editar-cotizacion-materiales/${row.id}/" class="btn btn-warning btn-sm">Editar</a>`;
+                }
+            },
+            { 
+                data: null, 
+                render: function(data, type, row) {
+                    return `<button class="btn-eliminar-cotizacion btn btn-danger btn-sm" data-id="${row.id}">Eliminar</button>`;
+                }
+            }
+        ],
+        language: {
+            search: "Buscar:",
+            lengthMenu: "Mostrar _MENU_ entradas",
+            info: "Mostrando _START_ a _END_ de _TOTAL_ entradas",
+            paginate: {
+                first: "Primero",
+                last: "Último",
+                next: "Siguiente",
+                previous: "Anterior"
+            }
         }
     });
 }
@@ -1256,63 +1215,52 @@ function getCSRFToken() {
 /////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////
 
 function listadoIngenieriaDetallesContraparte() {
-    $.ajax({
-        url: "/tabla_ingenieria_detalles_contraparte/",
-        type: "GET",
-        dataType: "json",
-        headers: { "X-Requested-With": "XMLHttpRequest" },
-        success: function(response) {
-            // ✅ Destruir instancia previa de DataTable si existe
-            if ($.fn.DataTable.isDataTable('#tabla_ingenieria_detalles_contraparte')) {
-                $('#tabla_ingenieria_detalles_contraparte').DataTable().destroy();
-            }
-            
-            // ✅ Inicializar DataTable con los datos correctos
-            $('#tabla_ingenieria_detalles_contraparte').DataTable({
-                data: response,
-                columns: [
-                    { data: "id" },
-                    { data: "id_categoria" },
-                    { data: "nombre" },
-                    { data: "UF",
-                        render: function (data) {
-                            return `${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { data: "MB" },
-                    { data: "total_usd",
-                        render: function (data) {
-                            return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { 
-                        data: null, 
-                        render: function(data, type, row) {
-                            return `<a href="/editar-ingenieria-detalles-contraparte/${row.id}/" class="btn btn-warning btn-sm">Editar</a>`;
-                        }
-                    },
-                    { 
-                        data: null, 
-                        render: function(data, type, row) {
-                            return `<button class="btn-eliminar-ingenieria btn btn-danger btn-sm" data-id="${row.id}">Eliminar</button>`;
-                        }
-                    }
-                ],
-                language: {
-                    search: "Buscar:",
-                    lengthMenu: "Mostrar _MENU_ entradas",
-                    info: "Mostrando _START_ a _END_ de _TOTAL_ entradas",
-                    paginate: {
-                        first: "Primero",
-                        last: "Último",
-                        next: "Siguiente",
-                        previous: "Anterior"
-                    }
+    // ✅ Destruir instancia previa de DataTable si existe
+    if ($.fn.DataTable.isDataTable('#tabla_ingenieria_detalles_contraparte')) {
+        $('#tabla_ingenieria_detalles_contraparte').DataTable().destroy();
+    }
+    
+    // ✅ Inicializar DataTable con los datos correctos
+    $('#tabla_ingenieria_detalles_contraparte').DataTable({
+        ...tablaServidor("/tabla_ingenieria_detalles_contraparte/"),
+        columns: [
+            { data: "id" },
+            { data: "id_categoria" },
+            { data: "nombre" },
+            { data: "UF",
+                render: function (data) {
+                    return `${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
                 }
-            });
-        },
-        error: function(xhr, status, error) {
-            console.error("Error en la petición AJAX:", error);
+             },
+            { data: "MB" },
+            { data: "total_usd",
+                render: function (data) {
+                    return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
+                }
+             },
+            { 
+                data: null, 
+                render: function(data, type, row) {
+                    return `<a href="/editar-ingenieria-detalles-contraparte/${row.id}/" class="btn btn-warning btn-sm">Editar</a>`;
+                }
+            },
+            { 
+                data: null, 
+                render: function(data, type, row) {
+                    return `<button class="btn-eliminar-ingenieria btn btn-danger btn-sm" data-id="${row.id}">Eliminar</button>`;
+                }
+            }
+        ],
+        language: {
+            search: "Buscar:",
+            lengthMenu: "Mostrar _MENU_ entradas",
+            info: "Mostrando _START_ a _END_ de _TOTAL_ entradas",
+            paginate: {
+                first: "Primero",
+                last: "Último",
+                next: "Siguiente",
+                previous: "Anterior"
+            }
         }
     });
 }
@@ -1358,79 +1306,68 @@ function getCSRFToken() {
 
 
 function listadoGestionPermisos() {
-    $.ajax({
-        url: "/tabla_gestion_permisos/",
-        type: "GET",
-        dataType: "json",
-        headers: { "X-Requested-With": "XMLHttpRequest" },
-        success: function(response) {
-            // ✅ Destruir instancia previa de DataTable si existe
-            if ($.fn.DataTable.isDataTable('#tabla_gestion_permisos')) {
-                $('#tabla_gestion_permisos').DataTable().destroy();
-            }
-            
-            // ✅ Inicializar DataTable con los datos correctos
-            $('#tabla_gestion_permisos').DataTable({
-                data: response,
-                columns: [
-                    { data: "id" },
-                    { data: "id_categoria" },
-                    { data: "nombre" },
-                    { data: "dedicacion",
-                        render: function (data) {
-                            return `${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { data: "meses",
-                        render: function (data) {
-                            return `${new Intl.NumberFormat('es-CL').format(data)}`;
-                        }
-                     },
-                    { data: "cantidad",
-                        render: function (data) {
-                            return `${new Intl.NumberFormat('es-CL').format(data)}`;
-                        }
-                     },
-                    { data: "turno" },
-                    { data: "MB" },
-                    { data: "HH",
-                        render: function (data) {
-                            return `${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { data: "total_usd",
-                        render: function (data) {
-                            return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { 
-                        data: null, 
-                        render: function(data, type, row) {
-                            return `<a href="/editar-gestion-permisos/${row.id}/" class="btn btn-warning btn-sm">Editar</a>`;
-                        }
-                    },
-                    { 
-                        data: null, 
-                        render: function(data, type, row) {
-                            return `<button class="btn-eliminar-permiso btn btn-danger btn-sm" data-id="${row.id}">Eliminar</button>`;
-                        }
-                    }
-                ],
-                language: {
-                    search: "Buscar:",
-                    lengthMenu: "Mostrar _MENU_ entradas",
-                    info: "Mostrando _START_ a _END_ de _TOTAL_ entradas",
-                    paginate: {
-                        first: "Primero",
-                        last: "Último",
-                        next: "Siguiente",
-                        previous: "Anterior"
-                    }
+    // ✅ Destruir instancia previa de DataTable si existe
+    if ($.fn.DataTable.isDataTable('#tabla_gestion_permisos')) {
+        $('#tabla_gestion_permisos').DataTable().destroy();
+    }
+    
+    // ✅ Inicializar DataTable con los datos correctos
+    $('#tabla_gestion_permisos').DataTable({
+        ...tablaServidor("/tabla_gestion_permisos/"),
+        columns: [
+            { data: "id" },
+            { data: "id_categoria" },
+            { data: "nombre" },
+            { data: "dedicacion",
+                render: function (data) {
+                    return `${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
                 }
-            });
-        },
-        error: function(xhr, status, error) {
-            console.error("Error en la petición AJAX:", error);
+             },
+            { data: "meses",
+                render: function (data) {
+                    return `${new Intl.NumberFormat('es-CL').format(data)}`;
+                }
+             },
+            { data: "cantidad",
+                render: function (data) {
+                    return `${new Intl.NumberFormat('es-CL').format(data)}`;
+                }
+             },
+            { data: "turno" },
+            { data: "MB" },
+            { data: "HH",
+                render: function (data) {
+                    return `${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
+                }
+             },
+            { data: "total_usd",
+                render: function (data) {
+                    return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
+                }
+             },
+            { 
+                data: null, 
+                render: function(data, type, row) {
+                    return `<a href="/editar-gestion-permisos/${row.id}/" class="btn btn-warning btn-sm">Editar</a>`;
+                }
+            },
+            { 
+                data: null, 
+                render: function(data, type, row) {
+                    return `<button class="btn-eliminar-permiso btn btn-danger btn-sm" data-id="${row.id}">Eliminar</button>`;
+                }
+            }
+        ],
+        language: {
+            search: "Buscar:",
+            lengthMenu: "Mostrar _MENU_ entradas",
+            info: "Mostrando _START_ a _END_ de _TOTAL_ entradas",
+            paginate: {
+                first: "Primero",
+                last: "Último",
+                next: "Siguiente",
+                previous: "Anterior"
+            }
         }
     });
 }
@@ -1476,67 +1413,56 @@ function getCSRFToken() {
 
 
 function listadoDueno() {
-    $.ajax({
-        url: "/tabla_dueno/",
-        type: "GET",
-        dataType: "json",
-        headers: { "X-Requested-With": "XMLHttpRequest" },
-        success: function(response) {
-            // ✅ Destruir instancia previa de DataTable si existe
-            if ($.fn.DataTable.isDataTable('#tabla_dueno')) {
-                $('#tabla_dueno').DataTable().destroy();
-            }
-            
-            // ✅ Inicializar DataTable con los datos correctos
-            $('#tabla_dueno').DataTable({
-                data: response,
-                columns: [
-                    { data: "id" },
-                    { data: "id_categoria" },
-                    { data: "nombre" },
-                    { data: "total_hh",
-                        render: function (data) {
-                            return `${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { data: "costo_hh_us",
-                        render: function (data) {
-                            return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { data: "costo_total",
-                        render: function (data) {
-                            return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { 
-                        data: null, 
-                        render: function(data, type, row) {
-                            return `<a href="/editar-dueno/${row.id}/" class="btn btn-warning btn-sm">Editar</a>`;
-                        }
-                    },
-                    { 
-                        data: null, 
-                        render: function(data, type, row) {
-                            return `<button class="btn-eliminar-dueno btn btn-danger btn-sm" data-id="${row.id}">Eliminar</button>`;
-                        }
-                    }
-                ],
-                language: {
-                    search: "Buscar:",
-                    lengthMenu: "Mostrar _MENU_ entradas",
-                    info: "Mostrando _START_ a _END_ de _TOTAL_ entradas",
-                    paginate: {
-                        first: "Primero",
-                        last: "Último",
-                        next: "Siguiente",
-                        previous: "Anterior"
-                    }
+    // ✅ Destruir instancia previa de DataTable si existe
+    if ($.fn.DataTable.isDataTable('#tabla_dueno')) {
+        $('#tabla_dueno').DataTable().destroy();
+    }
+    
+    // ✅ Inicializar DataTable con los datos correctos
+    $('#tabla_dueno').DataTable({
+        ...tablaServidor("/tabla_dueno/"),
+        columns: [
+            { data: "id" },
+            { data: "id_categoria" },
+            { data: "nombre" },
+            { data: "total_hh",
+                render: function (data) {
+                    return `${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
                 }
-            });
-        },
-        error: function(xhr, status, error) {
-            console.error("Error en la petición AJAX:", error);
+             },
+            { data: "costo_hh_us",
+                render: function (data) {
+                    return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
+                }
+             },
+            { data: "costo_total",
+                render: function (data) {
+                    return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
+                }
+             },
+            { 
+                data: null, 
+                render: function(data, type, row) {
+                    return `<a href="/editar-dueno/${row.id}/" class="btn btn-warning btn-sm">Editar</a>`;
+                }
+            },
+            { 
+                data: null, 
+                render: function(data, type, row) {
+                    return `<button class="btn-eliminar-dueno btn btn-danger btn-sm" data-id="${row.id}">Eliminar</button>`;
+                }
+            }
+        ],
+        language: {
+            search: "Buscar:",
+            lengthMenu: "Mostrar _MENU_ entradas",
+            info: "Mostrando _START_ a _END_ de _TOTAL_ entradas",
+            paginate: {
+                first: "Primero",
+                last: "Último",
+                next: "Siguiente",
+                previous: "Anterior"
+            }
         }
     });
 }
@@ -1582,61 +1508,50 @@ function getCSRFToken() {
 
 
 function listadoMB() {
-    $.ajax({
-        url: "/tabla_mb/",
-        type: "GET",
-        dataType: "json",
-        headers: { "X-Requested-With": "XMLHttpRequest" },
-        success: function(response) {
-            // ✅ Destruir instancia previa de DataTable si existe
-            if ($.fn.DataTable.isDataTable('#tabla_mb')) {
-                $('#tabla_mb').DataTable().destroy();
-            }
-            
-            // ✅ Inicializar DataTable con los datos correctos
-            $('#tabla_mb').DataTable({
-                data: response,
-                columns: [
-                    { data: "id" },
-                    { data: "mb",
-                        render: function (data) {
-                            return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { data: "fc",
-                        render: function (data) {
-                            return `${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { data: "anio" },
-                    { 
-                        data: null, 
-                        render: function(data, type, row) {
-                            return `<a href="/editar-mb/${row.id}/" class="btn btn-warning btn-sm">Editar</a>`;
-                        }
-                    },
-                    { 
-                        data: null, 
-                        render: function(data, type, row) {
-                            return `<button class="btn-eliminar-mb btn btn-danger btn-sm" data-id="${row.id}">Eliminar</button>`;
-                        }
-                    }
-                ],
-                language: {
-                    search: "Buscar:",
-                    lengthMenu: "Mostrar _MENU_ entradas",
-                    info: "Mostrando _START_ a _END_ de _TOTAL_ entradas",
-                    paginate: {
-                        first: "Primero",
-                        last: "Último",
-                        next: "Siguiente",
-                        previous: "Anterior"
-                    }
+    // ✅ Destruir instancia previa de DataTable si existe
+    if ($.fn.DataTable.isDataTable('#tabla_mb')) {
+        $('#tabla_mb').DataTable().destroy();
+    }
+    
+    // ✅ Inicializar DataTable con los datos correctos
+    $('#tabla_mb').DataTable({
+        ...tablaServidor("/tabla_mb/"),
+        columns: [
+            { data: "id" },
+            { data: "mb",
+                render: function (data) {
+                    return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
                 }
-            });
-        },
-        error: function(xhr, status, error) {
-            console.error("Error en la petición AJAX:", error);
+             },
+            { data: "fc",
+                render: function (data) {
+                    return `${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
+                }
+             },
+            { data: "anio" },
+            { 
+                data: null, 
+                render: function(data, type, row) {
+                    return `<a href="/editar-mb/${row.id}/" class="btn btn-warning btn-sm">Editar</a>`;
+                }
+            },
+            { 
+                data: null, 
+                render: function(data, type, row) {
+                    return `<button class="btn-eliminar-mb btn btn-danger btn-sm" data-id="${row.id}">Eliminar</button>`;
+                }
+            }
+        ],
+        language: {
+            search: "Buscar:",
+            lengthMenu: "Mostrar _MENU_ entradas",
+            info: "Mostrando _START_ a _END_ de _TOTAL_ entradas",
+            paginate: {
+                first: "Primero",
+                last: "Último",
+                next: "Siguiente",
+                previous: "Anterior"
+            }
         }
     });
 }
@@ -1682,92 +1597,81 @@ function getCSRFToken() {
 
 
 function listadoAdministracionSupervision() {
-    $.ajax({
-        url: "/tabla_administracion_supervision/",
-        type: "GET",
-        dataType: "json",
-        headers: { "X-Requested-With": "XMLHttpRequest" },
-        success: function(response) {
-            // ✅ Destruir instancia previa de DataTable si existe
-            if ($.fn.DataTable.isDataTable('#tabla_administracion_supervision')) {
-                $('#tabla_administracion_supervision').DataTable().destroy();
-            }
-            
-            // ✅ Inicializar DataTable con los datos correctos
-            $('#tabla_administracion_supervision').DataTable({
-                data: response,
-                columns: [
-                    { data: "id" },
-                    { data: "id_categoria" },
-                    { data: "unidad" },
-                    { data: "precio_unitario_clp",
-                        render: function (data) {
-                            return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { data: "total_unitario",
-                        render: function (data) {
-                            return `${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { data: "factor_uso",
-                        render: function (data) {
-                            return `${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { data: "cantidad_u_persona",
-                        render: function (data) {
-                            return `${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { data: "mb_seleccionado",
-                        render: function (data) {
-                            return `${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { data: "costo_total_clp",
-                        render: function (data) {
-                            return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { data: "costo_total_us",
-                        render: function (data) {
-                            return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { data: "costo_total_mb",
-                        render: function (data) {
-                            return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { 
-                        data: null, 
-                        render: function(data, type, row) {
-                            return `<a href="/editar-administracion-supervision/${row.id}/" class="btn btn-warning btn-sm">Editar</a>`;
-                        }
-                    },
-                    { 
-                        data: null, 
-                        render: function(data, type, row) {
-                            return `<button class="btn-eliminar-administracion-supervision btn btn-danger btn-sm" data-id="${row.id}">Eliminar</button>`;
-                        }
-                    }
-                ],
-                language: {
-                    search: "Buscar:",
-                    lengthMenu: "Mostrar _MENU_ entradas",
-                    info: "Mostrando _START_ a _END_ de _TOTAL_ entradas",
-                    paginate: {
-                        first: "Primero",
-                        last: "Último",
-                        next: "Siguiente",
-                        previous: "Anterior"
-                    }
+    // ✅ Destruir instancia previa de DataTable si existe
+    if ($.fn.DataTable.isDataTable('#tabla_administracion_supervision')) {
+        $('#tabla_administracion_supervision').DataTable().destroy();
+    }
+    
+    // ✅ Inicializar DataTable con los datos correctos
+    $('#tabla_administracion_supervision').DataTable({
+        ...tablaServidor("/tabla_administracion_supervision/"),
+        columns: [
+            { data: "id" },
+            { data: "id_categoria" },
+            { data: "unidad" },
+            { data: "precio_unitario_clp",
+                render: function (data) {
+                    return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
                 }
-            });
-        },
-        error: function(xhr, status, error) {
-            console.error("Error en la petición AJAX:", error);
+             },
+            { data: "total_unitario",
+                render: function (data) {
+                    return `${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
+                }
+             },
+            { data: "factor_uso",
+                render: function (data) {
+                    return `${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
+                }
+             },
+            { data: "cantidad_u_persona",
+                render: function (data) {
+                    return `${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
+                }
+             },
+            { data: "mb_seleccionado",
+                render: function (data) {
+                    return `${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
+                }
+             },
+            { data: "costo_total_clp",
+                render: function (data) {
+                    return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
+                }
+             },
+            { data: "costo_total_us",
+                render: function (data) {
+                    return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
+                }
+             },
+            { data: "costo_total_mb",
+                render: function (data) {
+                    return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
+                }
+             },
+            { 
+                data: null, 
+                render: function(data, type, row) {
+                    return `<a href="/editar-administracion-supervision/${row.id}/" class="btn btn-warning btn-sm">Editar</a>`;
+                }
+            },
+            { 
+                data: null, 
+                render: function(data, type, row) {
+                    return `<button class="btn-eliminar-administracion-supervision btn btn-danger btn-sm" data-id="${row.id}">Eliminar</button>`;
+                }
+            }
+        ],
+        language: {
+            search: "Buscar:",
+            lengthMenu: "Mostrar _MENU_ entradas",
+            info: "Mostrando _START_ a _END_ de _TOTAL_ entradas",
+            paginate: {
+                first: "Primero",
+                last: "Último",
+                next: "Siguiente",
+                previous: "Anterior"
+            }
         }
     });
 }
@@ -1814,94 +1718,83 @@ function getCSRFToken() {
 
 
 function listadoPersonalIndirectoContratista() {
-    $.ajax({
-        url: "/tabla_personal_indirecto_contratista/",
-        type: "GET",
-        dataType: "json",
-        headers: { "X-Requested-With": "XMLHttpRequest" },
-        success: function(response) {
-            // ✅ Destruir instancia previa de DataTable si existe
-            if ($.fn.DataTable.isDataTable('#tabla_personal_indirecto_contratista')) {
-                $('#tabla_personal_indirecto_contratista').DataTable().destroy();
-            }
-            
-            // ✅ Inicializar DataTable con los datos correctos
-            $('#tabla_personal_indirecto_contratista').DataTable({
-                data: response,
-                columns: [
-                    { data: "id" },
-                    { data: "id_categoria" },
-                    { data: "mb_seleccionado" },
-                    { data: "turno" },
-                    { data: "unidad" },
-                    { data: "hh_mes",
-                        render: function (data) {
-                            return `${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { data: "plazo_mes",
-                        render: function (data) {
-                            return `${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { data: "total_hh",
-                        render: function (data) {
-                            return `${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { data: "precio_unitario_clp_hh",
-                        render: function (data) {
-                            return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { data: "tarifa_usd_hh",
-                        render: function (data) {
-                            return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { data: "costo_total_clp",
-                        render: function (data) {
-                            return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { data: "costo_total_us",
-                        render: function (data) {
-                            return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { data: "costo_total_mb",
-                        render: function (data) {
-                            return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { 
-                        data: null, 
-                        render: function(data, type, row) {
-                            return `<a href="/editar-personal-indirecto-contratista/${row.id}/" class="btn btn-warning btn-sm">Editar</a>`;
-                        }
-                    },
-                    { 
-                        data: null, 
-                        render: function(data, type, row) {
-                            return `<button class="btn-eliminar-personal-indirecto-contratista btn btn-danger btn-sm" data-id="${row.id}">Eliminar</button>`;
-                        }
-                    }
-                ],
-                language: {
-                    search: "Buscar:",
-                    lengthMenu: "Mostrar _MENU_ entradas",
-                    info: "Mostrando _START_ a _END_ de _TOTAL_ entradas",
-                    paginate: {
-                        first: "Primero",
-                        last: "Último",
-                        next: "Siguiente",
-                        previous: "Anterior"
-                    }
+    // ✅ Destruir instancia previa de DataTable si existe
+    if ($.fn.DataTable.isDataTable('#tabla_personal_indirecto_contratista')) {
+        $('#tabla_personal_indirecto_contratista').DataTable().destroy();
+    }
+    
+    // ✅ Inicializar DataTable con los datos correctos
+    $('#tabla_personal_indirecto_contratista').DataTable({
+        ...tablaServidor("/tabla_personal_indirecto_contratista/"),
+        columns: [
+            { data: "id" },
+            { data: "id_categoria" },
+            { data: "mb_seleccionado" },
+            { data: "turno" },
+            { data: "unidad" },
+            { data: "hh_mes",
+                render: function (data) {
+                    return `${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
                 }
-            });
-        },
-        error: function(xhr, status, error) {
-            console.error("Error en la petición AJAX:", error);
+             },
+            { data: "plazo_mes",
+                render: function (data) {
+                    return `${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
+                }
+             },
+            { data: "total_hh",
+                render: function (data) {
+                    return `${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
+                }
+             },
+            { data: "precio_unitario_clp_hh",
+                render: function (data) {
+                    return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
+                }
+             },
+            { data: "tarifa_usd_hh",
+                render: function (data) {
+                    return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
+                }
+             },
+            { data: "costo_total_clp",
+                render: function (data) {
+                    return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
+                }
+             },
+            { data: "costo_total_us",
+                render: function (data) {
+                    return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
+                }
+             },
+            { data: "costo_total_mb",
+                render: function (data) {
+                    return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
+                }
+             },
+            { 
+                data: null, 
+                render: function(data, type, row) {
+                    return `<a href="/editar-personal-indirecto-contratista/${row.id}/" class="btn btn-warning btn-sm">Editar</a>`;
+                }
+            },
+            { 
+                data: null, 
+                render: function(data, type, row) {
+                    return `<button class="btn-eliminar-personal-indirecto-contratista btn btn-danger btn-sm" data-id="${row.id}">Eliminar</button>`;
+                }
+            }
+        ],
+        language: {
+            search: "Buscar:",
+            lengthMenu: "Mostrar _MENU_ entradas",
+            info: "Mostrando _START_ a _END_ de _TOTAL_ entradas",
+            paginate: {
+                first: "Primero",
+                last: "Último",
+                next: "Siguiente",
+                previous: "Anterior"
+            }
         }
     });
 }
@@ -1948,73 +1841,62 @@ function getCSRFToken() {
 
 
 function listadoServiciosApoyo() {
-    $.ajax({
-        url: "/tabla_servicios_apoyo/",  // Endpoint to fetch data
-        type: "GET",
-        dataType: "json",
-        headers: { "X-Requested-With": "XMLHttpRequest" },
-        success: function(response) {
-            // ✅ Destroy previous instance of DataTable if it exists
-            if ($.fn.DataTable.isDataTable('#tabla_servicios_apoyo')) {
-                $('#tabla_servicios_apoyo').DataTable().destroy();
-            }
-            
-            // ✅ Initialize DataTable with the correct data
-            $('#tabla_servicios_apoyo').DataTable({
-                data: response,
-                columns: [
-                    { data: "id" },
-                    { data: "id_categoria" },
-                    { data: "unidad" },
-                    { data: "cantidad",
-                        render: function (data) {
-                            return `${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { data: "hh_totales",
-                        render: function (data) {
-                            return `${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { data: "tarifas_clp",
-                        render: function (data) {
-                            return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { data: "mb" },
-                    { data: "total_usd",
-                        render: function (data) {
-                            return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { 
-                        data: null, 
-                        render: function(data, type, row) {
-                            return `<a href="/editar-servicios-apoyo/${row.id}/" class="btn btn-warning btn-sm">Editar</a>`;
-                        }
-                    },
-                    { 
-                        data: null, 
-                        render: function(data, type, row) {
-                            return `<button class="btn-eliminar-servicios-apoyo btn btn-danger btn-sm" data-id="${row.id}">Eliminar</button>`;
-                        }
-                    }
-                ],
-                language: {
-                    search: "Buscar:",
-                    lengthMenu: "Mostrar _MENU_ entradas",
-                    info: "Mostrando _START_ a _END_ de _TOTAL_ entradas",
-                    paginate: {
-                        first: "Primero",
-                        last: "Último",
-                        next: "Siguiente",
-                        previous: "Anterior"
-                    }
+    // ✅ Destroy previous instance of DataTable if it exists
+    if ($.fn.DataTable.isDataTable('#tabla_servicios_apoyo')) {
+        $('#tabla_servicios_apoyo').DataTable().destroy();
+    }
+    
+    // ✅ Initialize DataTable with the correct data
+    $('#tabla_servicios_apoyo').DataTable({
+        ...tablaServidor("/tabla_servicios_apoyo/"),
+        columns: [
+            { data: "id" },
+            { data: "id_categoria" },
+            { data: "unidad" },
+            { data: "cantidad",
+                render: function (data) {
+                    return `${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
                 }
-            });
-        },
-        error: function(xhr, status, error) {
-            console.error("Error en la petición AJAX:", error);
+             },
+            { data: "hh_totales",
+                render: function (data) {
+                    return `${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
+                }
+             },
+            { data: "tarifas_clp",
+                render: function (data) {
+                    return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
+                }
+             },
+            { data: "mb" },
+            { data: "total_usd",
+                render: function (data) {
+                    return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
+                }
+             },
+            { 
+                data: null, 
+                render: function(data, type, row) {
+                    return `<a href="/editar-servicios-apoyo/${row.id}/" class="btn btn-warning btn-sm">Editar</a>`;
+                }
+            },
+            { 
+                data: null, 
+                render: function(data, type, row) {
+                    return `<button class="btn-eliminar-servicios-apoyo btn btn-danger btn-sm" data-id="${row.id}">Eliminar</button>`;
+                }
+            }
+        ],
+        language: {
+            search: "Buscar:",
+            lengthMenu: "Mostrar _MENU_ entradas",
+            info: "Mostrando _START_ a _END_ de _TOTAL_ entradas",
+            paginate: {
+                first: "Primero",
+                last: "Último",
+                next: "Siguiente",
+                previous: "Anterior"
+            }
         }
     });
 }
@@ -2060,78 +1942,67 @@ function getCSRFToken() {
 
 
 function listadoOtrosADM() {
-    $.ajax({
-        url: "/tabla_otros_adm/",  // Cambia esta URL si es necesario
-        type: "GET",
-        dataType: "json",
-        headers: { "X-Requested-With": "XMLHttpRequest" },
-        success: function(response) {
-            // ✅ Destruir instancia previa de DataTable si existe
-            if ($.fn.DataTable.isDataTable('#tabla_otros_adm')) {
-                $('#tabla_otros_adm').DataTable().destroy();
-            }
-            
-            // ✅ Inicializar DataTable con los datos correctos
-            $('#tabla_otros_adm').DataTable({
-                data: response,
-                columns: [
-                    { data: "id" },
-                    { data: "id_categoria" },
-                    { data: "HH",
-                        render: function (data) {
-                            return `${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { data: "MB" },
-                    { data: "total_usd",
-                        render: function (data) {
-                            return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { data: "dedicacion",
-                        render: function (data) {
-                            return `${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { data: "meses",
-                        render: function (data) {
-                            return `${new Intl.NumberFormat('es-CL').format(data)}`;
-                        }
-                     },
-                    { data: "cantidad",
-                        render: function (data) {
-                            return `${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { data: "turno" },
-                    { 
-                        data: null, 
-                        render: function(data, type, row) {
-                            return `<a href="/editar-otros-adm/${row.id}/" class="btn btn-warning btn-sm">Editar</a>`;
-                        }
-                    },
-                    { 
-                        data: null, 
-                        render: function(data, type, row) {
-                            return `<button class="btn-eliminar-otros-adm btn btn-danger btn-sm" data-id="${row.id}">Eliminar</button>`;
-                        }
-                    }
-                ],
-                language: {
-                    search: "Buscar:",
-                    lengthMenu: "Mostrar _MENU_ entradas",
-                    info: "Mostrando _START_ a _END_ de _TOTAL_ entradas",
-                    paginate: {
-                        first: "Primero",
-                        last: "Último",
-                        next: "Siguiente",
-                        previous: "Anterior"
-                    }
+    // ✅ Destruir instancia previa de DataTable si existe
+    if ($.fn.DataTable.isDataTable('#tabla_otros_adm')) {
+        $('#tabla_otros_adm').DataTable().destroy();
+    }
+    
+    // ✅ Inicializar DataTable con los datos correctos
+    $('#tabla_otros_adm').DataTable({
+        ...tablaServidor("/tabla_otros_adm/"),
+        columns: [
+            { data: "id" },
+            { data: "id_categoria" },
+            { data: "HH",
+                render: function (data) {
+                    return `${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
                 }
-            });
-        },
-        error: function(xhr, status, error) {
-            console.error("Error en la petición AJAX:", error);
+             },
+            { data: "MB" },
+            { data: "total_usd",
+                render: function (data) {
+                    return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
+                }
+             },
+            { data: "dedicacion",
+                render: function (data) {
+                    return `${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
+                }
+             },
+            { data: "meses",
+                render: function (data) {
+                    return `${new Intl.NumberFormat('es-CL').format(data)}`;
+                }
+             },
+            { data: "cantidad",
+                render: function (data) {
+                    return `${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
+                }
+             },
+            { data: "turno" },
+            { 
+                data: null, 
+                render: function(data, type, row) {
+                    return `<a href="/editar-otros-adm/${row.id}/" class="btn btn-warning btn-sm">Editar</a>`;
+                }
+            },
+            { 
+                data: null, 
+                render: function(data, type, row) {
+                    return `<button class="btn-eliminar-otros-adm btn btn-danger btn-sm" data-id="${row.id}">Eliminar</button>`;
+                }
+            }
+        ],
+        language: {
+            search: "Buscar:",
+            lengthMenu: "Mostrar _MENU_ entradas",
+            info: "Mostrando _START_ a _END_ de _TOTAL_ entradas",
+            paginate: {
+                first: "Primero",
+                last: "Último",
+                next: "Siguiente",
+                previous: "Anterior"
+            }
         }
     });
 }
@@ -2179,72 +2050,61 @@ function getCSRFToken() {
 ///////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////
 
 function listadoAdministrativoFinanciero() {
-    $.ajax({
-        url: "/tabla_administrativo_financiero/",  // Cambia esta URL si es necesario
-        type: "GET",
-        dataType: "json",
-        headers: { "X-Requested-With": "XMLHttpRequest" },
-        success: function(response) {
-            // ✅ Destruir instancia previa de DataTable si existe
-            if ($.fn.DataTable.isDataTable('#tabla_administrativo_financiero')) {
-                $('#tabla_administrativo_financiero').DataTable().destroy();
-            }
-            
-            // ✅ Inicializar DataTable con los datos correctos
-            $('#tabla_administrativo_financiero').DataTable({
-                data: response,
-                columns: [
-                    { data: "id" },
-                    { data: "id_categoria" },
-                    { data: "unidad" },
-                    { data: "valor",
-                        render: function (data) {
-                            return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { data: "meses",
-                        render: function (data) {
-                            return `${new Intl.NumberFormat('es-CL').format(data)}`;
-                        }
-                     },
-                    { data: "sobre_contrato_base",
-                        render: function (data) {
-                            return `${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { data: "costo_total",
-                        render: function (data) {
-                            return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { 
-                        data: null, 
-                        render: function(data, type, row) {
-                            return `<a href="/editar-administrativo-financiero/${row.id}/" class="btn btn-warning btn-sm">Editar</a>`;
-                        }
-                    },
-                    { 
-                        data: null, 
-                        render: function(data, type, row) {
-                            return `<button class="btn-eliminar-administrativo-financiero btn btn-danger btn-sm" data-id="${row.id}">Eliminar</button>`;
-                        }
-                    }
-                ],
-                language: {
-                    search: "Buscar:",
-                    lengthMenu: "Mostrar _MENU_ entradas",
-                    info: "Mostrando _START_ a _END_ de _TOTAL_ entradas",
-                    paginate: {
-                        first: "Primero",
-                        last: "Último",
-                        next: "Siguiente",
-                        previous: "Anterior"
-                    }
+    // ✅ Destruir instancia previa de DataTable si existe
+    if ($.fn.DataTable.isDataTable('#tabla_administrativo_financiero')) {
+        $('#tabla_administrativo_financiero').DataTable().destroy();
+    }
+    
+    // ✅ Inicializar DataTable con los datos correctos
+    $('#tabla_administrativo_financiero').DataTable({
+        ...tablaServidor("/tabla_administrativo_financiero/"),
+        columns: [
+            { data: "id" },
+            { data: "id_categoria" },
+            { data: "unidad" },
+            { data: "valor",
+                render: function (data) {
+                    return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
                 }
-            });
-        },
-        error: function(xhr, status, error) {
-            console.error("Error en la petición AJAX:", error);
+             },
+            { data: "meses",
+                render: function (data) {
+                    return `${new Intl.NumberFormat('es-CL').format(data)}`;
+                }
+             },
+            { data: "sobre_contrato_base",
+                render: function (data) {
+                    return `${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
+                }
+             },
+            { data: "costo_total",
+                render: function (data) {
+                    return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
+                }
+             },
+            { 
+                data: null, 
+                render: function(data, type, row) {
+                    return `<a href="/editar-administrativo-financiero/${row.id}/" class="btn btn-warning btn-sm">Editar</a>`;
+                }
+            },
+            { 
+                data: null, 
+                render: function(data, type, row) {
+                    return `<button class="btn-eliminar-administrativo-financiero btn btn-danger btn-sm" data-id="${row.id}">Eliminar</button>`;
+                }
+            }
+        ],
+        language: {
+            search: "Buscar:",
+            lengthMenu: "Mostrar _MENU_ entradas",
+            info: "Mostrando _START_ a _END_ de _TOTAL_ entradas",
+            paginate: {
+                first: "Primero",
+                last: "Último",
+                next: "Siguiente",
+                previous: "Anterior"
+            }
         }
     });
 }
@@ -2292,61 +2152,50 @@ function getCSRFToken() {
 ////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////
 
 function listadoDatosEP() {
-    $.ajax({
-        url: "/tabla_datos_ep/",  // Cambia esta URL si es necesario
-        type: "GET",
-        dataType: "json",
-        headers: { "X-Requested-With": "XMLHttpRequest" },
-        success: function(response) {
-            // ✅ Destruir instancia previa de DataTable si existe
-            if ($.fn.DataTable.isDataTable('#tabla_datos_ep')) {
-                $('#tabla_datos_ep').DataTable().destroy();
-            }
-            
-            // ✅ Inicializar DataTable con los datos correctos
-            $('#tabla_datos_ep').DataTable({
-                data: response,
-                columns: [
-                    { data: "id" },
-                    { data: "id_categoria" },
-                    { data: "hh_profesionales",
-                        render: function (data) {
-                            return `${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { data: "precio_hh",
-                        render: function (data) {
-                            return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { 
-                        data: null, 
-                        render: function(data, type, row) {
-                            return `<a href="/editar-datos-ep/${row.id}/" class="btn btn-warning btn-sm">Editar</a>`;
-                        }
-                    },
-                    { 
-                        data: null, 
-                        render: function(data, type, row) {
-                            return `<button class="btn-eliminar-datos-ep btn btn-danger btn-sm" data-id="${row.id}">Eliminar</button>`;
-                        }
-                    }
-                ],
-                language: {
-                    search: "Buscar:",
-                    lengthMenu: "Mostrar _MENU_ entradas",
-                    info: "Mostrando _START_ a _END_ de _TOTAL_ entradas",
-                    paginate: {
-                        first: "Primero",
-                        last: "Último",
-                        next: "Siguiente",
-                        previous: "Anterior"
-                    }
+    // ✅ Destruir instancia previa de DataTable si existe
+    if ($.fn.DataTable.isDataTable('#tabla_datos_ep')) {
+        $('#tabla_datos_ep').DataTable().destroy();
+    }
+    
+    // ✅ Inicializar DataTable con los datos correctos
+    $('#tabla_datos_ep').DataTable({
+        ...tablaServidor("/tabla_datos_ep/"),
+        columns: [
+            { data: "id" },
+            { data: "id_categoria" },
+            { data: "hh_profesionales",
+                render: function (data) {
+                    return `${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
                 }
-            });
-        },
-        error: function(xhr, status, error) {
-            console.error("Error en la petición AJAX:", error);
+             },
+            { data: "precio_hh",
+                render: function (data) {
+                    return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
+                }
+             },
+            { 
+                data: null, 
+                render: function(data, type, row) {
+                    return `<a href="/editar-datos-ep/${row.id}/" class="btn btn-warning btn-sm">Editar</a>`;
+                }
+            },
+            { 
+                data: null, 
+                render: function(data, type, row) {
+                    return `<button class="btn-eliminar-datos-ep btn btn-danger btn-sm" data-id="${row.id}">Eliminar</button>`;
+                }
+            }
+        ],
+        language: {
+            search: "Buscar:",
+            lengthMenu: "Mostrar _MENU_ entradas",
+            info: "Mostrando _START_ a _END_ de _TOTAL_ entradas",
+            paginate: {
+                first: "Primero",
+                last: "Último",
+                next: "Siguiente",
+                previous: "Anterior"
+            }
         }
     });
 }
@@ -2394,92 +2243,80 @@ function getCSRFToken() {
 //////////////////////////////////////////////////////////////////////////////////////////////////////////////////
 
 function listadoDatosOtrosEP() {
-    $.ajax({
-        url: "/tabla_datos_otros_ep/",  // Asegúrate de tener esta URL configurada en tus urls.py
-        type: "GET",
-        dataType: "json",
-        headers: { "X-Requested-With": "XMLHttpRequest" },
-        success: function(response) {
-            // Destruir instancia previa de DataTable si existe
-            if ($.fn.DataTable.isDataTable('#tabla_datos_otros_ep')) {
-                $('#tabla_datos_otros_ep').DataTable().destroy();
+    // Destruir instancia previa de DataTable si existe
+    if ($.fn.DataTable.isDataTable('#tabla_datos_otros_ep')) {
+        $('#tabla_datos_otros_ep').DataTable().destroy();
+    }
+    
+    // Inicializar DataTable con los datos
+    $('#tabla_datos_otros_ep').DataTable({
+        ...tablaServidor("/tabla_datos_otros_ep/"),
+        columns: [
+            { data: "id", },
+            { 
+                data: "id_categoria", 
+                
+            },
+            { data: "comprador", title: "Comprador",
+                render: function (data) {
+                    return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
+                }
+             },
+            { data: "dedicacion", title: "Dedicación",
+                render: function (data) {
+                    return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
+                }
+             },
+            { data: "plazo", title: "Plazo",
+                render: function (data) {
+                    return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
+                }
+             },
+            { data: "sueldo_pax", title: "Sueldo Pax",
+                render: function (data) {
+                    return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
+                }
+             },
+            { data: "gestiones", title: "Gestión",
+                render: function (data) {
+                    return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
+                }
+             },
+            { data: "viajes", title: "Viajes",
+                render: function (data) {
+                    return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
+                }
+             },
+            { 
+                data: null, 
+                title: "Editar",
+                render: function(data, type, row) {
+                    return `<a href="/editar-datos-otros-ep/${row.id}/" class="btn btn-warning btn-sm">Editar</a>`;
+                }
+            },
+            { 
+                data: null, 
+                title: "Eliminar",
+                render: function(data, type, row) {
+                    return `<button class="btn-eliminar-datos-otros-ep btn btn-danger btn-sm" data-id="${row.id}">Eliminar</button>`;
+                }
+            }
+        ],
+        language: {
+            search: "Buscar:",
+            lengthMenu: "Mostrar _MENU_ entradas",
+            info: "Mostrando _START_ a _END_ de _TOTAL_ entradas",
+            paginate: {
+                first: "Primero",
+                last: "Último",
+                next: "Siguiente",
+                previous: "Anterior"
             }
-            
-            // Inicializar DataTable con los datos
-            $('#tabla_datos_otros_ep').DataTable({
-                data: response,
-                columns: [
-                    { data: "id", },
-                    { 
-                        data: "id_categoria", 
-                        
-                    },
-                    { data: "comprador", title: "Comprador",
-                        render: function (data) {
-                            return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { data: "dedicacion", title: "Dedicación",
-                        render: function (data) {
-                            return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { data: "plazo", title: "Plazo",
-                        render: function (data) {
-                            return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { data: "sueldo_pax", title: "Sueldo Pax",
-                        render: function (data) {
-                            return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { data: "gestiones", title: "Gestión",
-                        render: function (data) {
-                            return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { data: "viajes", title: "Viajes",
-                        render: function (data) {
-                            return `$${new Intl.NumberFormat('es-CL', { minimumFractionDigits: 2 }).format(data)}`;
-                        }
-                     },
-                    { 
-                        data: null, 
-                        title: "Editar",
-                        render: function(data, type, row) {
-                            return `<a href="/editar-datos-otros-ep/${row.id}/" class="btn btn-warning btn-sm">Editar</a>`;
-                        }
-                    },
-                    { 
-                        data: null, 
-                        title: "Eliminar",
-                        render: function(data, type, row) {
-                            return `<button class="btn-eliminar-datos-otros-ep btn btn-danger btn-sm" data-id="${row.id}">Eliminar</button>`;
-                        }
-                    }
-                ],
-                language: {
-                    search: "Buscar:",
-                    lengthMenu: "Mostrar _MENU_ entradas",
-                    info: "Mostrando _START_ a _END_ de _TOTAL_ entradas",
-                    paginate: {
-                        first: "Primero",
-                        last: "Último",
-                        next: "Siguiente",
-                        previous: "Anterior"
-                    }
-                },
-                dom: 'Bfrtip',  // Para botones de exportación si los necesitas
-                buttons: [
-                    'copy', 'csv', 'excel', 'pdf', 'print'
-                ]
-            });
         },
-        error: function(xhr, status, error) {
-            console.error("Error en la petición AJAX:", error);
-            alert("Error al cargar los datos. Por favor, recarga la página.");
-        }
+        dom: 'Bfrtip',  // Para botones de exportación si los necesitas
+        buttons: [
+            'copy', 'csv', 'excel', 'pdf', 'print'
+        ]
     });
 }
 